@@ -0,0 +1,61 @@
+"""Benchmark del tiempo de arranque de un proceso nuevo
+
+Cada medición corre en un intérprete nuevo (arranque en frío de un worker)
+y reporta la mediana de: importar `aeroalpes.api`, ejecutar `create_app` y
+atender la primera petición (`GET /health`). Se compara una base de datos
+nueva, una existente con la verificación de la versión del esquema y una
+existente ejecutando create_all en cada arranque (comportamiento anterior).
+
+Uso: python benchmarks/bench_arranque.py [repeticiones]
+
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+PROCESO = '''
+import json, sys, time
+inicio = time.perf_counter()
+from aeroalpes.api import create_app
+importado = time.perf_counter()
+app = create_app(json.loads(sys.argv[1]))
+creada = time.perf_counter()
+assert app.test_client().get('/health').status_code == 200
+atendida = time.perf_counter()
+print(json.dumps(dict(importar=importado - inicio, create_app=creada - importado, primera_peticion=atendida - creada)))
+'''
+
+def medir(configuracion: dict) -> dict:
+    salida = subprocess.run(
+        [sys.executable, '-c', PROCESO, json.dumps(configuracion)],
+        env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(salida)
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    directorio = tempfile.mkdtemp()
+    existente = os.path.join(directorio, 'existente.db')
+    medir({"TESTING": True, "DATABASE": existente})
+
+    casos = [
+        ("bd nueva", lambda i: {"TESTING": True, "DATABASE": os.path.join(directorio, f'nueva{i}.db')}),
+        ("bd existente, versión", lambda i: {"TESTING": True, "DATABASE": existente}),
+        ("bd existente, create_all", lambda i: {"TESTING": True, "DATABASE": existente, "ESQUEMA_VERIFICAR_VERSION": False}),
+    ]
+
+    print(f"{'caso':<26} {'importar':>10} {'create_app':>11} {'1a petición':>12} {'total':>10}   (ms, mediana de {repeticiones})")
+    for nombre, configuracion in casos:
+        mediciones = [medir(configuracion(i)) for i in range(repeticiones)]
+        medianas = {fase: statistics.median(m[fase] for m in mediciones) * 1000 for fase in mediciones[0]}
+        total = statistics.median(sum(m.values()) for m in mediciones) * 1000
+        print(f"{nombre:<26} {medianas['importar']:10.1f} {medianas['create_app']:11.1f} {medianas['primera_peticion']:12.1f} {total:10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark de lecturas por id con y sin el cache de agregados
+
+Se crean usuarios y reservas y se leen por id (`GET /cliente/usuarios/<id>`
+y `GET /vuelos/reserva/<id>`) eligiendo el id con una distribución sesgada
+(unos pocos agregados reciben la mayoría de las lecturas). Se reportan
+lecturas por segundo, sentencias SQL por lectura y la tasa de aciertos del
+cache.
+
+Uso: python benchmarks/bench_cache_agregados.py [lecturas] [agregados]
+
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+from aeroalpes.config.db import engines
+
+def usuario(consecutivo: int) -> str:
+    return json.dumps({
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Cache{consecutivo}",
+        "email": f"cache{consecutivo}@example.com",
+        "cedula": str(consecutivo),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{consecutivo}", "datos_ofuscados": "****1234"}]
+    })
+
+def reserva(consecutivo: int) -> str:
+    fecha = f"2024-{consecutivo % 12 + 1:02d}-{consecutivo % 28 + 1:02d}"
+    leg = {"fecha_salida": f"{fecha}T13:00:00Z", "fecha_llegada": f"{fecha}T15:00:00Z",
+           "origen": {"codigo": "BOG", "nombre": "Bogotá"}, "destino": {"codigo": f"M{consecutivo:05d}", "nombre": "Destino"}}
+    return json.dumps({"itinerarios": [{"odos": [{"segmentos": [{"legs": [leg]}]}]}]})
+
+def medir(cache: bool, lecturas: int, agregados: int) -> dict:
+    app = create_app({
+        "TESTING": True, "DATABASE": os.path.join(tempfile.mkdtemp(), 'cache.db'),
+        "CACHE_AGREGADOS": cache, "ADMISION_HABILITADA": False,
+    })
+    cliente = app.test_client()
+    rutas = list()
+    for i in range(agregados):
+        rutas.append(f"/cliente/usuarios/{cliente.post('/cliente/usuarios', data=usuario(i), content_type='application/json').json['id']}")
+        rutas.append(f"/vuelos/reserva/{cliente.post('/vuelos/reserva', data=reserva(i), content_type='application/json').json['id']}")
+
+    sentencias = [0]
+    with app.app_context():
+        for engine in engines():
+            event.listen(engine, 'before_cursor_execute', lambda *args: sentencias.__setitem__(0, sentencias[0] + 1))
+
+    azar = random.Random(7)
+    pesos = [1 / (i + 1) for i in range(len(rutas))]
+    elegidas = azar.choices(rutas, weights=pesos, k=lecturas)
+    inicio = time.perf_counter()
+    for ruta in elegidas:
+        assert cliente.get(ruta).status_code == 200
+    transcurrido = time.perf_counter() - inicio
+
+    estadisticas = app.extensions['cache_agregados'].estadisticas() if cache else dict(aciertos=0, fallos=0)
+    consultas = estadisticas['aciertos'] + estadisticas['fallos']
+    return dict(
+        por_segundo=lecturas / transcurrido,
+        sentencias=sentencias[0] / lecturas,
+        aciertos=estadisticas['aciertos'] / consultas if consultas else 0.0,
+    )
+
+def main():
+    lecturas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    agregados = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print(f"{lecturas} lecturas por id sobre {agregados} usuarios y {agregados} reservas")
+    for nombre, cache in (("sin cache", False), ("con cache", True)):
+        resultado = medir(cache, lecturas, agregados)
+        print(f"{nombre:<10} {resultado['por_segundo']:8.0f} lecturas/s  {resultado['sentencias']:5.2f} sentencias/lectura"
+              f"  aciertos {resultado['aciertos']:.0%}")
+
+if __name__ == '__main__':
+    main()
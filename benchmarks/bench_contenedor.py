@@ -0,0 +1,89 @@
+"""Benchmark de asignaciones por petición con el contenedor de dependencias
+
+Compara el grafo de objetos que se armaba en cada petición (servicio,
+fábricas, mapeadores y repositorio nuevos) contra los singletons que entrega
+el contenedor. Por petición se reporta el tiempo, la cantidad de objetos
+construidos (llamados a `__init__`) y los bytes asignados según tracemalloc.
+
+Uso: python benchmarks/bench_contenedor.py [peticiones]
+
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+from aeroalpes.modulos.vuelos.aplicacion.mapeadores import MapeadorReservaDTOJson
+from aeroalpes.modulos.vuelos.aplicacion.servicios import ServicioReserva
+from aeroalpes.seedwork.aplicacion.contenedor import resolver
+
+def grafo_por_peticion(id_reserva):
+    map_reserva = MapeadorReservaDTOJson()
+    sr = ServicioReserva()
+    return map_reserva, sr.obtener_version_reserva(id_reserva)
+
+def grafo_del_contenedor(id_reserva):
+    map_reserva = resolver(MapeadorReservaDTOJson)
+    sr = resolver(ServicioReserva)
+    return map_reserva, sr.obtener_version_reserva(id_reserva)
+
+def contar_constructores(funcion, id_reserva) -> int:
+    llamados = 0
+
+    def perfil(frame, evento, argumento):
+        nonlocal llamados
+        if evento == 'call' and frame.f_code.co_name == '__init__':
+            llamados += 1
+
+    sys.setprofile(perfil)
+    try:
+        funcion(id_reserva)
+    finally:
+        sys.setprofile(None)
+    return llamados
+
+def bytes_asignados(funcion, id_reserva, peticiones: int) -> float:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    pico = 0
+    for _ in range(peticiones):
+        tracemalloc.reset_peak()
+        funcion(id_reserva)
+        pico += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return pico / peticiones
+
+def medir(funcion, id_reserva, peticiones: int) -> tuple[float, int, float]:
+    funcion(id_reserva)
+    inicio = time.perf_counter()
+    for _ in range(peticiones):
+        funcion(id_reserva)
+    micros = (time.perf_counter() - inicio) / peticiones * 1e6
+    return micros, contar_constructores(funcion, id_reserva), bytes_asignados(funcion, id_reserva, peticiones // 10 or 1)
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    app = create_app({"TESTING": True, "DATABASE": ruta_db})
+
+    with app.test_request_context():
+        id_reserva = 'no-existe'
+        resultados = [
+            ('por petición', medir(grafo_por_peticion, id_reserva, peticiones)),
+            ('contenedor', medir(grafo_del_contenedor, id_reserva, peticiones)),
+        ]
+
+    for nombre, (micros, objetos, bytes_pico) in resultados:
+        print(f"{nombre:13} {micros:8.1f} µs/petición  {objetos:4d} objetos construidos  {bytes_pico / 1024:6.1f} KB pico")
+
+    os.close(fd)
+    os.unlink(ruta_db)
+
+if __name__ == '__main__':
+    main()
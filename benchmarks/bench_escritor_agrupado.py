@@ -0,0 +1,111 @@
+"""Benchmark de escrituras concurrentes con y sin escritor agrupado
+
+Lanza a la vez muchos hilos escritores (por defecto 64) que crean usuarios y
+reservas (una de cada tres peticiones), cada escritura con su propia
+transacción o encolada en el escritor agrupado (`ESCRITOR_AGRUPADO`). Se
+reportan escrituras por segundo, percentil 95 de latencia, errores y, con el
+escritor, operaciones por transacción, para los perfiles `durable` y
+`balanced` de SQLite.
+
+Uso: python benchmarks/bench_escritor_agrupado.py [escritores] [duracion]
+
+"""
+
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+
+def usuario(consecutivo: int) -> str:
+    return json.dumps({
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Carga{consecutivo}",
+        "email": f"carga{consecutivo}@example.com",
+        "cedula": str(consecutivo),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{consecutivo}", "datos_ofuscados": "****1234"}]
+    })
+
+def reserva(consecutivo: int) -> str:
+    # Un leg propio por reserva: los itinerarios existentes son información duplicada
+    salida = datetime(2023, 1, 1) + timedelta(minutes=consecutivo)
+    return json.dumps({"itinerarios": [{"odos": [{"segmentos": [{"legs": [{
+        "fecha_salida": salida.isoformat() + "Z", "fecha_llegada": (salida + timedelta(hours=2)).isoformat() + "Z",
+        "origen": {"codigo": "BOG", "nombre": "El Dorado"}, "destino": {"codigo": "JFK", "nombre": "John F. Kennedy"},
+    }]}]}]}]})
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+def medir(perfil: str, agrupado: bool, escritores: int, duracion: float) -> dict:
+    app = create_app({
+        "TESTING": True, "DATABASE": os.path.join(tempfile.mkdtemp(), 'escritor.db'),
+        "SQLITE_PERFIL": perfil, "ESCRITOR_AGRUPADO": agrupado, "ADMISION_HABILITADA": False,
+    })
+    consecutivo = itertools.count()
+    latencias, estados = list(), Counter()
+    candado = threading.Lock()
+    barrera = threading.Barrier(escritores)
+
+    def trabajar():
+        cliente = app.test_client()
+        propias, propios = list(), Counter()
+        barrera.wait()
+        fin = time.perf_counter() + duracion
+        while time.perf_counter() < fin:
+            n = next(consecutivo)
+            inicio = time.perf_counter()
+            if n % 3 == 0:
+                rv = cliente.post('/vuelos/reserva', data=reserva(n), content_type='application/json')
+            else:
+                rv = cliente.post('/cliente/usuarios', data=usuario(n), content_type='application/json')
+            propias.append(time.perf_counter() - inicio)
+            propios[rv.status_code] += 1
+        with candado:
+            latencias.extend(propias)
+            estados.update(propios)
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(escritores)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+
+    escritor = app.extensions.get('escritor')
+    if escritor is not None:
+        escritor.detener()
+    return dict(
+        por_segundo=sum(c for e, c in estados.items() if e < 400) / transcurrido,
+        p95_ms=percentil(latencias, 0.95) * 1000,
+        errores=sum(c for e, c in estados.items() if e >= 400),
+        por_transaccion=escritor.estadisticas()['operaciones_por_lote'] if escritor is not None else 1.0,
+    )
+
+def main():
+    escritores = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    duracion = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+
+    print(f"{escritores} escritores durante {duracion:.0f} s")
+    print(f"{'perfil':<10} {'modo':<26} {'escrituras/s':>12} {'p95 (ms)':>10} {'errores':>8} {'ops/transacción':>16}")
+    for perfil in ('durable', 'balanced'):
+        for agrupado in (False, True):
+            r = medir(perfil, agrupado, escritores, duracion)
+            modo = 'escritor agrupado' if agrupado else 'transacción por petición'
+            print(f"{perfil:<10} {modo:<26} {r['por_segundo']:12.0f} {r['p95_ms']:10.1f} {r['errores']:8} {r['por_transaccion']:16.1f}")
+
+if __name__ == '__main__':
+    main()
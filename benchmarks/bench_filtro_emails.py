@@ -0,0 +1,70 @@
+"""Benchmark de consultas por emails no registrados e inserciones de emails repetidos con y sin el filtro de emails
+
+Con una base de datos de usuarios se mide, sin y con `FILTRO_EMAILS`:
+consultas por email que no existen (`GET /cliente/usuarios/email/<email>`),
+altas con un email ya registrado (`POST /cliente/usuarios`, que responden
+400) y el tiempo de construir el filtro al arrancar.
+
+Uso: python benchmarks/bench_filtro_emails.py [usuarios] [peticiones]
+
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+
+def usuario(consecutivo: int) -> dict:
+    return {
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Filtro{consecutivo}",
+        "email": f"filtro{consecutivo}@example.com",
+        "cedula": str(consecutivo),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{consecutivo}", "datos_ofuscados": "****1234"}]
+    }
+
+def por_segundo(peticiones: int, hacer) -> float:
+    inicio = time.perf_counter()
+    for i in range(peticiones):
+        hacer(i)
+    return peticiones / (time.perf_counter() - inicio)
+
+def medir(base: str, filtro: bool, usuarios: int, peticiones: int) -> dict:
+    inicio = time.perf_counter()
+    app = create_app({"TESTING": True, "DATABASE": base, "FILTRO_EMAILS": filtro, "ADMISION_HABILITADA": False})
+    arranque = time.perf_counter() - inicio
+    cliente = app.test_client()
+
+    def consultar(i):
+        assert cliente.get(f'/cliente/usuarios/email/ausente{i}@example.com').status_code == 404
+
+    def repetir(i):
+        rv = cliente.post('/cliente/usuarios', data=json.dumps(usuario(i % usuarios)), content_type='application/json')
+        assert rv.status_code == 400
+
+    return dict(arranque_ms=arranque * 1000, consultas=por_segundo(peticiones, consultar), repetidos=por_segundo(peticiones, repetir))
+
+def main():
+    usuarios = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    peticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    base = os.path.join(tempfile.mkdtemp(), 'filtro.db')
+    cliente = create_app({"TESTING": True, "DATABASE": base, "ADMISION_HABILITADA": False}).test_client()
+    for i in range(0, usuarios, 1000):
+        lote = [usuario(j) for j in range(i, min(usuarios, i + 1000))]
+        assert cliente.post('/cliente/usuarios/bulk', data=json.dumps(lote), content_type='application/json').status_code in (200, 201, 207)
+
+    print(f"{usuarios} usuarios registrados, {peticiones} peticiones por caso")
+    for nombre, filtro in (("sin filtro", False), ("con filtro", True)):
+        resultado = medir(base, filtro, usuarios, peticiones)
+        print(f"{nombre:<11} arranque {resultado['arranque_ms']:7.1f} ms  emails no registrados {resultado['consultas']:6.0f}/s"
+              f"  emails repetidos {resultado['repetidos']:6.0f}/s")
+
+if __name__ == '__main__':
+    main()
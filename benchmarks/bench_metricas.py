@@ -0,0 +1,84 @@
+"""Benchmark del costo de las métricas por petición
+
+Mide por separado el costo de los ganchos de `Metricas` (iniciar el
+cronómetro y registrar la respuesta en los histogramas), el costo de un
+método instrumentado frente al mismo método sin instrumentar y la
+diferencia en peticiones completas a una ruta trivial con y sin la extensión.
+
+Uso: python benchmarks/bench_metricas.py [peticiones]
+
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from flask import Flask, Response
+from aeroalpes.seedwork.presentacion.metricas import Metricas, instrumentar
+
+class Repositorio:
+    def obtener(self, id):
+        return id
+
+class RepositorioInstrumentado:
+    def obtener(self, id):
+        return id
+
+instrumentar(RepositorioInstrumentado, 'repositorio')
+
+def crear_app(con_metricas: bool) -> Flask:
+    app = Flask(__name__)
+    if con_metricas:
+        Metricas(app)
+
+    @app.route('/usuarios/<id>')
+    def usuario(id):
+        return id
+
+    return app
+
+def micros_por_llamado(funcion, repeticiones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+def main():
+    peticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    app = crear_app(con_metricas=True)
+    metricas = app.extensions['metricas']
+    respuesta = Response('ok')
+    with app.test_request_context('/usuarios/1'):
+        app.preprocess_request()
+
+        def ganchos():
+            metricas.iniciar()
+            metricas.registrar(respuesta)
+        ganchos_us = micros_por_llamado(ganchos, peticiones * 5)
+
+        # Dentro de una petición medida, con el cronómetro activo
+        metricas.iniciar()
+        simple, instrumentado = Repositorio(), RepositorioInstrumentado()
+        sin_capa_us = micros_por_llamado(lambda: simple.obtener(1), peticiones * 5)
+        con_capa_us = micros_por_llamado(lambda: instrumentado.obtener(1), peticiones * 5)
+        metricas.descartar()
+
+    fuera_us = micros_por_llamado(lambda: instrumentado.obtener(1), peticiones * 5)
+
+    completas = dict()
+    for nombre, con_metricas in (('sin métricas', False), ('con métricas', True)):
+        cliente = crear_app(con_metricas).test_client()
+        cliente.get('/usuarios/1')
+        completas[nombre] = micros_por_llamado(lambda: cliente.get('/usuarios/1'), peticiones)
+
+    print(f"ganchos por petición          {ganchos_us:8.2f} µs")
+    print(f"llamado instrumentado         {con_capa_us - sin_capa_us:8.2f} µs adicionales por método medido")
+    print(f"llamado fuera de petición     {fuera_us - sin_capa_us:8.2f} µs adicionales")
+    for nombre, micros in completas.items():
+        print(f"petición completa {nombre:12} {micros:8.1f} µs")
+
+if __name__ == '__main__':
+    main()
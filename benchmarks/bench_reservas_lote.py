@@ -0,0 +1,69 @@
+"""Benchmark de ingesta masiva de reservas
+
+Compara `ServicioReserva.crear_reserva` (una reserva y un commit por
+llamado) contra `ServicioReserva.crear_reservas_en_lote`.
+
+Uso: python benchmarks/bench_reservas_lote.py [cantidad]
+
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+from aeroalpes.modulos.vuelos.aplicacion.mapeadores import MapeadorReservaDTOJson
+from aeroalpes.modulos.vuelos.aplicacion.servicios import ServicioReserva
+
+FORMATO_FECHA = '%Y-%m-%dT%H:%M:%SZ'
+
+def generar_reservas(cantidad: int, inicio: datetime):
+    # Cada reserva tiene legs distintos para no compartir filas de itinerarios
+    for i in range(cantidad):
+        salida = inicio + timedelta(minutes=i)
+        yield {
+            "itinerarios": [{"odos": [{"segmentos": [{"legs": [
+                {
+                    "fecha_salida": salida.strftime(FORMATO_FECHA),
+                    "fecha_llegada": (salida + timedelta(hours=2)).strftime(FORMATO_FECHA),
+                    "origen": {"codigo": "BOG", "nombre": "El Dorado"},
+                    "destino": {"codigo": "JFK", "nombre": "John F. Kennedy"}
+                },
+                {
+                    "fecha_salida": (salida + timedelta(hours=3)).strftime(FORMATO_FECHA),
+                    "fecha_llegada": (salida + timedelta(hours=9)).strftime(FORMATO_FECHA),
+                    "origen": {"codigo": "JFK", "nombre": "John F. Kennedy"},
+                    "destino": {"codigo": "LAX", "nombre": "Los Angeles"}
+                }
+            ]}]}]}]
+        }
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    app = create_app({"TESTING": True, "DATABASE": ruta_db})
+
+    with app.app_context():
+        sr = ServicioReserva()
+        mapeador = MapeadorReservaDTOJson()
+
+        inicio = time.perf_counter()
+        for reserva in generar_reservas(cantidad, datetime(2030, 1, 1)):
+            sr.crear_reserva(mapeador.externo_a_dto(reserva))
+        uno_a_uno = cantidad / (time.perf_counter() - inicio)
+
+        resultado = sr.crear_reservas_en_lote(generar_reservas(cantidad, datetime(2040, 1, 1)))
+        assert resultado.creadas == cantidad, resultado.errores[:3]
+
+    print(f"uno a uno   {uno_a_uno:12.0f} reservas/s")
+    print(f"por lote    {resultado.reservas_por_segundo:12.0f} reservas/s  ({resultado.reservas_por_segundo / uno_a_uno:.1f}x)")
+
+    os.close(fd)
+    os.unlink(ruta_db)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark de serialización de DTOs
+
+Compara la serialización actual (diccionarios intermedios + `json.dumps`)
+contra los codificadores compilados por DTO de
+`aeroalpes.seedwork.aplicacion.serializacion`.
+
+Uso: python benchmarks/bench_serializacion.py
+
+"""
+
+import json
+import os
+import sys
+import timeit
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.seedwork.aplicacion.serializacion import codificar
+from aeroalpes.modulos.cliente.aplicacion.dto import ClienteNaturalDTO, MetodoPagoDTO
+from aeroalpes.modulos.cliente.aplicacion.mapeadores import MapeadorUsuarioDTOJson
+from aeroalpes.modulos.vuelos.aplicacion.dto import ReservaDTO, ItinerarioDTO, OdoDTO, SegmentoDTO, LegDTO
+
+def reserva_grande(itinerarios: int) -> ReservaDTO:
+    leg = LegDTO(
+        "2022-11-22T13:10:00Z", "2022-11-22T15:10:00Z",
+        {"codigo": "BOG", "nombre": "El Dorado - Bogotá International Airport (BOG)"},
+        {"codigo": "JFK", "nombre": "John F. Kennedy International Airport"}
+    )
+    odo = OdoDTO([SegmentoDTO([leg, leg, leg]) for _ in range(2)])
+    return ReservaDTO(
+        "2022-11-22T13:10:00Z", "2022-11-22T13:10:00Z", "id-reserva",
+        [ItinerarioDTO([odo, odo]) for _ in range(itinerarios)]
+    )
+
+def usuarios(cantidad: int) -> list[ClienteNaturalDTO]:
+    metodo = MetodoPagoDTO("m1", "CREDITO", "Tarjeta", "tok_123", "****1234", "2022-11-22T13:10:00Z", "2022-11-22T13:10:00Z")
+    return [
+        ClienteNaturalDTO(str(i), "natural", "Juan Pérez", f"juan{i}@example.com", "2022-11-22T13:10:00Z",
+                          "2022-11-22T13:10:00Z", [metodo, metodo], "123", "1990-05-15T00:00:00Z")
+        for i in range(cantidad)
+    ]
+
+def medir(nombre: str, funcion, repeticiones: int):
+    segundos = min(timeit.repeat(funcion, number=repeticiones, repeat=5)) / repeticiones
+    print(f"{nombre:<45} {segundos * 1e3:10.3f} ms")
+    return segundos
+
+def main():
+    reserva = reserva_grande(200)
+    lista_usuarios = usuarios(1000)
+    mapeador = MapeadorUsuarioDTOJson()
+
+    print("Reserva con 200 itinerarios (4.800 legs)")
+    antes = medir("  asdict + json.dumps", lambda: json.dumps(asdict(reserva)).encode(), 20)
+    despues = medir("  codificador compilado", lambda: codificar(reserva), 20)
+    print(f"  mejora: {antes / despues:.1f}x")
+
+    print("1.000 usuarios con métodos de pago")
+    antes = medir("  dto_a_externo + json.dumps", lambda: json.dumps([mapeador.dto_a_externo(u) for u in lista_usuarios]).encode(), 20)
+    despues = medir("  codificador compilado", lambda: codificar(lista_usuarios), 20)
+    print(f"  mejora: {antes / despues:.1f}x")
+
+if __name__ == '__main__':
+    main()
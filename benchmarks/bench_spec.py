@@ -0,0 +1,55 @@
+"""Benchmark del endpoint /spec
+
+Compara el costo por petición de generar el documento OpenAPI en cada
+llamado (comportamiento anterior) contra servir el documento precalculado.
+
+Uso: python benchmarks/bench_spec.py
+
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from flask import jsonify
+from flask_swagger import swagger
+
+from aeroalpes.api import create_app
+
+ITERACIONES = 2000
+
+def main():
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    app = create_app({"TESTING": True, "DATABASE": ruta_db})
+
+    def spec_por_peticion():
+        swag = swagger(app)
+        swag['info']['version'] = "1.0"
+        swag['info']['title'] = "My API"
+        return jsonify(swag)
+
+    spec_precalculada = app.view_functions['spec']
+
+    with app.test_request_context('/spec'):
+        etag = spec_precalculada().get_etag()[0]
+
+    casos = [
+        ("por petición", spec_por_peticion, {}),
+        ("precalculada", spec_precalculada, {}),
+        ("precalculada gzip", spec_precalculada, {'Accept-Encoding': 'gzip'}),
+        ("precalculada 304", spec_precalculada, {'If-None-Match': f'"{etag}"'}),
+    ]
+
+    for nombre, vista, encabezados in casos:
+        with app.test_request_context('/spec', headers=encabezados):
+            segundos = timeit.timeit(vista, number=ITERACIONES)
+        print(f"{nombre:<20} {segundos / ITERACIONES * 1e6:10.2f} µs/petición")
+
+    os.close(fd)
+    os.unlink(ruta_db)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark de cargas mixtas de lectura y escritura por perfil de SQLite
+
+Para cada perfil (`SQLITE_PERFIL`) y sin perfil (rollback journal, valores
+por defecto de SQLite) se crea una base de datos nueva y se lanzan a la vez
+hilos escritores (un usuario nuevo por petición, un commit cada uno) e hilos
+lectores (una página de 20 usuarios). Se reportan operaciones por segundo,
+percentil 95 de latencia y errores de cada clase.
+
+Uso: python benchmarks/bench_sqlite_perfiles.py [escritores] [lectores] [duracion]
+
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+from aeroalpes.config.db import PERFILES_SQLITE
+
+def usuario(consecutivo: int) -> str:
+    return json.dumps({
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Carga{consecutivo}",
+        "email": f"carga{consecutivo}@example.com",
+        "cedula": str(consecutivo),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{consecutivo}", "datos_ofuscados": "****1234"}]
+    })
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+def medir(perfil: str, escritores: int, lectores: int, duracion: float) -> dict:
+    directorio = tempfile.mkdtemp()
+    app = create_app({
+        "TESTING": True, "DATABASE": os.path.join(directorio, 'perfil.db'),
+        "SQLITE_PERFIL": perfil, "ADMISION_HABILITADA": False,
+    })
+    consecutivo = iter(range(sys.maxsize))
+    resultados = {clase: dict(latencias=list(), estados=Counter()) for clase in ('escrituras', 'lecturas')}
+    candado = threading.Lock()
+    fin = time.perf_counter() + duracion
+
+    def trabajar(clase: str):
+        cliente = app.test_client()
+        latencias, estados = list(), Counter()
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            if clase == 'escrituras':
+                rv = cliente.post('/cliente/usuarios', data=usuario(next(consecutivo)), content_type='application/json')
+            else:
+                rv = cliente.get('/cliente/usuarios?limite=20')
+            latencias.append(time.perf_counter() - inicio)
+            estados[rv.status_code] += 1
+        with candado:
+            resultados[clase]['latencias'].extend(latencias)
+            resultados[clase]['estados'].update(estados)
+
+    hilos = [threading.Thread(target=trabajar, args=('escrituras',)) for _ in range(escritores)]
+    hilos += [threading.Thread(target=trabajar, args=('lecturas',)) for _ in range(lectores)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+
+    return {
+        clase: dict(
+            por_segundo=len(resultado['latencias']) / transcurrido,
+            p95_ms=percentil(resultado['latencias'], 0.95) * 1000,
+            errores=sum(cantidad for estado, cantidad in resultado['estados'].items() if estado >= 400),
+        )
+        for clase, resultado in resultados.items()
+    }
+
+def main():
+    escritores = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    lectores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duracion = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+
+    print(f"{escritores} escritores y {lectores} lectores durante {duracion:.0f} s")
+    for perfil in (None, *PERFILES_SQLITE):
+        resumen = medir(perfil, escritores, lectores, duracion)
+        print(f"{perfil or 'sin perfil':<12}", end='')
+        for clase, valores in resumen.items():
+            print(f"  {clase} {valores['por_segundo']:7.0f}/s p95 {valores['p95_ms']:7.1f} ms errores {valores['errores']:<4}", end='')
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark de casos de uso que modifican varios agregados
+
+Compara cada caso de uso con un commit por operación de repositorio
+(comportamiento anterior) y dentro de una unidad de trabajo (un solo flush y
+un solo commit), con los perfiles de SQLite `durable` y `balanced`:
+
+- crear un usuario y 3 reservas suyas
+- actualizar 5 usuarios
+
+Uso: python benchmarks/bench_unidad_trabajo.py [casos]
+
+"""
+
+import contextlib
+import itertools
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+from aeroalpes.config.uow import UnidadDeTrabajoSQLAlchemy
+from aeroalpes.modulos.cliente.aplicacion.dto import ActualizarUsuarioDTO
+from aeroalpes.modulos.cliente.aplicacion.servicios import ServicioUsuario
+from aeroalpes.modulos.vuelos.aplicacion.mapeadores import MapeadorReservaDTOJson
+from aeroalpes.modulos.vuelos.aplicacion.servicios import ServicioReserva
+
+RESERVAS_POR_USUARIO = 3
+USUARIOS_POR_ACTUALIZACION = 5
+
+consecutivo = itertools.count()
+
+def usuario(i: int) -> dict:
+    return {
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Unidad{i}",
+        "email": f"unidad{i}@example.com",
+        "cedula": str(i),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{i}", "datos_ofuscados": "****1234"}]
+    }
+
+def reserva(i: int) -> dict:
+    # Cada reserva con un leg propio: los itinerarios existentes son información duplicada
+    salida = datetime(2023, 1, 1) + timedelta(minutes=i)
+    return {"itinerarios": [{"odos": [{"segmentos": [{"legs": [{
+        "fecha_salida": salida.isoformat() + "Z", "fecha_llegada": (salida + timedelta(hours=2)).isoformat() + "Z",
+        "origen": {"codigo": "BOG", "nombre": "El Dorado"}, "destino": {"codigo": "JFK", "nombre": "John F. Kennedy"},
+    }]}]}]}]}
+
+def crear_usuario_con_reservas(servicio_usuario, servicio_reserva, abrir):
+    mapeador = MapeadorReservaDTOJson()
+    with abrir():
+        servicio_usuario.crear_usuario_desde_json(usuario(next(consecutivo)))
+        for _ in range(RESERVAS_POR_USUARIO):
+            servicio_reserva.crear_reserva(mapeador.externo_a_dto(reserva(next(consecutivo))))
+
+def actualizar_usuarios(servicio_usuario, ids: list[str], en_unidad: bool):
+    dtos = [ActualizarUsuarioDTO(id=id, nombre=f"Nombre Nuevo{next(consecutivo)}") for id in ids]
+    if en_unidad:
+        servicio_usuario.actualizar_usuarios(dtos)
+    else:
+        for dto in dtos:
+            servicio_usuario.actualizar_usuario(dto)
+
+def medir(perfil: str, casos: int) -> dict:
+    app = create_app({"TESTING": True, "DATABASE": os.path.join(tempfile.mkdtemp(), 'unidad.db'), "SQLITE_PERFIL": perfil})
+    servicio_usuario, servicio_reserva = ServicioUsuario(), ServicioReserva()
+    resultados = dict()
+
+    with app.app_context():
+        ids = [servicio_usuario.crear_usuario_desde_json(usuario(next(consecutivo))).id for _ in range(USUARIOS_POR_ACTUALIZACION)]
+
+        for en_unidad in (False, True):
+            abrir = UnidadDeTrabajoSQLAlchemy if en_unidad else contextlib.nullcontext
+            nombre = 'unidad' if en_unidad else 'commit por operación'
+
+            inicio = time.perf_counter()
+            for _ in range(casos):
+                crear_usuario_con_reservas(servicio_usuario, servicio_reserva, abrir)
+            resultados[('usuario + reservas', nombre)] = casos / (time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            for _ in range(casos):
+                actualizar_usuarios(servicio_usuario, ids, en_unidad)
+            resultados[(f'actualizar {USUARIOS_POR_ACTUALIZACION} usuarios', nombre)] = casos / (time.perf_counter() - inicio)
+    return resultados
+
+def main():
+    casos = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"{'perfil':<10} {'caso de uso':<22} {'modo':<22} {'casos/s':>10}")
+    for perfil in ('durable', 'balanced'):
+        for (caso, modo), por_segundo in medir(perfil, casos).items():
+            print(f"{perfil:<10} {caso:<22} {modo:<22} {por_segundo:10.0f}")
+
+if __name__ == '__main__':
+    main()
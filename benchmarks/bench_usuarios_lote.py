@@ -0,0 +1,64 @@
+"""Benchmark de creación masiva de usuarios
+
+Compara `ServicioUsuario.crear_usuario_desde_json` (una validación, un `add`
+y un `commit` por usuario) contra `ServicioUsuario.crear_usuarios_en_lote`,
+que valida cada elemento y persiste los válidos con inserciones multi-fila
+por lote.
+
+Uso: python benchmarks/bench_usuarios_lote.py [cantidad]
+
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aeroalpes.api import create_app
+from aeroalpes.modulos.cliente.aplicacion.servicios import ServicioUsuario
+
+TAMANO_LOTE = 500
+
+def generar_usuarios(cantidad: int, prefijo: str):
+    for i in range(cantidad):
+        yield {
+            "tipo_usuario": "natural",
+            "nombre": f"Usuario Prueba{i}",
+            "email": f"{prefijo}{i}@example.com",
+            "cedula": str(i),
+            "fecha_nacimiento": "1990-05-15T00:00:00Z",
+            "metodos_pago": [
+                {"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{i}", "datos_ofuscados": "****1234"}
+            ]
+        }
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    app = create_app({"TESTING": True, "DATABASE": ruta_db})
+
+    with app.app_context():
+        servicio = ServicioUsuario()
+
+        inicio = time.perf_counter()
+        for usuario_json in generar_usuarios(cantidad, "uno"):
+            servicio.crear_usuario_desde_json(usuario_json)
+        uno_a_uno = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultados = servicio.crear_usuarios_en_lote(generar_usuarios(cantidad, "lote"), TAMANO_LOTE)
+        por_lote = time.perf_counter() - inicio
+
+        errores = [resultado.error for resultado in resultados if resultado.error]
+        assert not errores, errores[:3]
+
+    print(f"uno a uno   {cantidad / uno_a_uno:12.0f} usuarios/s")
+    print(f"por lote    {cantidad / por_lote:12.0f} usuarios/s  ({uno_a_uno / por_lote:.1f}x)")
+
+    os.close(fd)
+    os.unlink(ruta_db)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""Generador de carga HTTP y comparación de los modos WSGI y ASGI
+
+Lanza `concurrencia` clientes que hacen peticiones a una URL durante
+`duracion` segundos y reporta peticiones por segundo, percentiles de latencia
+y códigos de respuesta.
+
+Uso:
+    python benchmarks/generador_carga.py URL [concurrencia] [duracion]
+    python benchmarks/generador_carga.py --comparar [concurrencia] [duracion]
+    python benchmarks/generador_carga.py --admision [concurrencia] [duracion]
+    python benchmarks/generador_carga.py --prefork [concurrencia] [duracion]
+
+Con `--comparar` se levantan, uno a la vez, servidores sobre la misma base
+de datos: el servidor de desarrollo de Flask con un hilo por petición
+(WSGI), gunicorn con workers `gthread` de 16 hilos si está instalado y
+uvicorn con el adaptador ASGI y su pool de 16 hilos (requiere
+`pip install uvicorn`). Cada petición es una reserva nueva (escritura en
+SQLite).
+
+Con `--admision` se levanta el servidor WSGI con y sin control de admisión
+y se lanzan a la vez `concurrencia` escritores (reservas nuevas) y
+`concurrencia` lectores (listado de usuarios). Con el control activo, el
+exceso se rechaza con 503 y la latencia de las lecturas se mantiene acotada.
+
+Con `--prefork` se levanta `flask serve` con 1, 2, 4, ... workers (hasta el
+número de núcleos) y se mide el throughput de lecturas (listado de
+usuarios). Con suficientes núcleos crece casi linealmente con los workers.
+
+"""
+
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FORMATO_FECHA = '%Y-%m-%dT%H:%M:%SZ'
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+def generar_carga(url: str, concurrencia: int = 32, duracion: float = 5.0,
+                  metodo: str = 'GET', cuerpo=None, timeout: float = 30.0) -> dict:
+    """Ejecuta la carga y retorna un resumen con throughput, latencias y estados
+
+    `cuerpo` puede ser bytes o una función que recibe un consecutivo y retorna
+    bytes, para que cada petición sea distinta.
+    """
+    partes = urlsplit(url)
+    ruta = partes.path + (f'?{partes.query}' if partes.query else '')
+    latencias = list()
+    estados = Counter()
+    candado = threading.Lock()
+    consecutivo = iter(range(sys.maxsize))
+    fin = time.perf_counter() + duracion
+
+    def cliente():
+        conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=timeout)
+        locales, estados_locales = list(), Counter()
+        while time.perf_counter() < fin:
+            datos = cuerpo(next(consecutivo)) if callable(cuerpo) else cuerpo
+            encabezados = {'Content-Type': 'application/json'} if datos is not None else {}
+            inicio = time.perf_counter()
+            try:
+                conexion.request(metodo, ruta, body=datos, headers=encabezados)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                estados_locales[respuesta.status] += 1
+            except (OSError, http.client.HTTPException) as e:
+                estados_locales[type(e).__name__] += 1
+                conexion.close()
+                conexion = http.client.HTTPConnection(partes.hostname, partes.port, timeout=timeout)
+            locales.append(time.perf_counter() - inicio)
+        conexion.close()
+        with candado:
+            latencias.extend(locales)
+            estados.update(estados_locales)
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente) for _ in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+
+    return {
+        'peticiones': len(latencias),
+        'peticiones_por_segundo': len(latencias) / transcurrido,
+        'p50_ms': percentil(latencias, 0.50) * 1000,
+        'p95_ms': percentil(latencias, 0.95) * 1000,
+        'p99_ms': percentil(latencias, 0.99) * 1000,
+        'estados': dict(estados),
+    }
+
+def imprimir(nombre: str, resumen: dict):
+    print(f"{nombre:12} {resumen['peticiones_por_segundo']:9.0f} req/s  "
+          f"p50 {resumen['p50_ms']:7.1f} ms  p95 {resumen['p95_ms']:7.1f} ms  "
+          f"p99 {resumen['p99_ms']:7.1f} ms  {resumen['estados']}")
+
+def cuerpo_reserva(base: datetime):
+    def construir(i: int) -> bytes:
+        salida = base + timedelta(minutes=i)
+        return json.dumps({"itinerarios": [{"odos": [{"segmentos": [{"legs": [{
+            "fecha_salida": salida.strftime(FORMATO_FECHA),
+            "fecha_llegada": (salida + timedelta(hours=2)).strftime(FORMATO_FECHA),
+            "origen": {"codigo": "BOG", "nombre": "El Dorado"},
+            "destino": {"codigo": "JFK", "nombre": "John F. Kennedy"}
+        }]}]}]}]}).encode('utf-8')
+    return construir
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def esperar_servidor(puerto: int, limite: float = 20.0):
+    fin = time.perf_counter() + limite
+    while time.perf_counter() < fin:
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=1)
+            conexion.request('GET', '/health')
+            if conexion.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servidor en el puerto {puerto} no respondió")
+
+def levantar(codigo: str, puerto: int, ruta_db: str, configuracion: dict = None) -> subprocess.Popen:
+    entorno = dict(os.environ, PYTHONPATH=os.path.join(RAIZ, 'src'))
+    argumentos = [json.dumps(configuracion)] if configuracion else []
+    proceso = subprocess.Popen(
+        [sys.executable, '-c', codigo, str(puerto), ruta_db, *argumentos],
+        env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    esperar_servidor(puerto)
+    return proceso
+
+SERVIDOR_WSGI = """
+import json, sys
+from aeroalpes.api import create_app
+app = create_app(dict(json.loads(sys.argv[3]) if len(sys.argv) > 3 else {}, TESTING=True, DATABASE=sys.argv[2]))
+app.run(port=int(sys.argv[1]), threaded=True)
+"""
+
+SERVIDOR_GUNICORN = """
+import sys
+from gunicorn.app.base import BaseApplication
+from aeroalpes.api import create_app
+
+class Servidor(BaseApplication):
+    def load_config(self):
+        self.cfg.set('bind', f'127.0.0.1:{sys.argv[1]}')
+        self.cfg.set('worker_class', 'gthread')
+        self.cfg.set('workers', 1)
+        self.cfg.set('threads', 16)
+        self.cfg.set('loglevel', 'warning')
+
+    def load(self):
+        return create_app({"TESTING": True, "DATABASE": sys.argv[2]})
+
+Servidor().run()
+"""
+
+SERVIDOR_ASGI = """
+import sys, uvicorn
+from aeroalpes.api.asgi import crear_app_asgi
+app = crear_app_asgi({"TESTING": True, "DATABASE": sys.argv[2]})
+uvicorn.run(app, port=int(sys.argv[1]), log_level="warning")
+"""
+
+SERVIDOR_PREFORK = """
+import json, sys
+from aeroalpes.api import create_app
+from aeroalpes.api.servidor import servir
+servir(create_app({"TESTING": True, "DATABASE": sys.argv[2]}), puerto=int(sys.argv[1]), workers=json.loads(sys.argv[3])['workers'])
+"""
+
+def comparar(concurrencia: int, duracion: float):
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    modos = [('wsgi', SERVIDOR_WSGI, datetime(2030, 1, 1))]
+    if importlib.util.find_spec('gunicorn'):
+        modos.append(('gthread', SERVIDOR_GUNICORN, datetime(2035, 1, 1)))
+    modos.append(('asgi', SERVIDOR_ASGI, datetime(2040, 1, 1)))
+    try:
+        for nombre, codigo, base in modos:
+            puerto = puerto_libre()
+            proceso = levantar(codigo, puerto, ruta_db)
+            try:
+                resumen = generar_carga(f'http://127.0.0.1:{puerto}/vuelos/reserva', concurrencia,
+                                        duracion, metodo='POST', cuerpo=cuerpo_reserva(base))
+                imprimir(nombre, resumen)
+            finally:
+                proceso.terminate()
+                proceso.wait()
+    finally:
+        os.close(fd)
+        os.unlink(ruta_db)
+
+def admision(concurrencia: int, duracion: float):
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    modos = [
+        ('sin control', {"ADMISION_HABILITADA": False}, datetime(2030, 1, 1)),
+        ('con control', {"ADMISION_HABILITADA": True}, datetime(2040, 1, 1)),
+    ]
+    try:
+        for nombre, configuracion, base in modos:
+            puerto = puerto_libre()
+            proceso = levantar(SERVIDOR_WSGI, puerto, ruta_db, configuracion)
+            resumenes = dict()
+            try:
+                cargas = {
+                    'escrituras': dict(url=f'http://127.0.0.1:{puerto}/vuelos/reserva', metodo='POST', cuerpo=cuerpo_reserva(base)),
+                    'lecturas': dict(url=f'http://127.0.0.1:{puerto}/cliente/usuarios?limite=20'),
+                }
+                hilos = [
+                    threading.Thread(target=lambda clase=clase, carga=carga: resumenes.__setitem__(
+                        clase, generar_carga(concurrencia=concurrencia, duracion=duracion, **carga)))
+                    for clase, carga in cargas.items()
+                ]
+                for hilo in hilos:
+                    hilo.start()
+                for hilo in hilos:
+                    hilo.join()
+            finally:
+                proceso.terminate()
+                proceso.wait()
+
+            print(nombre)
+            for clase, resumen in resumenes.items():
+                imprimir(f'  {clase}', resumen)
+    finally:
+        os.close(fd)
+        os.unlink(ruta_db)
+
+def prefork(concurrencia: int, duracion: float):
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    cantidades = [1]
+    while cantidades[-1] * 2 <= (os.cpu_count() or 1):
+        cantidades.append(cantidades[-1] * 2)
+    try:
+        base = None
+        for workers in cantidades:
+            puerto = puerto_libre()
+            proceso = levantar(SERVIDOR_PREFORK, puerto, ruta_db, dict(workers=workers))
+            try:
+                if workers == 1:
+                    usuarios = [{"tipo_usuario": "natural", "nombre": f"Usuario Carga{i}", "email": f"carga{i}@example.com",
+                                 "cedula": f"{1000 + i}", "fecha_nacimiento": "1990-05-15T00:00:00Z", "metodos_pago": []}
+                                for i in range(20)]
+                    conexion = http.client.HTTPConnection('127.0.0.1', puerto)
+                    conexion.request('POST', '/cliente/usuarios/bulk', body=json.dumps(usuarios),
+                                     headers={'Content-Type': 'application/json'})
+                    conexion.getresponse().read()
+                resumen = generar_carga(f'http://127.0.0.1:{puerto}/cliente/usuarios?limite=20', concurrencia, duracion)
+            finally:
+                proceso.terminate()
+                proceso.wait()
+
+            base = base or resumen['peticiones_por_segundo']
+            imprimir(f'{workers} workers', resumen)
+            print(f"{'':12} x{resumen['peticiones_por_segundo'] / base:.2f} respecto a 1 worker")
+    finally:
+        os.close(fd)
+        os.unlink(ruta_db)
+
+def main():
+    argumentos = sys.argv[1:]
+    if not argumentos:
+        print(__doc__)
+        return
+
+    objetivo = argumentos[0]
+    concurrencia = int(argumentos[1]) if len(argumentos) > 1 else 32
+    duracion = float(argumentos[2]) if len(argumentos) > 2 else 5.0
+
+    if objetivo == '--comparar':
+        comparar(concurrencia, duracion)
+    elif objetivo == '--admision':
+        admision(concurrencia, duracion)
+    elif objetivo == '--prefork':
+        prefork(concurrencia, duracion)
+    else:
+        imprimir('carga', generar_carga(objetivo, concurrencia, duracion))
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,152 @@
+import importlib
 import os
 
 from flask import Flask, jsonify, redirect, render_template, request, url_for
-from flask_swagger import swagger
+
+from aeroalpes.seedwork.aplicacion.contenedor import Contenedor
+from aeroalpes.seedwork.infraestructura.cache import CacheLRU, MapaIdentidad
+from aeroalpes.seedwork.infraestructura.planes import GuardiaPlanes
+from aeroalpes.seedwork.presentacion.admision import ControlAdmision
+from aeroalpes.seedwork.presentacion.api import DocumentoPrecalculado, VistasVersionadas
+from aeroalpes.seedwork.presentacion.compresion import Compresion
+from aeroalpes.seedwork.presentacion.idempotencia import Idempotencia
+from aeroalpes.seedwork.presentacion.metricas import Metricas, instrumentar, instrumentar_commits
+from aeroalpes.seedwork.presentacion.trazas import Trazas
+from aeroalpes.seedwork.trazas import trazar_sesion
 
 # Identifica el directorio base
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+# Módulos que definen los modelos de SQLAlchemy; su código fuente forma la huella del esquema
+MODULOS_MODELOS = (
+    'aeroalpes.modulos.cliente.infraestructura.dto',
+    'aeroalpes.modulos.hoteles.infraestructura.dto',
+    'aeroalpes.modulos.pagos.infraestructura.dto',
+    'aeroalpes.modulos.precios_dinamicos.infraestructura.dto',
+    'aeroalpes.modulos.vehiculos.infraestructura.dto',
+    'aeroalpes.modulos.vuelos.infraestructura.dto',
+)
+
 def importar_modelos_alchemy():
-    import aeroalpes.modulos.cliente.infraestructura.dto
-    import aeroalpes.modulos.hoteles.infraestructura.dto
-    import aeroalpes.modulos.pagos.infraestructura.dto
-    import aeroalpes.modulos.precios_dinamicos.infraestructura.dto
-    import aeroalpes.modulos.vehiculos.infraestructura.dto
-    import aeroalpes.modulos.vuelos.infraestructura.dto
+    from aeroalpes.config.db import db
+    from aeroalpes.config.indices import definir_indices
+
+    for modulo in MODULOS_MODELOS:
+        importlib.import_module(modulo)
+    definir_indices(db.metadata)
+
+def registrar_dependencias(contenedor: Contenedor, cache: CacheLRU = None):
+    from aeroalpes.config.uow import UnidadDeTrabajoSQLAlchemy
+    from aeroalpes.modulos.cliente.aplicacion.mapeadores import MapeadorUsuarioDTOJson
+    from aeroalpes.modulos.cliente.aplicacion.servicios import CargadorUsuarios, ServicioUsuario
+    from aeroalpes.modulos.cliente.dominio.fabricas import FabricaCliente
+    from aeroalpes.modulos.cliente.infraestructura.fabricas import FabricaRepositorio as FabricaRepositorioCliente
+    from aeroalpes.modulos.vuelos.aplicacion.mapeadores import MapeadorReservaDTOJson
+    from aeroalpes.modulos.vuelos.aplicacion.servicios import CargadorReservas, ServicioReserva
+    from aeroalpes.modulos.vuelos.dominio.fabricas import FabricaVuelos
+    from aeroalpes.modulos.vuelos.infraestructura.fabricas import FabricaRepositorio as FabricaRepositorioVuelos
+
+    # Singletons: fábricas, mapeadores y servicios no guardan estado entre peticiones
+    contenedor.registrar_singleton(FabricaCliente, lambda c: FabricaCliente())
+    contenedor.registrar_singleton(FabricaVuelos, lambda c: FabricaVuelos())
+    # Con `cache`, los repositorios leen los agregados por id desde el mapa de identidad de la petición y el cache
+    mapa_identidad = lambda: contenedor.resolver(MapaIdentidad)
+    contenedor.registrar_singleton(FabricaRepositorioCliente, lambda c: FabricaRepositorioCliente(cache=cache, mapa_identidad=mapa_identidad))
+    contenedor.registrar_singleton(FabricaRepositorioVuelos, lambda c: FabricaRepositorioVuelos(cache=cache, mapa_identidad=mapa_identidad))
+    contenedor.registrar_singleton(MapeadorUsuarioDTOJson, lambda c: MapeadorUsuarioDTOJson())
+    contenedor.registrar_singleton(MapeadorReservaDTOJson, lambda c: MapeadorReservaDTOJson())
+    contenedor.registrar_singleton(ServicioUsuario, lambda c: ServicioUsuario(
+        fabrica_repositorio=c.resolver(FabricaRepositorioCliente),
+        fabrica_cliente=c.resolver(FabricaCliente),
+        fabrica_unidad_de_trabajo=UnidadDeTrabajoSQLAlchemy
+    ))
+    contenedor.registrar_singleton(ServicioReserva, lambda c: ServicioReserva(
+        fabrica_repositorio=c.resolver(FabricaRepositorioVuelos),
+        fabrica_vuelos=c.resolver(FabricaVuelos)
+    ))
+
+    # Por petición: cada petición agrupa y conserva sus propias lecturas por id
+    contenedor.registrar_por_peticion(CargadorUsuarios, lambda c: c.resolver(ServicioUsuario).crear_cargador())
+    contenedor.registrar_por_peticion(CargadorReservas, lambda c: c.resolver(ServicioReserva).crear_cargador())
+    contenedor.registrar_por_peticion(MapaIdentidad, lambda c: MapaIdentidad())
+
+def instrumentar_capas():
+    from aeroalpes.config.db import db
+    from aeroalpes.modulos.cliente.aplicacion import mapeadores as mapeadores_app_cliente
+    from aeroalpes.modulos.cliente.dominio.fabricas import FabricaCliente
+    from aeroalpes.modulos.cliente.infraestructura import mapeadores as mapeadores_cliente
+    from aeroalpes.modulos.cliente.infraestructura.fabricas import FabricaRepositorio as FabricaRepositorioCliente
+    from aeroalpes.modulos.cliente.infraestructura.repositorios import RepositorioUsuariosSQLite
+    from aeroalpes.modulos.vuelos.aplicacion import mapeadores as mapeadores_app_vuelos
+    from aeroalpes.modulos.vuelos.dominio.fabricas import FabricaVuelos
+    from aeroalpes.modulos.vuelos.infraestructura import mapeadores as mapeadores_vuelos
+    from aeroalpes.modulos.vuelos.infraestructura.fabricas import FabricaRepositorio as FabricaRepositorioVuelos
+    from aeroalpes.modulos.vuelos.infraestructura.repositorios import RepositorioReservasSQLite
+
+    capas = dict(
+        mapeador=(
+            mapeadores_app_cliente.MapeadorUsuarioDTOJson, mapeadores_app_cliente.MapeadorUsuario,
+            mapeadores_cliente.MapeadorUsuario, mapeadores_cliente.MapeadorMetodoPago,
+            mapeadores_app_vuelos.MapeadorReservaDTOJson, mapeadores_app_vuelos.MapeadorReserva,
+            mapeadores_vuelos.MapeadorReserva,
+        ),
+        fabrica=(FabricaCliente, FabricaRepositorioCliente, FabricaVuelos, FabricaRepositorioVuelos),
+        repositorio=(RepositorioUsuariosSQLite, RepositorioReservasSQLite),
+    )
+    for capa, clases in capas.items():
+        for clase in clases:
+            instrumentar(clase, capa)
+    instrumentar_commits(db.session)
+
+def instalar_guardia_planes(app: Flask):
+    """Con PLANES_VERIFICAR ('advertir' o 'fallar') revisa el plan de cada sentencia SQL distinta"""
+    from aeroalpes.config.db import engines
+
+    app.config.setdefault('PLANES_VERIFICAR', os.environ.get('AEROALPES_PLANES_VERIFICAR') or None)
+    modo = app.config['PLANES_VERIFICAR']
+    if modo is None:
+        return
+    if modo not in ('advertir', 'fallar'):
+        raise ValueError(f"Modo de PLANES_VERIFICAR desconocido: {modo} (opciones: advertir, fallar)")
+
+    guardia = GuardiaPlanes(
+        fallar=modo == 'fallar',
+        al_encontrar=lambda h: app.logger.warning("Plan de consulta con %s: %s en %s", h.problema, h.detalle, h.sentencia)
+    )
+    with app.app_context():
+        for engine in engines():
+            guardia.instalar(engine)
+    app.extensions['planes'] = guardia
+
+def huella_rutas(app: Flask) -> int:
+    """Huella de las reglas de enrutamiento: cambia si se agrega, quita o reemplaza una regla o su vista"""
+    return hash(tuple(
+        (regla.rule, regla.endpoint, tuple(sorted(regla.methods or ())), id(app.view_functions.get(regla.endpoint)))
+        for regla in app.url_map.iter_rules()
+    ))
+
+def vigilar_rutas(app: Flask):
+    """Función que da `huella_rutas(app)` y solo la recalcula cuando cambian las vistas o el mapa de rutas
+
+    Las vistas se cambian a un `VistasVersionadas`, que cuenta sus cambios.
+    Flask no admite reglas nuevas después de la primera petición; antes de
+    ella, toda regla registrada con su vista también cambia las vistas.
+    """
+    if not isinstance(app.view_functions, VistasVersionadas):
+        app.view_functions = VistasVersionadas(app.view_functions)
+    calculada = dict(llave=None, huella=None)
+
+    def huella():
+        vistas = app.view_functions
+        if not isinstance(vistas, VistasVersionadas):
+            # Alguien reemplazó el diccionario de vistas: no hay cómo saber si cambió
+            return huella_rutas(app)
+        llave = (id(app.url_map), id(vistas), vistas.version)
+        if calculada['llave'] != llave:
+            calculada.update(llave=llave, huella=huella_rutas(app))
+        return calculada['huella']
+
+    return huella
 
 def create_app(configuracion=None):
     # Init la aplicacion de Flask
@@ -28,14 +162,37 @@ def create_app(configuracion=None):
             'sqlite:///' + os.path.join(basedir, 'database.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Las demás variables (por ejemplo COMPRESION_* o ADMISION_*) tienen prioridad sobre los valores por defecto
+    if configuracion is not None:
+        app.config.from_mapping({k: v for k, v in configuracion.items() if k not in ('TESTING', 'DATABASE')})
+
      # Inicializa la DB
-    from aeroalpes.config.db import init_db, db
+    from aeroalpes.config.db import init_db, db, preparar_esquema
+    from aeroalpes.config.cache import init_cache_agregados
+    from aeroalpes.config.escritor import init_escritor
+    from aeroalpes.config.filtro_emails import init_filtro_emails
     
     init_db(app)
-    importar_modelos_alchemy()
 
-    with app.app_context():
-        db.create_all()
+    # Con ESCRITOR_AGRUPADO las escrituras de los repositorios comparten transacción en un hilo escritor
+    init_escritor(app)
+
+    # Con CACHE_AGREGADOS las lecturas por id de usuarios y reservas pasan por un cache LRU del proceso
+    init_cache_agregados(app)
+
+    # Contenedor de dependencias de la aplicación
+    contenedor = Contenedor()
+    registrar_dependencias(contenedor, app.extensions.get('cache_agregados'))
+    contenedor.init_app(app)
+
+    # El DDL solo se ejecuta si los modelos cambiaron desde el último arranque
+    preparar_esquema(app, MODULOS_MODELOS)
+
+    # Con FILTRO_EMAILS un filtro de Bloom de los emails registrados evita consultas e inserciones que no encontrarían o fallarían
+    init_filtro_emails(app)
+
+    # Revisión opcional de los planes de consulta (por ejemplo, AEROALPES_PLANES_VERIFICAR=fallar en las pruebas)
+    instalar_guardia_planes(app)
 
      # Importa Blueprints
     from . import cliente, hoteles, pagos, precios_dinamicos, vehiculos, vuelos
@@ -48,15 +205,48 @@ def create_app(configuracion=None):
     app.register_blueprint(vehiculos.bp)
     app.register_blueprint(vuelos.bp)
 
-    @app.route("/spec")
-    def spec():
+    # Latencias por ruta y por capa, expuestas en /metrics
+    Metricas(app)
+    instrumentar_capas()
+
+    # Spans por capa de una fracción de las peticiones, consultables en TRAZAS_RUTA (solo si se configura)
+    Trazas(app)
+    trazar_sesion(db.session)
+
+    # Rechaza con 503 el exceso de carga antes de que se acumule detrás de las escrituras
+    ControlAdmision(app)
+
+    # Los reintentos con la misma Idempotency-Key repiten la respuesta guardada
+    Idempotencia(app)
+
+    # Comprime las respuestas grandes según el Accept-Encoding del cliente
+    Compresion(app)
+
+    # El documento OpenAPI se genera en el primer /spec y se sirve desde memoria
+    def construir_spec():
+        from flask_swagger import swagger
+
         swag = swagger(app)
         swag['info']['version'] = "1.0"
         swag['info']['title'] = "My API"
-        return jsonify(swag)
+        return swag
+
+    documento_spec = DocumentoPrecalculado(construir_spec, huella=vigilar_rutas(app))
+
+    @app.route("/spec")
+    def spec():
+        return documento_spec.responder()
 
     @app.route("/health")
     def health():
         return {"status": "up"}
 
+    # flask serve: varios procesos que comparten la aplicación precargada
+    from .servidor import serve
+    app.cli.add_command(serve)
+
+    # flask planes: revisa que las consultas de los repositorios usen índices
+    from .planes import planes
+    app.cli.add_command(planes)
+
     return app
@@ -0,0 +1,19 @@
+"""Punto de entrada ASGI del API
+
+Expone las mismas rutas de `create_app` sobre un event loop de asyncio.
+Las llamadas bloqueantes (repositorios, SQLite) se ejecutan en un pool de
+hilos acotado.
+
+Uso: uvicorn --factory aeroalpes.api.asgi:crear_app_asgi --app-dir src
+
+"""
+
+import os
+
+from aeroalpes.api import create_app
+from aeroalpes.seedwork.presentacion.asgi import AdaptadorASGI
+
+def crear_app_asgi(configuracion=None, max_hilos: int = None) -> AdaptadorASGI:
+    if max_hilos is None:
+        max_hilos = int(os.environ.get('AEROALPES_ASGI_MAX_HILOS', 16))
+    return AdaptadorASGI(create_app(configuracion), max_hilos=max_hilos)
@@ -7,31 +7,41 @@ En este archivo encontrará los endpoints REST para gestión de clientes
 import aeroalpes.seedwork.presentacion.api as api
 import json
 from uuid import UUID
-from aeroalpes.modulos.cliente.aplicacion.servicios import ServicioUsuario
-from aeroalpes.modulos.cliente.aplicacion.dto import ActualizarUsuarioDTO
+from aeroalpes.modulos.cliente.aplicacion.servicios import CargadorUsuarios, ServicioUsuario
+from aeroalpes.modulos.cliente.aplicacion.dto import ActualizarUsuarioDTO, CAMPOS_USUARIO
 from aeroalpes.modulos.cliente.aplicacion.mapeadores import MapeadorUsuarioDTOJson
 from aeroalpes.seedwork.dominio.excepciones import ExcepcionDominio
+from aeroalpes.seedwork.aplicacion.contenedor import resolver
+from aeroalpes.seedwork.presentacion.idempotencia import idempotente
 
-from flask import request, Response
+from flask import current_app, request, Response, stream_with_context, url_for
 
 bp = api.crear_blueprint('cliente', '/cliente')
 
+def _campos_invalidos(e: ValueError) -> Response:
+    return Response(
+        json.dumps(dict(error=str(e))), 
+        status=400, 
+        mimetype='application/json'
+    )
+
 @bp.route('/usuarios', methods=('POST',))
+@idempotente
 def crear_usuario():
     """Endpoint para crear un nuevo usuario"""
     try:
         usuario_dict = request.json
         
         # Llamar al servicio de aplicación directamente con JSON
-        servicio_usuario = ServicioUsuario()
+        servicio_usuario = resolver(ServicioUsuario)
         usuario_creado = servicio_usuario.crear_usuario_desde_json(usuario_dict)
         
         # Convertir respuesta a formato externo
-        mapeador_json = MapeadorUsuarioDTOJson()
-        resultado = mapeador_json.dto_a_externo(usuario_creado)
+        mapeador_json = resolver(MapeadorUsuarioDTOJson)
+        resultado = mapeador_json.dto_a_json(usuario_creado)
         
         return Response(
-            json.dumps(resultado), 
+            resultado, 
             status=201, 
             mimetype='application/json'
         )
@@ -49,26 +59,83 @@ def crear_usuario():
             mimetype='application/json'
         )
 
+@bp.route('/usuarios/bulk', methods=('POST',))
+def crear_usuarios_en_lote():
+    """Endpoint para crear usuarios de forma masiva (arreglo JSON o NDJSON)"""
+    try:
+        servicio_usuario = resolver(ServicioUsuario)
+        resultados = servicio_usuario.crear_usuarios_en_lote(api.leer_elementos_lote())
+
+        errores = [dict(indice=r.indice, error=r.error) for r in resultados if r.error]
+        creados = [dict(indice=r.indice, id=r.id) for r in resultados if not r.error]
+
+        return Response(
+            json.dumps(dict(
+                total=len(resultados),
+                creados=len(creados),
+                fallidos=len(errores),
+                resultados=creados,
+                errores=errores
+            )), 
+            status=201 if not errores else 207, 
+            mimetype='application/json'
+        )
+
+    except ValueError as e:
+        return Response(
+            json.dumps(dict(error=str(e))), 
+            status=400, 
+            mimetype='application/json'
+        )
+    except Exception as e:
+        return Response(
+            json.dumps(dict(error=f"Error interno: {str(e)}")), 
+            status=500, 
+            mimetype='application/json'
+        )
+
 @bp.route('/usuarios/<id>', methods=('GET',))
 def obtener_usuario_por_id(id):
-    """Endpoint para obtener un usuario por ID"""
+    """Endpoint para obtener un usuario por ID
+
+    Con `fields` (por ejemplo `?fields=nombre,email`) solo se leen esas columnas
+    y el id, sin cargar los métodos de pago salvo que se pidan.
+    """
+    try:
+        campos = api.leer_campos(CAMPOS_USUARIO)
+    except ValueError as e:
+        return _campos_invalidos(e)
+
     try:
         # Convertir string a UUID
         usuario_id = UUID(id)
         
-        # Llamar al servicio de aplicación
-        servicio_usuario = ServicioUsuario()
-        usuario_dto = servicio_usuario.obtener_usuario_por_id(usuario_id)
-        
-        # Convertir a formato externo
-        mapeador_json = MapeadorUsuarioDTOJson()
-        resultado = mapeador_json.dto_a_externo(usuario_dto)
+        # Validar la copia del cliente sin cargar el agregado
+        servicio_usuario = resolver(ServicioUsuario)
+        version = servicio_usuario.obtener_version_usuario(usuario_id)
+        if version is not None:
+            etag = api.etag_version(usuario_id, version)
+            if api.es_vigente_en_cliente(etag, version):
+                return api.respuesta_no_modificada(etag, version)
+
+        mapeador_json = resolver(MapeadorUsuarioDTOJson)
+        if campos:
+            resultado = mapeador_json.proyeccion_a_json(servicio_usuario.obtener_proyeccion_usuario(campos, id=usuario_id))
+        else:
+            # Llamar al servicio de aplicación
+            usuario_dto = servicio_usuario.obtener_usuario_por_id(usuario_id, resolver(CargadorUsuarios))
+
+            # Convertir a formato externo
+            resultado = mapeador_json.dto_a_json(usuario_dto)
         
-        return Response(
-            json.dumps(resultado), 
+        respuesta = Response(
+            resultado, 
             status=200, 
             mimetype='application/json'
         )
+        if version is not None:
+            api.agregar_validadores(respuesta, etag, version)
+        return respuesta
         
     except ValueError:
         return Response(
@@ -89,26 +156,99 @@ def obtener_usuario_por_id(id):
             mimetype='application/json'
         )
 
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+
+def _quiere_ndjson() -> bool:
+    return request.args.get('formato') == 'ndjson' \
+        or request.accept_mimetypes.best == 'application/x-ndjson'
+
 @bp.route('/usuarios', methods=('GET',))
 def obtener_todos_usuarios():
-    """Endpoint para obtener todos los usuarios"""
+    """Endpoint para obtener los usuarios
+
+    Por defecto responde una página (`limite`, `cursor`) e informa el cursor
+    de la siguiente página en el encabezado `X-Siguiente-Cursor`. Con
+    `formato=ndjson` (o `Accept: application/x-ndjson`) transmite todos los
+    usuarios, uno por línea, sin construir la lista completa en memoria.
+    Con `fields` cada usuario incluye solo su id y los campos pedidos.
+    Con `ids` responde esos usuarios, en el orden pedido, leídos en lote.
+    """
     try:
-        # Llamar al servicio de aplicación
-        servicio_usuario = ServicioUsuario()
-        usuarios_dto = servicio_usuario.obtener_todos_los_usuarios()
-        
-        # Convertir a formato externo
-        mapeador_json = MapeadorUsuarioDTOJson()
-        resultado = []
-        for usuario_dto in usuarios_dto:
-            usuario_dict = mapeador_json.dto_a_externo(usuario_dto)
-            resultado.append(usuario_dict)
-        
+        campos = api.leer_campos(CAMPOS_USUARIO)
+        ids = api.leer_ids(LIMITE_MAXIMO)
+    except ValueError as e:
+        return _campos_invalidos(e)
+
+    if ids is not None:
+        return _obtener_usuarios_por_ids(ids, campos)
+
+    try:
+        limite = min(int(request.args.get('limite', LIMITE_POR_DEFECTO)), LIMITE_MAXIMO)
+        cursor = request.args.get('cursor')
+        if limite <= 0:
+            raise ValueError()
+    except ValueError:
         return Response(
-            json.dumps(resultado), 
+            json.dumps(dict(error="El parámetro limite debe ser un entero positivo")), 
+            status=400, 
+            mimetype='application/json'
+        )
+
+    try:
+        servicio_usuario = resolver(ServicioUsuario)
+        mapeador_json = resolver(MapeadorUsuarioDTOJson)
+
+        if _quiere_ndjson():
+            # El primer usuario se lee antes de responder: un error al iniciar
+            # la consulta todavía puede retornar 400/500 en lugar de 200
+            if campos:
+                usuarios = servicio_usuario.iterar_proyecciones_usuarios(campos)
+                a_json = mapeador_json.proyeccion_a_json
+            else:
+                usuarios = servicio_usuario.iterar_usuarios()
+                a_json = mapeador_json.dto_a_json
+            primero = next(usuarios, None)
+
+            def generar_lineas():
+                try:
+                    if primero is not None:
+                        yield a_json(primero) + b'\n'
+                    for usuario in usuarios:
+                        yield a_json(usuario) + b'\n'
+                except Exception as e:
+                    # El estado 200 ya fue enviado: el error se informa como última línea
+                    current_app.logger.exception("Error transmitiendo usuarios")
+                    yield json.dumps(dict(error=f"Error interno: {str(e)}")).encode('utf-8') + b'\n'
+
+            return Response(
+                stream_with_context(generar_lineas()), 
+                status=200, 
+                mimetype='application/x-ndjson'
+            )
+
+        if campos:
+            proyecciones, siguiente_cursor = servicio_usuario.obtener_proyecciones_paginadas(campos, limite, cursor)
+            resultado = mapeador_json.proyeccion_a_json(proyecciones)
+        else:
+            # Llamar al servicio de aplicación
+            usuarios_dto, siguiente_cursor = servicio_usuario.obtener_usuarios_paginados(limite, cursor)
+
+            # Convertir a formato externo
+            resultado = mapeador_json.dto_a_json(usuarios_dto)
+        
+        respuesta = Response(
+            resultado, 
             status=200, 
             mimetype='application/json'
         )
+        if siguiente_cursor:
+            respuesta.headers['X-Siguiente-Cursor'] = siguiente_cursor
+            parametros = dict(limite=limite, cursor=siguiente_cursor)
+            if campos:
+                parametros['fields'] = request.args['fields']
+            respuesta.headers['Link'] = f'<{url_for(".obtener_todos_usuarios", **parametros)}>; rel="next"'
+        return respuesta
         
     except ExcepcionDominio as e:
         return Response(
@@ -123,20 +263,50 @@ def obtener_todos_usuarios():
             mimetype='application/json'
         )
 
+def _obtener_usuarios_por_ids(ids: list[UUID], campos: frozenset) -> Response:
+    """Usuarios con los ids dados; los que no existen se omiten de la respuesta"""
+    if campos:
+        return _campos_invalidos(ValueError("El parámetro fields no se admite junto con ids"))
+
+    try:
+        servicio_usuario = resolver(ServicioUsuario)
+        usuarios_dto = servicio_usuario.obtener_usuarios_por_ids(ids, resolver(CargadorUsuarios))
+
+        mapeador_json = resolver(MapeadorUsuarioDTOJson)
+        return Response(
+            mapeador_json.dto_a_json(usuarios_dto), 
+            status=200, 
+            mimetype='application/json'
+        )
+    except Exception as e:
+        return Response(
+            json.dumps(dict(error=f"Error interno: {str(e)}")), 
+            status=500, 
+            mimetype='application/json'
+        )
+
 @bp.route('/usuarios/email/<email>', methods=('GET',))
 def obtener_usuario_por_email(email):
-    """Endpoint para obtener un usuario por email"""
+    """Endpoint para obtener un usuario por email (acepta `fields` igual que la consulta por ID)"""
     try:
-        # Llamar al servicio de aplicación
-        servicio_usuario = ServicioUsuario()
-        usuario_dto = servicio_usuario.obtener_usuario_por_email(email)
-        
-        # Convertir a formato externo
-        mapeador_json = MapeadorUsuarioDTOJson()
-        resultado = mapeador_json.dto_a_externo(usuario_dto)
+        campos = api.leer_campos(CAMPOS_USUARIO)
+    except ValueError as e:
+        return _campos_invalidos(e)
+
+    try:
+        servicio_usuario = resolver(ServicioUsuario)
+        mapeador_json = resolver(MapeadorUsuarioDTOJson)
+        if campos:
+            resultado = mapeador_json.proyeccion_a_json(servicio_usuario.obtener_proyeccion_usuario(campos, email=email))
+        else:
+            # Llamar al servicio de aplicación
+            usuario_dto = servicio_usuario.obtener_usuario_por_email(email)
+
+            # Convertir a formato externo
+            resultado = mapeador_json.dto_a_json(usuario_dto)
         
         return Response(
-            json.dumps(resultado), 
+            resultado, 
             status=200, 
             mimetype='application/json'
         )
@@ -180,15 +350,15 @@ def actualizar_usuario(id):
         )
         
         # Llamar al servicio de aplicación
-        servicio_usuario = ServicioUsuario()
+        servicio_usuario = resolver(ServicioUsuario)
         usuario_actualizado = servicio_usuario.actualizar_usuario(dto_actualizacion)
         
         # Convertir a formato externo
-        mapeador_json = MapeadorUsuarioDTOJson()
-        resultado = mapeador_json.dto_a_externo(usuario_actualizado)
+        mapeador_json = resolver(MapeadorUsuarioDTOJson)
+        resultado = mapeador_json.dto_a_json(usuario_actualizado)
         
         return Response(
-            json.dumps(resultado), 
+            resultado, 
             status=200, 
             mimetype='application/json'
         )
@@ -220,7 +390,7 @@ def eliminar_usuario(id):
         usuario_id = UUID(id)
         
         # Llamar al servicio de aplicación
-        servicio_usuario = ServicioUsuario()
+        servicio_usuario = resolver(ServicioUsuario)
         eliminado = servicio_usuario.eliminar_usuario(usuario_id)
         
         if eliminado:
@@ -0,0 +1,107 @@
+"""Revisión de los planes de consulta de los repositorios
+
+Crea la aplicación sobre una base de datos temporal, ejecuta una carga que
+recorre las consultas y comandos de los repositorios a través del API y
+reporta las sentencias cuyo plan (`EXPLAIN QUERY PLAN`) recorre una tabla
+completa, ordena con un B-tree temporal o necesita un índice automático.
+Los índices se definen en `aeroalpes.config.indices`.
+
+Uso: flask --app src/aeroalpes/api planes
+
+"""
+
+import json
+import os
+import tempfile
+import uuid
+
+import click
+
+from aeroalpes.config.db import engines
+from aeroalpes.seedwork.infraestructura.planes import GuardiaPlanes
+
+def _usuario(consecutivo: int) -> dict:
+    return {
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Planes{consecutivo}",
+        "email": f"planes{consecutivo}@example.com",
+        "cedula": str(consecutivo),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{consecutivo}", "datos_ofuscados": "****1234"}]
+    }
+
+def _reserva(dia: int) -> dict:
+    legs = [
+        {"fecha_salida": f"2023-02-{dia:02d}T13:11:00Z", "fecha_llegada": f"2023-02-{dia:02d}T15:11:00Z",
+         "origen": {"codigo": "BOG", "nombre": "El Dorado"}, "destino": {"codigo": "JFK", "nombre": "John F. Kennedy"}},
+    ]
+    return {"itinerarios": [{"odos": [{"segmentos": [{"legs": legs}]}]}]}
+
+def ejercitar_repositorios(app):
+    """Ejecuta a través del API cada consulta y comando de los repositorios de usuarios y reservas"""
+    cliente = app.test_client()
+
+    def enviar(metodo, ruta, cuerpo=None, **kwargs):
+        rv = cliente.open(ruta, method=metodo, data=None if cuerpo is None else json.dumps(cuerpo),
+                          content_type='application/json', **kwargs)
+        if rv.status_code >= 500:
+            raise click.ClickException(f"{metodo} {ruta} respondió {rv.status_code}: {rv.get_data(as_text=True)}")
+        return rv
+
+    # Usuarios: creación individual y en lote
+    enviar('POST', '/cliente/usuarios', _usuario(0))
+    enviar('POST', '/cliente/usuarios/bulk', [_usuario(i) for i in range(1, 4)])
+    usuarios = enviar('GET', '/cliente/usuarios?limite=2')
+    id_usuario = usuarios.json[0]['id']
+
+    # Usuarios: consultas por id, email, ids, páginas, proyecciones y recorridos completos
+    enviar('GET', f'/cliente/usuarios/{id_usuario}')
+    enviar('GET', f'/cliente/usuarios/{id_usuario}?fields=nombre,metodos_pago')
+    enviar('GET', '/cliente/usuarios/email/planes1@example.com')
+    enviar('GET', '/cliente/usuarios/email/planes1@example.com?fields=nombre')
+    enviar('GET', f'/cliente/usuarios?ids={id_usuario},{uuid.uuid4()}')
+    enviar('GET', f"/cliente/usuarios?limite=2&cursor={usuarios.headers['X-Siguiente-Cursor']}")
+    enviar('GET', '/cliente/usuarios?limite=2&fields=nombre,metodos_pago')
+    enviar('GET', '/cliente/usuarios?formato=ndjson')
+    enviar('GET', '/cliente/usuarios?formato=ndjson&fields=email,metodos_pago')
+
+    # Usuarios: actualización y eliminación
+    enviar('PUT', f'/cliente/usuarios/{id_usuario}', dict(nombre="Usuario Actualizado", email="planes0@example.com"))
+    enviar('DELETE', f'/cliente/usuarios/{id_usuario}')
+
+    # Reservas: creación individual y en lote (con duplicados), consultas por id e ids
+    id_reserva = enviar('POST', '/vuelos/reserva', _reserva(1)).json['id']
+    enviar('POST', '/vuelos/reserva/bulk', [_reserva(2), _reserva(2), _reserva(1)])
+    enviar('GET', f'/vuelos/reserva/{id_reserva}')
+    enviar('GET', f'/vuelos/reserva/{id_reserva}?fields=fecha_creacion')
+    enviar('GET', f'/vuelos/reserva?ids={id_reserva},{uuid.uuid4()}')
+
+def revisar_planes(configuracion: dict = None) -> GuardiaPlanes:
+    """Ejecuta la carga sobre una base de datos temporal y retorna la guardia con sus hallazgos"""
+    from aeroalpes.api import create_app
+
+    with tempfile.TemporaryDirectory() as directorio:
+        app = create_app(dict(
+            configuracion or dict(), TESTING=True, DATABASE=os.path.join(directorio, 'planes.db'),
+            PLANES_VERIFICAR=None, ADMISION_HABILITADA=False,
+        ))
+        guardia = GuardiaPlanes()
+        with app.app_context():
+            for engine in engines():
+                guardia.instalar(engine)
+            try:
+                ejercitar_repositorios(app)
+            finally:
+                for engine in engines():
+                    guardia.retirar(engine)
+                    engine.dispose()
+        return guardia
+
+@click.command('planes')
+def planes():
+    """Revisa los planes de consulta de los repositorios; termina con código 1 si alguno no usa índices"""
+    guardia = revisar_planes()
+    click.echo(f"{len(guardia.revisadas)} sentencias revisadas")
+    if guardia.hallazgos:
+        click.echo(guardia.reporte())
+        raise SystemExit(1)
@@ -0,0 +1,79 @@
+"""Servidor multiproceso (pre-fork) del API
+
+La aplicación se crea una sola vez en el proceso padre y se comparte con
+los workers mediante `fork`. Cada worker reinicia los pools de los engines
+de SQLAlchemy (primario y de lectura) y las conexiones SQLite de la
+idempotencia, que no pueden usarse a través de un fork. Con varios workers,
+el filtro de emails de cada uno no ve los emails que registran los demás, así
+que deja de responder que un email no está registrado, y las respuestas
+idempotentes se comparten en un archivo SQLite junto a la base de datos (si
+no se configuró `IDEMPOTENCIA_ARCHIVO`): un reintento puede llegar a otro
+worker.
+
+Uso: flask --app src/aeroalpes/api serve --workers 4
+
+"""
+
+import os
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from sqlalchemy.engine import make_url
+
+from aeroalpes.config.db import engines
+from aeroalpes.seedwork.presentacion.prefork import ServidorPrefork
+
+def reiniciar_conexiones(app: Flask):
+    """Descarta en el worker las conexiones heredadas del proceso padre"""
+    with app.app_context():
+        # close=False: las conexiones del padre no se cierran desde el hijo, solo se abandonan
+        for engine in engines():
+            engine.dispose(close=False)
+
+    idempotencia = app.extensions.get('idempotencia')
+    if idempotencia is not None and idempotencia.sqlite is not None:
+        idempotencia.sqlite.reiniciar()
+
+def archivo_idempotencia(app: Flask) -> str:
+    """Archivo SQLite de las respuestas idempotentes, junto al de la base de datos (None si no es un archivo SQLite)"""
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    base, _ = os.path.splitext(url.database)
+    return f'{base}-idempotencia.db'
+
+def compartir_estado(app: Flask, workers: int):
+    """Ajusta el estado de cada proceso que no puede ser propio de cada worker"""
+    if workers <= 1:
+        return
+    app.config['FILTRO_EMAILS_NEGATIVOS'] = False
+
+    idempotencia = app.extensions.get('idempotencia')
+    if idempotencia is not None and idempotencia.sqlite is None:
+        ruta = archivo_idempotencia(app)
+        if ruta is None:
+            raise click.ClickException(
+                "Con varios workers, IDEMPOTENCIA_ARCHIVO debe apuntar a un archivo SQLite compartido"
+            )
+        idempotencia.compartir(app, ruta)
+
+def servir(app: Flask, host: str = '127.0.0.1', puerto: int = 5000, workers: int = None):
+    # El padre no conserva conexiones abiertas que los workers puedan heredar
+    with app.app_context():
+        for engine in engines():
+            engine.dispose()
+
+    servidor = ServidorPrefork(app, host, puerto, workers, al_iniciar_worker=lambda: reiniciar_conexiones(app))
+    compartir_estado(app, servidor.workers)
+    click.echo(f" * Sirviendo en http://{host}:{puerto} con {servidor.workers} workers")
+    servidor.servir()
+
+@click.command('serve')
+@click.option('--host', '-h', default='127.0.0.1', help='Interfaz donde escuchar.')
+@click.option('--port', '-p', default=5000, type=int, help='Puerto donde escuchar.')
+@click.option('--workers', '-w', default=None, type=click.IntRange(min=1), help='Procesos (por defecto, uno por núcleo).')
+@with_appcontext
+def serve(host: str, port: int, workers: int):
+    """Sirve el API con varios procesos que comparten la aplicación precargada"""
+    servir(current_app._get_current_object(), host, port, workers)
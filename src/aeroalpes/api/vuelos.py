@@ -1,36 +1,80 @@
 import aeroalpes.seedwork.presentacion.api as api
 import json
-from aeroalpes.modulos.vuelos.aplicacion.servicios import ServicioReserva
-from aeroalpes.modulos.vuelos.aplicacion.dto import ReservaDTO
+from aeroalpes.modulos.vuelos.aplicacion.servicios import CargadorReservas, ServicioReserva
+from aeroalpes.modulos.vuelos.aplicacion.dto import ReservaDTO, CAMPOS_RESERVA
 from aeroalpes.seedwork.dominio.excepciones import ExcepcionDominio
 
 from flask import redirect, render_template, request, session, url_for
-from flask import Response
+from flask import Response, make_response
 from aeroalpes.modulos.vuelos.aplicacion.mapeadores import MapeadorReservaDTOJson
+from aeroalpes.seedwork.aplicacion.contenedor import resolver
+from aeroalpes.seedwork.presentacion.idempotencia import idempotente
 
 bp = api.crear_blueprint('vuelos', '/vuelos')
 
+# Reservas por petición con `?ids=`
+LIMITE_IDS = 1000
+
 @bp.route('/reserva', methods=('POST',))
+@idempotente
 def reservar():
     try:
         reserva_dict = request.json
 
-        map_reserva = MapeadorReservaDTOJson()
+        map_reserva = resolver(MapeadorReservaDTOJson)
         reserva_dto = map_reserva.externo_a_dto(reserva_dict)
 
-        sr = ServicioReserva()
+        sr = resolver(ServicioReserva)
         dto_final = sr.crear_reserva(reserva_dto)
 
-        return map_reserva.dto_a_externo(dto_final)
+        return Response(map_reserva.dto_a_json(dto_final), status=200, mimetype='application/json')
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
 
+@bp.route('/reserva/bulk', methods=('POST',))
+def reservar_en_lote():
+    try:
+        sr = resolver(ServicioReserva)
+        resultado = sr.crear_reservas_en_lote(api.leer_elementos_lote())
+
+        return Response(
+            json.dumps(resultado.__dict__),
+            status=201 if not resultado.errores else 207,
+            mimetype='application/json'
+        )
+    except ValueError as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+
 @bp.route('/reserva', methods=('GET',))
 @bp.route('/reserva/<id>', methods=('GET',))
 def dar_reserva(id=None):
     if id:
-        sr = ServicioReserva()
-        
-        return sr.obtener_reserva_por_id(id)
+        try:
+            campos = api.leer_campos(CAMPOS_RESERVA)
+        except ValueError as e:
+            return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+
+        sr = resolver(ServicioReserva)
+
+        # Validar la copia del cliente sin cargar el agregado
+        version = sr.obtener_version_reserva(id)
+        if version is not None:
+            etag = api.etag_version(id, version)
+            if api.es_vigente_en_cliente(etag, version):
+                return api.respuesta_no_modificada(etag, version)
+
+        respuesta = make_response(sr.obtener_reserva_por_id(id, campos, resolver(CargadorReservas)))
+        if version is not None:
+            api.agregar_validadores(respuesta, etag, version)
+        return respuesta
+    elif 'ids' in request.args:
+        # Reservas completas, en el orden pedido, con una consulta por lote
+        try:
+            ids = api.leer_ids(LIMITE_IDS)
+        except ValueError as e:
+            return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+
+        sr = resolver(ServicioReserva)
+        return make_response(sr.obtener_reservas_por_ids(ids, resolver(CargadorReservas)))
     else:
         return [{'message': 'GET!'}]
\ No newline at end of file
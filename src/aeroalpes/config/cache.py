@@ -0,0 +1,31 @@
+"""Cache de agregados de la aplicación
+
+Con `CACHE_AGREGADOS=True`, los repositorios de usuarios y reservas leen por
+id (y los usuarios por email) desde el mapa de identidad de la petición y
+desde un cache LRU del proceso con vencimiento `CACHE_AGREGADOS_TTL`
+(segundos). El tamaño se acota con `CACHE_AGREGADOS_MAX_ENTRADAS` y/o
+`CACHE_AGREGADOS_MAX_BYTES` (agregados serializados). Las invalidaciones son
+del proceso; con varios workers, cada acierto se compara con la versión
+(`fecha_actualizacion`) guardada en la base de datos.
+
+"""
+
+from flask import Flask
+
+from aeroalpes.seedwork.infraestructura.cache import CacheLRU
+
+def init_cache_agregados(app: Flask):
+    app.config.setdefault('CACHE_AGREGADOS', False)
+    app.config.setdefault('CACHE_AGREGADOS_TTL', 30)
+    app.config.setdefault('CACHE_AGREGADOS_MAX_ENTRADAS', 10000)
+    app.config.setdefault('CACHE_AGREGADOS_MAX_BYTES', None)
+    if not app.config['CACHE_AGREGADOS']:
+        return
+
+    app.extensions['cache_agregados'] = CacheLRU(
+        max_entradas=app.config['CACHE_AGREGADOS_MAX_ENTRADAS'],
+        max_bytes=app.config['CACHE_AGREGADOS_MAX_BYTES'],
+        ttl=app.config['CACHE_AGREGADOS_TTL'],
+        # Los agregados se guardan serializados (bytes) y las llaves secundarias como texto
+        medir=len,
+    )
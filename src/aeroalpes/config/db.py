@@ -1,9 +1,176 @@
+import contextlib
+import hashlib
+import importlib
+import importlib.util
+
+import sqlalchemy
 from flask_sqlalchemy import SQLAlchemy
-from flask import Flask
+from flask import Flask, current_app, g, has_app_context
+from flask.globals import app_ctx
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
 
 db = SQLAlchemy()
 
+class SesionLectura(Session):
+    """Sesión para consultas sobre el engine de lectura de la aplicación actual"""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        return current_app.extensions['lectura']
+
+# Igual que db.session, una sesión de lectura por contexto de aplicación
+sesion_lectura = scoped_session(sessionmaker(class_=SesionLectura), scopefunc=lambda: id(app_ctx._get_current_object()))
+
+TABLA_VERSION_ESQUEMA = 'version_esquema'
+MODULO_INDICES = 'aeroalpes.config.indices'
+
+# PRAGMAs que se aplican a cada conexión SQLite según el perfil (SQLITE_PERFIL).
+# En WAL los lectores no bloquean al escritor ni el escritor a los lectores.
+PERFILES_SQLITE = dict(
+    # Cada commit llega al disco antes de confirmarse, incluso ante un corte de energía
+    durable=dict(journal_mode='WAL', synchronous='FULL', busy_timeout=5000,
+                 cache_size=-2000, mmap_size=0, temp_store='DEFAULT'),
+    # Un corte de energía puede perder los últimos commits, pero nunca corrompe la base de datos
+    balanced=dict(journal_mode='WAL', synchronous='NORMAL', busy_timeout=5000,
+                  cache_size=-16000, mmap_size=64 * 1024 * 1024, temp_store='MEMORY'),
+    # Sin fsync: una caída del sistema operativo puede perder o corromper datos
+    throughput=dict(journal_mode='WAL', synchronous='OFF', busy_timeout=10000,
+                    cache_size=-64000, mmap_size=256 * 1024 * 1024, temp_store='MEMORY'),
+)
+
 def init_db(app: Flask):
+    # Con False se ejecuta create_all en cada arranque, sin consultar la versión guardada
+    app.config.setdefault('ESQUEMA_VERIFICAR_VERSION', True)
+    # Perfil de PRAGMAs (None no aplica ninguno) y PRAGMAs que reemplazan los del perfil
+    app.config.setdefault('SQLITE_PERFIL', 'balanced')
+    app.config.setdefault('SQLITE_PRAGMAS', dict())
+    # Base de datos de las consultas: 'auto' abre el mismo archivo SQLite en solo lectura, None usa el primario
+    app.config.setdefault('BD_LECTURA_URI', 'auto')
+    app.config.setdefault('BD_LECTURA_POOL', 10)
+    pragmas = pragmas_sqlite(app.config['SQLITE_PERFIL'], app.config['SQLITE_PRAGMAS'])
     db.init_app(app)
-    
\ No newline at end of file
+
+    if pragmas:
+        with app.app_context():
+            for engine in db.engines.values():
+                configurar_sqlite(engine, pragmas)
+
+    uri_lectura = uri_solo_lectura(app.config['SQLALCHEMY_DATABASE_URI']) \
+        if app.config['BD_LECTURA_URI'] == 'auto' else app.config['BD_LECTURA_URI']
+    if uri_lectura:
+        engine_lectura = create_engine(uri_lectura, pool_size=app.config['BD_LECTURA_POOL'])
+        # El modo del journal lo fija el primario; una conexión de solo lectura no puede cambiarlo
+        configurar_sqlite(engine_lectura, {pragma: valor for pragma, valor in pragmas.items() if pragma != 'journal_mode'})
+        app.extensions['lectura'] = engine_lectura
+        app.teardown_appcontext(lambda excepcion: sesion_lectura.remove())
+
+    # Una escritura confirmada fija el resto de la petición al primario (read-your-writes)
+    if not event.contains(db.session, 'after_commit', _fijar_primario_tras_commit):
+        event.listen(db.session, 'after_commit', _fijar_primario_tras_commit)
+
+def uri_solo_lectura(uri: str) -> str:
+    """URI de solo lectura para un archivo SQLite, o None si `uri` no es un archivo SQLite"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return f'sqlite:///file:{url.database}?mode=ro&uri=true'
+
+def engines() -> list[Engine]:
+    """Engines de la aplicación actual: el primario (y sus binds) y el de lectura"""
+    todos = list(db.engines.values())
+    if 'lectura' in current_app.extensions:
+        todos.append(current_app.extensions['lectura'])
+    return todos
+
+def _fijar_primario_tras_commit(sesion):
+    if has_app_context():
+        g._leer_del_primario = True
+
+@contextlib.contextmanager
+def leer_del_primario():
+    """Dentro del bloque las consultas de los repositorios usan el primario (lecturas consistentes con las escrituras)"""
+    anterior = g.get('_leer_del_primario', False)
+    g._leer_del_primario = True
+    try:
+        yield
+    finally:
+        g._leer_del_primario = anterior
+
+def sesion_consultas():
+    """Sesión para las consultas de los repositorios
+
+    Es la de lectura, salvo que no haya engine de lectura o que la petición
+    esté fijada al primario (`leer_del_primario` o una escritura previa).
+    Los comandos siempre usan `db.session`.
+    """
+    if 'lectura' not in current_app.extensions or g.get('_leer_del_primario', False):
+        return db.session
+    return sesion_lectura
+
+def pragmas_sqlite(perfil: str, reemplazos: dict = None) -> dict:
+    if perfil is not None and perfil not in PERFILES_SQLITE:
+        raise ValueError(f"Perfil de SQLite desconocido: {perfil} (opciones: {', '.join(PERFILES_SQLITE)})")
+    return dict(PERFILES_SQLITE.get(perfil, dict()), **(reemplazos or dict()))
+
+def configurar_sqlite(engine: Engine, pragmas: dict):
+    """Aplica los `pragmas` a cada conexión nueva del engine (solo si es SQLite)"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        try:
+            for pragma, valor in pragmas.items():
+                cursor.execute(f'PRAGMA {pragma} = {valor}')
+        finally:
+            cursor.close()
+
+def huella_esquema(modulos: tuple[str, ...]) -> str:
+    """Huella del esquema: código fuente de los módulos de modelos y de índices (leído sin importarlos) y versión de SQLAlchemy"""
+    huella = hashlib.sha256(sqlalchemy.__version__.encode('utf-8'))
+    for modulo in (*modulos, MODULO_INDICES):
+        huella.update(modulo.encode('utf-8'))
+        with open(importlib.util.find_spec(modulo).origin, 'rb') as archivo:
+            huella.update(archivo.read())
+    return huella.hexdigest()
+
+def version_esquema() -> str:
+    """Huella guardada en la base de datos por el último arranque que creó el esquema (None si no hay)"""
+    try:
+        with db.engine.connect() as conexion:
+            return conexion.execute(text(f'SELECT huella FROM {TABLA_VERSION_ESQUEMA}')).scalar()
+    except OperationalError:
+        return None
+
+def guardar_version_esquema(huella: str):
+    with db.engine.begin() as conexion:
+        conexion.execute(text(f'CREATE TABLE IF NOT EXISTS {TABLA_VERSION_ESQUEMA} (huella TEXT NOT NULL)'))
+        conexion.execute(text(f'DELETE FROM {TABLA_VERSION_ESQUEMA}'))
+        conexion.execute(text(f'INSERT INTO {TABLA_VERSION_ESQUEMA} (huella) VALUES (:huella)'), dict(huella=huella))
+
+def preparar_esquema(app: Flask, modulos: tuple[str, ...]) -> bool:
+    """Importa los modelos y ejecuta create_all solo si el esquema cambió desde el último arranque
+
+    Si la huella guardada coincide, los módulos de modelos no se importan aquí
+    (los que usan las vistas se importan con ellas) y no se ejecuta DDL.
+    Retorna True si se creó el esquema.
+    """
+    with app.app_context():
+        huella = huella_esquema(modulos)
+        if app.config['ESQUEMA_VERIFICAR_VERSION'] and version_esquema() == huella:
+            return False
+
+        from aeroalpes.config.indices import crear_indices, definir_indices
+
+        for modulo in modulos:
+            importlib.import_module(modulo)
+        definir_indices(db.metadata)
+        db.create_all()
+        # create_all no agrega índices nuevos a tablas que ya existen
+        crear_indices(db.engine, db.metadata)
+        guardar_version_esquema(huella)
+        return True
@@ -0,0 +1,50 @@
+"""Escritor agrupado de la aplicación
+
+Con `ESCRITOR_AGRUPADO=True`, los métodos de escritura de los repositorios
+(marcados con `@escritura`) no abren su propia transacción: encolan la
+operación en el escritor de la aplicación y esperan su resultado. El hilo
+escritor agrupa las operaciones de `ESCRITOR_ESPERA_MS` milisegundos (o
+`ESCRITOR_MAX_OPERACIONES`) en una sola transacción.
+
+"""
+
+import functools
+
+from flask import Flask, current_app, has_app_context
+
+from aeroalpes.config.uow import UnidadDeTrabajoSQLAlchemy
+from aeroalpes.seedwork.infraestructura.escritor import EscritorAgrupado
+from aeroalpes.seedwork.infraestructura.uow import unidad_de_trabajo_actual
+
+def init_escritor(app: Flask):
+    app.config.setdefault('ESCRITOR_AGRUPADO', False)
+    app.config.setdefault('ESCRITOR_MAX_OPERACIONES', 64)
+    app.config.setdefault('ESCRITOR_ESPERA_MS', 2)
+    if not app.config['ESCRITOR_AGRUPADO']:
+        return
+
+    app.extensions['escritor'] = EscritorAgrupado(
+        # Cada operación escribe en su savepoint, así sus errores (por ejemplo, un email repetido) le llegan a ella
+        abrir_unidad=lambda: UnidadDeTrabajoSQLAlchemy(flush_por_operacion=True),
+        contexto=app.app_context,
+        max_operaciones=app.config['ESCRITOR_MAX_OPERACIONES'],
+        espera=app.config['ESCRITOR_ESPERA_MS'] / 1000,
+    )
+
+def escritor_agrupado() -> EscritorAgrupado:
+    """Escritor agrupado de la aplicación actual (None si no está habilitado)"""
+    return current_app.extensions.get('escritor') if has_app_context() else None
+
+def escritura(metodo):
+    """Envía el método de escritura de un repositorio al escritor agrupado, si está habilitado
+
+    Dentro de una unidad de trabajo (incluida la del hilo escritor) el método
+    se ejecuta directamente como parte de ella.
+    """
+    @functools.wraps(metodo)
+    def escribir(self, *args, **kwargs):
+        escritor = escritor_agrupado()
+        if escritor is None or unidad_de_trabajo_actual() is not None:
+            return metodo(self, *args, **kwargs)
+        return escritor.ejecutar(functools.partial(metodo, self, *args, **kwargs))
+    return escribir
@@ -0,0 +1,57 @@
+"""Filtro de emails registrados de la aplicación
+
+Con `FILTRO_EMAILS=True`, al arrancar se recorren los emails de los usuarios
+y se construye un filtro de Bloom con contadores, con tasa de falsos
+positivos `FILTRO_EMAILS_FALSOS_POSITIVOS`. El repositorio de usuarios lo
+mantiene al crear, actualizar y eliminar, y lo consulta para:
+
+- responder sin consultar la base de datos que un email no está registrado;
+- verificar contra la base de datos, antes de insertar, solo los emails que
+  pueden estar registrados (los demás se insertan directamente).
+
+El filtro es del proceso: no ve las escrituras de otros procesos. Con
+`FILTRO_EMAILS_NEGATIVOS=False` (así lo deja `flask serve` con varios
+workers) solo se usa para evitar inserciones que fallarían, donde la
+restricción de unicidad de la base de datos sigue siendo la garantía.
+
+"""
+
+from flask import Flask, current_app, has_app_context
+
+from aeroalpes.seedwork.infraestructura.bloom import FiltroReconstruible
+
+def normalizar_email(email: str) -> str:
+    # Solo une variantes (mayúsculas, espacios): puede agregar falsos positivos, nunca falsos negativos
+    return (email or '').strip().casefold()
+
+def init_filtro_emails(app: Flask):
+    app.config.setdefault('FILTRO_EMAILS', False)
+    app.config.setdefault('FILTRO_EMAILS_FALSOS_POSITIVOS', 0.01)
+    app.config.setdefault('FILTRO_EMAILS_CAPACIDAD_MINIMA', 10000)
+    app.config.setdefault('FILTRO_EMAILS_NEGATIVOS', True)
+    if not app.config['FILTRO_EMAILS']:
+        return
+
+    from aeroalpes.modulos.cliente.infraestructura.repositorios import RepositorioUsuariosSQLite
+
+    repositorio = RepositorioUsuariosSQLite()
+    filtro = FiltroReconstruible(
+        contar=repositorio.contar,
+        leer=repositorio.iterar_emails,
+        falsos_positivos=app.config['FILTRO_EMAILS_FALSOS_POSITIVOS'],
+        capacidad_minima=app.config['FILTRO_EMAILS_CAPACIDAD_MINIMA'],
+        normalizar=normalizar_email,
+        contexto=app.app_context,
+    )
+    with app.app_context():
+        filtro.reconstruir()
+    app.extensions['filtro_emails'] = filtro
+
+def filtro_emails() -> FiltroReconstruible:
+    """Filtro de emails de la aplicación actual (None si no está habilitado)"""
+    return current_app.extensions.get('filtro_emails') if has_app_context() else None
+
+def email_no_registrado(email: str) -> bool:
+    """True solo si el filtro asegura que el email no está registrado"""
+    filtro = filtro_emails()
+    return filtro is not None and current_app.config['FILTRO_EMAILS_NEGATIVOS'] and not filtro.puede_contener(email)
@@ -0,0 +1,57 @@
+"""Índices administrados de la base de datos
+
+En este archivo usted encontrará los índices secundarios de las tablas de
+usuarios, métodos de pago, reservas e itinerarios (y de sus tablas de
+relación). Cada índice respalda una consulta de los repositorios; la guardia
+de planes (`flask planes`) señala las consultas que no tienen uno.
+
+Las llaves primarias y las columnas `unique` (por ejemplo `usuarios.email`)
+ya tienen un índice propio en SQLite y no se repiten aquí.
+
+"""
+
+from sqlalchemy import Index, MetaData, inspect
+from sqlalchemy.engine import Engine
+
+# tabla -> ((nombre del índice, columnas), ...)
+INDICES = dict(
+    usuarios=(
+        # Paginación por llave (keyset) e iteración ordenada por fecha de creación
+        ('ix_usuarios_fecha_creacion_id', ('fecha_creacion', 'id')),
+    ),
+    usuarios_metodos_pago=(
+        # Métodos de pago de un grupo de usuarios (selectinload y proyecciones)
+        ('ix_usuarios_metodos_pago_usuario_id', ('usuario_id', 'metodo_pago_id')),
+    ),
+    metodos_pago=(),
+    reservas=(),
+    reservas_itinerarios=(
+        # Itinerarios de un grupo de reservas (selectinload)
+        ('ix_reservas_itinerarios_reserva_id', ('reserva_id',)),
+    ),
+    itinerarios=(
+        # Búsqueda de itinerarios existentes: SQLite no usa la llave primaria para un IN de tuplas de 7 columnas
+        ('ix_itinerarios_fecha_salida', ('fecha_salida', 'origen_codigo', 'destino_codigo')),
+    ),
+)
+
+def definir_indices(metadata: MetaData):
+    """Agrega a las tablas de `metadata` los índices que aún no tienen (las tablas no definidas se omiten)"""
+    for nombre_tabla, indices in INDICES.items():
+        tabla = metadata.tables.get(nombre_tabla)
+        if tabla is None:
+            continue
+        existentes = {indice.name for indice in tabla.indexes}
+        for nombre, columnas in indices:
+            if nombre not in existentes:
+                Index(nombre, *(tabla.c[columna] for columna in columnas))
+
+def crear_indices(engine: Engine, metadata: MetaData):
+    """Crea en una base de datos existente los índices definidos que le faltan"""
+    definir_indices(metadata)
+    tablas = set(inspect(engine).get_table_names())
+    with engine.begin() as conexion:
+        for nombre_tabla in INDICES:
+            if nombre_tabla in tablas and nombre_tabla in metadata.tables:
+                for indice in metadata.tables[nombre_tabla].indexes:
+                    indice.create(conexion, checkfirst=True)
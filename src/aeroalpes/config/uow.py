@@ -0,0 +1,79 @@
+"""Unidad de trabajo sobre la sesión de SQLAlchemy de la aplicación
+
+Mientras la unidad está abierta, la sesión no hace autoflush: los cambios de
+los repositorios se acumulan y se escriben en un solo flush al confirmar,
+donde SQLAlchemy agrupa los INSERT de cada tabla en una sentencia
+executemany. Las consultas de los repositorios se fijan al primario para
+que vean los cambios de la unidad.
+
+"""
+
+import contextlib
+
+from aeroalpes.config.db import db, leer_del_primario
+from aeroalpes.seedwork.infraestructura.uow import UnidadDeTrabajo, unidad_de_trabajo_actual
+
+def confirmar():
+    """Confirma los cambios de un repositorio, salvo que los confirme la unidad de trabajo abierta
+
+    Con una unidad que escribe en cada operación, los cambios se escriben
+    (flush) sin confirmar, así el repositorio recibe sus propios errores.
+    """
+    unidad = unidad_de_trabajo_actual()
+    if unidad is None:
+        db.session.commit()
+    elif unidad.flush_por_operacion:
+        db.session.flush()
+
+def tras_confirmar(funcion):
+    """Ejecuta `funcion` cuando los cambios de un repositorio ya confirmados por `confirmar` lleguen a la base de datos
+
+    Sin unidad de trabajo ya están confirmados; con una, al confirmarse ella.
+    """
+    unidad = unidad_de_trabajo_actual()
+    if unidad is None:
+        funcion()
+    else:
+        unidad.al_confirmar(funcion)
+
+def deshacer():
+    """Descarta los cambios de un repositorio que falló, salvo que los descarte la unidad de trabajo abierta"""
+    if unidad_de_trabajo_actual() is None:
+        db.session.rollback()
+
+class UnidadDeTrabajoSQLAlchemy(UnidadDeTrabajo):
+
+    def __init__(self, flush_por_operacion: bool = False):
+        super().__init__()
+        self.flush_por_operacion = flush_por_operacion
+        self._sesion = None
+        self._autoflush = True
+        self._contexto: contextlib.ExitStack = None
+
+    def _abrir(self):
+        self._sesion = db.session()
+        self._autoflush = self._sesion.autoflush
+        self._sesion.autoflush = False
+        self._contexto = contextlib.ExitStack()
+        self._contexto.enter_context(leer_del_primario())
+
+    def _cerrar(self):
+        self._sesion.autoflush = self._autoflush
+        self._contexto.close()
+
+    def commit(self):
+        try:
+            self._sesion.flush()
+            self._sesion.commit()
+        except Exception:
+            self._sesion.rollback()
+            raise
+
+    def rollback(self):
+        self._sesion.rollback()
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        # SAVEPOINT ... RELEASE; los cambios pendientes de la unidad se escriben antes de abrirlo
+        with self._sesion.begin_nested():
+            yield
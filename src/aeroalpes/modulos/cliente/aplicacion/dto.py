@@ -7,6 +7,16 @@ En este archivo usted encontrará los DTOs de la capa de aplicación del dominio
 from dataclasses import dataclass, field
 from aeroalpes.seedwork.aplicacion.dto import DTO
 
+# Campos de la representación externa, en el orden de `UsuarioDTO` y sus subclases;
+# son los valores aceptados en `?fields=`
+CAMPOS_METODO_PAGO = (
+    'id', 'tipo', 'nombre', 'token_seguridad', 'datos_ofuscados', 'fecha_creacion', 'fecha_actualizacion'
+)
+CAMPOS_USUARIO = (
+    'id', 'tipo_usuario', 'nombre', 'email', 'fecha_creacion', 'fecha_actualizacion', 'metodos_pago',
+    'cedula', 'fecha_nacimiento', 'rut', 'fecha_constitucion'
+)
+
 @dataclass(frozen=True)
 class MetodoPagoDTO(DTO):
     id: str = field(default_factory=str)
@@ -56,3 +66,10 @@ class ActualizarUsuarioDTO(DTO):
     nombre: str = field(default="")
     email: str = field(default="")
     metodos_pago: list[MetodoPagoDTO] = field(default_factory=list)
+
+@dataclass(frozen=True)
+class ResultadoLoteDTO(DTO):
+    """DTO con el resultado de un elemento dentro de una creación masiva"""
+    indice: int
+    id: str = field(default="")
+    error: str = field(default="")
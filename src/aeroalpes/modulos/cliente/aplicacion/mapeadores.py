@@ -6,14 +6,26 @@ encargados de la transformación entre DTOs de aplicación y entidades de domini
 """
 
 from datetime import datetime
+from uuid import UUID
 from aeroalpes.seedwork.aplicacion.dto import Mapeador as AppMap
+from aeroalpes.seedwork.aplicacion.serializacion import codificar
 from aeroalpes.seedwork.dominio.repositorios import Mapeador as RepMap
 from aeroalpes.modulos.cliente.dominio.entidades import Usuario, ClienteNatural, ClienteEmpresa, MetodoPago
 from aeroalpes.modulos.cliente.dominio.objetos_valor import Nombre, Email, Cedula, Rut, TipoPago, TokenSeguridad, DatosOfuscados
 from .dto import (
-    UsuarioDTO, ClienteNaturalDTO, ClienteEmpresaDTO, MetodoPagoDTO
+    UsuarioDTO, ClienteNaturalDTO, ClienteEmpresaDTO, MetodoPagoDTO, CAMPOS_USUARIO, CAMPOS_METODO_PAGO
 )
 
+_FORMATO_FECHA = '%Y-%m-%dT%H:%M:%SZ'
+
+def _valor_externo(valor):
+    # Mismo formato que `MapeadorUsuario.entidad_a_dto`: fechas ISO y cadenas vacías en lugar de nulos
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.strftime(_FORMATO_FECHA)
+    return valor
+
 class MapeadorUsuarioDTOJson(AppMap):
     """Mapeador para convertir entre datos externos (JSON) y DTOs de aplicación"""
     
@@ -114,13 +126,62 @@ class MapeadorUsuarioDTOJson(AppMap):
         
         return result
 
+    def dto_a_json(self, dto: UsuarioDTO) -> bytes:
+        """Serializa con el codificador compilado; el JSON equivale al de `dto_a_externo`"""
+        return codificar(dto)
+
+    def proyeccion_a_externo(self, proyeccion: dict) -> dict:
+        """Convierte una proyección del repositorio (id y campos pedidos) al formato externo
+
+        Los campos conservan el orden y el formato de `dto_a_externo`.
+        """
+        externo = dict()
+        for campo in CAMPOS_USUARIO:
+            if campo not in proyeccion:
+                continue
+            if campo == 'metodos_pago':
+                externo[campo] = [
+                    {campo_metodo: _valor_externo(metodo[campo_metodo]) for campo_metodo in CAMPOS_METODO_PAGO}
+                    for metodo in proyeccion[campo]
+                ]
+            else:
+                externo[campo] = _valor_externo(proyeccion[campo])
+        return externo
+
+    def proyeccion_a_json(self, proyeccion: dict) -> bytes:
+        """Serializa una proyección (o lista de proyecciones) a bytes JSON"""
+        if isinstance(proyeccion, list):
+            return codificar([self.proyeccion_a_externo(elemento) for elemento in proyeccion])
+        return codificar(self.proyeccion_a_externo(proyeccion))
+
 class MapeadorUsuario(RepMap):
     """Mapeador para convertir entre DTOs de aplicación y entidades de dominio"""
     
-    _FORMATO_FECHA = '%Y-%m-%dT%H:%M:%SZ'
+    _FORMATO_FECHA = _FORMATO_FECHA
     
     def obtener_tipo(self) -> type:
         return Usuario.__class__
+
+    def _fecha(self, texto: str) -> datetime:
+        return datetime.strptime(texto, self._FORMATO_FECHA) if texto else datetime.now()
+
+    def _id(self, texto: str) -> UUID:
+        # Un id vacío o inválido hace que la entidad genere uno nuevo
+        try:
+            return UUID(texto)
+        except (TypeError, ValueError):
+            return None
+
+    def metodo_pago_a_entidad(self, metodo_dto: MetodoPagoDTO) -> MetodoPago:
+        return MetodoPago(
+            id=self._id(metodo_dto.id),
+            tipo=TipoPago(metodo_dto.tipo),
+            nombre=metodo_dto.nombre,
+            token_seguridad=TokenSeguridad(metodo_dto.token_seguridad),
+            datos_ofuscados=DatosOfuscados.desde_texto(metodo_dto.datos_ofuscados) if metodo_dto.datos_ofuscados else None,
+            fecha_creacion=self._fecha(metodo_dto.fecha_creacion),
+            fecha_actualizacion=self._fecha(metodo_dto.fecha_actualizacion)
+        )
     
     def entidad_a_dto(self, entidad: Usuario) -> UsuarioDTO:
         """Convierte entidad de dominio a DTO de aplicación"""
@@ -130,10 +191,10 @@ class MapeadorUsuario(RepMap):
         for metodo in entidad.metodos_pago:
             metodo_dto = MetodoPagoDTO(
                 id=str(metodo.id),
-                tipo=metodo.tipo.tipo if metodo.tipo else '',
+                tipo=str(metodo.tipo) if metodo.tipo else '',
                 nombre=metodo.nombre,
-                token_seguridad=metodo.token_seguridad.token if metodo.token_seguridad else '',
-                datos_ofuscados=metodo.datos_ofuscados.datos if hasattr(metodo, 'datos_ofuscados') and metodo.datos_ofuscados else '',
+                token_seguridad=str(metodo.token_seguridad) if metodo.token_seguridad else '',
+                datos_ofuscados=str(metodo.datos_ofuscados) if metodo.datos_ofuscados else '',
                 fecha_creacion=metodo.fecha_creacion.strftime(self._FORMATO_FECHA) if metodo.fecha_creacion else '',
                 fecha_actualizacion=metodo.fecha_actualizacion.strftime(self._FORMATO_FECHA) if metodo.fecha_actualizacion else ''
             )
@@ -144,9 +205,9 @@ class MapeadorUsuario(RepMap):
             return ClienteNaturalDTO(
                 id=str(entidad.id),
                 tipo_usuario='natural',
-                nombre=entidad.nombre.nombre if entidad.nombre else '',
-                email=entidad.email.email if entidad.email else '',
-                cedula=entidad.cedula.cedula if entidad.cedula else '',
+                nombre=str(entidad.nombre) if entidad.nombre else '',
+                email=str(entidad.email) if entidad.email else '',
+                cedula=str(entidad.cedula) if entidad.cedula else '',
                 fecha_nacimiento=entidad.fecha_nacimiento.strftime(self._FORMATO_FECHA) if entidad.fecha_nacimiento else '',
                 fecha_creacion=entidad.fecha_creacion.strftime(self._FORMATO_FECHA) if entidad.fecha_creacion else '',
                 fecha_actualizacion=entidad.fecha_actualizacion.strftime(self._FORMATO_FECHA) if entidad.fecha_actualizacion else '',
@@ -156,9 +217,9 @@ class MapeadorUsuario(RepMap):
             return ClienteEmpresaDTO(
                 id=str(entidad.id),
                 tipo_usuario='empresa',
-                nombre=entidad.nombre.nombre if entidad.nombre else '',
-                email=entidad.email.email if entidad.email else '',
-                rut=entidad.rut.rut if entidad.rut else '',
+                nombre=str(entidad.nombre) if entidad.nombre else '',
+                email=str(entidad.email) if entidad.email else '',
+                rut=str(entidad.rut) if entidad.rut else '',
                 fecha_constitucion=entidad.fecha_constitucion.strftime(self._FORMATO_FECHA) if entidad.fecha_constitucion else '',
                 fecha_creacion=entidad.fecha_creacion.strftime(self._FORMATO_FECHA) if entidad.fecha_creacion else '',
                 fecha_actualizacion=entidad.fecha_actualizacion.strftime(self._FORMATO_FECHA) if entidad.fecha_actualizacion else '',
@@ -168,8 +229,8 @@ class MapeadorUsuario(RepMap):
             return UsuarioDTO(
                 id=str(entidad.id),
                 tipo_usuario='base',
-                nombre=entidad.nombre.nombre if entidad.nombre else '',
-                email=entidad.email.email if entidad.email else '',
+                nombre=str(entidad.nombre) if entidad.nombre else '',
+                email=str(entidad.email) if entidad.email else '',
                 fecha_creacion=entidad.fecha_creacion.strftime(self._FORMATO_FECHA) if entidad.fecha_creacion else '',
                 fecha_actualizacion=entidad.fecha_actualizacion.strftime(self._FORMATO_FECHA) if entidad.fecha_actualizacion else '',
                 metodos_pago=metodos_pago_dto
@@ -178,38 +239,28 @@ class MapeadorUsuario(RepMap):
     def dto_a_entidad(self, dto: UsuarioDTO) -> Usuario:
         """Convierte DTO de aplicación a entidad de dominio"""
         
-        # Mapear métodos de pago
-        metodos_pago = []
-        for metodo_dto in dto.metodos_pago:
-            metodo = MetodoPago()
-            metodo.id = metodo_dto.id
-            metodo.tipo = TipoPago(metodo_dto.tipo) if metodo_dto.tipo else TipoPago()
-            metodo.nombre = metodo_dto.nombre
-            metodo.token_seguridad = TokenSeguridad(metodo_dto.token_seguridad) if metodo_dto.token_seguridad else TokenSeguridad()
-            if metodo_dto.datos_ofuscados:
-                metodo.datos_ofuscados = DatosOfuscados(metodo_dto.datos_ofuscados)
-            metodo.fecha_creacion = datetime.strptime(metodo_dto.fecha_creacion, self._FORMATO_FECHA) if metodo_dto.fecha_creacion else datetime.now()
-            metodo.fecha_actualizacion = datetime.strptime(metodo_dto.fecha_actualizacion, self._FORMATO_FECHA) if metodo_dto.fecha_actualizacion else datetime.now()
-            metodos_pago.append(metodo)
+        # Propiedades comunes
+        comunes = dict(
+            id=self._id(dto.id),
+            nombre=Nombre.desde_texto(dto.nombre),
+            email=Email.desde_texto(dto.email, es_empresarial=dto.tipo_usuario == 'empresa'),
+            metodos_pago=[self.metodo_pago_a_entidad(metodo_dto) for metodo_dto in dto.metodos_pago],
+            fecha_creacion=self._fecha(dto.fecha_creacion),
+            fecha_actualizacion=self._fecha(dto.fecha_actualizacion)
+        )
         
         # Crear entidad según tipo
         if isinstance(dto, ClienteNaturalDTO) or dto.tipo_usuario == 'natural':
-            entidad = ClienteNatural()
-            entidad.cedula = Cedula(dto.cedula) if hasattr(dto, 'cedula') and dto.cedula else Cedula()
-            entidad.fecha_nacimiento = datetime.strptime(dto.fecha_nacimiento, self._FORMATO_FECHA) if hasattr(dto, 'fecha_nacimiento') and dto.fecha_nacimiento else datetime.now()
+            return ClienteNatural(
+                cedula=Cedula(dto.cedula) if getattr(dto, 'cedula', '') else None,
+                fecha_nacimiento=self._fecha(getattr(dto, 'fecha_nacimiento', '')),
+                **comunes
+            )
         elif isinstance(dto, ClienteEmpresaDTO) or dto.tipo_usuario == 'empresa':
-            entidad = ClienteEmpresa()
-            entidad.rut = Rut(dto.rut) if hasattr(dto, 'rut') and dto.rut else Rut()
-            entidad.fecha_constitucion = datetime.strptime(dto.fecha_constitucion, self._FORMATO_FECHA) if hasattr(dto, 'fecha_constitucion') and dto.fecha_constitucion else datetime.now()
+            return ClienteEmpresa(
+                rut=Rut(dto.rut) if getattr(dto, 'rut', '') else None,
+                fecha_constitucion=self._fecha(getattr(dto, 'fecha_constitucion', '')),
+                **comunes
+            )
         else:
-            entidad = Usuario()
-        
-        # Propiedades comunes
-        entidad.id = dto.id
-        entidad.nombre = Nombre(dto.nombre) if dto.nombre else Nombre()
-        entidad.email = Email(dto.email) if dto.email else Email()
-        entidad.metodos_pago = metodos_pago
-        entidad.fecha_creacion = datetime.strptime(dto.fecha_creacion, self._FORMATO_FECHA) if dto.fecha_creacion else datetime.now()
-        entidad.fecha_actualizacion = datetime.strptime(dto.fecha_actualizacion, self._FORMATO_FECHA) if dto.fecha_actualizacion else datetime.now()
-        
-        return entidad
+            return Usuario(**comunes)
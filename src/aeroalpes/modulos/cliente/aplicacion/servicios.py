@@ -5,23 +5,35 @@ para coordinar casos de uso del dominio de cliente
 
 """
 
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
 from uuid import UUID
+from aeroalpes.config.uow import UnidadDeTrabajoSQLAlchemy
 from aeroalpes.modulos.cliente.dominio.entidades import Usuario
 from aeroalpes.modulos.cliente.dominio.fabricas import FabricaCliente
 from aeroalpes.modulos.cliente.infraestructura.fabricas import FabricaRepositorio
 from aeroalpes.modulos.cliente.dominio.repositorios import RepositorioUsuarios
+from aeroalpes.seedwork.aplicacion.cargadores import CargadorAgregados
 from aeroalpes.seedwork.aplicacion.servicios import Servicio
+from aeroalpes.seedwork.infraestructura.uow import UnidadDeTrabajo
 
-from .dto import UsuarioDTO, ClienteNaturalDTO, ClienteEmpresaDTO, CrearUsuarioDTO, ActualizarUsuarioDTO
+from .dto import UsuarioDTO, ClienteNaturalDTO, ClienteEmpresaDTO, CrearUsuarioDTO, ActualizarUsuarioDTO, ResultadoLoteDTO
 from .mapeadores import MapeadorUsuario, MapeadorUsuarioDTOJson
 
 
+class CargadorUsuarios(CargadorAgregados):
+    """Cargador por lotes de usuarios; el contenedor entrega uno por petición"""
+
 class ServicioUsuario(Servicio):
     """Servicio de aplicación para gestionar usuarios (casos de uso)"""
 
-    def __init__(self):
-        self._fabrica_repositorio: FabricaRepositorio = FabricaRepositorio()
-        self._fabrica_cliente: FabricaCliente = FabricaCliente()
+    def __init__(self, fabrica_repositorio: FabricaRepositorio = None, fabrica_cliente: FabricaCliente = None,
+                 fabrica_unidad_de_trabajo: Callable[[], UnidadDeTrabajo] = None):
+        self._fabrica_repositorio: FabricaRepositorio = fabrica_repositorio or FabricaRepositorio()
+        self._fabrica_cliente: FabricaCliente = fabrica_cliente or FabricaCliente()
+        self._fabrica_unidad_de_trabajo = fabrica_unidad_de_trabajo or UnidadDeTrabajoSQLAlchemy
+        self._mapeador_usuario: MapeadorUsuario = MapeadorUsuario()
+        self._mapeador_json: MapeadorUsuarioDTOJson = MapeadorUsuarioDTOJson()
 
     @property
     def fabrica_repositorio(self):
@@ -62,22 +74,48 @@ class ServicioUsuario(Servicio):
             )
 
         # Crear entidad de dominio usando la fábrica (aplica validaciones)
-        usuario: Usuario = self.fabrica_cliente.crear_objeto(dto_usuario, MapeadorUsuario())
+        usuario: Usuario = self.fabrica_cliente.crear_objeto(dto_usuario, self._mapeador_usuario)
 
         # Persistir usando el repositorio
         repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
         repositorio.agregar(usuario)
 
         # Retornar DTO de respuesta
-        return self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+        return self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario)
 
-    def obtener_usuario_por_id(self, id: UUID) -> UsuarioDTO:
-        """Caso de uso: Obtener usuario por ID"""
-        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
-        usuario = repositorio.obtener_por_id(id)
+    def obtener_usuario_por_id(self, id: UUID, cargador: CargadorUsuarios = None) -> UsuarioDTO:
+        """Caso de uso: Obtener usuario por ID
+
+        Con el `cargador` de la petición, el usuario se lee en el mismo lote que
+        los demás ids solicitados y no se vuelve a consultar en ella.
+        """
+        usuario = cargador.obtener(id) if cargador else None
+        if usuario is None:
+            # Sin cargador, o para fallar con el mismo error si el usuario no existe
+            repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+            usuario = repositorio.obtener_por_id(id)
         
         # Convertir entidad a DTO usando la fábrica
-        return self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+        return self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario)
+
+    def crear_cargador(self) -> CargadorUsuarios:
+        """Crea un cargador que agrupa las lecturas de usuarios por id en una consulta por lote"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        return CargadorUsuarios(repositorio.obtener_por_ids)
+
+    def obtener_usuarios_por_ids(self, ids: list[UUID], cargador: CargadorUsuarios = None) -> list[UsuarioDTO]:
+        """Caso de uso: Obtener varios usuarios por ID, en el orden pedido y omitiendo los que no existen
+
+        Con el `cargador` de la petición, los usuarios ya leídos en ella no se vuelven a consultar.
+        """
+        cargador = cargador or self.crear_cargador()
+        usuarios = cargador.obtener_muchos(ids)
+        return [self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario) for usuario in usuarios if usuario is not None]
+
+    def obtener_version_usuario(self, id: UUID) -> datetime:
+        """Caso de uso: Consultar la versión (fecha de actualización) de un usuario"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        return repositorio.obtener_version(id)
 
     def obtener_usuario_por_email(self, email: str) -> UsuarioDTO:
         """Caso de uso: Obtener usuario por email"""
@@ -85,7 +123,7 @@ class ServicioUsuario(Servicio):
         usuario = repositorio.obtener_por_email(email)
         
         # Convertir entidad a DTO usando la fábrica
-        return self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+        return self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario)
 
     def obtener_todos_los_usuarios(self) -> list[UsuarioDTO]:
         """Caso de uso: Obtener todos los usuarios"""
@@ -95,45 +133,71 @@ class ServicioUsuario(Servicio):
         # Convertir entidades a DTOs
         usuarios_dto = []
         for usuario in usuarios:
-            usuario_dto = self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+            usuario_dto = self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario)
             usuarios_dto.append(usuario_dto)
         
         return usuarios_dto
 
+    def obtener_usuarios_paginados(self, limite: int, cursor: str = None) -> tuple[list[UsuarioDTO], str]:
+        """Caso de uso: Obtener una página de usuarios y el cursor de la siguiente"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        usuarios, siguiente_cursor = repositorio.obtener_pagina(limite, cursor)
+
+        usuarios_dto = [self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario) for usuario in usuarios]
+        return usuarios_dto, siguiente_cursor
+
+    def iterar_usuarios(self, tamano_lote: int = 500) -> Iterator[UsuarioDTO]:
+        """Caso de uso: Recorrer todos los usuarios como un flujo de DTOs"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        mapeador = self._mapeador_usuario
+
+        for usuario in repositorio.iterar_todos(tamano_lote):
+            yield self.fabrica_cliente.crear_objeto(usuario, mapeador)
+
+    def obtener_proyeccion_usuario(self, campos: frozenset[str], id: UUID = None, email: str = None) -> dict:
+        """Caso de uso: Obtener solo algunos campos de un usuario por ID o por email, sin reconstruir el agregado"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        return repositorio.obtener_proyeccion(campos, id=id, email=email)
+
+    def obtener_proyecciones_paginadas(self, campos: frozenset[str], limite: int, cursor: str = None) -> tuple[list[dict], str]:
+        """Caso de uso: Obtener una página con algunos campos de cada usuario y el cursor de la siguiente"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        return repositorio.obtener_pagina_proyectada(campos, limite, cursor)
+
+    def iterar_proyecciones_usuarios(self, campos: frozenset[str], tamano_lote: int = 500) -> Iterator[dict]:
+        """Caso de uso: Recorrer algunos campos de todos los usuarios como un flujo"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        yield from repositorio.iterar_proyecciones(campos, tamano_lote)
+
     def actualizar_usuario(self, usuario_dto: ActualizarUsuarioDTO) -> UsuarioDTO:
         """Caso de uso: Actualizar un usuario existente"""
-        
-        # Obtener usuario existente
         repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        return self._actualizar(repositorio, usuario_dto)
+
+    def actualizar_usuarios(self, usuarios_dto: list[ActualizarUsuarioDTO]) -> list[UsuarioDTO]:
+        """Caso de uso: Actualizar varios usuarios en una sola transacción (todos o ninguno)"""
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        with self._fabrica_unidad_de_trabajo() as unidad:
+            return [unidad.registrar(self._actualizar, repositorio, usuario_dto) for usuario_dto in usuarios_dto]
+
+    def _actualizar(self, repositorio: RepositorioUsuarios, usuario_dto: ActualizarUsuarioDTO) -> UsuarioDTO:
+        # Obtener usuario existente
         usuario_existente = repositorio.obtener_por_id(UUID(usuario_dto.id))
         
         # Actualizar campos modificables
         if usuario_dto.nombre:
             from aeroalpes.modulos.cliente.dominio.objetos_valor import Nombre
-            usuario_existente.nombre = Nombre(usuario_dto.nombre)
+            usuario_existente.nombre = Nombre.desde_texto(usuario_dto.nombre)
         
         if usuario_dto.email:
             from aeroalpes.modulos.cliente.dominio.objetos_valor import Email
-            usuario_existente.email = Email(usuario_dto.email)
+            usuario_existente.email = Email.desde_texto(usuario_dto.email)
         
         if usuario_dto.metodos_pago:
             # Convertir DTOs a entidades de métodos de pago
-            from aeroalpes.modulos.cliente.dominio.entidades import MetodoPago
-            from aeroalpes.modulos.cliente.dominio.objetos_valor import TipoPago, TokenSeguridad, DatosOfuscados
-            from datetime import datetime
-            
-            metodos_pago = []
-            for metodo_dto in usuario_dto.metodos_pago:
-                metodo = MetodoPago()
-                metodo.tipo = TipoPago(metodo_dto.tipo) if metodo_dto.tipo else TipoPago()
-                metodo.nombre = metodo_dto.nombre
-                metodo.token_seguridad = TokenSeguridad(metodo_dto.token_seguridad) if metodo_dto.token_seguridad else TokenSeguridad()
-                if metodo_dto.datos_ofuscados:
-                    metodo.datos_ofuscados = DatosOfuscados(metodo_dto.datos_ofuscados)
-                metodo.fecha_actualizacion = datetime.now()
-                metodos_pago.append(metodo)
-            
-            usuario_existente.metodos_pago = metodos_pago
+            usuario_existente.metodos_pago = [
+                self._mapeador_usuario.metodo_pago_a_entidad(metodo_dto) for metodo_dto in usuario_dto.metodos_pago
+            ]
         
         # Actualizar timestamp
         from datetime import datetime
@@ -143,7 +207,7 @@ class ServicioUsuario(Servicio):
         repositorio.actualizar(usuario_existente)
         
         # Retornar DTO actualizado
-        return self.fabrica_cliente.crear_objeto(usuario_existente, MapeadorUsuario())
+        return self.fabrica_cliente.crear_objeto(usuario_existente, self._mapeador_usuario)
 
     def eliminar_usuario(self, id: UUID) -> bool:
         """Caso de uso: Eliminar un usuario"""
@@ -158,15 +222,75 @@ class ServicioUsuario(Servicio):
         """Caso de uso: Crear usuario desde datos JSON externos"""
         
         # Mapear JSON a DTO usando el mapeador externo
-        mapeador_json = MapeadorUsuarioDTOJson()
-        usuario_dto = mapeador_json.externo_a_dto(usuario_json)
+        usuario_dto = self._mapeador_json.externo_a_dto(usuario_json)
         
         # Crear entidad de dominio
-        usuario: Usuario = self.fabrica_cliente.crear_objeto(usuario_dto, MapeadorUsuario())
+        usuario: Usuario = self.fabrica_cliente.crear_objeto(usuario_dto, self._mapeador_usuario)
         
         # Persistir
         repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
         repositorio.agregar(usuario)
         
         # Retornar DTO
-        return self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+        return self.fabrica_cliente.crear_objeto(usuario, self._mapeador_usuario)
+
+    def crear_usuarios_en_lote(self, usuarios_json: Iterable[dict], tamano_lote: int = 500) -> list[ResultadoLoteDTO]:
+        """Caso de uso: Crear usuarios de forma masiva
+
+        Cada elemento se valida de forma independiente con la fábrica de dominio;
+        los válidos se persisten en lotes de `tamano_lote` usuarios por transacción.
+        Los errores se reportan por elemento sin detener el resto del lote.
+        """
+        resultados: list[ResultadoLoteDTO] = list()
+        lote: list[tuple[int, dict]] = list()
+
+        for indice, usuario_json in enumerate(usuarios_json):
+            lote.append((indice, usuario_json))
+            if len(lote) >= tamano_lote:
+                resultados.extend(self._procesar_lote(lote))
+                lote = list()
+
+        if lote:
+            resultados.extend(self._procesar_lote(lote))
+
+        return resultados
+
+    def _procesar_lote(self, lote: list[tuple[int, dict]]) -> list[ResultadoLoteDTO]:
+        mapeador_json = self._mapeador_json
+        mapeador = self._mapeador_usuario
+        resultados: list[ResultadoLoteDTO] = list()
+        validos: list[tuple[int, Usuario, str]] = list()
+
+        for indice, usuario_json in lote:
+            if not isinstance(usuario_json, dict):
+                resultados.append(ResultadoLoteDTO(indice=indice, error="El elemento no es un objeto JSON válido"))
+                continue
+            try:
+                usuario_dto = mapeador_json.externo_a_dto(usuario_json)
+                usuario: Usuario = self.fabrica_cliente.crear_objeto(usuario_dto, mapeador)
+                validos.append((indice, usuario, usuario_dto.email))
+            except Exception as e:
+                resultados.append(ResultadoLoteDTO(indice=indice, error=str(e)))
+
+        # Se descartan emails repetidos dentro del lote o ya registrados,
+        # así una sola violación de unicidad no invalida la transacción completa
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioUsuarios)
+        vistos = repositorio.emails_existentes([email for _, _, email in validos])
+        a_insertar: list[tuple[int, Usuario]] = list()
+
+        for indice, usuario, email in validos:
+            if email in vistos:
+                resultados.append(ResultadoLoteDTO(indice=indice, error=f"El email {email} ya está registrado"))
+            else:
+                vistos.add(email)
+                a_insertar.append((indice, usuario))
+
+        # Si la transacción falla, el lote se divide hasta aislar los usuarios que la hacen fallar
+        fallidos = self._persistir_lote(a_insertar, lambda lote: repositorio.agregar_lote([usuario for _, usuario in lote]))
+        indices_fallidos = {indice for (indice, _), _ in fallidos}
+        resultados.extend(ResultadoLoteDTO(indice=indice, error=error) for (indice, _), error in fallidos)
+        resultados.extend(
+            ResultadoLoteDTO(indice=indice, id=str(usuario.id)) for indice, usuario in a_insertar if indice not in indices_fallidos
+        )
+
+        return sorted(resultados, key=lambda resultado: resultado.indice)
@@ -11,7 +11,7 @@ from .excepciones import TipoObjetoNoExisteEnDominioClienteExcepcion
 from aeroalpes.seedwork.dominio.repositorios import Mapeador
 from aeroalpes.seedwork.dominio.fabricas import Fabrica
 from aeroalpes.seedwork.dominio.entidades import Entidad
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class _FabricaUsuario(Fabrica):
@@ -45,16 +45,17 @@ class _FabricaMetodoPago(Fabrica):
 
 @dataclass
 class FabricaCliente(Fabrica):
+    _fabrica_usuario: _FabricaUsuario = field(default_factory=_FabricaUsuario, repr=False)
+    _fabrica_metodo_pago: _FabricaMetodoPago = field(default_factory=_FabricaMetodoPago, repr=False)
+
     def crear_objeto(self, obj: any, mapeador: Mapeador) -> any:
         
         # Nota: Aquí se aplicó el patrón Factory Method
         # La fábrica principal delega a fábricas específicas según el tipo de objeto
         
         if isinstance(obj, Usuario) or (hasattr(obj, 'tipo_usuario') and obj.tipo_usuario in ['natural', 'empresa', 'base']):
-            fabrica_usuario = _FabricaUsuario()
-            return fabrica_usuario.crear_objeto(obj, mapeador)
+            return self._fabrica_usuario.crear_objeto(obj, mapeador)
         elif isinstance(obj, MetodoPago) or (hasattr(obj, 'tipo') and hasattr(obj, 'token_seguridad')):
-            fabrica_metodo_pago = _FabricaMetodoPago()
-            return fabrica_metodo_pago.crear_objeto(obj, mapeador)
+            return self._fabrica_metodo_pago.crear_objeto(obj, mapeador)
         else:
             raise TipoObjetoNoExisteEnDominioClienteExcepcion()
@@ -13,21 +13,44 @@ class Nombre(ObjetoValor):
     nombres: str
     apellidos: str
 
+    @classmethod
+    def desde_texto(cls, texto: str) -> 'Nombre':
+        # El primer término son los nombres y el resto los apellidos
+        nombres, _, apellidos = (texto or '').strip().partition(' ')
+        return cls(nombres=nombres, apellidos=apellidos.strip())
+
+    def __str__(self) -> str:
+        return f'{self.nombres} {self.apellidos}'.strip()
+
 @dataclass(frozen=True)
 class Email(ObjetoValor):
     address: str
     dominio: str
     es_empresarial: bool
 
+    @classmethod
+    def desde_texto(cls, texto: str, es_empresarial: bool = False) -> 'Email':
+        texto = (texto or '').strip()
+        return cls(address=texto, dominio=texto.rpartition('@')[2], es_empresarial=es_empresarial)
+
+    def __str__(self) -> str:
+        return self.address
+
 @dataclass(frozen=True)
 class Cedula(ObjetoValor):
     numero: int
-    ciudad: Ciudad
+    ciudad: Ciudad = None
+
+    def __str__(self) -> str:
+        return str(self.numero)
 
 @dataclass(frozen=True)
 class Rut(ObjetoValor):
     numero: int
-    ciudad: Ciudad
+    ciudad: Ciudad = None
+
+    def __str__(self) -> str:
+        return str(self.numero)
 
 # tipo: tarjeta de crédito, débito, transferencia bancaria
 # nombre cambiable
@@ -44,6 +67,9 @@ class TipoPagoEnum(Enum):
 class TipoPago(ObjetoValor):
     tipo: TipoPagoEnum  
 
+    def __str__(self) -> str:
+        return self.tipo.value if isinstance(self.tipo, TipoPagoEnum) else str(self.tipo)
+
 # No existe un nombre metodo de pago porque sería hacer sobre ingenieria.
 # No vale crear un Value Object por que no:
 # - existe logica de validacion compleja
@@ -59,7 +85,19 @@ class TipoPago(ObjetoValor):
 class TokenSeguridad(ObjetoValor):
     token: str  # Token único persistente para recuperar datos
 
+    def __str__(self) -> str:
+        return self.token
+
 @dataclass(frozen=True)
 class DatosOfuscados(ObjetoValor):
     ultimos_digitos: str  # Solo últimos 4 dígitos
     marca: str  # Visa, Mastercard, etc.
+
+    @classmethod
+    def desde_texto(cls, texto: str) -> 'DatosOfuscados':
+        # Formato persistido: "<marca> ****<últimos dígitos>", la marca es opcional
+        texto = (texto or '').strip()
+        return cls(ultimos_digitos=texto[-4:], marca=texto[:-4].rstrip('*').strip())
+
+    def __str__(self) -> str:
+        return f'{self.marca} ****{self.ultimos_digitos}'.strip()
@@ -5,8 +5,12 @@ del dominio de cliente
 
 """
 
-from abc import ABC
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterator
+from uuid import UUID
 from aeroalpes.seedwork.dominio.repositorios import Repositorio
+from .entidades import Usuario
 
 class RepositorioUsuarios(Repositorio, ABC):
     """Repositorio para gestionar agregados de Usuario (ClienteNatural y ClienteEmpresa)
@@ -14,4 +18,48 @@ class RepositorioUsuarios(Repositorio, ABC):
     Nota: No necesitamos repositorio separado para MetodoPago ya que es una entidad
     interna del agregado Usuario y se accede a través de él.
     """
-    ...
+
+    @abstractmethod
+    def obtener_pagina(self, limite: int, cursor: str = None) -> tuple[list[Usuario], str]:
+        """Retorna hasta `limite` usuarios posteriores al cursor y el cursor siguiente (None al final)"""
+        ...
+
+    @abstractmethod
+    def iterar_todos(self, tamano_lote: int = 500) -> Iterator[Usuario]:
+        """Recorre todos los usuarios sin cargarlos completos en memoria"""
+        ...
+
+    @abstractmethod
+    def obtener_por_ids(self, ids: list[str]) -> dict[str, Usuario]:
+        """Retorna los usuarios con los ids dados, indexados por id; los que no existen no aparecen"""
+        ...
+
+    @abstractmethod
+    def obtener_version(self, id: UUID) -> datetime:
+        """Retorna la fecha de actualización del usuario sin cargar el agregado (None si no existe)"""
+        ...
+
+    @abstractmethod
+    def obtener_proyeccion(self, campos: frozenset[str], id: UUID = None, email: str = None) -> dict:
+        """Retorna el id y los `campos` del usuario con el id o el email dados, sin reconstruir el agregado"""
+        ...
+
+    @abstractmethod
+    def obtener_pagina_proyectada(self, campos: frozenset[str], limite: int, cursor: str = None) -> tuple[list[dict], str]:
+        """Igual que `obtener_pagina`, pero cada usuario es un diccionario con su id y los `campos` pedidos"""
+        ...
+
+    @abstractmethod
+    def iterar_proyecciones(self, campos: frozenset[str], tamano_lote: int = 500) -> Iterator[dict]:
+        """Igual que `iterar_todos`, pero cada usuario es un diccionario con su id y los `campos` pedidos"""
+        ...
+
+    @abstractmethod
+    def agregar_lote(self, usuarios: list[Usuario]):
+        """Agrega varios usuarios en una sola transacción"""
+        ...
+
+    @abstractmethod
+    def emails_existentes(self, emails: list[str]) -> set[str]:
+        """Retorna cuáles de los emails dados ya están registrados"""
+        ...
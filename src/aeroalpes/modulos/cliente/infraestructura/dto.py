@@ -30,6 +30,7 @@ class MetodoPago(db.Model):
 
 class Usuario(db.Model):
     __tablename__ = "usuarios"
+    # Los índices secundarios se administran en aeroalpes.config.indices
     
     id = db.Column(db.String, primary_key=True, default=lambda: str(uuid.uuid4()))
     tipo_usuario = db.Column(db.String, nullable=False)  # 'natural' o 'empresa'
@@ -5,11 +5,13 @@ objetos complejos en la capa de infraestructura del dominio de cliente
 
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable
 
 from aeroalpes.modulos.cliente.dominio.repositorios import RepositorioUsuarios
 from aeroalpes.seedwork.dominio.fabricas import Fabrica
 from aeroalpes.seedwork.dominio.repositorios import Repositorio
+from aeroalpes.seedwork.infraestructura.cache import CacheLRU, MapaIdentidad, RepositorioCacheado
 
 from .excepciones import ExcepcionFabrica
 from .repositorios import RepositorioUsuariosSQLite
@@ -17,8 +19,28 @@ from .repositorios import RepositorioUsuariosSQLite
 
 @dataclass
 class FabricaRepositorio(Fabrica):
+    # Los repositorios no guardan estado propio (usan la sesión de db), así
+    # que se crea una sola instancia por tipo
+    _repositorios: dict = field(default_factory=dict, repr=False)
+    # Con un cache, las lecturas por id y por email pasan por él y por el mapa de identidad de la petición
+    cache: CacheLRU = None
+    mapa_identidad: Callable[[], MapaIdentidad] = None
+
     def crear_objeto(self, obj: type, mapeador: any = None) -> Repositorio:
+        repositorio = self._repositorios.get(obj)
+        if repositorio is not None:
+            return repositorio
+
         if obj == RepositorioUsuarios:
-            return RepositorioUsuariosSQLite()
+            repositorio = RepositorioUsuariosSQLite()
+            if self.cache is not None:
+                repositorio = RepositorioCacheado(
+                    repositorio, self.cache, 'usuarios', self.mapa_identidad,
+                    llaves=dict(obtener_por_email=lambda usuario: str(usuario.email)),
+                    version=lambda usuario: usuario.fecha_actualizacion
+                )
         else:
             raise ExcepcionFabrica(f"No existe fábrica para el tipo {obj}")
+
+        self._repositorios[obj] = repositorio
+        return repositorio
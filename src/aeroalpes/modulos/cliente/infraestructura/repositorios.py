@@ -5,19 +5,65 @@ persistir objetos dominio (agregaciones) en la capa de infraestructura del domin
 
 """
 
+import base64
+import json
+from datetime import datetime
+from typing import Iterator
 from uuid import UUID
-from aeroalpes.config.db import db
+from sqlalchemy import insert, tuple_
+from aeroalpes.config.db import db, sesion_consultas
+from aeroalpes.config.escritor import escritura
+from aeroalpes.config.filtro_emails import email_no_registrado, filtro_emails
+from aeroalpes.config.uow import confirmar, deshacer, tras_confirmar
+from aeroalpes.seedwork.infraestructura.carga import PlanesCarga, SELECTIN
 from aeroalpes.modulos.cliente.dominio.repositorios import RepositorioUsuarios
-from aeroalpes.modulos.cliente.dominio.entidades import Usuario, ClienteNatural
+from aeroalpes.modulos.cliente.dominio.entidades import Usuario
 from aeroalpes.modulos.cliente.dominio.fabricas import FabricaCliente
-from .dto import Usuario as UsuarioDTO
+from .dto import Usuario as UsuarioDTO, MetodoPago as MetodoPagoDTO, usuarios_metodos_pago
 from .mapeadores import MapeadorUsuario
 from .excepciones import ExcepcionRepositorio
 
+# Columnas propias de cada tipo de usuario; las del otro tipo no forman parte de su representación
+_CAMPOS_POR_TIPO = dict(
+    natural=('cedula', 'fecha_nacimiento'),
+    empresa=('rut', 'fecha_constitucion'),
+)
+_CAMPOS_ESPECIFICOS = frozenset(campo for campos in _CAMPOS_POR_TIPO.values() for campo in campos)
+_COLUMNAS_METODO_PAGO = tuple(columna.key for columna in MetodoPagoDTO.__table__.columns)
+
+# Usuarios por consulta al cargar por ids o los métodos de pago de una proyección
+_IDS_POR_CONSULTA = 500
+
+def _fila(dto) -> dict:
+    # Convierte un modelo de SQLAlchemy en un diccionario columna -> valor
+    return {columna.key: getattr(dto, columna.key) for columna in dto.__table__.columns}
+
+def _codificar_cursor(fecha_creacion: datetime, id: str) -> str:
+    contenido = json.dumps([fecha_creacion.isoformat(), id])
+    return base64.urlsafe_b64encode(contenido.encode('utf-8')).decode('ascii')
+
+def _decodificar_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        fecha_creacion, id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(fecha_creacion), id
+    except Exception:
+        raise ExcepcionRepositorio(f"Cursor de paginación inválido: {cursor}")
+
 class RepositorioUsuariosSQLite(RepositorioUsuarios):
+
+    # Las lecturas de agregados completos traen los métodos de pago de todas las filas en una consulta adicional
+    PLANES_CARGA = dict(
+        obtener_por_id=dict(metodos_pago=SELECTIN),
+        obtener_por_ids=dict(metodos_pago=SELECTIN),
+        obtener_por_email=dict(metodos_pago=SELECTIN),
+        obtener_pagina=dict(metodos_pago=SELECTIN),
+        iterar_todos=dict(metodos_pago=SELECTIN),
+    )
     
-    def __init__(self):
-        self._fabrica_cliente: FabricaCliente = FabricaCliente()
+    def __init__(self, fabrica_cliente: FabricaCliente = None, planes_carga: dict[str, dict[str, str]] = None):
+        self._fabrica_cliente: FabricaCliente = fabrica_cliente or FabricaCliente()
+        self._mapeador: MapeadorUsuario = MapeadorUsuario()
+        self._planes_carga = PlanesCarga(UsuarioDTO, self.PLANES_CARGA, planes_carga, por_lotes=frozenset({'iterar_todos'}))
 
     @property
     def fabrica_cliente(self):
@@ -26,62 +72,251 @@ class RepositorioUsuariosSQLite(RepositorioUsuarios):
     def obtener_por_id(self, id: UUID) -> Usuario:
         """Obtiene un usuario por su ID"""
         try:
-            usuario_dto = db.session.query(UsuarioDTO).filter_by(id=str(id)).one()
-            return self.fabrica_cliente.crear_objeto(usuario_dto, MapeadorUsuario())
+            usuario_dto = sesion_consultas().query(UsuarioDTO)\
+                .options(*self._planes_carga.opciones('obtener_por_id'))\
+                .filter_by(id=str(id)).one()
+            return self.fabrica_cliente.crear_objeto(usuario_dto, self._mapeador)
         except Exception as e:
             raise ExcepcionRepositorio(f"Error al obtener usuario por ID {id}: {str(e)}")
 
+    def obtener_por_ids(self, ids: list[str]) -> dict[str, Usuario]:
+        """Obtiene varios usuarios con una consulta IN por grupo de ids y una más para sus métodos de pago"""
+        usuarios = dict()
+        try:
+            for i in range(0, len(ids), _IDS_POR_CONSULTA):
+                consulta = sesion_consultas().query(UsuarioDTO)\
+                    .options(*self._planes_carga.opciones('obtener_por_ids'))\
+                    .filter(UsuarioDTO.id.in_([str(id) for id in ids[i:i + _IDS_POR_CONSULTA]]))
+                for usuario_dto in consulta:
+                    usuarios[usuario_dto.id] = self.fabrica_cliente.crear_objeto(usuario_dto, self._mapeador)
+        except Exception as e:
+            raise ExcepcionRepositorio(f"Error al obtener usuarios por ID: {str(e)}")
+        return usuarios
+
     def obtener_por_email(self, email: str) -> Usuario:
         """Obtiene un usuario por su email"""
+        if email_no_registrado(email):
+            raise ExcepcionRepositorio(f"Error al obtener usuario por email {email}: el email no está registrado")
         try:
-            usuario_dto = db.session.query(UsuarioDTO).filter_by(email=email).one()
-            return self.fabrica_cliente.crear_objeto(usuario_dto, MapeadorUsuario())
+            usuario_dto = sesion_consultas().query(UsuarioDTO)\
+                .options(*self._planes_carga.opciones('obtener_por_email'))\
+                .filter_by(email=email).one()
+            return self.fabrica_cliente.crear_objeto(usuario_dto, self._mapeador)
         except Exception as e:
             raise ExcepcionRepositorio(f"Error al obtener usuario por email {email}: {str(e)}")
 
+    def obtener_version(self, id: UUID) -> datetime:
+        """Obtiene la fecha de actualización de un usuario sin cargar la fila ni sus relaciones"""
+        return sesion_consultas().query(UsuarioDTO.fecha_actualizacion).filter_by(id=str(id)).scalar()
+
     def obtener_todos(self) -> list[Usuario]:
-        """Obtiene todos los usuarios - Para propósitos de demostración"""
+        """Obtiene todos los usuarios
+
+        Nota: Para volúmenes grandes use `obtener_pagina` o `iterar_todos`
+        """
+        return list(self.iterar_todos())
+
+    def _consulta_ordenada(self, *columnas):
+        # El orden (fecha_creacion, id) es estable y está respaldado por un índice
+        return sesion_consultas().query(*(columnas or (UsuarioDTO,))).order_by(UsuarioDTO.fecha_creacion, UsuarioDTO.id)
+
+    def _pagina(self, consulta, limite: int, cursor: str = None) -> tuple[list, str]:
+        if cursor:
+            fecha_creacion, id = _decodificar_cursor(cursor)
+            consulta = consulta.filter(
+                tuple_(UsuarioDTO.fecha_creacion, UsuarioDTO.id) > tuple_(fecha_creacion, id)
+            )
+
         try:
-            # Crear algunos usuarios de ejemplo para demostración
-            from aeroalpes.modulos.cliente.dominio.objetos_valor import Nombre, Email, Cedula, TipoPago, TokenSeguridad
-            from aeroalpes.modulos.cliente.dominio.entidades import MetodoPago
-            from datetime import datetime
-            
-            # Usuario Natural de ejemplo
-            metodo_pago = MetodoPago()
-            metodo_pago.tipo = TipoPago("CREDITO")
-            metodo_pago.nombre = "Tarjeta Principal"
-            metodo_pago.token_seguridad = TokenSeguridad("tok_123456789")
-            
-            cliente_natural = ClienteNatural()
-            cliente_natural.nombre = Nombre("Juan Pérez")
-            cliente_natural.email = Email("juan.perez@example.com")
-            cliente_natural.cedula = Cedula("12345678")
-            cliente_natural.fecha_nacimiento = datetime(1990, 5, 15)
-            cliente_natural.metodos_pago = [metodo_pago]
-            
-            return [cliente_natural]
+            # Se pide un registro adicional para saber si existe una página siguiente
+            filas = consulta.limit(limite + 1).all()
+        except Exception as e:
+            raise ExcepcionRepositorio(f"Error al obtener página de usuarios: {str(e)}")
+
+        siguiente_cursor = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            ultima = filas[-1]
+            siguiente_cursor = _codificar_cursor(ultima.fecha_creacion, ultima.id)
+        return filas, siguiente_cursor
+
+    def obtener_pagina(self, limite: int, cursor: str = None) -> tuple[list[Usuario], str]:
+        """Obtiene una página de usuarios usando paginación por llave (keyset)"""
+        consulta = self._consulta_ordenada().options(*self._planes_carga.opciones('obtener_pagina'))
+        usuarios_dto, siguiente_cursor = self._pagina(consulta, limite, cursor)
+
+        usuarios = [self.fabrica_cliente.crear_objeto(usuario_dto, self._mapeador) for usuario_dto in usuarios_dto]
+        return usuarios, siguiente_cursor
+
+    def _columnas_proyeccion(self, campos: frozenset[str]) -> list:
+        # id y tipo_usuario deciden qué campos específicos aplican; fecha_creacion ordena y arma el cursor
+        columnas = {'id', 'tipo_usuario', 'fecha_creacion'} | (campos - {'metodos_pago'})
+        return [getattr(UsuarioDTO, columna) for columna in sorted(columnas)]
+
+    def _proyectar(self, filas: list, campos: frozenset[str]) -> list[dict]:
+        proyecciones = list()
+        for fila in filas:
+            fila = fila._asdict()
+            aplicables = _CAMPOS_POR_TIPO.get(fila['tipo_usuario'], ())
+            proyecciones.append({
+                campo: fila[campo] for campo in ('id', *campos)
+                if campo != 'metodos_pago' and (campo not in _CAMPOS_ESPECIFICOS or campo in aplicables)
+            })
+
+        # La relación solo se consulta si se pidió, con una consulta por cada grupo de usuarios
+        if 'metodos_pago' in campos:
+            metodos_pago = self._metodos_pago_por_usuario([proyeccion['id'] for proyeccion in proyecciones])
+            for proyeccion in proyecciones:
+                proyeccion['metodos_pago'] = metodos_pago.get(proyeccion['id'], [])
+        return proyecciones
+
+    def _metodos_pago_por_usuario(self, ids: list[str]) -> dict[str, list[dict]]:
+        relacion = usuarios_metodos_pago.c
+        tabla = MetodoPagoDTO.__table__
+        metodos_pago: dict[str, list[dict]] = dict()
+        for i in range(0, len(ids), _IDS_POR_CONSULTA):
+            consulta = sesion_consultas().query(relacion.usuario_id, *tabla.columns)\
+                .select_from(usuarios_metodos_pago)\
+                .join(tabla, tabla.c.id == relacion.metodo_pago_id)\
+                .filter(relacion.usuario_id.in_(ids[i:i + _IDS_POR_CONSULTA]))
+            for usuario_id, *valores in consulta:
+                metodos_pago.setdefault(usuario_id, []).append(dict(zip(_COLUMNAS_METODO_PAGO, valores)))
+        return metodos_pago
+
+    def obtener_proyeccion(self, campos: frozenset[str], id: UUID = None, email: str = None) -> dict:
+        """Obtiene el id y los `campos` de un usuario por su ID o su email leyendo solo esas columnas"""
+        if id is None and email_no_registrado(email):
+            raise ExcepcionRepositorio(f"Error al obtener usuario {email}: el email no está registrado")
+        filtro = UsuarioDTO.id == str(id) if id is not None else UsuarioDTO.email == email
+        try:
+            fila = sesion_consultas().query(*self._columnas_proyeccion(campos)).filter(filtro).one()
+        except Exception as e:
+            raise ExcepcionRepositorio(f"Error al obtener usuario {id if id is not None else email}: {str(e)}")
+        return self._proyectar([fila], campos)[0]
+
+    def obtener_pagina_proyectada(self, campos: frozenset[str], limite: int, cursor: str = None) -> tuple[list[dict], str]:
+        """Obtiene una página de proyecciones de usuarios usando paginación por llave (keyset)"""
+        filas, siguiente_cursor = self._pagina(self._consulta_ordenada(*self._columnas_proyeccion(campos)), limite, cursor)
+        return self._proyectar(filas, campos), siguiente_cursor
+
+    def iterar_proyecciones(self, campos: frozenset[str], tamano_lote: int = 500) -> Iterator[dict]:
+        """Recorre las proyecciones de todos los usuarios en lotes"""
+        try:
+            lote = list()
+            for fila in self._consulta_ordenada(*self._columnas_proyeccion(campos)).yield_per(tamano_lote):
+                lote.append(fila)
+                if len(lote) >= tamano_lote:
+                    yield from self._proyectar(lote, campos)
+                    lote = list()
+            yield from self._proyectar(lote, campos)
+        except ExcepcionRepositorio:
+            raise
+        except Exception as e:
+            raise ExcepcionRepositorio(f"Error al obtener todos los usuarios: {str(e)}")
+
+    def iterar_todos(self, tamano_lote: int = 500) -> Iterator[Usuario]:
+        """Recorre todos los usuarios en lotes, manteniendo el uso de memoria constante"""
+        try:
+            consulta = self._consulta_ordenada().options(*self._planes_carga.opciones('iterar_todos'))
+            for usuario_dto in consulta.yield_per(tamano_lote):
+                yield self.fabrica_cliente.crear_objeto(usuario_dto, self._mapeador)
+        except ExcepcionRepositorio:
+            raise
         except Exception as e:
             raise ExcepcionRepositorio(f"Error al obtener todos los usuarios: {str(e)}")
 
+    def contar(self) -> int:
+        """Cantidad de usuarios registrados"""
+        return sesion_consultas().query(UsuarioDTO.id).count()
+
+    def iterar_emails(self, tamano_lote: int = 5000) -> Iterator[str]:
+        """Recorre los emails de todos los usuarios en lotes"""
+        for email, in sesion_consultas().query(UsuarioDTO.email).yield_per(tamano_lote):
+            yield email
+
+    def _registrar_emails(self, agregados: list[str] = (), quitados: list[str] = ()):
+        # El filtro solo cambia con cambios confirmados: quitar antes daría falsos negativos
+        filtro = filtro_emails()
+        if filtro is None:
+            return
+
+        def actualizar_filtro():
+            for email in agregados:
+                filtro.agregar(email)
+            for email in quitados:
+                filtro.quitar(email)
+        tras_confirmar(actualizar_filtro)
+
+    @escritura
     def agregar(self, usuario: Usuario):
         """Agrega un nuevo usuario"""
+        email = str(usuario.email)
+        # Un email que puede estar registrado se verifica antes de intentar la inserción (y su rollback)
+        filtro = filtro_emails()
+        if filtro is not None and filtro.puede_contener(email) and self._emails_registrados([email]):
+            raise ExcepcionRepositorio(f"Error al agregar usuario: el email {email} ya está registrado")
+
         try:
-            usuario_dto = self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+            usuario_dto = self.fabrica_cliente.crear_objeto(usuario, self._mapeador)
             db.session.add(usuario_dto)
-            db.session.commit()
+            confirmar()
         except Exception as e:
-            db.session.rollback()
+            deshacer()
             raise ExcepcionRepositorio(f"Error al agregar usuario: {str(e)}")
+        self._registrar_emails(agregados=[email])
+
+    @escritura
+    def agregar_lote(self, usuarios: list[Usuario]):
+        """Agrega varios usuarios con inserciones multi-fila en una sola transacción"""
+        usuarios_dto = [self.fabrica_cliente.crear_objeto(usuario, self._mapeador) for usuario in usuarios]
+        self._insertar_filas(usuarios_dto)
+
+    def _insertar_filas(self, usuarios_dto: list[UsuarioDTO]):
+        filas_usuarios = list()
+        filas_metodos_pago = list()
+        filas_relacion = list()
+
+        for usuario_dto in usuarios_dto:
+            filas_usuarios.append(_fila(usuario_dto))
+            for metodo_dto in usuario_dto.metodos_pago or []:
+                filas_metodos_pago.append(_fila(metodo_dto))
+                filas_relacion.append(dict(usuario_id=usuario_dto.id, metodo_pago_id=metodo_dto.id))
+
+        try:
+            # executemany: una sentencia por tabla sin importar el tamaño del lote
+            if filas_usuarios:
+                db.session.execute(insert(UsuarioDTO.__table__), filas_usuarios)
+            if filas_metodos_pago:
+                db.session.execute(insert(MetodoPagoDTO.__table__), filas_metodos_pago)
+            if filas_relacion:
+                db.session.execute(insert(usuarios_metodos_pago), filas_relacion)
+            confirmar()
+        except Exception as e:
+            deshacer()
+            raise ExcepcionRepositorio(f"Error al agregar lote de usuarios: {str(e)}")
+        self._registrar_emails(agregados=[fila['email'] for fila in filas_usuarios])
+
+    def emails_existentes(self, emails: list[str]) -> set[str]:
+        """Retorna cuáles de los emails dados ya están registrados"""
+        # Los que el filtro descarta no se consultan
+        return self._emails_registrados([email for email in emails if not email_no_registrado(email)])
+
+    def _emails_registrados(self, emails: list[str]) -> set[str]:
+        if not emails:
+            return set()
+        consulta = db.session.query(UsuarioDTO.email).filter(UsuarioDTO.email.in_(emails))
+        return {email for email, in consulta}
 
+    @escritura
     def actualizar(self, usuario: Usuario):
         """Actualiza un usuario existente"""
         try:
             # Buscar el usuario existente
             usuario_existente = db.session.query(UsuarioDTO).filter_by(id=str(usuario.id)).one()
+            email_anterior = usuario_existente.email
             
             # Mapear los nuevos datos
-            usuario_dto = self.fabrica_cliente.crear_objeto(usuario, MapeadorUsuario())
+            usuario_dto = self.fabrica_cliente.crear_objeto(usuario, self._mapeador)
             
             # Actualizar campos
             usuario_existente.nombre = usuario_dto.nombre
@@ -93,17 +328,21 @@ class RepositorioUsuariosSQLite(RepositorioUsuarios):
             if hasattr(usuario_dto, 'rut') and usuario_dto.rut:
                 usuario_existente.rut = usuario_dto.rut
             
-            db.session.commit()
+            confirmar()
         except Exception as e:
-            db.session.rollback()
+            deshacer()
             raise ExcepcionRepositorio(f"Error al actualizar usuario: {str(e)}")
+        if usuario_dto.email != email_anterior:
+            self._registrar_emails(agregados=[usuario_dto.email], quitados=[email_anterior])
 
+    @escritura
     def eliminar(self, usuario_id: UUID):
         """Elimina un usuario por su ID"""
         try:
             usuario = db.session.query(UsuarioDTO).filter_by(id=str(usuario_id)).one()
             db.session.delete(usuario)
-            db.session.commit()
+            confirmar()
         except Exception as e:
-            db.session.rollback()
-            raise ExcepcionRepositorio(f"Error al eliminar usuario {usuario_id}: {str(e)}")
\ No newline at end of file
+            deshacer()
+            raise ExcepcionRepositorio(f"Error al eliminar usuario {usuario_id}: {str(e)}")
+        self._registrar_emails(quitados=[usuario.email])
\ No newline at end of file
@@ -1,6 +1,9 @@
 from dataclasses import dataclass, field
 from aeroalpes.seedwork.aplicacion.dto import DTO
 
+# Campos de la reserva aceptados en `?fields=`
+CAMPOS_RESERVA = ('id', 'fecha_creacion', 'fecha_actualizacion', 'itinerarios')
+
 @dataclass(frozen=True)
 class LegDTO(DTO):
     fecha_salida: str
@@ -25,4 +28,12 @@ class ReservaDTO(DTO):
     fecha_creacion: str = field(default_factory=str)
     fecha_actualizacion: str = field(default_factory=str)
     id: str = field(default_factory=str)
-    itinerarios: list[ItinerarioDTO] = field(default_factory=list)
\ No newline at end of file
+    itinerarios: list[ItinerarioDTO] = field(default_factory=list)
+
+@dataclass(frozen=True)
+class ResultadoIngestaDTO(DTO):
+    total: int = field(default=0)
+    creadas: int = field(default=0)
+    errores: list[dict] = field(default_factory=list)
+    duracion_segundos: float = field(default=0.0)
+    reservas_por_segundo: float = field(default=0.0)
@@ -1,4 +1,5 @@
 from aeroalpes.seedwork.aplicacion.dto import Mapeador as AppMap
+from aeroalpes.seedwork.aplicacion.serializacion import codificar
 from aeroalpes.seedwork.dominio.repositorios import Mapeador as RepMap
 from aeroalpes.modulos.vuelos.dominio.entidades import Reserva, Aeropuerto
 from aeroalpes.modulos.vuelos.dominio.objetos_valor import Itinerario, Odo, Segmento, Leg
@@ -36,6 +37,10 @@ class MapeadorReservaDTOJson(AppMap):
     def dto_a_externo(self, dto: ReservaDTO) -> dict:
         return dto.__dict__
 
+    def dto_a_json(self, dto: ReservaDTO) -> bytes:
+        # El formato externo es el mismo DTO, así que se usa el codificador compilado
+        return codificar(dto)
+
 class MapeadorReserva(RepMap):
     _FORMATO_FECHA = '%Y-%m-%dT%H:%M:%SZ'
 
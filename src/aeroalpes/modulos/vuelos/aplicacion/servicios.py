@@ -1,20 +1,30 @@
+import time
+from datetime import datetime
+from typing import Iterable
+
 from aeroalpes.modulos.vuelos.dominio.entidades import Reserva
 from aeroalpes.modulos.vuelos.dominio.fabricas import FabricaVuelos
 from aeroalpes.modulos.vuelos.infraestructura.fabricas import \
     FabricaRepositorio
 from aeroalpes.modulos.vuelos.infraestructura.repositorios import \
     RepositorioReservas
+from aeroalpes.seedwork.aplicacion.cargadores import CargadorAgregados
 from aeroalpes.seedwork.aplicacion.servicios import Servicio
 
-from .dto import ReservaDTO
-from .mapeadores import MapeadorReserva
+from .dto import ReservaDTO, ResultadoIngestaDTO
+from .mapeadores import MapeadorReserva, MapeadorReservaDTOJson
+
 
+class CargadorReservas(CargadorAgregados):
+    """Cargador por lotes de reservas; el contenedor entrega uno por petición"""
 
 class ServicioReserva(Servicio):
 
-    def __init__(self):
-        self._fabrica_repositorio: FabricaRepositorio = FabricaRepositorio()
-        self._fabrica_vuelos: FabricaVuelos = FabricaVuelos()
+    def __init__(self, fabrica_repositorio: FabricaRepositorio = None, fabrica_vuelos: FabricaVuelos = None):
+        self._fabrica_repositorio: FabricaRepositorio = fabrica_repositorio or FabricaRepositorio()
+        self._fabrica_vuelos: FabricaVuelos = fabrica_vuelos or FabricaVuelos()
+        self._mapeador_reserva: MapeadorReserva = MapeadorReserva()
+        self._mapeador_json: MapeadorReservaDTOJson = MapeadorReservaDTOJson()
 
     @property
     def fabrica_repositorio(self):
@@ -25,14 +35,115 @@ class ServicioReserva(Servicio):
         return self._fabrica_vuelos
 
     def crear_reserva(self, reserva_dto: ReservaDTO) -> ReservaDTO:
-        reserva: Reserva = self.fabrica_vuelos.crear_objeto(reserva_dto, MapeadorReserva())
+        reserva: Reserva = self.fabrica_vuelos.crear_objeto(reserva_dto, self._mapeador_reserva)
 
         repositorio = self.fabrica_repositorio.crear_objeto(RepositorioReservas)
         repositorio.agregar(reserva)
 
-        return self.fabrica_vuelos.crear_objeto(reserva, MapeadorReserva())
+        return self.fabrica_vuelos.crear_objeto(reserva, self._mapeador_reserva)
+
+    def obtener_version_reserva(self, id) -> datetime:
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioReservas)
+        return repositorio.obtener_version(id)
+
+    def obtener_reserva_por_id(self, id, campos: frozenset[str] = None, cargador: CargadorReservas = None) -> ReservaDTO:
+        """Reserva completa o, con `campos`, solo su id y esos campos
 
-    def obtener_reserva_por_id(self, id) -> ReservaDTO:
+        Los itinerarios son la única parte que requiere reconstruir el agregado;
+        sin ellos la reserva se lee como una proyección de columnas. Con el
+        `cargador` de la petición, el agregado se lee en el mismo lote que los
+        demás ids solicitados y no se vuelve a consultar en ella.
+        """
         repositorio = self.fabrica_repositorio.crear_objeto(RepositorioReservas)
-        return repositorio.obtener_por_id(id).__dict__
+        if campos and 'itinerarios' not in campos:
+            proyeccion = repositorio.obtener_proyeccion(id, campos)
+            # Misma llave que la representación completa, que expone los atributos de la entidad
+            proyeccion['_id'] = proyeccion.pop('id')
+            return proyeccion
+
+        reserva = cargador.obtener(id) if cargador else None
+        if reserva is None:
+            # Sin cargador, o para fallar con el mismo error si la reserva no existe
+            reserva = repositorio.obtener_por_id(id)
+        reserva = reserva.__dict__
+        if campos:
+            return {llave: valor for llave, valor in reserva.items() if llave == '_id' or llave in campos}
+        return reserva
+
+    def crear_cargador(self) -> CargadorReservas:
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioReservas)
+        return CargadorReservas(repositorio.obtener_por_ids)
+
+    def obtener_reservas_por_ids(self, ids: list, cargador: CargadorReservas = None) -> list[dict]:
+        """Reservas completas en el orden de `ids`, omitiendo las que no existen
+
+        Todas se leen con una consulta por lote; con el `cargador` de la
+        petición, las reservas ya leídas en ella no se vuelven a consultar.
+        """
+        cargador = cargador or self.crear_cargador()
+        return [reserva.__dict__ for reserva in cargador.obtener_muchos(ids) if reserva is not None]
+
+    def crear_reservas_en_lote(self, reservas_externas: Iterable[dict], tamano_lote: int = 1000) -> ResultadoIngestaDTO:
+        """Ingesta masiva de reservas
+
+        Las reservas se consumen como un flujo, se validan en lotes con las reglas
+        de la fábrica (MinimoUnItinerario, RutaValida) y cada lote se persiste con
+        inserciones multi-fila en una sola transacción. Si la transacción falla,
+        el lote se divide hasta aislar las reservas que la hacen fallar.
+        """
+        inicio = time.perf_counter()
+        total = 0
+        creadas = 0
+        errores: list[dict] = list()
+        lote: list[tuple[int, dict]] = list()
+
+        for indice, reserva_externa in enumerate(reservas_externas):
+            total += 1
+            lote.append((indice, reserva_externa))
+            if len(lote) >= tamano_lote:
+                creadas += self._procesar_lote(lote, errores)
+                lote = list()
+
+        if lote:
+            creadas += self._procesar_lote(lote, errores)
+
+        duracion = time.perf_counter() - inicio
+        return ResultadoIngestaDTO(
+            total=total,
+            creadas=creadas,
+            errores=errores,
+            duracion_segundos=duracion,
+            reservas_por_segundo=creadas / duracion if duracion > 0 else 0.0
+        )
+
+    def _procesar_lote(self, lote: list[tuple[int, dict]], errores: list[dict]) -> int:
+        map_reserva_json = self._mapeador_json
+        map_reserva = self._mapeador_reserva
+        reservas: list[tuple[int, Reserva]] = list()
+
+        for indice, reserva_externa in lote:
+            if not isinstance(reserva_externa, dict):
+                errores.append(dict(indice=indice, error="El elemento no es un objeto JSON válido"))
+                continue
+            try:
+                reserva_dto = map_reserva_json.externo_a_dto(reserva_externa)
+                reservas.append((indice, self.fabrica_vuelos.crear_objeto(reserva_dto, map_reserva)))
+            except Exception as e:
+                errores.append(dict(indice=indice, error=str(e)))
+
+        if not reservas:
+            return 0
+
+        # Igual que en `crear_reserva`, una reserva con itinerarios ya registrados
+        # es información duplicada; se descarta antes de abrir la transacción
+        repositorio = self.fabrica_repositorio.crear_objeto(RepositorioReservas)
+        duplicados = repositorio.indices_duplicados([reserva for _, reserva in reservas])
+        for posicion in sorted(duplicados):
+            errores.append(dict(indice=reservas[posicion][0], error="La reserva contiene itinerarios ya registrados"))
+        reservas = [elemento for posicion, elemento in enumerate(reservas) if posicion not in duplicados]
+
+        fallidas = self._persistir_lote(reservas, lambda lote: repositorio.agregar_lote([reserva for _, reserva in lote]))
+        errores.extend(dict(indice=indice, error=error) for (indice, _), error in fallidas)
+        errores.sort(key=lambda error: error['indice'])
 
+        return len(reservas) - len(fallidas)
@@ -11,7 +11,7 @@ from .excepciones import TipoObjetoNoExisteEnDominioVuelosExcepcion
 from aeroalpes.seedwork.dominio.repositorios import Mapeador, Repositorio
 from aeroalpes.seedwork.dominio.fabricas import Fabrica
 from aeroalpes.seedwork.dominio.entidades import Entidad
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class _FabricaReserva(Fabrica):
@@ -28,10 +28,11 @@ class _FabricaReserva(Fabrica):
 
 @dataclass
 class FabricaVuelos(Fabrica):
+    _fabrica_reserva: _FabricaReserva = field(default_factory=_FabricaReserva, repr=False)
+
     def crear_objeto(self, obj: any, mapeador: Mapeador) -> any:
         if mapeador.obtener_tipo() == Reserva.__class__:
-            fabrica_reserva = _FabricaReserva()
-            return fabrica_reserva.crear_objeto(obj, mapeador)
+            return self._fabrica_reserva.crear_objeto(obj, mapeador)
         else:
             raise TipoObjetoNoExisteEnDominioVuelosExcepcion()
 
@@ -5,11 +5,35 @@ del dominio de vuelos
 
 """
 
-from abc import ABC
+from abc import ABC, abstractmethod
+from datetime import datetime
+from uuid import UUID
 from aeroalpes.seedwork.dominio.repositorios import Repositorio
+from .entidades import Reserva
 
 class RepositorioReservas(Repositorio, ABC):
-    ...
+
+    @abstractmethod
+    def obtener_por_ids(self, ids: list[str]) -> dict[str, Reserva]:
+        """Retorna las reservas con los ids dados, indexadas por id; las que no existen no aparecen"""
+        ...
+
+    @abstractmethod
+    def obtener_version(self, id: UUID) -> datetime:
+        ...
+
+    @abstractmethod
+    def obtener_proyeccion(self, id: UUID, campos: frozenset[str]) -> dict:
+        """Retorna el id y los `campos` de la reserva, sin cargar sus itinerarios"""
+        ...
+
+    @abstractmethod
+    def agregar_lote(self, reservas: list[Reserva]):
+        ...
+
+    @abstractmethod
+    def indices_duplicados(self, reservas: list[Reserva]) -> set[int]:
+        ...
 
 class RepositorioProveedores(Repositorio, ABC):
     ...
\ No newline at end of file
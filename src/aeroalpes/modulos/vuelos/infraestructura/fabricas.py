@@ -6,11 +6,13 @@ objetos complejos en la capa de infraestructura del dominio de vuelos
 """
 
 from dataclasses import dataclass, field
+from typing import Callable
 
 from aeroalpes.modulos.vuelos.dominio.repositorios import (
     RepositorioProveedores, RepositorioReservas)
 from aeroalpes.seedwork.dominio.fabricas import Fabrica
 from aeroalpes.seedwork.dominio.repositorios import Repositorio
+from aeroalpes.seedwork.infraestructura.cache import CacheLRU, MapaIdentidad, RepositorioCacheado
 
 from .excepciones import ExcepcionFabrica
 from .repositorios import (RepositorioProveedoresSQLite,
@@ -19,10 +21,27 @@ from .repositorios import (RepositorioProveedoresSQLite,
 
 @dataclass
 class FabricaRepositorio(Fabrica):
+    # Los repositorios no guardan estado propio (usan la sesión de db), así
+    # que se crea una sola instancia por tipo
+    _repositorios: dict = field(default_factory=dict, repr=False)
+    # Con un cache, las lecturas de reservas por id pasan por él y por el mapa de identidad de la petición
+    cache: CacheLRU = None
+    mapa_identidad: Callable[[], MapaIdentidad] = None
+
     def crear_objeto(self, obj: type, mapeador: any = None) -> Repositorio:
+        repositorio = self._repositorios.get(obj)
+        if repositorio is not None:
+            return repositorio
+
         if obj == RepositorioReservas:
-            return RepositorioReservasSQLite()
+            repositorio = RepositorioReservasSQLite()
+            if self.cache is not None:
+                repositorio = RepositorioCacheado(repositorio, self.cache, 'reservas', self.mapa_identidad,
+                                                  version=lambda reserva: reserva.fecha_actualizacion)
         elif obj == RepositorioProveedores:
-            return RepositorioProveedoresSQLite()
+            repositorio = RepositorioProveedoresSQLite()
         else:
-            raise ExcepcionFabrica()
\ No newline at end of file
+            raise ExcepcionFabrica()
+
+        self._repositorios[obj] = repositorio
+        return repositorio
@@ -5,6 +5,7 @@ encargados de la transformación entre formatos de dominio y DTOs
 
 """
 
+from uuid import UUID
 from aeroalpes.seedwork.dominio.repositorios import Mapeador
 from aeroalpes.modulos.vuelos.dominio.objetos_valor import NombreAero, Odo, Leg, Segmento, Itinerario, CodigoIATA
 from aeroalpes.modulos.vuelos.dominio.entidades import Proveedor, Aeropuerto, Reserva
@@ -76,7 +77,8 @@ class MapeadorReserva(Mapeador):
         return reserva_dto
 
     def dto_a_entidad(self, dto: ReservaDTO) -> Reserva:
-        reserva = Reserva(dto.id, dto.fecha_creacion, dto.fecha_actualizacion)
+        # El id persistido se conserva: un texto haría que la entidad generara uno nuevo
+        reserva = Reserva(UUID(dto.id), dto.fecha_creacion, dto.fecha_actualizacion)
         reserva.itinerarios = list()
 
         itinerarios_dto: list[ItinerarioDTO] = dto.itinerarios
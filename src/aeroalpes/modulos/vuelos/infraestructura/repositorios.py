@@ -5,14 +5,32 @@ persistir objetos dominio (agregaciones) en la capa de infraestructura del domin
 
 """
 
-from aeroalpes.config.db import db
+from aeroalpes.config.db import db, sesion_consultas
+from aeroalpes.config.escritor import escritura
+from aeroalpes.config.uow import confirmar, deshacer
 from aeroalpes.modulos.vuelos.dominio.repositorios import RepositorioReservas, RepositorioProveedores
 from aeroalpes.modulos.vuelos.dominio.objetos_valor import NombreAero, Odo, Leg, Segmento, Itinerario, CodigoIATA
 from aeroalpes.modulos.vuelos.dominio.entidades import Proveedor, Aeropuerto, Reserva
 from aeroalpes.modulos.vuelos.dominio.fabricas import FabricaVuelos
-from .dto import Reserva as ReservaDTO
+from .dto import Reserva as ReservaDTO, Itinerario as ItinerarioDTO, reservas_itinerarios
 from .mapeadores import MapeadorReserva
+from datetime import datetime
 from uuid import UUID
+from sqlalchemy import insert, tuple_
+from aeroalpes.seedwork.infraestructura.carga import PlanesCarga, SELECTIN
+
+_COLUMNAS_ITINERARIO = (
+    'odo_orden', 'segmento_orden', 'leg_orden', 'fecha_salida',
+    'fecha_llegada', 'origen_codigo', 'destino_codigo'
+)
+
+_COLUMNAS_RESERVA = frozenset(('id', 'fecha_creacion', 'fecha_actualizacion'))
+
+# Claves por consulta al buscar itinerarios existentes (7 parámetros por clave)
+_CLAVES_POR_CONSULTA = 500
+
+# Reservas por consulta al cargar por ids
+_IDS_POR_CONSULTA = 500
 
 class RepositorioProveedoresSQLite(RepositorioProveedores):
 
@@ -46,25 +64,120 @@ class RepositorioProveedoresSQLite(RepositorioProveedores):
 
 class RepositorioReservasSQLite(RepositorioReservas):
 
-    def __init__(self):
-        self._fabrica_vuelos: FabricaVuelos = FabricaVuelos()
+    # Las lecturas de agregados completos traen los itinerarios de todas las filas en una consulta adicional
+    PLANES_CARGA = dict(
+        obtener_por_id=dict(itinerarios=SELECTIN),
+        obtener_por_ids=dict(itinerarios=SELECTIN),
+    )
+
+    def __init__(self, fabrica_vuelos: FabricaVuelos = None, planes_carga: dict[str, dict[str, str]] = None):
+        self._fabrica_vuelos: FabricaVuelos = fabrica_vuelos or FabricaVuelos()
+        self._mapeador: MapeadorReserva = MapeadorReserva()
+        self._planes_carga = PlanesCarga(ReservaDTO, self.PLANES_CARGA, planes_carga)
 
     @property
     def fabrica_vuelos(self):
         return self._fabrica_vuelos
 
     def obtener_por_id(self, id: UUID) -> Reserva:
-        reserva_dto = db.session.query(ReservaDTO).filter_by(id=str(id)).one()
-        return self.fabrica_vuelos.crear_objeto(reserva_dto, MapeadorReserva())
+        reserva_dto = sesion_consultas().query(ReservaDTO)\
+            .options(*self._planes_carga.opciones('obtener_por_id'))\
+            .filter_by(id=str(id)).one()
+        return self.fabrica_vuelos.crear_objeto(reserva_dto, self._mapeador)
+
+    def obtener_por_ids(self, ids: list[str]) -> dict[str, Reserva]:
+        # Una consulta IN por grupo de ids y, con selectin, una más para los itinerarios de todo el grupo
+        reservas = dict()
+        for i in range(0, len(ids), _IDS_POR_CONSULTA):
+            consulta = sesion_consultas().query(ReservaDTO)\
+                .options(*self._planes_carga.opciones('obtener_por_ids'))\
+                .filter(ReservaDTO.id.in_([str(id) for id in ids[i:i + _IDS_POR_CONSULTA]]))
+            for reserva_dto in consulta:
+                reservas[reserva_dto.id] = self.fabrica_vuelos.crear_objeto(reserva_dto, self._mapeador)
+        return reservas
+
+    def obtener_version(self, id: UUID) -> datetime:
+        return sesion_consultas().query(ReservaDTO.fecha_actualizacion).filter_by(id=str(id)).scalar()
+
+    def obtener_proyeccion(self, id: UUID, campos: frozenset[str]) -> dict:
+        # Solo columnas de la tabla reservas; la relación con itinerarios no se consulta
+        columnas = sorted({'id'} | (campos & _COLUMNAS_RESERVA))
+        fila = sesion_consultas().query(*(getattr(ReservaDTO, columna) for columna in columnas)).filter(ReservaDTO.id == str(id)).one()
+        return fila._asdict()
 
     def obtener_todos(self) -> list[Reserva]:
         # TODO
         raise NotImplementedError
 
+    @escritura
     def agregar(self, reserva: Reserva):
-        reserva_dto = self.fabrica_vuelos.crear_objeto(reserva, MapeadorReserva())
+        reserva_dto = self.fabrica_vuelos.crear_objeto(reserva, self._mapeador)
         db.session.add(reserva_dto)
-        db.session.commit()
+        confirmar()
+
+    @escritura
+    def agregar_lote(self, reservas: list[Reserva]):
+        filas_reservas = list()
+        filas_itinerarios = list()
+        filas_relacion = list()
+
+        for reserva in reservas:
+            reserva_dto = self.fabrica_vuelos.crear_objeto(reserva, self._mapeador)
+            filas_reservas.append(dict(
+                id=reserva_dto.id,
+                fecha_creacion=reserva_dto.fecha_creacion,
+                fecha_actualizacion=reserva_dto.fecha_actualizacion
+            ))
+
+            for itinerario_dto in reserva_dto.itinerarios:
+                fila = {columna: getattr(itinerario_dto, columna) for columna in _COLUMNAS_ITINERARIO}
+                filas_itinerarios.append(fila)
+                filas_relacion.append(dict(reserva_id=reserva_dto.id, **fila))
+
+        try:
+            db.session.execute(insert(ReservaDTO.__table__), filas_reservas)
+            if filas_itinerarios:
+                db.session.execute(insert(ItinerarioDTO.__table__), filas_itinerarios)
+                db.session.execute(insert(reservas_itinerarios), filas_relacion)
+            confirmar()
+        except Exception:
+            deshacer()
+            raise
+
+    def indices_duplicados(self, reservas: list[Reserva]) -> set[int]:
+        """Posiciones de las reservas con itinerarios ya registrados o repetidos por una reserva anterior de la lista
+
+        Igual que en `agregar`, un itinerario existente es información duplicada.
+        """
+        claves_por_reserva = list()
+        for reserva in reservas:
+            reserva_dto = self.fabrica_vuelos.crear_objeto(reserva, self._mapeador)
+            claves_por_reserva.append([
+                tuple(getattr(itinerario_dto, columna) for columna in _COLUMNAS_ITINERARIO)
+                for itinerario_dto in reserva_dto.itinerarios
+            ])
+
+        vistas = self._claves_existentes([clave for claves in claves_por_reserva for clave in claves])
+        duplicados = set()
+        for indice, claves in enumerate(claves_por_reserva):
+            if any(clave in vistas for clave in claves):
+                duplicados.add(indice)
+            else:
+                vistas.update(claves)
+        return duplicados
+
+    def _claves_existentes(self, claves: list[tuple]) -> set[tuple]:
+        columnas = [getattr(ItinerarioDTO, columna) for columna in _COLUMNAS_ITINERARIO]
+        existentes = set()
+        posicion_salida = _COLUMNAS_ITINERARIO.index('fecha_salida')
+        for i in range(0, len(claves), _CLAVES_POR_CONSULTA):
+            grupo = claves[i:i + _CLAVES_POR_CONSULTA]
+            # El filtro por fecha de salida usa ix_itinerarios_fecha_salida; el de tuplas descarta el resto
+            consulta = db.session.query(*columnas)\
+                .filter(ItinerarioDTO.fecha_salida.in_({clave[posicion_salida] for clave in grupo}))\
+                .filter(tuple_(*columnas).in_(grupo))
+            existentes.update(tuple(fila) for fila in consulta)
+        return existentes
 
     def actualizar(self, reserva: Reserva):
         # TODO
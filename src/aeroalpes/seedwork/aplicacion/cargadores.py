@@ -0,0 +1,56 @@
+"""Carga por lotes de agregados (dataloader) reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará un cargador que agrupa las lecturas por id
+de un mismo tipo de agregado: los ids se anotan con `solicitar` y el primer
+`obtener` los carga todos con una sola consulta al repositorio. Registrado
+por petición en el contenedor, cada petición tiene su propia caché.
+
+"""
+
+from typing import Any, Callable, Iterable
+
+class CargadorAgregados:
+    """Agrupa las lecturas por id en lotes y conserva los resultados
+
+    `cargar_lote` recibe una lista de ids (texto) y retorna un diccionario
+    id -> agregado; los ids que no existen simplemente no aparecen.
+    """
+
+    def __init__(self, cargar_lote: Callable[[list[str]], dict], tamano_maximo: int = 500):
+        self._cargar_lote = cargar_lote
+        self.tamano_maximo = tamano_maximo
+        self._cache: dict[str, Any] = dict()
+        self._pendientes: dict[str, None] = dict()
+        self.lotes = 0
+
+    def solicitar(self, ids: Iterable):
+        """Anota ids para cargarlos en el próximo lote"""
+        for id in ids:
+            id = str(id)
+            if id not in self._cache:
+                self._pendientes[id] = None
+
+    def obtener(self, id) -> Any:
+        """Retorna el agregado (None si no existe), cargando junto con él todos los ids solicitados"""
+        id = str(id)
+        if id not in self._cache:
+            self._pendientes[id] = None
+            self._despachar()
+        return self._cache[id]
+
+    def obtener_muchos(self, ids: Iterable) -> list:
+        """Retorna los agregados en el orden de `ids`, con None para los que no existen"""
+        ids = [str(id) for id in ids]
+        self.solicitar(ids)
+        self._despachar()
+        return [self._cache[id] for id in ids]
+
+    def _despachar(self):
+        pendientes = list(self._pendientes)
+        self._pendientes.clear()
+        for i in range(0, len(pendientes), self.tamano_maximo):
+            lote = pendientes[i:i + self.tamano_maximo]
+            encontrados = self._cargar_lote(lote)
+            self.lotes += 1
+            for id in lote:
+                self._cache[id] = encontrados.get(id)
@@ -0,0 +1,86 @@
+"""Contenedor de dependencias reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará un contenedor de inyección de dependencias
+liviano con dos alcances: singletons que viven lo mismo que la aplicación
+(fábricas, mapeadores, servicios sin estado) y recursos por petición
+(sesiones, unidades de trabajo) que se liberan al cerrar el contexto de Flask.
+
+"""
+
+import threading
+from typing import Any, Callable
+
+from flask import Flask, current_app, g, has_app_context
+
+SINGLETON = 'singleton'
+POR_PETICION = 'por_peticion'
+
+class DependenciaNoRegistradaExcepcion(Exception):
+    def __init__(self, clave, mensaje='La dependencia {} no está registrada en el contenedor'):
+        nombre = getattr(clave, '__name__', clave)
+        self.__mensaje = mensaje.format(nombre)
+    def __str__(self):
+        return str(self.__mensaje)
+
+class Contenedor:
+    """Registro de proveedores de dependencias
+
+    Un proveedor es una función que recibe el contenedor y retorna la
+    instancia, de modo que pueda resolver sus propias dependencias.
+    """
+
+    def __init__(self):
+        self._proveedores: dict[Any, tuple[str, Callable, Callable]] = dict()
+        self._singletons: dict[Any, Any] = dict()
+        self._candado = threading.RLock()
+
+    def registrar_singleton(self, clave, proveedor: Callable[['Contenedor'], Any]):
+        self._proveedores[clave] = (SINGLETON, proveedor, None)
+        self._singletons.pop(clave, None)
+
+    def registrar_por_peticion(self, clave, proveedor: Callable[['Contenedor'], Any], liberar: Callable[[Any], None] = None):
+        self._proveedores[clave] = (POR_PETICION, proveedor, liberar)
+
+    def init_app(self, app: Flask):
+        app.extensions['contenedor'] = self
+        app.teardown_appcontext(self.liberar_alcance)
+
+    def resolver(self, clave):
+        registro = self._proveedores.get(clave)
+        if registro is None:
+            raise DependenciaNoRegistradaExcepcion(clave)
+
+        alcance, proveedor, _ = registro
+        if alcance == SINGLETON:
+            return self._resolver_singleton(clave, proveedor)
+
+        # Fuera de un contexto de Flask no hay alcance donde guardar la instancia
+        if not has_app_context():
+            return proveedor(self)
+        instancias = g.setdefault('_contenedor_alcance', dict())
+        if clave not in instancias:
+            instancias[clave] = proveedor(self)
+        return instancias[clave]
+
+    def _resolver_singleton(self, clave, proveedor):
+        try:
+            return self._singletons[clave]
+        except KeyError:
+            pass
+        with self._candado:
+            if clave not in self._singletons:
+                self._singletons[clave] = proveedor(self)
+            return self._singletons[clave]
+
+    def liberar_alcance(self, excepcion=None):
+        instancias = g.pop('_contenedor_alcance', None)
+        if not instancias:
+            return
+        for clave, instancia in instancias.items():
+            _, _, liberar = self._proveedores[clave]
+            if liberar is not None:
+                liberar(instancia)
+
+def resolver(clave):
+    """Resuelve una dependencia con el contenedor de la aplicación actual"""
+    return current_app.extensions['contenedor'].resolver(clave)
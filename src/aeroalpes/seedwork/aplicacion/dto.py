@@ -1,11 +1,17 @@
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from .serializacion import codificar
+from ..trazas import trazar_metodos
 
 @dataclass(frozen=True)
 class DTO():
     ...
 
 class Mapeador(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trazar_metodos(cls, 'mapeador')
+
     @abstractmethod
     def externo_a_dto(self, externo: any) -> DTO:
         ...
@@ -13,4 +19,14 @@ class Mapeador(ABC):
     @abstractmethod
     def dto_a_externo(self, dto: DTO) -> any:
         ...
-    
\ No newline at end of file
+
+    def dto_a_json(self, dto: DTO) -> bytes:
+        """Serializa el DTO (o lista de DTOs) a bytes JSON a partir de `dto_a_externo`
+
+        Los mapeadores cuyo formato externo coincide campo a campo con el DTO
+        pueden sobrescribir este método con `codificar(dto)` para usar el
+        codificador compilado sin construir diccionarios intermedios.
+        """
+        if isinstance(dto, list):
+            return codificar([self.dto_a_externo(elemento) for elemento in dto])
+        return codificar(self.dto_a_externo(dto))
@@ -0,0 +1,106 @@
+"""Serialización JSON compilada para DTOs de la capa de aplicación
+
+En este archivo usted encontrará un generador de codificadores JSON
+especializados: por cada clase DTO (dataclass) se compila, una sola vez,
+una función que escribe el JSON directamente a partir de los atributos,
+sin construir diccionarios intermedios.
+
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, get_origin
+from uuid import UUID
+
+_codificadores: dict[type, Callable[[Any], str]] = dict()
+_compilando: set[type] = set()
+
+def codificar(dto: Any) -> bytes:
+    """Serializa un DTO (o lista de DTOs) a bytes JSON"""
+    return _valor(dto).encode('ascii')
+
+def codificador_para(tipo: type) -> Callable[[Any], str]:
+    """Retorna el codificador compilado para la clase dada, compilándolo si es necesario"""
+    codificador = _codificadores.get(tipo)
+    if codificador is None:
+        codificador = _compilar(tipo)
+        _codificadores[tipo] = codificador
+    return codificador
+
+def _valor(valor: Any) -> str:
+    # Despacho genérico para valores cuyo tipo no se conoce al compilar
+    clase = valor.__class__
+    if clase is str:
+        return encode_basestring_ascii(valor)
+    if clase is list or clase is tuple:
+        return _lista(valor)
+    if is_dataclass(clase):
+        return codificador_para(clase)(valor)
+    if clase is dict:
+        return '{' + ','.join(encode_basestring_ascii(str(k)) + ':' + _valor(v) for k, v in valor.items()) + '}'
+    if valor is None or clase is bool or clase is int or clase is float:
+        return json.dumps(valor)
+    if isinstance(valor, (datetime, date)):
+        return encode_basestring_ascii(valor.isoformat())
+    if isinstance(valor, UUID):
+        return encode_basestring_ascii(str(valor))
+    if isinstance(valor, Enum):
+        return _valor(valor.value)
+    raise TypeError(f"El tipo {clase.__name__} no es serializable a JSON")
+
+def _lista(valores) -> str:
+    return '[' + ','.join([_valor(valor) for valor in valores]) + ']'
+
+def _codificador_anidado(tipo: type) -> Callable[[Any], str]:
+    # Un DTO que se contiene a sí mismo se resuelve de forma diferida
+    if tipo in _compilando:
+        return lambda valor: codificador_para(tipo)(valor)
+    return codificador_para(tipo)
+
+def _expresion(campo, variable: str, espacio: dict) -> str:
+    # Elige el codificador del campo según su anotación de tipo; si el valor
+    # real no coincide con la anotación se usa el despacho genérico
+    if campo.type is str:
+        return f'(_esc({variable}) if {variable}.__class__ is str else _valor({variable}))'
+
+    argumentos = getattr(campo.type, '__args__', ())
+    if get_origin(campo.type) is list and argumentos and is_dataclass(argumentos[0]):
+        elemento = argumentos[0]
+        nombre_tipo = f'_tipo_{campo.name}'
+        espacio[nombre_tipo] = elemento
+        espacio[f'_cod_{campo.name}'] = _codificador_anidado(elemento)
+        return (f"('[' + ','.join([_cod_{campo.name}(x) if x.__class__ is {nombre_tipo} else _valor(x) "
+                f"for x in {variable}]) + ']' if {variable}.__class__ is list else _valor({variable}))")
+
+    if campo.type is list or get_origin(campo.type) is list:
+        return f'_lista({variable})'
+    return f'_valor({variable})'
+
+def _compilar(tipo: type) -> Callable[[Any], str]:
+    if not is_dataclass(tipo):
+        raise TypeError(f"El tipo {tipo.__name__} no es un DTO (dataclass)")
+
+    espacio = dict(_esc=encode_basestring_ascii, _lista=_lista, _valor=_valor)
+    lineas = list()
+    partes = list()
+
+    _compilando.add(tipo)
+    try:
+        for i, campo in enumerate(fields(tipo)):
+            variable = f'v{i}'
+            prefijo = ('{' if i == 0 else ',') + json.dumps(campo.name) + ':'
+            lineas.append(f'    {variable} = dto.{campo.name}\n')
+            partes.append(prefijo.replace('{', '{{') + '{' + _expresion(campo, variable, espacio) + '}')
+    finally:
+        _compilando.discard(tipo)
+
+    # Una sola f-string arma el objeto completo sin concatenaciones intermedias
+    plantilla = ''.join(partes) + '}}' if partes else '{{}}'
+    nombre = f'codificar_{tipo.__name__}'
+    codigo = f'def {nombre}(dto):\n' + ''.join(lineas) + f'    return f"""{plantilla}"""\n'
+
+    exec(compile(codigo, f'<codificador {tipo.__qualname__}>', 'exec'), espacio)
+    return espacio[nombre]
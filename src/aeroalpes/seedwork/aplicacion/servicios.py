@@ -1,2 +1,28 @@
+from typing import Any, Callable
+
+from ..trazas import trazar_metodos
+
 class Servicio:
-    ...
\ No newline at end of file
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trazar_metodos(cls, 'servicio')
+
+    def _persistir_lote(self, elementos: list, persistir: Callable[[list], None]) -> list[tuple[Any, str]]:
+        """Persiste `elementos` con `persistir` en una sola transacción
+
+        Si la transacción falla, el lote se divide en mitades hasta aislar los
+        elementos que la hacen fallar; estos se retornan junto con su error y
+        el resto del lote se persiste normalmente.
+        """
+        if not elementos:
+            return list()
+        try:
+            persistir(elementos)
+            return list()
+        except Exception as e:
+            if len(elementos) == 1:
+                return [(elementos[0], str(e))]
+
+        mitad = len(elementos) // 2
+        return self._persistir_lote(elementos[:mitad], persistir) + self._persistir_lote(elementos[mitad:], persistir)
@@ -30,7 +30,8 @@ class Entidad:
     def id(self, id: uuid.UUID) -> None:
         if not IdEntidadEsInmutable(self).es_valido():
             raise IdDebeSerInmutableExcepcion()
-        self._id = self.siguiente_id()
+        # Un UUID explícito reconstituye una entidad existente; si no, se genera uno nuevo
+        self._id = id if isinstance(id, uuid.UUID) else self.siguiente_id()
         
 
 @dataclass
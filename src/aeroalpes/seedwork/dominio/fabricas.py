@@ -8,8 +8,13 @@ objetos complejos reusables parte del seedwork del proyecto
 from abc import ABC, abstractmethod
 from .repositorios import Mapeador
 from .mixins import ValidarReglasMixin
+from ..trazas import trazar_metodos
 
 class Fabrica(ABC, ValidarReglasMixin):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trazar_metodos(cls, 'fabrica')
+
     @abstractmethod
     def crear_objeto(self, obj: any, mapeador: Mapeador=None) -> any:
         ...
\ No newline at end of file
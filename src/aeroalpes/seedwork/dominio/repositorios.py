@@ -8,8 +8,13 @@ reusables parte del seedwork del proyecto
 from abc import ABC, abstractmethod
 from uuid import UUID
 from .entidades import Entidad
+from ..trazas import trazar_metodos
 
 class Repositorio(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trazar_metodos(cls, 'repositorio')
+
     @abstractmethod
     def obtener_por_id(self, id: UUID) -> Entidad:
         ...
@@ -32,6 +37,10 @@ class Repositorio(ABC):
 
 
 class Mapeador(ABC):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trazar_metodos(cls, 'mapeador')
+
     @abstractmethod
     def obtener_tipo(self) -> type:
         ...
@@ -0,0 +1,170 @@
+"""Filtro de Bloom reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará:
+
+- `FiltroBloomContador`: filtro de Bloom con contadores, que responde si un
+  valor con certeza no está en el conjunto o si puede estar (con una tasa de
+  falsos positivos configurable). A diferencia de un filtro de Bloom simple,
+  admite quitar valores
+- `FiltroReconstruible`: un filtro que se construye con un recorrido del
+  conjunto y se puede reconstruir en línea, sin dejar de responder
+
+El filtro nunca da falsos negativos mientras se le agreguen los valores
+confirmados y solo se le quiten los que ya no existen: agregar de más o no
+quitar solo produce falsos positivos.
+
+"""
+
+import contextlib
+import hashlib
+import math
+import threading
+from typing import Callable, ContextManager, Iterable
+
+# Un contador saturado ya no se decrementa (solo puede producir falsos positivos)
+_SATURADO = 255
+
+class FiltroBloomContador:
+    """Filtro de Bloom de `capacidad` valores con tasa de `falsos_positivos` esperada en esa capacidad
+
+    Usa un contador de un byte por posición: ocupa 8 veces lo que un filtro
+    de Bloom simple de la misma tasa.
+    """
+
+    def __init__(self, capacidad: int, falsos_positivos: float = 0.01):
+        if capacidad < 1:
+            raise ValueError(f"La capacidad del filtro debe ser positiva: {capacidad}")
+        if not 0 < falsos_positivos < 1:
+            raise ValueError(f"La tasa de falsos positivos debe estar entre 0 y 1: {falsos_positivos}")
+        self.capacidad = capacidad
+        self.falsos_positivos = falsos_positivos
+        self.tamano = max(8, math.ceil(-capacidad * math.log(falsos_positivos) / math.log(2) ** 2))
+        self.funciones = max(1, round(self.tamano / capacidad * math.log(2)))
+        self.elementos = 0
+        self._contadores = bytearray(self.tamano)
+        self._candado = threading.Lock()
+
+    def agregar(self, valor: str):
+        posiciones = self._posiciones(valor)
+        with self._candado:
+            for posicion in posiciones:
+                if self._contadores[posicion] < _SATURADO:
+                    self._contadores[posicion] += 1
+            self.elementos += 1
+
+    def quitar(self, valor: str):
+        """Quita un valor agregado antes (quitar uno que no se agregó puede producir falsos negativos)"""
+        posiciones = self._posiciones(valor)
+        with self._candado:
+            for posicion in posiciones:
+                if 0 < self._contadores[posicion] < _SATURADO:
+                    self._contadores[posicion] -= 1
+            self.elementos = max(0, self.elementos - 1)
+
+    def __contains__(self, valor: str) -> bool:
+        """False si el valor con certeza no está; True si puede estar"""
+        contadores = self._contadores
+        return all(contadores[posicion] for posicion in self._posiciones(valor))
+
+    def tasa_estimada(self) -> float:
+        """Tasa de falsos positivos esperada con los elementos actuales"""
+        return (1 - math.exp(-self.funciones * self.elementos / self.tamano)) ** self.funciones
+
+    def _posiciones(self, valor: str) -> list[int]:
+        # Doble hashing: las k posiciones salen de dos hashes de 64 bits de un solo digest
+        digest = hashlib.blake2b(valor.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.tamano for i in range(self.funciones)]
+
+class FiltroReconstruible:
+    """Filtro de un conjunto que se construye recorriéndolo con `leer` y se reconstruye en línea
+
+    `contar` da el tamaño del conjunto, que junto con `capacidad_minima` fija
+    la capacidad del filtro (el doble de los valores actuales, para que
+    crezca sin reconstruirse enseguida). Al superar la capacidad, el filtro se
+    reconstruye en un hilo, dentro de `contexto` (opcional). `normalizar` se
+    aplica a cada valor antes de agregarlo o consultarlo.
+    """
+
+    def __init__(self, contar: Callable[[], int], leer: Callable[[], Iterable[str]], falsos_positivos: float = 0.01,
+                 capacidad_minima: int = 10000, normalizar: Callable[[str], str] = str,
+                 contexto: Callable[[], ContextManager] = None):
+        self.contar = contar
+        self.leer = leer
+        self.falsos_positivos = falsos_positivos
+        self.capacidad_minima = capacidad_minima
+        self.normalizar = normalizar
+        self.contexto = contexto or contextlib.nullcontext
+        self.consultas = 0
+        self.descartes = 0
+        self.reconstrucciones = 0
+        self.filtro: FiltroBloomContador = None
+        self._pendientes: list[str] = None
+        self._candado = threading.Lock()
+
+    def puede_contener(self, valor: str) -> bool:
+        """False si el valor con certeza no está en el conjunto (True si aún no se construye el filtro)"""
+        filtro = self.filtro
+        if filtro is None:
+            return True
+        self.consultas += 1
+        if self.normalizar(valor) in filtro:
+            return True
+        self.descartes += 1
+        return False
+
+    def agregar(self, valor: str):
+        valor = self.normalizar(valor)
+        with self._candado:
+            if self.filtro is not None:
+                self.filtro.agregar(valor)
+            # Durante una reconstrucción se repite en el filtro nuevo, que quizás ya no lo lea
+            if self._pendientes is not None:
+                self._pendientes.append(valor)
+            excedido = self.filtro is not None and self.filtro.elementos > self.filtro.capacidad
+        if excedido:
+            self.reconstruir_en_segundo_plano()
+
+    def quitar(self, valor: str):
+        # Durante una reconstrucción no se repite: el filtro nuevo quizás no lo leyó y quitarlo daría falsos negativos
+        with self._candado:
+            if self.filtro is not None:
+                self.filtro.quitar(self.normalizar(valor))
+
+    def reconstruir(self) -> bool:
+        """Construye un filtro nuevo recorriendo el conjunto y lo reemplaza (False si ya hay una reconstrucción en curso)"""
+        with self._candado:
+            if self._pendientes is not None:
+                return False
+            self._pendientes = list()
+        try:
+            nuevo = FiltroBloomContador(max(self.capacidad_minima, 2 * self.contar()), self.falsos_positivos)
+            for valor in self.leer():
+                nuevo.agregar(self.normalizar(valor))
+            with self._candado:
+                for valor in self._pendientes:
+                    nuevo.agregar(valor)
+                self.filtro = nuevo
+                self.reconstrucciones += 1
+            return True
+        finally:
+            with self._candado:
+                self._pendientes = None
+
+    def reconstruir_en_segundo_plano(self) -> threading.Thread:
+        def reconstruir():
+            with self.contexto():
+                self.reconstruir()
+
+        hilo = threading.Thread(target=reconstruir, name='filtro-reconstruccion', daemon=True)
+        hilo.start()
+        return hilo
+
+    def estadisticas(self) -> dict:
+        filtro = self.filtro
+        return dict(
+            elementos=filtro.elementos if filtro else 0, capacidad=filtro.capacidad if filtro else 0,
+            bytes=filtro.tamano if filtro else 0, tasa_estimada=filtro.tasa_estimada() if filtro else 0.0,
+            consultas=self.consultas, descartes=self.descartes, reconstrucciones=self.reconstrucciones,
+        )
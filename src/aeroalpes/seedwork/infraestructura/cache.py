@@ -0,0 +1,229 @@
+"""Cache de agregados reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará:
+
+- `CacheLRU`: cache del proceso con vencimiento (TTL), acotado por cantidad
+  de entradas o por bytes, con contadores de aciertos, fallos y desalojos
+- `MapaIdentidad`: mapa de identidad de una petición, donde cada agregado
+  leído es la misma instancia durante toda la petición
+- `RepositorioCacheado`: decorador de un repositorio que lee por id (y por
+  llaves como el email) desde el mapa de identidad y el cache antes que
+  desde la base de datos, e invalida en `actualizar` y `eliminar`
+
+"""
+
+import functools
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from .uow import unidad_de_trabajo_actual
+
+class CacheLRU:
+    """Cache con desalojo del elemento usado hace más tiempo (LRU) y vencimiento por TTL
+
+    `max_entradas` y `max_bytes` (opcionales) acotan el tamaño; el tamaño de
+    cada valor lo calcula `medir`.
+    """
+
+    def __init__(self, max_entradas: int = None, max_bytes: int = None, ttl: float = 60.0,
+                 medir: Callable[[Any], int] = sys.getsizeof):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.medir = medir
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.vencidos = 0
+        self.invalidaciones = 0
+        self.bytes = 0
+        self._entradas: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, clave: Hashable) -> Any:
+        """Valor guardado en `clave` (None si no está o ya venció)"""
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            vence, valor, _ = entrada
+            if vence <= time.monotonic():
+                self._quitar(clave)
+                self.vencidos += 1
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any):
+        tamano = self.medir(valor)
+        with self._candado:
+            if clave in self._entradas:
+                self._quitar(clave)
+            # Un valor que no cabe en el cache vacío no se guarda
+            if self.max_bytes is not None and tamano > self.max_bytes:
+                return
+            self._entradas[clave] = (time.monotonic() + self.ttl, valor, tamano)
+            self.bytes += tamano
+            while self._excedido():
+                self._quitar(next(iter(self._entradas)))
+                self.desalojos += 1
+
+    def invalidar(self, clave: Hashable):
+        with self._candado:
+            if clave in self._entradas:
+                self._quitar(clave)
+                self.invalidaciones += 1
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estadisticas(self) -> dict:
+        with self._candado:
+            return dict(
+                entradas=len(self._entradas), bytes=self.bytes, aciertos=self.aciertos, fallos=self.fallos,
+                desalojos=self.desalojos, vencidos=self.vencidos, invalidaciones=self.invalidaciones,
+            )
+
+    def _excedido(self) -> bool:
+        return (self.max_entradas is not None and len(self._entradas) > self.max_entradas) \
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+
+    def _quitar(self, clave: Hashable):
+        _, _, tamano = self._entradas.pop(clave)
+        self.bytes -= tamano
+
+class MapaIdentidad(dict):
+    """Agregados leídos durante una petición, por clave"""
+
+class RepositorioCacheado:
+    """Decorador de un repositorio con mapa de identidad por petición y cache del proceso
+
+    El cache guarda los agregados serializados: cada petición recibe su propia
+    copia y la modifica sin afectar a las demás. `llaves` asocia otros métodos
+    de lectura (por ejemplo `obtener_por_email`) con la función que obtiene
+    su llave de un agregado; el cache guarda para ellos solo el id. Con
+    `version`, un agregado del cache se compara con la versión del
+    repositorio (`obtener_version`, que nunca se cachea y se consulta una vez
+    por petición) y se descarta si no coincide. Los demás métodos se delegan
+    al repositorio sin cache.
+    """
+
+    def __init__(self, repositorio, cache: CacheLRU, tipo: str, mapa_identidad: Callable[[], MapaIdentidad] = None,
+                 llaves: dict[str, Callable[[Any], Hashable]] = None, version: Callable[[Any], Any] = None):
+        self.repositorio = repositorio
+        self.cache = cache
+        self.tipo = tipo
+        self.llaves = dict(llaves or dict())
+        self.version = version
+        self._mapa_identidad = mapa_identidad or MapaIdentidad
+
+    def __getattr__(self, nombre: str):
+        if nombre in self.llaves:
+            return functools.partial(self._obtener_por_llave, nombre)
+        return getattr(self.repositorio, nombre)
+
+    def obtener_por_id(self, id):
+        clave = (self.tipo, str(id))
+        mapa = self._mapa_identidad()
+        if clave in mapa:
+            return mapa[clave]
+
+        entidad = self._leer_cache(clave, id, mapa, consultar_version=True)
+        if entidad is None:
+            entidad = self.repositorio.obtener_por_id(id)
+            self.cache.guardar(clave, pickle.dumps(entidad))
+        mapa[clave] = entidad
+        return entidad
+
+    def obtener_por_ids(self, ids: list) -> dict:
+        """Como `obtener_por_ids` del repositorio, que lee en un lote los ids que no están en el mapa ni en el cache
+
+        Con `version`, del cache solo se toman los agregados cuya versión ya se
+        consultó en la petición: validar los demás costaría una consulta por id.
+        """
+        mapa = self._mapa_identidad()
+        encontrados, faltantes = dict(), list()
+        for id in ids:
+            clave = (self.tipo, str(id))
+            entidad = mapa[clave] if clave in mapa else self._leer_cache(clave, id, mapa, consultar_version=False)
+            if entidad is None:
+                faltantes.append(id)
+            else:
+                encontrados[str(id)] = mapa.setdefault(clave, entidad)
+        if faltantes:
+            for id, entidad in self.repositorio.obtener_por_ids(faltantes).items():
+                clave = (self.tipo, str(id))
+                self.cache.guardar(clave, pickle.dumps(entidad))
+                encontrados[str(id)] = mapa.setdefault(clave, entidad)
+        return encontrados
+
+    def _leer_cache(self, clave, id, mapa: MapaIdentidad, consultar_version: bool):
+        serializado = self.cache.obtener(clave)
+        entidad = pickle.loads(serializado) if serializado is not None else None
+        if entidad is not None and self.version is not None:
+            if ('version', clave) in mapa:
+                version = mapa[('version', clave)]
+            elif consultar_version:
+                version = self.obtener_version(id)
+            else:
+                return None
+            # Otro proceso modificó el agregado después de guardarlo en este cache
+            if self.version(entidad) != version:
+                entidad = None
+        return entidad
+
+    def obtener_version(self, id):
+        version = self.repositorio.obtener_version(id)
+        self._mapa_identidad()[('version', (self.tipo, str(id)))] = version
+        return version
+
+    def _obtener_por_llave(self, metodo: str, valor: Hashable):
+        clave = (self.tipo, metodo, valor)
+        id = self.cache.obtener(clave)
+        if id is not None:
+            try:
+                entidad = self.obtener_por_id(id)
+            except Exception:
+                # El agregado fue eliminado: se busca de nuevo por la llave
+                entidad = None
+            # La llave pudo cambiar desde que se guardó (por ejemplo, un email actualizado)
+            if entidad is not None and self.llaves[metodo](entidad) == valor:
+                return entidad
+
+        entidad = getattr(self.repositorio, metodo)(valor)
+        clave_id = (self.tipo, str(entidad.id))
+        mapa = self._mapa_identidad()
+        entidad = mapa.setdefault(clave_id, entidad)
+        self.cache.guardar(clave_id, pickle.dumps(entidad))
+        self.cache.guardar(clave, str(entidad.id))
+        return entidad
+
+    def actualizar(self, entidad):
+        try:
+            return self.repositorio.actualizar(entidad)
+        finally:
+            self._invalidar(entidad.id)
+
+    def eliminar(self, id):
+        try:
+            return self.repositorio.eliminar(id)
+        finally:
+            self._invalidar(id)
+
+    def _invalidar(self, id):
+        clave = (self.tipo, str(id))
+        self._mapa_identidad().pop(clave, None)
+        self.cache.invalidar(clave)
+        # Dentro de una unidad de trabajo, otra petición puede volver a leer el valor anterior antes del commit
+        unidad = unidad_de_trabajo_actual()
+        if unidad is not None:
+            unidad.al_confirmar(lambda: self.cache.invalidar(clave))
@@ -0,0 +1,52 @@
+"""Planes de carga de relaciones reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará los planes de carga con los que cada
+método de un repositorio declara cómo se leen las relaciones de su modelo:
+
+- `selectin`: una consulta adicional `IN` por relación para todas las filas leídas
+- `joined`: la relación se lee en la misma consulta con un `LEFT OUTER JOIN`
+  (con `LIMIT`, la página se une en una subconsulta y se vuelve a ordenar)
+- `noload`: la relación no se lee (queda vacía)
+
+Sin un plan, SQLAlchemy carga cada relación al accederla (una consulta por
+fila al mapear una lista de agregados, el problema N+1).
+
+"""
+
+from sqlalchemy.orm import joinedload, noload, selectinload
+
+SELECTIN = 'selectin'
+JOINED = 'joined'
+NOLOAD = 'noload'
+
+ESTRATEGIAS = {SELECTIN: selectinload, JOINED: joinedload, NOLOAD: noload}
+
+class PlanesCarga:
+    """Planes de carga (relación -> estrategia) de los métodos de un repositorio
+
+    `planes` declara el plan de cada método; `reemplazos` cambia la estrategia
+    de relaciones puntuales de un método. Los métodos de `por_lotes` recorren
+    los resultados con `yield_per`, que no admite `joined` en colecciones.
+    """
+
+    def __init__(self, modelo, planes: dict[str, dict[str, str]], reemplazos: dict[str, dict[str, str]] = None,
+                 por_lotes: frozenset[str] = frozenset()):
+        self.modelo = modelo
+        self.planes = {metodo: dict(plan) for metodo, plan in planes.items()}
+        for metodo, plan in (reemplazos or dict()).items():
+            if metodo not in self.planes:
+                raise ValueError(f"El método {metodo} no declara un plan de carga")
+            self.planes[metodo].update(plan)
+
+        for metodo, plan in self.planes.items():
+            for relacion, estrategia in plan.items():
+                if estrategia not in ESTRATEGIAS:
+                    raise ValueError(f"Estrategia de carga desconocida: {estrategia} (opciones: {', '.join(ESTRATEGIAS)})")
+                if not hasattr(modelo, relacion):
+                    raise ValueError(f"{modelo.__name__} no tiene la relación {relacion}")
+                if estrategia == JOINED and metodo in por_lotes:
+                    raise ValueError(f"El método {metodo} lee por lotes y no admite la estrategia {JOINED}")
+
+    def opciones(self, metodo: str) -> list:
+        """Opciones de carga de SQLAlchemy para las consultas de `metodo`"""
+        return [ESTRATEGIAS[estrategia](getattr(self.modelo, relacion)) for relacion, estrategia in self.planes[metodo].items()]
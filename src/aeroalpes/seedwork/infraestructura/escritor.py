@@ -0,0 +1,134 @@
+"""Escritor agrupado reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará un escritor que atiende en un solo hilo las
+escrituras de muchos hilos. Cada hilo encola su operación y espera su
+resultado (un `Future`); el hilo escritor toma las operaciones que llegan en
+unos milisegundos (o hasta `max_operaciones`) y las ejecuta en una sola
+unidad de trabajo, cada una en su propio savepoint, con un solo commit
+(group commit). Con SQLite solo hay un escritor a la vez: en lugar de
+competir por el bloqueo, las escrituras concurrentes comparten transacción.
+
+"""
+
+import contextlib
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, ContextManager
+
+from .uow import UnidadDeTrabajo
+
+_FIN = object()
+
+class EscritorAgrupado:
+    """Ejecuta en un hilo propio las operaciones encoladas, agrupadas en transacciones
+
+    `abrir_unidad` crea la unidad de trabajo de cada grupo y `contexto` (opcional)
+    el contexto en que se ejecuta (por ejemplo, el de la aplicación de Flask).
+    Si una operación falla, solo se descarta su savepoint y su `Future` recibe
+    la excepción; si falla el commit, la reciben todas las operaciones del grupo.
+    """
+
+    def __init__(self, abrir_unidad: Callable[[], UnidadDeTrabajo], contexto: Callable[[], ContextManager] = None,
+                 max_operaciones: int = 64, espera: float = 0.002):
+        self.abrir_unidad = abrir_unidad
+        self.contexto = contexto or contextlib.nullcontext
+        self.max_operaciones = max_operaciones
+        self.espera = espera
+        self.lotes = 0
+        self.operaciones = 0
+        self.fallidas = 0
+        self.max_lote = 0
+        self._candado = threading.Lock()
+        self._cola: queue.SimpleQueue = None
+        self._hilo: threading.Thread = None
+        self._pid = None
+
+    def enviar(self, operacion: Callable[[], Any]) -> Future:
+        """Encola `operacion` y retorna el `Future` de su resultado"""
+        futuro = Future()
+        self._iniciar()
+        self._cola.put((futuro, operacion))
+        return futuro
+
+    def ejecutar(self, operacion: Callable[[], Any]) -> Any:
+        """Encola `operacion` y espera su resultado (o su excepción)"""
+        return self.enviar(operacion).result()
+
+    def detener(self, espera: float = None):
+        with self._candado:
+            hilo, self._hilo = self._hilo, None
+            if hilo is not None and self._pid == os.getpid():
+                self._cola.put(_FIN)
+        if hilo is not None:
+            hilo.join(espera)
+
+    def estadisticas(self) -> dict:
+        return dict(
+            lotes=self.lotes, operaciones=self.operaciones, fallidas=self.fallidas, max_lote=self.max_lote,
+            operaciones_por_lote=self.operaciones / self.lotes if self.lotes else 0.0,
+        )
+
+    def _iniciar(self):
+        # El hilo se crea con la primera operación del proceso (un hilo no sobrevive a un fork)
+        if self._hilo is not None and self._pid == os.getpid():
+            return
+        with self._candado:
+            if self._hilo is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._cola = queue.SimpleQueue()
+                self._hilo = threading.Thread(target=self._trabajar, args=(self._cola,), name='escritor-agrupado', daemon=True)
+                self._hilo.start()
+
+    def _trabajar(self, cola: queue.SimpleQueue):
+        while True:
+            primera = cola.get()
+            if primera is _FIN:
+                return
+
+            # El grupo se cierra al completar max_operaciones o al vencer la espera desde la primera
+            lote = [primera]
+            limite = time.monotonic() + self.espera
+            fin = False
+            while len(lote) < self.max_operaciones:
+                try:
+                    siguiente = cola.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    break
+                if siguiente is _FIN:
+                    fin = True
+                    break
+                lote.append(siguiente)
+
+            self._ejecutar_lote(lote)
+            if fin:
+                return
+
+    def _ejecutar_lote(self, lote: list[tuple[Future, Callable[[], Any]]]):
+        exitosas = list()
+        try:
+            with self.contexto(), self.abrir_unidad() as unidad:
+                for futuro, operacion in lote:
+                    if not futuro.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with unidad.savepoint():
+                            exitosas.append((futuro, unidad.registrar(operacion)))
+                    except BaseException as e:
+                        self.fallidas += 1
+                        futuro.set_exception(e)
+        except BaseException as e:
+            # El commit (o la apertura de la unidad) falló: ninguna operación del grupo quedó confirmada
+            for futuro, _ in lote:
+                if not futuro.done():
+                    self.fallidas += 1
+                    futuro.set_exception(e)
+        else:
+            for futuro, resultado in exitosas:
+                futuro.set_result(resultado)
+        finally:
+            self.lotes += 1
+            self.operaciones += len(lote)
+            self.max_lote = max(self.max_lote, len(lote))
@@ -0,0 +1,107 @@
+"""Revisión de planes de consulta reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará una guardia que captura las sentencias
+SQL que se ejecutan sobre un engine de SQLite, obtiene su plan con
+`EXPLAIN QUERY PLAN` y señala las que recorren una tabla completa, ordenan
+con un B-tree temporal o construyen un índice automático (señal de que
+falta un índice).
+
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Recorrido completo de la tabla: "SCAN t" sin "USING ... INDEX" (sí se permite recorrer un índice)
+_RECORRIDO_COMPLETO = re.compile(r'^SCAN (TABLE )?(?!CONSTANT ROW)\S+( AS \S+)?$')
+_PROBLEMAS = (
+    (_RECORRIDO_COMPLETO, 'recorrido completo de la tabla'),
+    (re.compile(r'USE TEMP B-TREE'), 'B-tree temporal'),
+    (re.compile(r'AUTOMATIC'), 'índice automático'),
+)
+_REVISABLES = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+class PlanConsultaExcepcion(Exception):
+    def __init__(self, hallazgo: 'Hallazgo', mensaje='Plan de consulta con {}: {} en {}'):
+        self.hallazgo = hallazgo
+        self.__mensaje = mensaje.format(hallazgo.problema, hallazgo.detalle, hallazgo.sentencia)
+    def __str__(self):
+        return str(self.__mensaje)
+
+@dataclass(frozen=True)
+class Hallazgo:
+    sentencia: str
+    detalle: str
+    problema: str
+
+def revisar_plan(detalles: list[str]) -> list[tuple[str, str]]:
+    """Retorna (detalle, problema) por cada paso del plan que recorre, ordena o indexa de más"""
+    problemas = list()
+    for detalle in detalles:
+        for patron, problema in _PROBLEMAS:
+            if patron.search(detalle):
+                problemas.append((detalle, problema))
+    return problemas
+
+class GuardiaPlanes:
+    """Revisa el plan de cada sentencia distinta que se ejecuta sobre los engines instalados
+
+    Con `fallar`, la sentencia no se ejecuta y se lanza `PlanConsultaExcepcion`.
+    `al_encontrar` recibe cada hallazgo nuevo (por ejemplo, para registrarlo).
+    `permitidos` son expresiones regulares de sentencias que se aceptan aunque
+    su plan recorra la tabla (por ejemplo, tablas de una sola fila).
+    """
+
+    def __init__(self, fallar: bool = False, al_encontrar: Callable[[Hallazgo], None] = None,
+                 permitidos: tuple[str, ...] = ()):
+        self.fallar = fallar
+        self.al_encontrar = al_encontrar
+        self.permitidos = tuple(re.compile(permitido) for permitido in permitidos)
+        self.hallazgos: list[Hallazgo] = list()
+        self.revisadas: dict[str, list[Hallazgo]] = dict()
+        self._candado = threading.Lock()
+
+    def instalar(self, engine: Engine):
+        if engine.dialect.name == 'sqlite' and not event.contains(engine, 'before_cursor_execute', self._revisar):
+            event.listen(engine, 'before_cursor_execute', self._revisar)
+
+    def retirar(self, engine: Engine):
+        if event.contains(engine, 'before_cursor_execute', self._revisar):
+            event.remove(engine, 'before_cursor_execute', self._revisar)
+
+    def reporte(self) -> str:
+        return '\n'.join(f'{h.problema}: {h.detalle}\n    {" ".join(h.sentencia.split())}' for h in self.hallazgos)
+
+    def _revisar(self, conexion, cursor, sentencia: str, parametros, contexto, executemany: bool):
+        if not sentencia.lstrip().upper().startswith(_REVISABLES) or sentencia in self.revisadas:
+            hallazgos = self.revisadas.get(sentencia)
+        else:
+            hallazgos = self._explicar(cursor, sentencia, parametros[0] if executemany else parametros)
+
+        if hallazgos and self.fallar:
+            raise PlanConsultaExcepcion(hallazgos[0])
+
+    def _explicar(self, cursor, sentencia: str, parametros) -> list[Hallazgo]:
+        hallazgos = list()
+        if not any(permitido.search(sentencia) for permitido in self.permitidos):
+            # Un cursor propio sobre la misma conexión DBAPI: la sentencia original no se altera
+            explicacion = cursor.connection.cursor()
+            try:
+                detalles = [fila[-1] for fila in explicacion.execute(f'EXPLAIN QUERY PLAN {sentencia}', parametros or ())]
+            finally:
+                explicacion.close()
+            hallazgos = [Hallazgo(sentencia, detalle, problema) for detalle, problema in revisar_plan(detalles)]
+
+        with self._candado:
+            nueva = sentencia not in self.revisadas
+            if nueva:
+                self.revisadas[sentencia] = hallazgos
+                self.hallazgos.extend(hallazgos)
+        if nueva and self.al_encontrar is not None:
+            for hallazgo in hallazgos:
+                self.al_encontrar(hallazgo)
+        return hallazgos
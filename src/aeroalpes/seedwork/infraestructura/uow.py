@@ -0,0 +1,95 @@
+"""Unidad de trabajo reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará la interfaz de la unidad de trabajo con la
+que un caso de uso agrupa los cambios de varios repositorios en una sola
+transacción. Mientras una unidad está abierta, los repositorios registran
+sus cambios en ella en lugar de confirmarlos cada uno; la unidad los escribe
+y confirma una sola vez al cerrarse sin errores, o los descarta todos.
+
+"""
+
+import contextlib
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Callable
+
+_unidad_actual: ContextVar['UnidadDeTrabajo'] = ContextVar('unidad_de_trabajo', default=None)
+
+def unidad_de_trabajo_actual() -> 'UnidadDeTrabajo':
+    """Unidad de trabajo abierta en el contexto actual (None si no hay)"""
+    return _unidad_actual.get()
+
+class UnidadDeTrabajo(ABC):
+    """Transacción de un caso de uso: `with unidad: ...` confirma al salir o descarta ante una excepción
+
+    Una unidad abierta dentro de otra se une a la exterior: sus cambios se
+    confirman o descartan con los de ella.
+    """
+
+    # Con True cada operación se escribe (sin confirmar) al terminar, y sus errores le llegan a ella
+    flush_por_operacion = False
+
+    def __init__(self):
+        self.operaciones = 0
+        self._token = None
+        self._exterior: UnidadDeTrabajo = None
+        self._al_confirmar: list[Callable[[], None]] = list()
+
+    def __enter__(self) -> 'UnidadDeTrabajo':
+        self._exterior = unidad_de_trabajo_actual()
+        if self._exterior is None:
+            self._abrir()
+            self._token = _unidad_actual.set(self)
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if self._exterior is not None:
+            return False
+        confirmada = False
+        try:
+            if tipo is None:
+                self.commit()
+                confirmada = True
+            else:
+                self.rollback()
+        finally:
+            _unidad_actual.reset(self._token)
+            self._token = None
+            self._cerrar()
+            pendientes, self._al_confirmar = self._al_confirmar, list()
+        if confirmada:
+            for funcion in pendientes:
+                funcion()
+        return False
+
+    def registrar(self, operacion: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ejecuta una operación de un repositorio (por ejemplo `repositorio.agregar`) como parte de la unidad"""
+        if unidad_de_trabajo_actual() is None:
+            raise RuntimeError("La unidad de trabajo no está abierta")
+        self.operaciones += 1
+        return operacion(*args, **kwargs)
+
+    def al_confirmar(self, funcion: Callable[[], None]):
+        """Ejecuta `funcion` después de que la unidad confirme sus cambios (no se ejecuta si los descarta)"""
+        (self._exterior or self)._al_confirmar.append(funcion)
+
+    @abstractmethod
+    def commit(self):
+        """Escribe los cambios registrados y los confirma en una sola transacción"""
+        ...
+
+    @abstractmethod
+    def rollback(self):
+        """Descarta todos los cambios registrados"""
+        ...
+
+    @abstractmethod
+    def savepoint(self) -> contextlib.AbstractContextManager:
+        """Bloque cuyos cambios se descartan solos si termina con una excepción, sin afectar al resto de la unidad"""
+        ...
+
+    def _abrir(self):
+        ...
+
+    def _cerrar(self):
+        ...
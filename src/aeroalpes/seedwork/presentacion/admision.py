@@ -0,0 +1,160 @@
+"""Control de admisión adaptativo reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará una extensión de Flask que limita la
+cantidad de peticiones en curso. El límite se ajusta con la latencia
+observada (AIMD: aumento aditivo mientras la latencia está por debajo del
+objetivo y disminución multiplicativa cuando la supera) y el exceso de carga
+se rechaza de inmediato con 503 y Retry-After en lugar de encolarse detrás
+de las escrituras en SQLite. Las lecturas tienen prioridad: las escrituras
+solo pueden ocupar una parte del límite.
+
+"""
+
+import json
+import threading
+import time
+
+from flask import Flask, Response, current_app, g, request
+
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+
+class LimitadorAdaptativo:
+    """Límite de peticiones en curso que se ajusta con la latencia observada
+
+    Cada respuesta más rápida que `latencia_objetivo` suma `1 / limite` al
+    límite (aproximadamente +1 por cada ventana de `limite` respuestas) y una
+    respuesta más lenta lo multiplica por `factor_disminucion`, a lo sumo una
+    vez por ventana de `latencia_objetivo`.
+    """
+
+    def __init__(self, limite_inicial: int = 20, limite_minimo: int = 2, limite_maximo: int = 200,
+                 latencia_objetivo: float = 0.25, factor_disminucion: float = 0.9,
+                 reserva_lecturas: float = 0.2, reloj=time.monotonic):
+        self.limite_minimo = limite_minimo
+        self.limite_maximo = limite_maximo
+        self.latencia_objetivo = latencia_objetivo
+        self.factor_disminucion = factor_disminucion
+        self.reserva_lecturas = reserva_lecturas
+        self.limite = float(limite_inicial)
+        self.en_curso = 0
+        self.admitidas = 0
+        self.rechazadas = dict(lecturas=0, escrituras=0)
+        self._reloj = reloj
+        self._ultima_disminucion = float('-inf')
+        self._candado = threading.Lock()
+
+    def capacidad(self, es_escritura: bool) -> int:
+        """Peticiones en curso a partir de las cuales se rechaza una lectura o una escritura"""
+        limite = int(self.limite)
+        if es_escritura:
+            return max(1, int(limite * (1 - self.reserva_lecturas)))
+        return limite
+
+    def intentar_admitir(self, es_escritura: bool) -> bool:
+        with self._candado:
+            if self.en_curso >= self.capacidad(es_escritura):
+                self.rechazadas['escrituras' if es_escritura else 'lecturas'] += 1
+                return False
+            self.en_curso += 1
+            self.admitidas += 1
+            return True
+
+    def liberar(self, latencia: float):
+        with self._candado:
+            en_curso = self.en_curso
+            self.en_curso -= 1
+
+            if latencia > self.latencia_objetivo:
+                ahora = self._reloj()
+                # Una ráfaga de respuestas lentas cuenta como una sola señal de congestión
+                if ahora - self._ultima_disminucion >= self.latencia_objetivo:
+                    self.limite = max(self.limite_minimo, self.limite * self.factor_disminucion)
+                    self._ultima_disminucion = ahora
+            elif en_curso >= self.limite / 2:
+                # Solo crece cuando el límite actual se está usando
+                self.limite = min(self.limite_maximo, self.limite + 1 / self.limite)
+
+    def estadisticas(self) -> dict:
+        with self._candado:
+            return dict(
+                limite=self.limite,
+                en_curso=self.en_curso,
+                admitidas=self.admitidas,
+                rechazadas_lecturas=self.rechazadas['lecturas'],
+                rechazadas_escrituras=self.rechazadas['escrituras'],
+            )
+
+class ControlAdmision:
+    """Extensión de Flask que admite o rechaza cada petición en un `before_request`
+
+    Configuración:
+        ADMISION_HABILITADA: activa el control de admisión (True)
+        ADMISION_LIMITE_INICIAL: peticiones en curso permitidas al arrancar (20)
+        ADMISION_LIMITE_MINIMO / ADMISION_LIMITE_MAXIMO: cotas del límite (2 / 200)
+        ADMISION_LATENCIA_OBJETIVO: latencia en segundos por encima de la cual el límite baja (0.25)
+        ADMISION_RESERVA_LECTURAS: fracción del límite que las escrituras no pueden ocupar (0.2)
+        ADMISION_REINTENTAR_EN: segundos sugeridos en Retry-After (1)
+        ADMISION_EXENTAS: rutas que nunca se rechazan (/health y /metrics)
+    """
+
+    def __init__(self, app: Flask = None):
+        self.limitador: LimitadorAdaptativo = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.config.setdefault('ADMISION_HABILITADA', True)
+        app.config.setdefault('ADMISION_LIMITE_INICIAL', 20)
+        app.config.setdefault('ADMISION_LIMITE_MINIMO', 2)
+        app.config.setdefault('ADMISION_LIMITE_MAXIMO', 200)
+        app.config.setdefault('ADMISION_LATENCIA_OBJETIVO', 0.25)
+        app.config.setdefault('ADMISION_RESERVA_LECTURAS', 0.2)
+        app.config.setdefault('ADMISION_REINTENTAR_EN', 1)
+        app.config.setdefault('ADMISION_EXENTAS', ('/health', '/metrics'))
+
+        self.limitador = LimitadorAdaptativo(
+            limite_inicial=app.config['ADMISION_LIMITE_INICIAL'],
+            limite_minimo=app.config['ADMISION_LIMITE_MINIMO'],
+            limite_maximo=app.config['ADMISION_LIMITE_MAXIMO'],
+            latencia_objetivo=app.config['ADMISION_LATENCIA_OBJETIVO'],
+            reserva_lecturas=app.config['ADMISION_RESERVA_LECTURAS'],
+        )
+        app.extensions['admision'] = self
+        app.before_request(self.admitir)
+        app.after_request(self.medir)
+        app.teardown_request(self.liberar)
+
+    def estadisticas(self) -> dict:
+        return self.limitador.estadisticas()
+
+    def admitir(self):
+        configuracion = current_app.config
+        if not configuracion['ADMISION_HABILITADA'] or request.path in configuracion['ADMISION_EXENTAS']:
+            return None
+
+        if not self.limitador.intentar_admitir(es_escritura=request.method not in METODOS_LECTURA):
+            return self._respuesta_sobrecarga()
+        g._admision_inicio = time.perf_counter()
+        return None
+
+    def medir(self, respuesta: Response) -> Response:
+        # La latencia se mide hasta tener la respuesta, sin contar la transmisión de un streaming
+        if '_admision_inicio' in g:
+            g._admision_latencia = time.perf_counter() - g._admision_inicio
+        return respuesta
+
+    def liberar(self, excepcion=None):
+        inicio = g.pop('_admision_inicio', None)
+        if inicio is None:
+            return
+        latencia = g.pop('_admision_latencia', None)
+        self.limitador.liberar(latencia if latencia is not None else time.perf_counter() - inicio)
+
+    def _respuesta_sobrecarga(self) -> Response:
+        respuesta = Response(
+            json.dumps(dict(error="El servicio está sobrecargado, intente de nuevo más tarde")),
+            status=503,
+            mimetype='application/json'
+        )
+        respuesta.headers['Retry-After'] = str(current_app.config['ADMISION_REINTENTAR_EN'])
+        return respuesta
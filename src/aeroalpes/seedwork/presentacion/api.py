@@ -1,8 +1,198 @@
 import functools
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from uuid import UUID
 
 from flask import (
-    Blueprint, flash, g, redirect, render_template, request, session, url_for
+    Blueprint, flash, g, redirect, render_template, request, session, url_for, Response
 )
 
+from .compresion import ENCODINGS_SOPORTADOS, etag_codificado
+
 def crear_blueprint(identificador: str, prefijo_url: str):
-    return Blueprint(identificador, __name__, url_prefix=prefijo_url)
\ No newline at end of file
+    return Blueprint(identificador, __name__, url_prefix=prefijo_url)
+
+def leer_elementos_lote():
+    """Lee el cuerpo de la petición como arreglo JSON o como NDJSON (un objeto por línea)
+
+    Las líneas NDJSON que no son JSON válido se entregan como texto para que
+    el caso de uso las reporte como elementos inválidos.
+    """
+    if request.mimetype == 'application/x-ndjson':
+        for linea in request.stream:
+            if not linea.strip():
+                continue
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                yield linea.decode('utf-8', errors='replace')
+    else:
+        elementos = request.get_json(silent=True)
+        if not isinstance(elementos, list):
+            raise ValueError("El cuerpo debe ser un arreglo JSON")
+        yield from elementos
+
+def leer_campos(permitidos) -> frozenset:
+    """Campos pedidos en `?fields=` (separados por comas), o None si no se pidió una proyección
+
+    Lanza ValueError si se pide un campo que no está en `permitidos`.
+    """
+    valor = request.args.get('fields')
+    if not valor:
+        return None
+    campos = frozenset(campo.strip() for campo in valor.split(',') if campo.strip())
+    desconocidos = campos.difference(permitidos)
+    if desconocidos:
+        raise ValueError(f"Campos desconocidos en fields: {', '.join(sorted(desconocidos))}")
+    return campos or None
+
+def leer_ids(maximo: int) -> list[UUID]:
+    """Ids pedidos en `?ids=` (separados por comas, sin repetir), o None si no se pidieron
+
+    Lanza ValueError si algún id no es un UUID o si se piden más de `maximo`.
+    """
+    valor = request.args.get('ids')
+    if valor is None:
+        return None
+    ids = list()
+    for texto in valor.split(','):
+        if not texto.strip():
+            continue
+        try:
+            ids.append(UUID(texto.strip()))
+        except ValueError:
+            raise ValueError(f"Id inválido en ids: {texto.strip()}")
+    ids = list(dict.fromkeys(ids))
+    if not ids or len(ids) > maximo:
+        raise ValueError(f"El parámetro ids debe tener entre 1 y {maximo} ids")
+    return ids
+
+def etag_version(id, version: datetime) -> str:
+    """ETag fuerte derivado del identificador y la versión (fecha de actualización) del agregado"""
+    return hashlib.sha256(f'{id}:{version.isoformat()}'.encode('utf-8')).hexdigest()[:32]
+
+def _como_utc(fecha: datetime) -> datetime:
+    # Las fechas persistidas no tienen zona horaria; se interpretan como UTC
+    fecha = fecha.replace(microsecond=0)
+    return fecha if fecha.tzinfo else fecha.replace(tzinfo=timezone.utc)
+
+def _etag_en_cliente(etag: str) -> str:
+    """Retorna la variante del ETag (sin comprimir o comprimida) que envió el cliente en If-None-Match"""
+    for variante in (etag, *(etag_codificado(etag, encoding) for encoding in ENCODINGS_SOPORTADOS)):
+        if request.if_none_match.contains_weak(variante):
+            return variante
+    return None
+
+def es_vigente_en_cliente(etag: str, ultima_modificacion: datetime) -> bool:
+    """Indica si la copia del cliente (If-None-Match / If-Modified-Since) sigue vigente
+
+    Como indica el RFC 9110, If-Modified-Since se ignora cuando hay If-None-Match.
+    """
+    if request.if_none_match:
+        return _etag_en_cliente(etag) is not None
+    if request.if_modified_since:
+        return _como_utc(ultima_modificacion) <= request.if_modified_since
+    return False
+
+def agregar_validadores(respuesta: Response, etag: str, ultima_modificacion: datetime) -> Response:
+    respuesta.set_etag(etag)
+    respuesta.last_modified = _como_utc(ultima_modificacion)
+    return respuesta
+
+def respuesta_no_modificada(etag: str, ultima_modificacion: datetime) -> Response:
+    # El 304 repite el mismo validador que el cliente recibió en el 200 (comprimido o no)
+    return agregar_validadores(Response(status=304), _etag_en_cliente(etag) or etag, ultima_modificacion)
+
+class VistasVersionadas(dict):
+    """Diccionario de vistas (`app.view_functions`) que cuenta sus cambios, para detectarlos sin recorrerlo"""
+
+    version = 0
+
+    def __setitem__(self, llave, valor):
+        self.version += 1
+        super().__setitem__(llave, valor)
+
+    def __delitem__(self, llave):
+        self.version += 1
+        super().__delitem__(llave)
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, llave, valor=None):
+        if llave not in self:
+            self.version += 1
+        return super().setdefault(llave, valor)
+
+    def update(self, *args, **kwargs):
+        self.version += 1
+        super().update(*args, **kwargs)
+
+    def __ior__(self, otro):
+        self.update(otro)
+        return self
+
+    def clear(self):
+        self.version += 1
+        super().clear()
+
+class DocumentoPrecalculado:
+    """Documento JSON que se serializa una sola vez y se sirve como bytes
+
+    El documento se construye con `constructor` y se vuelve a construir
+    únicamente cuando cambia el valor retornado por `huella` (por ejemplo,
+    cuando se registran nuevos blueprints). Cada petición solo compara
+    encabezados: responde 304 si el ETag coincide y entrega la versión
+    gzip cuando el cliente la acepta.
+    """
+
+    def __init__(self, constructor, huella=None):
+        self._constructor = constructor
+        self._huella = huella or (lambda: None)
+        self._huella_actual = object()
+        self.cuerpo: bytes = b''
+        self.cuerpo_gzip: bytes = b''
+        self.etag: str = ''
+
+    def construir(self):
+        huella = self._huella()
+        cuerpo = json.dumps(self._constructor(), sort_keys=True).encode('utf-8')
+
+        self.cuerpo = cuerpo
+        self.cuerpo_gzip = gzip.compress(cuerpo, mtime=0)
+        self.etag = hashlib.sha256(cuerpo).hexdigest()[:32]
+        self._huella_actual = huella
+
+    def _vigente(self) -> bool:
+        return self._huella_actual == self._huella()
+
+    def responder(self) -> Response:
+        if not self._vigente():
+            self.construir()
+
+        usa_gzip = request.accept_encodings['gzip'] > 0
+        etag = etag_codificado(self.etag, 'gzip') if usa_gzip else self.etag
+
+        if request.if_none_match.contains_weak(self.etag) \
+            or request.if_none_match.contains_weak(etag_codificado(self.etag, 'gzip')):
+            respuesta = Response(status=304)
+        else:
+            respuesta = Response(
+                self.cuerpo_gzip if usa_gzip else self.cuerpo,
+                status=200,
+                mimetype='application/json'
+            )
+            if usa_gzip:
+                respuesta.headers['Content-Encoding'] = 'gzip'
+
+        respuesta.set_etag(etag)
+        respuesta.headers['Cache-Control'] = 'no-cache'
+        respuesta.vary.add('Accept-Encoding')
+        return respuesta
@@ -0,0 +1,196 @@
+"""Adaptador ASGI reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará un adaptador que expone una aplicación
+WSGI (Flask) como aplicación ASGI. El event loop de asyncio atiende las
+conexiones y cada petición se ejecuta en un pool de hilos acotado, de modo
+que una escritura lenta en SQLite no bloquea al resto de peticiones.
+
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+_INICIO = 'inicio'
+_CUERPO = 'cuerpo'
+_FIN = 'fin'
+_ERROR = 'error'
+
+class _CuerpoEntrante(io.RawIOBase):
+    """`wsgi.input` que recibe el cuerpo de la petición ASGI a medida que la aplicación lo lee
+
+    Cada lectura sin datos pendientes espera el siguiente mensaje
+    `http.request` en el event loop, así el cuerpo nunca se acumula completo
+    en memoria y los endpoints NDJSON procesan las líneas mientras llegan.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._pendiente = memoryview(b'')
+        self._terminado = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _recibir(self) -> bytes:
+        mensaje = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if mensaje['type'] == 'http.disconnect' or not mensaje.get('more_body', False):
+            self._terminado = True
+        return mensaje.get('body', b'')
+
+    def readinto(self, destino) -> int:
+        while not self._pendiente and not self._terminado:
+            self._pendiente = memoryview(self._recibir())
+        cantidad = min(len(destino), len(self._pendiente))
+        destino[:cantidad] = self._pendiente[:cantidad]
+        self._pendiente = self._pendiente[cantidad:]
+        return cantidad
+
+class AdaptadorASGI:
+    """Aplicación ASGI que delega cada petición HTTP a una aplicación WSGI
+
+    Toda la petición (incluyendo la iteración de respuestas en streaming) se
+    ejecuta en un mismo hilo del pool, así el contexto de Flask y la sesión de
+    SQLAlchemy no cambian de hilo. El cuerpo de la petición se lee bajo
+    demanda desde ese hilo y los fragmentos de la respuesta pasan al event
+    loop por una cola acotada que aplica contrapresión sobre el hilo.
+    """
+
+    def __init__(self, app_wsgi, max_hilos: int = 16, max_fragmentos_pendientes: int = 8):
+        self.app_wsgi = app_wsgi
+        self.max_hilos = max_hilos
+        self.max_fragmentos_pendientes = max_fragmentos_pendientes
+        self._ejecutor: ThreadPoolExecutor = None
+
+    @property
+    def ejecutor(self) -> ThreadPoolExecutor:
+        if self._ejecutor is None:
+            self._ejecutor = ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix='aeroalpes-asgi')
+        return self._ejecutor
+
+    def iniciar(self):
+        # El pool se crea al arrancar para no pagar su costo en la primera petición
+        return self.ejecutor
+
+    def cerrar(self):
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=True)
+            self._ejecutor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._servir_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._ciclo_de_vida(receive, send)
+        else:
+            raise NotImplementedError(f"Tipo de scope ASGI no soportado: {scope['type']}")
+
+    async def _ciclo_de_vida(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                self.iniciar()
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(None, self.cerrar)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _construir_environ(self, scope, entrada: io.RawIOBase) -> dict:
+        servidor = scope.get('server') or ('localhost', 80)
+        cliente = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': servidor[0],
+            'SERVER_PORT': str(servidor[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': cliente[0],
+            'REMOTE_PORT': str(cliente[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BufferedReader(entrada),
+            # Sin Content-Length (cuerpo por fragmentos) se lee hasta el final del flujo
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+
+        for nombre, valor in scope.get('headers', []):
+            nombre = nombre.decode('latin-1').upper().replace('-', '_')
+            valor = valor.decode('latin-1')
+            if nombre in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[nombre] = valor
+            else:
+                clave = f'HTTP_{nombre}'
+                environ[clave] = f'{environ[clave]},{valor}' if clave in environ else valor
+
+        return environ
+
+    def _ejecutar_wsgi(self, environ: dict, loop, cola: asyncio.Queue):
+        def publicar(*mensaje):
+            asyncio.run_coroutine_threadsafe(cola.put(mensaje), loop).result()
+
+        def start_response(estado, encabezados, exc_info=None):
+            publicar(_INICIO, estado, encabezados)
+
+        try:
+            iterable = self.app_wsgi(environ, start_response)
+            try:
+                for fragmento in iterable:
+                    if fragmento:
+                        publicar(_CUERPO, fragmento)
+            finally:
+                if hasattr(iterable, 'close'):
+                    iterable.close()
+            publicar(_FIN)
+        except Exception as e:
+            publicar(_ERROR, e)
+
+    async def _servir_http(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        environ = self._construir_environ(scope, _CuerpoEntrante(receive, loop))
+
+        cola: asyncio.Queue = asyncio.Queue(maxsize=self.max_fragmentos_pendientes)
+        tarea = loop.run_in_executor(self.ejecutor, self._ejecutar_wsgi, environ, loop, cola)
+
+        iniciada = False
+        terminada = False
+        try:
+            while not terminada:
+                tipo, *datos = await cola.get()
+                terminada = tipo in (_FIN, _ERROR)
+
+                if tipo == _INICIO and not iniciada:
+                    estado, encabezados = datos
+                    await send({
+                        'type': 'http.response.start',
+                        'status': int(estado.split(' ', 1)[0]),
+                        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in encabezados],
+                    })
+                    iniciada = True
+                elif tipo == _CUERPO:
+                    await send({'type': 'http.response.body', 'body': datos[0], 'more_body': True})
+                elif tipo == _FIN:
+                    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                elif tipo == _ERROR:
+                    if not iniciada:
+                        await send({
+                            'type': 'http.response.start',
+                            'status': 500,
+                            'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+                        })
+                    await send({'type': 'http.response.body', 'body': b'' if iniciada else b'Error interno', 'more_body': False})
+        finally:
+            # Si el cliente se desconecta se drena la cola para liberar el hilo
+            while not terminada:
+                tipo, *_ = await cola.get()
+                terminada = tipo in (_FIN, _ERROR)
+
+        await tarea
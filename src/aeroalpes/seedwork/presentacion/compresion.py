@@ -0,0 +1,135 @@
+"""Compresión de respuestas HTTP reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará una extensión de Flask que negocia gzip o
+deflate con el cliente (Accept-Encoding) y comprime las respuestas cuyo tipo
+de contenido lo amerita. Las respuestas pequeñas se envían sin comprimir y
+las respuestas en streaming se comprimen fragmento a fragmento.
+
+"""
+
+import gzip
+import threading
+import zlib
+
+from flask import Flask, Response, current_app, request
+
+ENCODINGS_SOPORTADOS = ('gzip', 'deflate')
+
+TIPOS_COMPRIMIBLES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/html',
+    'text/plain',
+    'text/css',
+)
+
+def etag_codificado(etag: str, encoding: str) -> str:
+    """ETag fuerte de la representación comprimida con `encoding`"""
+    return f'{etag}-{encoding}'
+
+class Compresion:
+    """Extensión de Flask que comprime las respuestas en un `after_request`
+
+    Configuración:
+        COMPRESION_TAMANO_MINIMO: bytes por debajo de los cuales no se comprime (500)
+        COMPRESION_NIVEL: nivel de zlib entre 1 y 9 (6)
+        COMPRESION_TIPOS: tipos de contenido comprimibles
+    """
+
+    def __init__(self, app: Flask = None):
+        self._candado = threading.Lock()
+        self.respuestas_comprimidas = 0
+        self.bytes_originales = 0
+        self.bytes_comprimidos = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.config.setdefault('COMPRESION_TAMANO_MINIMO', 500)
+        app.config.setdefault('COMPRESION_NIVEL', 6)
+        app.config.setdefault('COMPRESION_TIPOS', TIPOS_COMPRIMIBLES)
+        app.extensions['compresion'] = self
+        app.after_request(self.comprimir)
+
+    @property
+    def bytes_ahorrados(self) -> int:
+        return self.bytes_originales - self.bytes_comprimidos
+
+    def estadisticas(self) -> dict:
+        with self._candado:
+            return dict(
+                respuestas_comprimidas=self.respuestas_comprimidas,
+                bytes_originales=self.bytes_originales,
+                bytes_comprimidos=self.bytes_comprimidos,
+                bytes_ahorrados=self.bytes_ahorrados,
+            )
+
+    def _registrar(self, originales: int, comprimidos: int):
+        with self._candado:
+            self.respuestas_comprimidas += 1
+            self.bytes_originales += originales
+            self.bytes_comprimidos += comprimidos
+
+    def _es_comprimible(self, respuesta: Response) -> bool:
+        return respuesta.status_code >= 200 \
+            and respuesta.status_code not in (204, 304) \
+            and request.method != 'HEAD' \
+            and 'Content-Encoding' not in respuesta.headers \
+            and 'no-transform' not in respuesta.headers.get('Cache-Control', '') \
+            and respuesta.mimetype in current_app.config['COMPRESION_TIPOS']
+
+    def comprimir(self, respuesta: Response) -> Response:
+        if not self._es_comprimible(respuesta):
+            return respuesta
+
+        # La representación depende de Accept-Encoding aunque no se comprima esta vez
+        respuesta.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(ENCODINGS_SOPORTADOS)
+        if encoding is None:
+            return respuesta
+
+        nivel = current_app.config['COMPRESION_NIVEL']
+        if respuesta.is_streamed:
+            respuesta.response = self._comprimir_flujo(respuesta.iter_encoded(), respuesta.response, encoding, nivel)
+            respuesta.headers.pop('Content-Length', None)
+            respuesta.direct_passthrough = False
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < current_app.config['COMPRESION_TAMANO_MINIMO']:
+                return respuesta
+
+            comprimidos = gzip.compress(datos, nivel, mtime=0) if encoding == 'gzip' else zlib.compress(datos, nivel)
+            if len(comprimidos) >= len(datos):
+                return respuesta
+            respuesta.set_data(comprimidos)
+            self._registrar(len(datos), len(comprimidos))
+
+        respuesta.headers['Content-Encoding'] = encoding
+        etag, debil = respuesta.get_etag()
+        if etag and not debil:
+            # Los bytes cambian, así que la representación comprimida tiene su propio ETag fuerte
+            respuesta.set_etag(etag_codificado(etag, encoding))
+        return respuesta
+
+    def _comprimir_flujo(self, fragmentos, original, encoding: str, nivel: int):
+        bits = 16 + zlib.MAX_WBITS if encoding == 'gzip' else zlib.MAX_WBITS
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, bits)
+        originales = comprimidos = 0
+        try:
+            for fragmento in fragmentos:
+                if not fragmento:
+                    continue
+                originales += len(fragmento)
+                # Z_SYNC_FLUSH entrega cada fragmento al cliente sin esperar al final
+                salida = compresor.compress(fragmento) + compresor.flush(zlib.Z_SYNC_FLUSH)
+                comprimidos += len(salida)
+                if salida:
+                    yield salida
+            salida = compresor.flush()
+            comprimidos += len(salida)
+            yield salida
+            self._registrar(originales, comprimidos)
+        finally:
+            if hasattr(original, 'close'):
+                original.close()
@@ -0,0 +1,267 @@
+"""Peticiones idempotentes con Idempotency-Key reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará una extensión de Flask que guarda la
+respuesta de cada petición con encabezado `Idempotency-Key` y la repite
+ante un reintento con la misma llave, sin volver a ejecutar la vista. Las
+respuestas se guardan en memoria (LRU acotado con expiración) y,
+opcionalmente, en una tabla SQLite compartida entre procesos. Un duplicado
+que llega mientras la petición original sigue en curso espera su resultado.
+
+"""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import Flask, Response, current_app, request
+
+ENCABEZADO = 'Idempotency-Key'
+LONGITUD_MAXIMA_LLAVE = 255
+
+@dataclass(frozen=True)
+class RespuestaGuardada:
+    huella: str
+    estado: int
+    cabeceras: tuple
+    cuerpo: bytes
+
+    @classmethod
+    def desde_respuesta(cls, huella: str, respuesta: Response) -> 'RespuestaGuardada':
+        cabeceras = tuple((nombre, valor) for nombre, valor in respuesta.headers.items() if nombre != 'Content-Length')
+        return cls(huella=huella, estado=respuesta.status_code, cabeceras=cabeceras, cuerpo=respuesta.get_data())
+
+    def a_respuesta(self) -> Response:
+        respuesta = Response(self.cuerpo, status=self.estado, headers=list(self.cabeceras))
+        respuesta.headers['Idempotent-Replayed'] = 'true'
+        return respuesta
+
+class AlmacenMemoria:
+    """Respuestas por llave, las menos usadas se descartan al superar `capacidad` y todas expiran tras `ttl` segundos"""
+
+    def __init__(self, capacidad: int = 10000, ttl: float = 86400, reloj=time.monotonic):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._reloj = reloj
+        self._respuestas: OrderedDict[str, tuple[float, RespuestaGuardada]] = OrderedDict()
+        self._candado = threading.Lock()
+
+    def obtener(self, llave: str) -> RespuestaGuardada:
+        with self._candado:
+            guardada = self._respuestas.get(llave)
+            if guardada is None:
+                return None
+            expira, respuesta = guardada
+            if expira <= self._reloj():
+                del self._respuestas[llave]
+                return None
+            self._respuestas.move_to_end(llave)
+            return respuesta
+
+    def guardar(self, llave: str, respuesta: RespuestaGuardada):
+        with self._candado:
+            self._respuestas[llave] = (self._reloj() + self.ttl, respuesta)
+            self._respuestas.move_to_end(llave)
+            while len(self._respuestas) > self.capacidad:
+                self._respuestas.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._respuestas)
+
+class AlmacenSQLite:
+    """Respuestas en una tabla SQLite, visibles para todos los procesos que comparten el archivo
+
+    Una fila sin estado marca una petición en curso: el primer proceso que
+    la inserta ejecuta la vista y los demás esperan a que se complete.
+    """
+
+    def __init__(self, ruta: str, ttl: float = 86400, reloj=time.time):
+        self.ruta = ruta
+        self.ttl = ttl
+        self._reloj = reloj
+        self._local = threading.local()
+        with self._conexion() as conexion:
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS respuestas_idempotentes ('
+                'llave TEXT PRIMARY KEY, huella TEXT NOT NULL, estado INTEGER, '
+                'cabeceras TEXT, cuerpo BLOB, expira REAL NOT NULL)'
+            )
+
+    def reiniciar(self):
+        """Olvida las conexiones abiertas; un proceso hijo no debe usar las que heredó del padre"""
+        self._local = threading.local()
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = self._local.conexion = sqlite3.connect(self.ruta, timeout=30)
+        return conexion
+
+    def reclamar(self, llave: str, huella: str, ttl_en_curso: float) -> bool:
+        """Marca la llave como en curso; retorna False si otro proceso ya la tiene"""
+        ahora = self._reloj()
+        with self._conexion() as conexion:
+            conexion.execute('DELETE FROM respuestas_idempotentes WHERE llave = ? AND expira <= ?', (llave, ahora))
+            cursor = conexion.execute(
+                'INSERT OR IGNORE INTO respuestas_idempotentes (llave, huella, expira) VALUES (?, ?, ?)',
+                (llave, huella, ahora + ttl_en_curso)
+            )
+            return cursor.rowcount == 1
+
+    def obtener(self, llave: str) -> tuple[bool, RespuestaGuardada]:
+        """Retorna (existe, respuesta); una llave en curso existe pero aún no tiene respuesta"""
+        fila = self._conexion().execute(
+            'SELECT huella, estado, cabeceras, cuerpo FROM respuestas_idempotentes WHERE llave = ? AND expira > ?',
+            (llave, self._reloj())
+        ).fetchone()
+        if fila is None:
+            return False, None
+        huella, estado, cabeceras, cuerpo = fila
+        if estado is None:
+            return True, None
+        return True, RespuestaGuardada(huella, estado, tuple(tuple(c) for c in json.loads(cabeceras)), cuerpo)
+
+    def guardar(self, llave: str, respuesta: RespuestaGuardada):
+        with self._conexion() as conexion:
+            conexion.execute(
+                'INSERT OR REPLACE INTO respuestas_idempotentes (llave, huella, estado, cabeceras, cuerpo, expira) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (llave, respuesta.huella, respuesta.estado, json.dumps(respuesta.cabeceras), respuesta.cuerpo, self._reloj() + self.ttl)
+            )
+
+    def liberar(self, llave: str):
+        with self._conexion() as conexion:
+            conexion.execute('DELETE FROM respuestas_idempotentes WHERE llave = ? AND estado IS NULL', (llave,))
+
+class Idempotencia:
+    """Extensión de Flask que aplica `Idempotency-Key` a las vistas decoradas con `idempotente`
+
+    Las respuestas 5xx no se guardan: el cliente puede reintentar con la misma llave.
+
+    Configuración:
+        IDEMPOTENCIA_TTL: segundos que se conserva cada respuesta (86400)
+        IDEMPOTENCIA_CAPACIDAD: respuestas que se conservan en memoria (10000)
+        IDEMPOTENCIA_ESPERA: segundos que un duplicado espera a la petición en curso antes de responder 409 (30)
+        IDEMPOTENCIA_ARCHIVO: archivo SQLite donde también se guardan las respuestas (None)
+    """
+
+    def __init__(self, app: Flask = None):
+        self.memoria: AlmacenMemoria = None
+        self.sqlite: AlmacenSQLite = None
+        self.espera = 30.0
+        self._en_curso: dict[str, threading.Event] = dict()
+        self._candado = threading.Lock()
+        self.repetidas = 0
+        self.esperas = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.config.setdefault('IDEMPOTENCIA_TTL', 86400)
+        app.config.setdefault('IDEMPOTENCIA_CAPACIDAD', 10000)
+        app.config.setdefault('IDEMPOTENCIA_ESPERA', 30)
+        app.config.setdefault('IDEMPOTENCIA_ARCHIVO', None)
+
+        self.espera = app.config['IDEMPOTENCIA_ESPERA']
+        self.memoria = AlmacenMemoria(app.config['IDEMPOTENCIA_CAPACIDAD'], app.config['IDEMPOTENCIA_TTL'])
+        if app.config['IDEMPOTENCIA_ARCHIVO']:
+            self.compartir(app, app.config['IDEMPOTENCIA_ARCHIVO'])
+        app.extensions['idempotencia'] = self
+
+    def compartir(self, app: Flask, ruta: str):
+        """Guarda también las respuestas en el archivo SQLite `ruta`, compartido por los procesos que lo usen"""
+        app.config['IDEMPOTENCIA_ARCHIVO'] = ruta
+        self.sqlite = AlmacenSQLite(ruta, app.config['IDEMPOTENCIA_TTL'])
+
+    def estadisticas(self) -> dict:
+        return dict(repetidas=self.repetidas, esperas=self.esperas, en_memoria=len(self.memoria))
+
+    def ejecutar(self, llave: str, huella: str, vista) -> Response:
+        """Ejecuta `vista` una sola vez por llave y repite su respuesta en los reintentos"""
+        limite = time.monotonic() + self.espera
+        while True:
+            guardada = self.memoria.obtener(llave)
+            if guardada is not None:
+                return self._repetir(guardada, huella)
+
+            with self._candado:
+                evento = self._en_curso.get(llave)
+                if evento is None:
+                    evento = self._en_curso[llave] = threading.Event()
+                    break
+
+            # Otra petición con la misma llave está en curso en este proceso
+            self.esperas += 1
+            if not evento.wait(max(0.0, limite - time.monotonic())):
+                return _error(409, "Una petición con la misma Idempotency-Key sigue en curso")
+
+        try:
+            if self.sqlite is not None:
+                respuesta = self._reclamar_en_sqlite(llave, huella, limite)
+                if respuesta is not None:
+                    return respuesta
+            return self._ejecutar_y_guardar(llave, huella, vista)
+        finally:
+            with self._candado:
+                del self._en_curso[llave]
+            evento.set()
+
+    def _reclamar_en_sqlite(self, llave: str, huella: str, limite: float) -> Response:
+        # Otro proceso puede tener la misma llave en curso o ya completada
+        while not self.sqlite.reclamar(llave, huella, ttl_en_curso=self.espera):
+            existe, guardada = self.sqlite.obtener(llave)
+            if guardada is not None:
+                self.memoria.guardar(llave, guardada)
+                return self._repetir(guardada, huella)
+            if existe:
+                if time.monotonic() >= limite:
+                    return _error(409, "Una petición con la misma Idempotency-Key sigue en curso")
+                time.sleep(0.05)
+        return None
+
+    def _ejecutar_y_guardar(self, llave: str, huella: str, vista) -> Response:
+        guardada = None
+        try:
+            respuesta = current_app.make_response(vista())
+            if respuesta.status_code < 500 and not respuesta.is_streamed:
+                guardada = RespuestaGuardada.desde_respuesta(huella, respuesta)
+                self.memoria.guardar(llave, guardada)
+                if self.sqlite is not None:
+                    self.sqlite.guardar(llave, guardada)
+            return respuesta
+        finally:
+            # Sin respuesta guardada la llave queda libre para un reintento en cualquier proceso
+            if self.sqlite is not None and guardada is None:
+                self.sqlite.liberar(llave)
+
+    def _repetir(self, guardada: RespuestaGuardada, huella: str) -> Response:
+        if guardada.huella != huella:
+            return _error(422, "La Idempotency-Key ya se usó con una petición diferente")
+        self.repetidas += 1
+        return guardada.a_respuesta()
+
+def _error(estado: int, mensaje: str) -> Response:
+    return Response(json.dumps(dict(error=mensaje)), status=estado, mimetype='application/json')
+
+def idempotente(vista):
+    """Decorador de vistas: con encabezado `Idempotency-Key` la vista se ejecuta una sola vez por llave
+
+    Sin el encabezado, o sin la extensión `Idempotencia` registrada, la vista se ejecuta normalmente.
+    """
+    @functools.wraps(vista)
+    def envoltura(*args, **kwargs):
+        llave = request.headers.get(ENCABEZADO)
+        extension = current_app.extensions.get('idempotencia')
+        if llave is None or extension is None:
+            return vista(*args, **kwargs)
+        if not llave or len(llave) > LONGITUD_MAXIMA_LLAVE:
+            return _error(400, f"El encabezado {ENCABEZADO} debe tener entre 1 y {LONGITUD_MAXIMA_LLAVE} caracteres")
+
+        # La llave es propia de la ruta; la huella del cuerpo detecta una llave reutilizada con otros datos
+        huella = hashlib.sha256(request.get_data()).hexdigest()
+        return extension.ejecutar(f'{request.method} {request.path} {llave}', huella, lambda: vista(*args, **kwargs))
+    return envoltura
@@ -0,0 +1,295 @@
+"""Métricas HTTP en formato Prometheus reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará una extensión de Flask que registra, por
+cada regla de enrutamiento y método, la cantidad de peticiones, los errores
+y un histograma de latencias. También mide el tiempo exclusivo que cada
+petición pasa en cada capa (mapeador, fábrica, repositorio y commit) y
+expone todo en `/metrics` con el formato de texto de Prometheus.
+
+"""
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import Flask, Response, current_app, request
+
+BUCKETS_POR_DEFECTO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+SIN_RUTA = 'sin_ruta'
+
+_cronometro_actual: ContextVar['Cronometro'] = ContextVar('cronometro_capas', default=None)
+
+_reloj = time.perf_counter
+
+class Cronometro:
+    """Acumula el tiempo exclusivo de cada capa durante una petición
+
+    Al entrar a una capa anidada se pausa la capa que la contiene, así el
+    tiempo de un repositorio no incluye el de su commit ni el de su mapeador.
+    """
+
+    __slots__ = ('inicio', 'tiempos', '_pila', '_marca')
+
+    def __init__(self):
+        self.inicio = self._marca = _reloj()
+        self.tiempos: dict[str, float] = {}
+        self._pila: list[str] = []
+
+    def entrar(self, capa: str):
+        ahora = time.perf_counter()
+        if self._pila:
+            anterior = self._pila[-1]
+            self.tiempos[anterior] = self.tiempos.get(anterior, 0.0) + ahora - self._marca
+        self._pila.append(capa)
+        self._marca = ahora
+
+    def salir(self, capa: str):
+        if capa not in self._pila:
+            return
+        ahora = time.perf_counter()
+        # Una capa que terminó con una excepción puede dejar capas internas abiertas
+        while self._pila:
+            actual = self._pila.pop()
+            self.tiempos[actual] = self.tiempos.get(actual, 0.0) + ahora - self._marca
+            self._marca = ahora
+            if actual == capa:
+                break
+
+    def capa_actual(self) -> str:
+        return self._pila[-1] if self._pila else None
+
+def instrumentar(clase: type, capa: str) -> type:
+    """Mide en `capa` los métodos públicos definidos en `clase`
+
+    Fuera de una petición (pruebas, benchmarks, scripts) los métodos se
+    ejecutan sin medición. Instrumentar dos veces la misma clase no tiene efecto.
+    """
+    for nombre, metodo in list(vars(clase).items()):
+        if nombre.startswith('_') or not inspect.isfunction(metodo) or hasattr(metodo, '__capa__'):
+            continue
+        envoltura = _envolver_generador(metodo, capa) if inspect.isgeneratorfunction(metodo) else _envolver(metodo, capa)
+        envoltura.__capa__ = capa
+        setattr(clase, nombre, envoltura)
+    return clase
+
+def _envolver(metodo, capa: str):
+    @functools.wraps(metodo)
+    def medido(*args, **kwargs):
+        cronometro = _cronometro_actual.get()
+        if cronometro is None:
+            return metodo(*args, **kwargs)
+        cronometro.entrar(capa)
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            cronometro.salir(capa)
+    return medido
+
+def _envolver_generador(metodo, capa: str):
+    # Un generador solo trabaja mientras se le pide el siguiente elemento
+    @functools.wraps(metodo)
+    def medido(*args, **kwargs):
+        generador = metodo(*args, **kwargs)
+        while True:
+            cronometro = _cronometro_actual.get()
+            if cronometro is not None:
+                cronometro.entrar(capa)
+            try:
+                elemento = next(generador)
+            except StopIteration:
+                return
+            finally:
+                if cronometro is not None:
+                    cronometro.salir(capa)
+            yield elemento
+    return medido
+
+CAPA_COMMIT = 'commit'
+
+def _antes_de_commit(sesion):
+    cronometro = _cronometro_actual.get()
+    if cronometro is not None:
+        cronometro.entrar(CAPA_COMMIT)
+
+def _despues_de_commit(sesion):
+    cronometro = _cronometro_actual.get()
+    if cronometro is not None and cronometro.capa_actual() == CAPA_COMMIT:
+        cronometro.salir(CAPA_COMMIT)
+
+def instrumentar_commits(sesion):
+    """Mide los commits de una sesión de SQLAlchemy (o `scoped_session`) en la capa `commit`"""
+    from sqlalchemy import event
+
+    if event.contains(sesion, 'before_commit', _antes_de_commit):
+        return
+    event.listen(sesion, 'before_commit', _antes_de_commit)
+    event.listen(sesion, 'after_commit', _despues_de_commit)
+    event.listen(sesion, 'after_rollback', _despues_de_commit)
+
+class _Histograma:
+    __slots__ = ('conteos', 'suma')
+
+    def __init__(self, cantidad_buckets: int):
+        # El último conteo corresponde al bucket +Inf
+        self.conteos = [0] * (cantidad_buckets + 1)
+        self.suma = 0.0
+
+    def observar(self, buckets: tuple, valor: float):
+        self.conteos[bisect_left(buckets, valor)] += 1
+        self.suma += valor
+
+    def copia(self) -> tuple[list, float]:
+        return list(self.conteos), self.suma
+
+class _Serie:
+    """Peticiones de una ruta y un método: conteo por estado, latencias y tiempo por capa"""
+
+    __slots__ = ('estados', 'latencias', 'capas')
+
+    def __init__(self, cantidad_buckets: int):
+        self.estados: dict[int, int] = dict()
+        self.latencias = _Histograma(cantidad_buckets)
+        self.capas: dict[str, _Histograma] = dict()
+
+class Metricas:
+    """Extensión de Flask que mide cada petición entre un `before_request` y un `after_request`
+
+    Configuración:
+        METRICAS_RUTA: ruta donde se exponen las métricas (/metrics)
+        METRICAS_BUCKETS: límites superiores en segundos de los histogramas de latencia
+    """
+
+    def __init__(self, app: Flask = None):
+        self._candado = threading.Lock()
+        self.buckets: tuple = BUCKETS_POR_DEFECTO
+        self._series: dict[tuple[str, str], _Serie] = dict()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.config.setdefault('METRICAS_RUTA', '/metrics')
+        app.config.setdefault('METRICAS_BUCKETS', BUCKETS_POR_DEFECTO)
+        self.buckets = tuple(sorted(app.config['METRICAS_BUCKETS']))
+        app.extensions['metricas'] = self
+        app.before_request(self.iniciar)
+        app.after_request(self.registrar)
+        app.teardown_request(self.descartar)
+        app.add_url_rule(app.config['METRICAS_RUTA'], 'metricas', self.exportar)
+
+    def iniciar(self):
+        _cronometro_actual.set(Cronometro())
+
+    def descartar(self, excepcion=None):
+        # Los hilos de un pool se reutilizan: ninguna medición queda viva entre peticiones
+        _cronometro_actual.set(None)
+
+    def registrar(self, respuesta: Response) -> Response:
+        cronometro = _cronometro_actual.get()
+        if cronometro is None:
+            return respuesta
+        duracion = _reloj() - cronometro.inicio
+
+        # Se resuelve el proxy una sola vez; cada acceso a `request.<atributo>` cuesta casi un microsegundo
+        peticion = request._get_current_object()
+        regla = peticion.url_rule
+        clave = (regla.rule if regla is not None else SIN_RUTA, peticion.method)
+        estado = respuesta.status_code
+        buckets = self.buckets
+
+        with self._candado:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = _Serie(len(buckets))
+            serie.estados[estado] = serie.estados.get(estado, 0) + 1
+            serie.latencias.observar(buckets, duracion)
+            for capa, tiempo in cronometro.tiempos.items():
+                histograma = serie.capas.get(capa)
+                if histograma is None:
+                    histograma = serie.capas[capa] = _Histograma(len(buckets))
+                histograma.observar(buckets, tiempo)
+
+        return respuesta
+
+    def _copiar_series(self) -> dict:
+        with self._candado:
+            return {
+                clave: (dict(serie.estados), serie.latencias.copia(), {capa: h.copia() for capa, h in serie.capas.items()})
+                for clave, serie in self._series.items()
+            }
+
+    def estadisticas(self) -> dict:
+        series = self._copiar_series()
+        estados = [estados for estados, _, _ in series.values()]
+        return dict(
+            peticiones=sum(total for conteo in estados for total in conteo.values()),
+            errores=sum(total for conteo in estados for estado, total in conteo.items() if estado >= 500),
+        )
+
+    def exportar(self) -> Response:
+        return Response(self.formato_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    def formato_prometheus(self) -> str:
+        series = sorted(self._copiar_series().items())
+
+        lineas = [
+            '# HELP aeroalpes_peticiones_total Peticiones HTTP atendidas por ruta, método y estado',
+            '# TYPE aeroalpes_peticiones_total counter',
+        ]
+        for (endpoint, metodo), (estados, _, _) in series:
+            for estado, total in sorted(estados.items()):
+                lineas.append(f'aeroalpes_peticiones_total{{endpoint="{endpoint}",metodo="{metodo}",estado="{estado}"}} {total}')
+
+        lineas += [
+            '# HELP aeroalpes_errores_total Peticiones HTTP respondidas con estado 5xx por ruta y método',
+            '# TYPE aeroalpes_errores_total counter',
+        ]
+        for (endpoint, metodo), (estados, _, _) in series:
+            errores = sum(total for estado, total in estados.items() if estado >= 500)
+            lineas.append(f'aeroalpes_errores_total{{endpoint="{endpoint}",metodo="{metodo}"}} {errores}')
+
+        lineas += [
+            '# HELP aeroalpes_peticion_duracion_segundos Latencia de las peticiones HTTP por ruta y método',
+            '# TYPE aeroalpes_peticion_duracion_segundos histogram',
+        ]
+        for (endpoint, metodo), (_, latencias, _) in series:
+            lineas += self._histograma('aeroalpes_peticion_duracion_segundos', f'endpoint="{endpoint}",metodo="{metodo}"', *latencias)
+
+        lineas += [
+            '# HELP aeroalpes_capa_duracion_segundos Tiempo exclusivo por petición en cada capa',
+            '# TYPE aeroalpes_capa_duracion_segundos histogram',
+        ]
+        for (endpoint, metodo), (_, _, capas) in series:
+            for capa, valores in sorted(capas.items()):
+                etiquetas = f'endpoint="{endpoint}",metodo="{metodo}",capa="{capa}"'
+                lineas += self._histograma('aeroalpes_capa_duracion_segundos', etiquetas, *valores)
+
+        lineas += self._estadisticas_de_extensiones()
+        return '\n'.join(lineas) + '\n'
+
+    def _histograma(self, nombre: str, etiquetas: str, conteos: list, suma: float) -> list[str]:
+        lineas = list()
+        acumulado = 0
+        for limite, conteo in zip(self.buckets, conteos):
+            acumulado += conteo
+            lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        acumulado += conteos[-1]
+        lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {acumulado}')
+        lineas.append(f'{nombre}_sum{{{etiquetas}}} {suma}')
+        lineas.append(f'{nombre}_count{{{etiquetas}}} {acumulado}')
+        return lineas
+
+    def _estadisticas_de_extensiones(self) -> list[str]:
+        # Las demás extensiones con `estadisticas()` (compresión, admisión, ...) se exponen como gauges
+        lineas = list()
+        for nombre, extension in sorted(current_app.extensions.items()):
+            if extension is self or not callable(getattr(extension, 'estadisticas', None)):
+                continue
+            for clave, valor in extension.estadisticas().items():
+                if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                    metrica = f'aeroalpes_{nombre}_{clave}'
+                    lineas += [f'# TYPE {metrica} gauge', f'{metrica} {valor}']
+        return lineas
@@ -0,0 +1,111 @@
+"""Servidor WSGI pre-fork reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará un servidor que carga la aplicación una
+sola vez en el proceso padre, congela el heap del recolector de basura
+(`gc.freeze`) para que las páginas de memoria sigan compartidas entre
+procesos (copy-on-write) y crea N workers con `fork` que atienden el mismo
+socket. Cada worker ejecuta `al_iniciar_worker`, donde se descartan las
+conexiones heredadas del padre (por ejemplo, las de SQLite). El padre
+reemplaza a los workers que terminan inesperadamente.
+
+"""
+
+import gc
+import os
+import signal
+import time
+from typing import Callable
+
+from werkzeug.serving import make_server
+
+# Un worker que termina antes de este tiempo se reemplaza con una pausa, para no entrar en un ciclo de forks
+VIDA_MINIMA_WORKER = 1.0
+ESPERA_TERMINACION = 10.0
+
+def _interrumpir(signum, frame):
+    raise KeyboardInterrupt()
+
+class ServidorPrefork:
+    """Servidor WSGI de N procesos, cada uno con un hilo por petición"""
+
+    def __init__(self, app, host: str = '127.0.0.1', puerto: int = 5000, workers: int = None,
+                 al_iniciar_worker: Callable[[], None] = None):
+        self.app = app
+        self.host = host
+        self.puerto = puerto
+        self.workers = workers or os.cpu_count() or 1
+        self.al_iniciar_worker = al_iniciar_worker
+        self.pids: dict[int, float] = dict()
+        self._servidor = None
+
+    def servir(self):
+        # El socket se abre en el padre y los workers lo heredan
+        self._servidor = make_server(self.host, self.puerto, self.app, threaded=True)
+        self.puerto = self._servidor.port
+
+        # Lo cargado hasta aquí no se vuelve a recorrer ni a escribir por el recolector en los hijos
+        gc.collect()
+        gc.freeze()
+
+        anteriores = {senal: signal.signal(senal, _interrumpir) for senal in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for _ in range(self.workers):
+                self._iniciar_worker()
+            self._supervisar()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for senal, manejador in anteriores.items():
+                signal.signal(senal, manejador)
+            self._detener_workers()
+            self._servidor.server_close()
+            gc.unfreeze()
+
+    def _iniciar_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            try:
+                signal.signal(signal.SIGTERM, _interrumpir)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                if self.al_iniciar_worker is not None:
+                    self.al_iniciar_worker()
+                self._servidor.serve_forever()
+            except BaseException:
+                codigo = 1
+            finally:
+                os._exit(codigo)
+        self.pids[pid] = time.monotonic()
+
+    def _supervisar(self):
+        while self.pids:
+            pid, _ = os.wait()
+            inicio = self.pids.pop(pid, None)
+            if inicio is None:
+                continue
+            if time.monotonic() - inicio < VIDA_MINIMA_WORKER:
+                time.sleep(VIDA_MINIMA_WORKER)
+            self._iniciar_worker()
+
+    def _detener_workers(self):
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        limite = time.monotonic() + ESPERA_TERMINACION
+        while self.pids:
+            for pid in list(self.pids):
+                try:
+                    terminado, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    terminado = pid
+                if terminado:
+                    del self.pids[pid]
+            if self.pids and time.monotonic() >= limite:
+                for pid in self.pids:
+                    os.kill(pid, signal.SIGKILL)
+                limite = float('inf')
+            if self.pids:
+                time.sleep(0.05)
@@ -0,0 +1,124 @@
+"""Trazas por petición reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará una extensión de Flask que abre el span raíz
+de cada petición muestreada, continúa las trazas que llegan con la cabecera
+`traceparent` (W3C Trace Context), entrega las trazas terminadas a un buffer
+circular en memoria o a un archivo JSON lines y permite consultarlas en
+`/debug/trazas` (solo en modo debug o de pruebas, o si se configura la ruta).
+Las trazas guardan la regla de la ruta y el tipo de las excepciones, no la
+ruta pedida ni sus mensajes, que pueden incluir datos personales.
+
+"""
+
+import json
+import random
+import re
+import threading
+
+from flask import Flask, Response, current_app, g, request
+
+from aeroalpes.seedwork.trazas import ArchivoJSONL, BufferCircular, Exportadores, iniciar_traza, terminar_traza, tipo_error
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+def leer_traceparent(valor: str):
+    """Retorna (id de traza, id del span padre, muestreada) o None si la cabecera no es válida"""
+    coincidencia = _TRACEPARENT.match(valor.strip().lower()) if valor else None
+    if coincidencia is None:
+        return None
+    id_traza, id_padre, banderas = coincidencia.groups()
+    if id_traza == '0' * 32 or id_padre == '0' * 16:
+        return None
+    return id_traza, id_padre, bool(int(banderas, 16) & 1)
+
+class Trazas:
+    """Extensión de Flask que traza una fracción de las peticiones
+
+    Configuración:
+        TRAZAS_MUESTREO: fracción de peticiones trazadas (0.1)
+        TRAZAS_CONFIAR_TRACEPARENT: un `traceparent` muestreado fuerza la traza; con False
+            solo se continúa su id y se decide con TRAZAS_MUESTREO (False)
+        TRAZAS_CAPACIDAD: trazas que se conservan en memoria (1000)
+        TRAZAS_ARCHIVO: archivo JSON lines donde también se agregan las trazas (None)
+        TRAZAS_RUTA: ruta de consulta de las trazas en memoria, sin autenticación; None la
+            desactiva (/debug/trazas en modo debug o de pruebas, si no None)
+    """
+
+    def __init__(self, app: Flask = None):
+        self.buffer: BufferCircular = None
+        self.exportador = None
+        self.muestreadas = 0
+        self._candado = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.config.setdefault('TRAZAS_MUESTREO', 0.1)
+        app.config.setdefault('TRAZAS_CONFIAR_TRACEPARENT', False)
+        app.config.setdefault('TRAZAS_CAPACIDAD', 1000)
+        app.config.setdefault('TRAZAS_ARCHIVO', None)
+        app.config.setdefault('TRAZAS_RUTA', '/debug/trazas' if app.debug or app.testing else None)
+
+        self.buffer = BufferCircular(app.config['TRAZAS_CAPACIDAD'])
+        self.exportador = self.buffer
+        if app.config['TRAZAS_ARCHIVO']:
+            self.exportador = Exportadores(self.buffer, ArchivoJSONL(app.config['TRAZAS_ARCHIVO']))
+
+        app.extensions['trazas'] = self
+        app.before_request(self.iniciar)
+        app.after_request(self.anotar)
+        app.teardown_request(self.terminar)
+        if app.config['TRAZAS_RUTA']:
+            app.add_url_rule(app.config['TRAZAS_RUTA'], 'trazas', self.consultar)
+
+    def estadisticas(self) -> dict:
+        return dict(muestreadas=self.muestreadas, en_memoria=len(self.buffer))
+
+    def iniciar(self):
+        padre = leer_traceparent(request.headers.get('traceparent'))
+        id_traza, id_padre, muestreada = padre if padre is not None else (None, None, True)
+        # Un cliente siempre puede pedir no muestrear; forzar la traza solo si se confía en él
+        if muestreada and (padre is None or not current_app.config['TRAZAS_CONFIAR_TRACEPARENT']):
+            muestreada = random.random() < current_app.config['TRAZAS_MUESTREO']
+        if not muestreada:
+            return None
+
+        # La regla y no la ruta pedida, que puede incluir datos personales (por ejemplo, un email)
+        regla = request.url_rule.rule if request.url_rule is not None else '(sin ruta)'
+        span, _ = iniciar_traza(f'{request.method} {regla}', 'api', id_traza, id_padre)
+        span.atributos['ruta'] = regla
+        g._traza_span = span
+        with self._candado:
+            self.muestreadas += 1
+        return None
+
+    def anotar(self, respuesta: Response) -> Response:
+        span = g.get('_traza_span')
+        if span is not None:
+            span.atributos['estado'] = respuesta.status_code
+            respuesta.headers['traceparent'] = f'00-{span.traza.id}-{span.id}-01'
+        return respuesta
+
+    def terminar(self, excepcion=None):
+        span = g.pop('_traza_span', None)
+        if span is None:
+            return
+        if excepcion is not None:
+            span.error = tipo_error(excepcion)
+        # Con streaming el teardown puede correr en otro contexto: se limpia en lugar de restaurar el token
+        terminar_traza(span, None, self.exportador)
+
+    def consultar(self) -> Response:
+        try:
+            limite = int(request.args.get('limite', 20))
+            duracion_minima_ms = float(request.args.get('min_ms', 0))
+        except ValueError:
+            return Response(json.dumps(dict(error="limite y min_ms deben ser numéricos")), status=400, mimetype='application/json')
+
+        trazas = self.buffer.consultar(
+            id=request.args.get('id'),
+            nombre=request.args.get('nombre'),
+            duracion_minima_ms=duracion_minima_ms,
+            limite=max(limite, 0),
+        )
+        return Response(json.dumps(dict(trazas=trazas), default=str), mimetype='application/json')
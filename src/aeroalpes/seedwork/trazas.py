@@ -0,0 +1,284 @@
+"""Trazas distribuidas entre capas reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará los spans que las clases base del seedwork
+(`Servicio`, `Fabrica`, `Mapeador` y `Repositorio`) abren alrededor de sus
+métodos públicos. El span actual se propaga con `contextvars`, así una traza
+sigue a la petición por todas las capas sin depender de Flask ni de pasar
+argumentos. Fuera de una traza muestreada un método solo paga una lectura
+del contexto.
+
+Las trazas terminadas se entregan a un exportador: un buffer circular en
+memoria que se puede consultar o un archivo JSON lines.
+
+"""
+
+import functools
+import inspect
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+_span_actual: ContextVar['Span'] = ContextVar('span_actual', default=None)
+
+_reloj = time.perf_counter
+
+def _nuevo_id(bits: int) -> str:
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+class Traza:
+    """Spans de una misma operación, normalmente una petición HTTP"""
+
+    __slots__ = ('id', 'spans', 'inicio', 'terminada')
+
+    def __init__(self, id: str = None):
+        self.id = id or _nuevo_id(128)
+        self.spans: list[Span] = list()
+        self.inicio = time.time()
+        self.terminada = False
+
+    @property
+    def raiz(self) -> 'Span':
+        return self.spans[0] if self.spans else None
+
+    def a_dict(self) -> dict:
+        raiz = self.raiz
+        origen = raiz.marca if raiz is not None else 0.0
+        return dict(
+            id=self.id,
+            nombre=raiz.nombre if raiz is not None else None,
+            inicio=self.inicio,
+            duracion_ms=raiz.duracion * 1000 if raiz is not None else 0.0,
+            spans=[span.a_dict(origen) for span in self.spans],
+        )
+
+def tipo_error(excepcion: BaseException) -> str:
+    return type(excepcion).__name__
+
+class Span:
+    """Intervalo de tiempo de una operación dentro de una traza"""
+
+    __slots__ = ('traza', 'id', 'id_padre', 'nombre', 'capa', 'atributos', 'error', 'marca', 'duracion')
+
+    def __init__(self, traza: Traza, nombre: str, capa: str, id_padre: str = None):
+        self.traza = traza
+        self.id = _nuevo_id(64)
+        self.id_padre = id_padre
+        self.nombre = nombre
+        self.capa = capa
+        self.atributos: dict = dict()
+        # Solo el tipo de la excepción: sus mensajes pueden incluir datos personales (por ejemplo, un email)
+        self.error: str = None
+        self.marca = _reloj()
+        self.duracion = 0.0
+        traza.spans.append(self)
+
+    def a_dict(self, origen: float) -> dict:
+        return dict(
+            id=self.id,
+            padre=self.id_padre,
+            nombre=self.nombre,
+            capa=self.capa,
+            inicio_ms=(self.marca - origen) * 1000,
+            duracion_ms=self.duracion * 1000,
+            atributos=self.atributos,
+            error=self.error,
+        )
+
+def span_actual() -> Span:
+    return _span_actual.get()
+
+def iniciar_traza(nombre: str, capa: str, id_traza: str = None, id_padre: str = None):
+    """Abre el span raíz de una traza nueva y lo deja como span actual
+
+    Retorna el span y el token para restaurar el contexto con `terminar_traza`.
+    `id_traza` e `id_padre` permiten continuar una traza iniciada por otro servicio.
+    """
+    span = Span(Traza(id_traza), nombre, capa, id_padre)
+    return span, _span_actual.set(span)
+
+def terminar_traza(span: Span, token, exportador: 'Exportador' = None):
+    """Cierra el span raíz y exporta la traza; sin `token` el contexto queda sin span actual"""
+    span.duracion = _reloj() - span.marca
+    span.traza.terminada = True
+    if token is not None:
+        _span_actual.reset(token)
+    else:
+        _span_actual.set(None)
+    if exportador is not None:
+        exportador.exportar(span.traza)
+
+def abrir_span(nombre: str, capa: str):
+    """Abre un span hijo del span actual; retorna None si no hay una traza en curso"""
+    padre = _span_actual.get()
+    if padre is None or padre.traza.terminada:
+        return None
+    span = Span(padre.traza, nombre, capa, padre.id)
+    return span, _span_actual.set(span)
+
+def cerrar_span(abierto, excepcion: BaseException = None):
+    if abierto is None:
+        return
+    span, token = abierto
+    span.duracion = _reloj() - span.marca
+    if excepcion is not None:
+        span.error = tipo_error(excepcion)
+    _span_actual.reset(token)
+
+def trazar_metodos(clase: type, capa: str) -> type:
+    """Abre un span `<Clase>.<método>` en `capa` alrededor de los métodos públicos definidos en `clase`
+
+    Las clases base del seedwork lo llaman desde `__init_subclass__`; los
+    métodos abstractos y los ya trazados se dejan como están.
+    """
+    for nombre, metodo in list(vars(clase).items()):
+        if (nombre.startswith('_') or not inspect.isfunction(metodo)
+                or getattr(metodo, '__isabstractmethod__', False) or hasattr(metodo, '__traza__')):
+            continue
+        nombre_span = f'{clase.__name__}.{nombre}'
+        if inspect.isgeneratorfunction(metodo):
+            envoltura = _envolver_generador(metodo, nombre_span, capa)
+        else:
+            envoltura = _envolver(metodo, nombre_span, capa)
+        envoltura.__traza__ = capa
+        setattr(clase, nombre, envoltura)
+    return clase
+
+def _envolver(metodo, nombre: str, capa: str):
+    @functools.wraps(metodo)
+    def trazado(*args, **kwargs):
+        if _span_actual.get() is None:
+            return metodo(*args, **kwargs)
+        abierto = abrir_span(nombre, capa)
+        try:
+            resultado = metodo(*args, **kwargs)
+        except BaseException as e:
+            cerrar_span(abierto, e)
+            raise
+        cerrar_span(abierto)
+        return resultado
+    return trazado
+
+def _envolver_generador(metodo, nombre: str, capa: str):
+    # El span de un generador solo acumula el tiempo en que produce elementos,
+    # y el contexto se restaura en cada `yield` para no filtrarse al consumidor
+    @functools.wraps(metodo)
+    def trazado(*args, **kwargs):
+        generador = metodo(*args, **kwargs)
+        span = None
+        while True:
+            if span is None:
+                abierto = abrir_span(nombre, capa)
+                if abierto is not None:
+                    span, token = abierto
+                    span.duracion = 0.0
+            else:
+                token = _span_actual.set(span)
+            inicio = _reloj()
+            try:
+                elemento = next(generador)
+            except StopIteration:
+                return
+            except BaseException as e:
+                if span is not None:
+                    span.error = tipo_error(e)
+                raise
+            finally:
+                if span is not None:
+                    span.duracion += _reloj() - inicio
+                    _span_actual.reset(token)
+            yield elemento
+    return trazado
+
+def _antes_de_flush(sesion, contexto, instancias):
+    abierto = abrir_span('sqlalchemy.flush', 'flush')
+    if abierto is not None:
+        sesion.info['_span_flush'] = abierto
+
+def _despues_de_flush(sesion, contexto):
+    cerrar_span(sesion.info.pop('_span_flush', None))
+
+def _antes_de_commit(sesion):
+    abierto = abrir_span('sqlalchemy.commit', 'commit')
+    if abierto is not None:
+        sesion.info['_span_commit'] = abierto
+
+def _despues_de_commit(sesion):
+    # Un flush que falló no llega a `after_flush_postexec`; se cierra con el rollback
+    cerrar_span(sesion.info.pop('_span_flush', None))
+    cerrar_span(sesion.info.pop('_span_commit', None))
+
+def trazar_sesion(sesion):
+    """Abre spans para los flush y commits de una sesión de SQLAlchemy (o `scoped_session`)"""
+    from sqlalchemy import event
+
+    if event.contains(sesion, 'before_flush', _antes_de_flush):
+        return
+    event.listen(sesion, 'before_flush', _antes_de_flush)
+    event.listen(sesion, 'after_flush_postexec', _despues_de_flush)
+    event.listen(sesion, 'before_commit', _antes_de_commit)
+    event.listen(sesion, 'after_commit', _despues_de_commit)
+    event.listen(sesion, 'after_rollback', _despues_de_commit)
+
+class Exportador:
+    def exportar(self, traza: Traza):
+        raise NotImplementedError
+
+class BufferCircular(Exportador):
+    """Conserva en memoria las últimas `capacidad` trazas terminadas"""
+
+    def __init__(self, capacidad: int = 1000):
+        self._trazas: deque[Traza] = deque(maxlen=capacidad)
+        self._candado = threading.Lock()
+        self.exportadas = 0
+
+    def exportar(self, traza: Traza):
+        with self._candado:
+            self._trazas.append(traza)
+            self.exportadas += 1
+
+    def consultar(self, id: str = None, nombre: str = None, duracion_minima_ms: float = 0.0, limite: int = 20) -> list[dict]:
+        """Trazas más recientes primero, filtradas por id, por nombre del span raíz o por duración"""
+        with self._candado:
+            trazas = list(self._trazas)
+        resultado = list()
+        for traza in reversed(trazas):
+            if len(resultado) >= limite:
+                break
+            raiz = traza.raiz
+            if id is not None and traza.id != id:
+                continue
+            if nombre is not None and (raiz is None or nombre not in raiz.nombre):
+                continue
+            if raiz is None or raiz.duracion * 1000 < duracion_minima_ms:
+                continue
+            resultado.append(traza.a_dict())
+        return resultado
+
+    def __len__(self) -> int:
+        return len(self._trazas)
+
+class ArchivoJSONL(Exportador):
+    """Agrega cada traza terminada como una línea JSON al final de `ruta`"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._candado = threading.Lock()
+        self.exportadas = 0
+
+    def exportar(self, traza: Traza):
+        linea = json.dumps(traza.a_dict(), default=str) + '\n'
+        with self._candado:
+            with open(self.ruta, 'a', encoding='utf-8') as archivo:
+                archivo.write(linea)
+            self.exportadas += 1
+
+class Exportadores(Exportador):
+    def __init__(self, *exportadores: Exportador):
+        self.exportadores = exportadores
+
+    def exportar(self, traza: Traza):
+        for exportador in self.exportadores:
+            exportador.exportar(traza)
@@ -50,6 +50,10 @@ def only_teardown():
     # close and remove the temporary database
     os.close(unique_db_fd)
     os.unlink(unique_db_path)
+    # En WAL, SQLite deja estos archivos mientras haya conexiones abiertas
+    for sufijo in ('-wal', '-shm'):
+        if os.path.exists(unique_db_path + sufijo):
+            os.unlink(unique_db_path + sufijo)
 
 def test_servidor_levanta(client):
 
@@ -119,4 +123,679 @@ def test_reservar_vuelo(client):
 def test_reservar_vuelo_error_informacion_duplicada(client):
     rv = client.post('/vuelos/reserva', data=json.dumps(reserva_correcta()), content_type='application/json')
     assert rv is not None
-    assert rv.status_code == 500
\ No newline at end of file
+    assert rv.status_code == 500
+
+def test_spec_se_sirve_con_etag(client):
+    # Dado el documento OpenAPI precalculado
+    rv = client.get('/spec')
+    etag = rv.headers['ETag']
+
+    assert rv.status_code == 200
+    assert etag is not None
+    assert json.loads(rv.data)['info']['title'] == "My API"
+
+    # Cuando el cliente envía el mismo ETag, no se retransmite el cuerpo
+    rv = client.get('/spec', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.data == b''
+
+def test_spec_se_sirve_comprimido(client):
+    import gzip
+
+    # Dado un cliente que acepta gzip
+    rv = client.get('/spec', headers={'Accept-Encoding': 'gzip'})
+
+    # Entonces recibe la versión comprimida del mismo documento
+    assert rv.status_code == 200
+    assert rv.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(rv.data))['swagger'] == "2.0"
+
+def test_spec_se_reconstruye_al_cambiar_las_rutas(tmp_path):
+    from aeroalpes.api import huella_rutas
+
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "spec.db")})
+    huella = huella_rutas(app)
+
+    # Una vista documentada que reemplaza a otra no cambia la cantidad de vistas registradas
+    def health():
+        """
+        Estado del servicio
+        ---
+        responses:
+          200:
+            description: El servicio está arriba
+        """
+        return {"status": "up"}
+
+    app.view_functions['health'] = health
+    assert huella_rutas(app) != huella
+
+    rv = app.test_client().get('/spec')
+    assert '/health' in rv.json['paths']
+
+def test_spec_no_recorre_las_rutas_en_cada_peticion(tmp_path, monkeypatch):
+    import aeroalpes.api as modulo_api
+
+    recorridos = list()
+    huella_rutas = modulo_api.huella_rutas
+    monkeypatch.setattr(modulo_api, 'huella_rutas', lambda app: recorridos.append(app) or huella_rutas(app))
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "spec.db")})
+    cliente = app.test_client()
+
+    # Las rutas se recorren en el primer /spec y no en los siguientes
+    for _ in range(3):
+        assert cliente.get('/spec').status_code == 200
+    assert len(recorridos) == 1
+
+    # Hasta que se reemplaza una vista
+    app.view_functions['health'] = lambda: {"status": "up"}
+    assert cliente.get('/spec').status_code == 200
+    assert len(recorridos) == 2
+
+def test_listar_usuarios_paginado_sin_registros(client):
+    # Dada una base de datos sin usuarios
+    rv = client.get('/cliente/usuarios?limite=10')
+
+    # Entonces responde una página vacía sin cursor siguiente
+    assert rv.status_code == 200
+    assert rv.json == []
+    assert 'X-Siguiente-Cursor' not in rv.headers
+
+def test_listar_usuarios_ndjson_sin_registros(client):
+    rv = client.get('/cliente/usuarios?formato=ndjson')
+
+    assert rv.status_code == 200
+    assert rv.mimetype == 'application/x-ndjson'
+    assert rv.data == b''
+
+def test_listar_usuarios_parametros_invalidos(client):
+    # Un límite no numérico o un cursor corrupto son errores del cliente
+    assert client.get('/cliente/usuarios?limite=abc').status_code == 400
+    assert client.get('/cliente/usuarios?limite=0').status_code == 400
+    assert client.get('/cliente/usuarios?cursor=no-es-un-cursor').status_code == 400
+
+@pytest.fixture
+def client_aislado(tmp_path):
+    """Cliente sobre una base de datos propia, para pruebas que dependen del contenido de las tablas"""
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "aislada.db")})
+    return app.test_client()
+
+def usuario_natural(i: int):
+    return {
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Prueba{i}",
+        "email": f"usuario{i}@example.com",
+        "cedula": f"{1000 + i}",
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [
+            {"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{i}", "datos_ofuscados": "****1234"}
+        ]
+    }
+
+def crear_usuarios(client, cantidad: int) -> list[str]:
+    ids = list()
+    for i in range(cantidad):
+        rv = client.post('/cliente/usuarios', data=json.dumps(usuario_natural(i)), content_type='application/json')
+        assert rv.status_code == 201, rv.data
+        ids.append(rv.json['id'])
+    return ids
+
+def test_listar_usuarios_por_paginas(client_aislado):
+    # Dados cinco usuarios registrados
+    ids = crear_usuarios(client_aislado, 5)
+
+    # Cuando se recorren las páginas siguiendo el cursor
+    paginas = list()
+    rv = client_aislado.get('/cliente/usuarios?limite=2')
+    while True:
+        assert rv.status_code == 200
+        paginas.append([usuario['id'] for usuario in rv.json])
+        cursor = rv.headers.get('X-Siguiente-Cursor')
+        if not cursor:
+            break
+        assert 'rel="next"' in rv.headers['Link']
+        rv = client_aislado.get('/cliente/usuarios', query_string={'limite': 2, 'cursor': cursor})
+
+    # Entonces cada usuario aparece una sola vez, en orden de creación
+    assert [len(pagina) for pagina in paginas] == [2, 2, 1]
+    assert [id for pagina in paginas for id in pagina] == ids
+
+def test_listar_usuarios_ndjson(client_aislado):
+    ids = crear_usuarios(client_aislado, 3)
+
+    rv = client_aislado.get('/cliente/usuarios', headers={'Accept': 'application/x-ndjson'})
+
+    assert rv.status_code == 200
+    lineas = [json.loads(linea) for linea in rv.data.splitlines()]
+    assert [usuario['id'] for usuario in lineas] == ids
+    assert lineas[0]['metodos_pago'][0]['datos_ofuscados'] == "****1234"
+
+def test_listar_usuarios_ndjson_reporta_error_durante_la_transmision(client_aislado, monkeypatch):
+    from aeroalpes.modulos.cliente.aplicacion.mapeadores import MapeadorUsuarioDTOJson
+
+    crear_usuarios(client_aislado, 3)
+    original = MapeadorUsuarioDTOJson.dto_a_json
+    llamados = list()
+
+    def dto_a_json_con_falla(self, dto):
+        llamados.append(dto)
+        if len(llamados) == 2:
+            raise RuntimeError("falla de serialización")
+        return original(self, dto)
+
+    monkeypatch.setattr(MapeadorUsuarioDTOJson, 'dto_a_json', dto_a_json_con_falla)
+
+    # Cuando falla un usuario después de enviar los encabezados
+    rv = client_aislado.get('/cliente/usuarios?formato=ndjson')
+
+    # Entonces la respuesta termina con una línea de error en lugar de cortarse
+    lineas = [json.loads(linea) for linea in rv.data.splitlines()]
+    assert rv.status_code == 200
+    assert 'id' in lineas[0]
+    assert lineas[-1] == {"error": "Error interno: falla de serialización"}
+
+def sentencias_sql(app) -> list[str]:
+    """Registra las sentencias SQL que se ejecutan sobre la base de datos de `app`"""
+    from sqlalchemy import event
+    from aeroalpes.config.db import engines
+
+    sentencias = list()
+    with app.app_context():
+        # Las consultas van al engine de lectura y los comandos al primario
+        for engine in engines():
+            event.listen(engine, 'before_cursor_execute', lambda conn, cursor, sql, *args: sentencias.append(sql))
+    return sentencias
+
+def test_obtener_usuario_con_campos(client_aislado):
+    # Dado un usuario registrado
+    id_usuario, = crear_usuarios(client_aislado, 1)
+    completo = client_aislado.get(f'/cliente/usuarios/{id_usuario}').json
+    sentencias = sentencias_sql(client_aislado.application)
+
+    # Cuando se piden solo algunos campos
+    rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}?fields=nombre,email')
+
+    # Entonces se responde el id y esos campos, sin consultar los métodos de pago
+    assert rv.status_code == 200
+    assert rv.json == {'id': id_usuario, 'nombre': completo['nombre'], 'email': completo['email']}
+    assert not any('metodos_pago' in sentencia for sentencia in sentencias)
+
+    # Y todos los campos pedidos explícitamente coinciden con la representación completa
+    campos = ','.join(completo)
+    assert client_aislado.get(f'/cliente/usuarios/{id_usuario}?fields={campos}').json == completo
+    assert client_aislado.get(f'/cliente/usuarios/email/usuario0@example.com?fields={campos}').json == completo
+
+def test_obtener_usuario_con_campos_desconocidos(client_aislado):
+    id_usuario, = crear_usuarios(client_aislado, 1)
+
+    rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}?fields=nombre,clave')
+
+    assert rv.status_code == 400
+    assert rv.json['error'] == "Campos desconocidos en fields: clave"
+    assert client_aislado.get('/cliente/usuarios?fields=clave').status_code == 400
+
+def test_listar_usuarios_con_campos(client_aislado):
+    ids = crear_usuarios(client_aislado, 3)
+
+    # La paginación conserva los campos en el enlace a la siguiente página
+    rv = client_aislado.get('/cliente/usuarios?limite=2&fields=email')
+    assert rv.json == [{'id': id, 'email': f'usuario{i}@example.com'} for i, id in enumerate(ids[:2])]
+    assert 'fields=email' in rv.headers['Link']
+    rv = client_aislado.get('/cliente/usuarios', query_string={'limite': 2, 'cursor': rv.headers['X-Siguiente-Cursor'], 'fields': 'email'})
+    assert rv.json == [{'id': ids[2], 'email': 'usuario2@example.com'}]
+
+    # Y el flujo NDJSON también se proyecta, con los métodos de pago cargados por lote
+    rv = client_aislado.get('/cliente/usuarios?formato=ndjson&fields=metodos_pago')
+    lineas = [json.loads(linea) for linea in rv.data.splitlines()]
+    assert [list(linea) for linea in lineas] == [['id', 'metodos_pago']] * 3
+    assert [linea['metodos_pago'][0]['token_seguridad'] for linea in lineas] == ['tok_0', 'tok_1', 'tok_2']
+
+def test_crear_usuarios_en_lote_reporta_errores_por_elemento(client):
+    # Dado un lote con elementos que no son objetos JSON
+    rv = client.post('/cliente/usuarios/bulk', data=json.dumps([1, "texto"]), content_type='application/json')
+
+    # Entonces cada elemento se reporta con su error
+    assert rv.status_code == 207
+    assert rv.json['total'] == 2
+    assert rv.json['creados'] == 0
+    assert [e['indice'] for e in rv.json['errores']] == [0, 1]
+
+def test_crear_usuarios_en_lote_ndjson(client):
+    cuerpo = '{"tipo_usuario": 1}\n\nno-es-json\n'
+    rv = client.post('/cliente/usuarios/bulk', data=cuerpo, content_type='application/x-ndjson')
+
+    assert rv.status_code == 207
+    assert rv.json['total'] == 2
+    assert rv.json['errores'][1] == dict(indice=1, error="El elemento no es un objeto JSON válido")
+
+def test_crear_usuarios_en_lote_cuerpo_invalido(client):
+    rv = client.post('/cliente/usuarios/bulk', data=json.dumps({"no": "es lista"}), content_type='application/json')
+    assert rv.status_code == 400
+
+def test_obtener_usuario_con_get_condicional(client_aislado):
+    # Dado un usuario creado
+    id_usuario, = crear_usuarios(client_aislado, 1)
+
+    # Cuando se consulta, la respuesta incluye los validadores de caché
+    rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}')
+    assert rv.status_code == 200
+    etag = rv.headers['ETag']
+    ultima_modificacion = rv.headers['Last-Modified']
+
+    # Entonces una consulta condicional vigente responde 304 sin cuerpo
+    rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.data == b''
+    assert rv.headers['ETag'] == etag
+
+    rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}', headers={'If-Modified-Since': ultima_modificacion})
+    assert rv.status_code == 304
+
+    # Y después de actualizar el usuario la copia anterior deja de ser vigente
+    rv = client_aislado.put(f'/cliente/usuarios/{id_usuario}', data=json.dumps({"nombre": "Nuevo Nombre"}),
+                            content_type='application/json')
+    assert rv.status_code == 200
+    rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}', headers={'If-None-Match': etag})
+    assert rv.status_code == 200
+    assert rv.headers['ETag'] != etag
+    assert rv.json['nombre'] == "Nuevo Nombre"
+
+def test_metricas_por_ruta_y_capa(client_aislado):
+    crear_usuarios(client_aislado, 1)
+    client_aislado.get('/cliente/usuarios')
+
+    lineas = client_aislado.get('/metrics').get_data(as_text=True).splitlines()
+
+    assert 'aeroalpes_peticiones_total{endpoint="/cliente/usuarios",metodo="POST",estado="201"} 1' in lineas
+    assert 'aeroalpes_peticiones_total{endpoint="/cliente/usuarios",metodo="GET",estado="200"} 1' in lineas
+    for capa in ('mapeador', 'fabrica', 'repositorio', 'commit'):
+        assert f'aeroalpes_capa_duracion_segundos_count{{endpoint="/cliente/usuarios",metodo="POST",capa="{capa}"}} 1' in lineas
+    assert 'aeroalpes_admision_en_curso 0' in lineas
+
+def test_crear_usuarios_en_lote_persiste_los_validos(client_aislado):
+    # Dado un lote con tres usuarios válidos, un email repetido y un elemento inválido
+    lote = [usuario_natural(1), usuario_natural(2), usuario_natural(1), {"tipo_usuario": 1}, usuario_natural(3)]
+    rv = client_aislado.post('/cliente/usuarios/bulk', data=json.dumps(lote), content_type='application/json')
+
+    # Entonces se crean los válidos y se reportan los demás por elemento
+    assert rv.status_code == 207
+    assert rv.json['total'] == 5
+    assert rv.json['creados'] == 3
+    assert [e['indice'] for e in rv.json['errores']] == [2, 3]
+    assert 'ya está registrado' in rv.json['errores'][0]['error']
+
+    # Y los usuarios creados se pueden consultar
+    ids = [creado['id'] for creado in rv.json['resultados']]
+    for id, indice in zip(ids, (1, 2, 3)):
+        rv = client_aislado.get(f'/cliente/usuarios/{id}')
+        assert rv.status_code == 200
+        assert rv.json['email'] == f"usuario{indice}@example.com"
+        assert rv.json['metodos_pago'][0]['token_seguridad'] == f"tok_{indice}"
+
+    rv = client_aislado.get('/cliente/usuarios')
+    assert sorted(usuario['id'] for usuario in rv.json) == sorted(ids)
+
+def test_crear_usuarios_en_lote_ndjson_todos_validos(client_aislado):
+    cuerpo = "\n".join(json.dumps(usuario_natural(i)) for i in range(4))
+    rv = client_aislado.post('/cliente/usuarios/bulk', data=cuerpo, content_type='application/x-ndjson')
+
+    assert rv.status_code == 201
+    assert rv.json['creados'] == 4
+    assert len(client_aislado.get('/cliente/usuarios').json) == 4
+
+def reserva_con_fecha(dia: int):
+    reserva = reserva_correcta()
+    for leg in reserva["itinerarios"][0]["odos"][0]["segmentos"][0]["legs"]:
+        leg["fecha_salida"] = leg["fecha_salida"].replace("2022-11-22", f"2023-01-{dia:02d}")
+        leg["fecha_llegada"] = leg["fecha_llegada"].replace("2022-11-22", f"2023-01-{dia:02d}")
+    return reserva
+
+def test_reservar_en_lote(client):
+    # Dado un lote con dos reservas válidas y dos inválidas
+    lote = [reserva_con_fecha(1), reserva_con_fecha(5), {"itinerarios": []}, "no-es-reserva"]
+    rv = client.post('/vuelos/reserva/bulk', data=json.dumps(lote), content_type='application/json')
+
+    # Entonces se crean las válidas y se reportan los errores por elemento
+    assert rv.status_code == 207
+    assert rv.json['total'] == 4
+    assert rv.json['creadas'] == 2
+    assert [e['indice'] for e in rv.json['errores']] == [2, 3]
+    assert rv.json['reservas_por_segundo'] > 0
+
+def test_reservar_en_lote_reporta_itinerarios_duplicados(client):
+    # Dado un lote donde una reserva repite los legs de otra del lote y otra los de una reserva existente
+    lote = [reserva_con_fecha(6), reserva_con_fecha(6), reserva_con_fecha(1), reserva_con_fecha(7)]
+    rv = client.post('/vuelos/reserva/bulk', data=json.dumps(lote), content_type='application/json')
+
+    # Entonces, igual que en POST /vuelos/reserva, se reportan como información duplicada sin afectar a las demás
+    assert rv.status_code == 207
+    assert rv.json['creadas'] == 2
+    assert [e['indice'] for e in rv.json['errores']] == [1, 2]
+    assert all("ya registrados" in e['error'] for e in rv.json['errores'])
+
+def test_reservar_en_lote_ndjson(client):
+    cuerpo = "\n".join(json.dumps(reserva_con_fecha(dia)) for dia in (2, 3, 4))
+    rv = client.post('/vuelos/reserva/bulk', data=cuerpo, content_type='application/x-ndjson')
+
+    assert rv.status_code == 201
+    assert rv.json['creadas'] == 3
+
+def test_obtener_reserva_con_get_condicional(client):
+    # Dada una reserva creada
+    rv = client.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(10)), content_type='application/json')
+    id_reserva = rv.json['id']
+
+    # Cuando se consulta, la respuesta incluye los validadores de caché
+    rv = client.get(f'/vuelos/reserva/{id_reserva}')
+    assert rv.status_code == 200
+    etag = rv.headers['ETag']
+    ultima_modificacion = rv.headers['Last-Modified']
+
+    # Entonces una consulta condicional vigente responde 304 sin cuerpo
+    rv = client.get(f'/vuelos/reserva/{id_reserva}', headers={'If-None-Match': etag})
+    assert rv.status_code == 304
+    assert rv.data == b''
+
+    rv = client.get(f'/vuelos/reserva/{id_reserva}', headers={'If-Modified-Since': ultima_modificacion})
+    assert rv.status_code == 304
+
+    # Y un ETag distinto obtiene la representación completa
+    rv = client.get(f'/vuelos/reserva/{id_reserva}', headers={'If-None-Match': '"otro"'})
+    assert rv.status_code == 200
+
+def test_obtener_reserva_comprimida(client):
+    import gzip
+
+    # Dada una reserva con itinerarios anidados
+    rv = client.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(11)), content_type='application/json')
+    id_reserva = rv.json['id']
+
+    # Cuando el cliente acepta gzip, la reserva se entrega comprimida con un ETag propio de la codificación
+    rv = client.get(f'/vuelos/reserva/{id_reserva}', headers={'Accept-Encoding': 'gzip'})
+    assert rv.status_code == 200
+    assert rv.headers['Content-Encoding'] == 'gzip'
+    etag_gzip = rv.headers['ETag']
+    assert etag_gzip.endswith('-gzip"') and not etag_gzip.startswith('W/')
+    assert len(json.loads(gzip.decompress(rv.data))['itinerarios']) == 1
+
+    # Y la consulta condicional responde 304 con el mismo validador
+    rv = client.get(f'/vuelos/reserva/{id_reserva}',
+                    headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag_gzip})
+    assert rv.status_code == 304
+    assert rv.headers['ETag'] == etag_gzip
+
+    # Mientras que la representación sin comprimir conserva el ETag base
+    rv = client.get(f'/vuelos/reserva/{id_reserva}')
+    assert rv.headers['ETag'] == etag_gzip.replace('-gzip', '')
+
+def test_trazas_de_reservar_por_capa(tmp_path):
+    client_aislado = create_app({"TESTING": True, "DATABASE": str(tmp_path / "trazas.db"),
+                                 "TRAZAS_RUTA": "/debug/trazas", "TRAZAS_CONFIAR_TRACEPARENT": True}).test_client()
+
+    # Dada una reserva enviada con una traza muestreada
+    id_traza = '4bf92f3577b34da6a3ce929d0e0e4736'
+    rv = client_aislado.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(12)), content_type='application/json',
+                             headers={'traceparent': f'00-{id_traza}-00f067aa0ba902b7-01'})
+    assert rv.status_code == 200
+    assert rv.headers['traceparent'].startswith(f'00-{id_traza}-')
+
+    # Entonces la traza tiene spans de cada capa, desde la API hasta el flush de SQLAlchemy
+    traza = client_aislado.get(f'/debug/trazas?id={id_traza}').json['trazas'][0]
+    assert traza['nombre'] == 'POST /vuelos/reserva'
+    capas = {span['capa'] for span in traza['spans']}
+    assert {'api', 'servicio', 'fabrica', 'mapeador', 'repositorio', 'commit', 'flush'} <= capas
+    nombres = {span['nombre'] for span in traza['spans']}
+    assert {'MapeadorReservaDTOJson.externo_a_dto', 'MapeadorReserva.dto_a_entidad', '_FabricaReserva.crear_objeto',
+            'RepositorioReservasSQLite.agregar'} <= nombres
+
+def test_obtener_reserva_con_campos(client_aislado):
+    # Dada una reserva con itinerarios
+    rv = client_aislado.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(13)), content_type='application/json')
+    id_reserva = rv.json['id']
+    completa = client_aislado.get(f'/vuelos/reserva/{id_reserva}').json
+    sentencias = sentencias_sql(client_aislado.application)
+
+    # Cuando se piden campos sin itinerarios, no se consultan los itinerarios
+    rv = client_aislado.get(f'/vuelos/reserva/{id_reserva}?fields=fecha_creacion')
+    assert rv.status_code == 200
+    assert rv.json == {'_id': id_reserva, 'fecha_creacion': completa['fecha_creacion']}
+    assert not any('itinerarios' in sentencia for sentencia in sentencias)
+
+    # Con itinerarios se obtiene esa parte de la reserva completa
+    rv = client_aislado.get(f'/vuelos/reserva/{id_reserva}?fields=itinerarios')
+    assert set(rv.json) == {'_id', 'itinerarios'}
+    legs = lambda reserva: [(leg['fecha_salida'], leg['origen']['codigo'], leg['destino']['codigo'])
+                            for leg in reserva['itinerarios'][0]['odos'][0]['segmentos'][0]['legs']]
+    assert legs(rv.json) == legs(completa)
+
+    assert client_aislado.get(f'/vuelos/reserva/{id_reserva}?fields=pasajeros').status_code == 400
+
+def test_reintentos_con_idempotency_key(client_aislado):
+    # Dado un reintento de la misma reserva con la misma llave
+    cuerpo = json.dumps(reserva_con_fecha(14))
+    primera = client_aislado.post('/vuelos/reserva', data=cuerpo, content_type='application/json', headers={'Idempotency-Key': 'r-1'})
+    segunda = client_aislado.post('/vuelos/reserva', data=cuerpo, content_type='application/json', headers={'Idempotency-Key': 'r-1'})
+
+    # Entonces se repite la respuesta original en lugar de reportar información duplicada
+    assert primera.status_code == segunda.status_code == 200
+    assert segunda.json['id'] == primera.json['id']
+    assert segunda.headers['Idempotent-Replayed'] == 'true'
+
+    # Igual para la creación de usuarios
+    usuario = json.dumps(usuario_natural(1))
+    rv = [client_aislado.post('/cliente/usuarios', data=usuario, content_type='application/json', headers={'Idempotency-Key': 'u-1'})
+          for _ in range(2)]
+    assert [r.status_code for r in rv] == [201, 201]
+    assert rv[0].json['id'] == rv[1].json['id']
+
+def test_obtener_usuarios_por_ids_en_lote(client_aislado):
+    # Dados tres usuarios registrados
+    ids = crear_usuarios(client_aislado, 3)
+    inexistente = '00000000-0000-0000-0000-000000000000'
+    sentencias = sentencias_sql(client_aislado.application)
+
+    # Cuando se piden por ids, con uno repetido y uno inexistente
+    rv = client_aislado.get('/cliente/usuarios', query_string={'ids': ','.join([ids[2], ids[0], inexistente, ids[2]])})
+
+    # Entonces se responden en el orden pedido, con una consulta para usuarios y otra para sus métodos de pago
+    assert rv.status_code == 200
+    assert [usuario['id'] for usuario in rv.json] == [ids[2], ids[0]]
+    assert rv.json[0]['metodos_pago'][0]['token_seguridad'] == 'tok_2'
+    consultas = [sentencia for sentencia in sentencias if sentencia.lstrip().upper().startswith('SELECT')]
+    assert len(consultas) == 2
+    assert ' IN ' in consultas[0]
+
+    assert client_aislado.get('/cliente/usuarios?ids=no-es-uuid').status_code == 400
+    assert client_aislado.get(f'/cliente/usuarios?ids={ids[0]}&fields=email').status_code == 400
+
+def test_obtener_reservas_por_ids_en_lote(client_aislado):
+    # Dadas dos reservas
+    ids = [client_aislado.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(dia)), content_type='application/json').json['id']
+           for dia in (15, 16)]
+    sentencias = sentencias_sql(client_aislado.application)
+
+    # Cuando se piden por ids
+    rv = client_aislado.get('/vuelos/reserva', query_string={'ids': f'{ids[1]},{ids[0]}'})
+
+    # Entonces se leen con una consulta para las reservas y otra para sus itinerarios
+    assert rv.status_code == 200
+    assert [reserva['_id'] for reserva in rv.json] == [ids[1], ids[0]]
+    assert all(reserva['itinerarios'] for reserva in rv.json)
+    assert len([sentencia for sentencia in sentencias if sentencia.lstrip().upper().startswith('SELECT')]) == 2
+
+    assert client_aislado.get('/vuelos/reserva?ids=').status_code == 400
+
+def test_cargador_por_peticion_reutiliza_las_lecturas(client_aislado):
+    from aeroalpes.modulos.cliente.aplicacion.servicios import CargadorUsuarios, ServicioUsuario
+    from aeroalpes.seedwork.aplicacion.contenedor import resolver
+
+    ids = crear_usuarios(client_aislado, 2)
+    app = client_aislado.application
+    sentencias = sentencias_sql(app)
+
+    # Dentro de una misma petición, el cargador es el mismo y los usuarios leídos no se vuelven a consultar
+    with app.test_request_context():
+        cargador = resolver(CargadorUsuarios)
+        assert resolver(CargadorUsuarios) is cargador
+        servicio = resolver(ServicioUsuario)
+        servicio.obtener_usuarios_por_ids(ids, cargador)
+        antes = len(sentencias)
+        assert [usuario.id for usuario in servicio.obtener_usuarios_por_ids(ids[:1], cargador)] == ids[:1]
+        assert len(sentencias) == antes
+
+    # Y otra petición tiene su propio cargador
+    with app.test_request_context():
+        assert resolver(CargadorUsuarios) is not cargador
+
+def test_lecturas_por_id_de_una_peticion_usan_su_cargador(client_aislado):
+    from aeroalpes.modulos.cliente.aplicacion.servicios import CargadorUsuarios, ServicioUsuario
+    from aeroalpes.seedwork.aplicacion.contenedor import resolver
+
+    ids = crear_usuarios(client_aislado, 3)
+    app = client_aislado.application
+    sentencias = sentencias_sql(app)
+
+    # Dados los ids que una petición va a leer, solicitados a su cargador
+    with app.test_request_context():
+        servicio = resolver(ServicioUsuario)
+        cargador = resolver(CargadorUsuarios)
+        cargador.solicitar(ids)
+
+        # Cuando se leen uno por uno, y alguno más de una vez
+        leidos = [servicio.obtener_usuario_por_id(id, cargador).id for id in ids + ids[:1]]
+
+    # Entonces todos salen de una sola consulta IN a usuarios (más la de sus métodos de pago)
+    assert leidos == ids + ids[:1]
+    consultas_usuarios = [sql for sql in sentencias if 'WHERE usuarios.id' in sql]
+    assert len(consultas_usuarios) == 1
+    assert 'WHERE usuarios.id IN' in consultas_usuarios[0]
+
+def test_lecturas_no_esperan_a_una_escritura_en_curso(client_aislado):
+    import sqlite3
+    import time
+    from sqlalchemy import event
+
+    id_usuario, = crear_usuarios(client_aislado, 1)
+    app = client_aislado.application
+    consultas_lectura = list()
+    with app.app_context():
+        event.listen(app.extensions['lectura'], 'before_cursor_execute', lambda conn, cursor, sql, *args: consultas_lectura.append(sql))
+
+    # Dada una transacción de escritura abierta en otra conexión
+    escritor = sqlite3.connect(app.config['SQLALCHEMY_DATABASE_URI'].removeprefix('sqlite:///'))
+    escritor.execute('BEGIN IMMEDIATE')
+    escritor.execute("UPDATE usuarios SET nombre = 'Sin Confirmar' WHERE id = ?", (id_usuario,))
+    try:
+        # Cuando se consulta el usuario, la lectura no espera a que la escritura termine
+        inicio = time.perf_counter()
+        rv = client_aislado.get(f'/cliente/usuarios/{id_usuario}')
+        assert time.perf_counter() - inicio < 1
+    finally:
+        escritor.rollback()
+        escritor.close()
+
+    # Y se atiende con el engine de lectura, sin ver datos sin confirmar
+    assert rv.status_code == 200
+    assert rv.json['nombre'] == 'Usuario Prueba0'
+    assert consultas_lectura
+
+def test_consultas_de_los_repositorios_usan_indices(runner):
+    # Dada la carga que recorre las consultas y comandos de los repositorios
+    resultado = runner.invoke(args=['planes'])
+
+    # Entonces ningún plan recorre una tabla completa ni ordena con un B-tree temporal
+    assert resultado.exit_code == 0, resultado.output
+    assert 'sentencias revisadas' in resultado.output
+
+def test_escritor_agrupado_comparte_transacciones_entre_peticiones(tmp_path):
+    import threading
+
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "agrupada.db"), "ESCRITOR_AGRUPADO": True,
+                      "ESCRITOR_ESPERA_MS": 20, "ADMISION_HABILITADA": False})
+    estados = list()
+    barrera = threading.Barrier(12)
+
+    def crear(i):
+        cliente = app.test_client()
+        barrera.wait()
+        if i % 3 == 0:
+            rv = cliente.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(17 + i // 3)), content_type='application/json')
+        else:
+            rv = cliente.post('/cliente/usuarios', data=json.dumps(usuario_natural(i)), content_type='application/json')
+        estados.append(rv.status_code)
+
+    # Dadas escrituras concurrentes de usuarios y reservas
+    hilos = [threading.Thread(target=crear, args=(i,)) for i in range(12)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # Entonces todas se confirman, en menos transacciones que peticiones
+    assert sorted(estados) == [200] * 4 + [201] * 8
+    estadisticas = app.extensions['escritor'].estadisticas()
+    assert estadisticas['operaciones'] == 12
+    assert estadisticas['lotes'] < 12
+    assert len(app.test_client().get('/cliente/usuarios').json) == 8
+
+    # Y un email repetido solo hace fallar su propia escritura
+    rv = app.test_client().post('/cliente/usuarios', data=json.dumps(usuario_natural(1)), content_type='application/json')
+    assert rv.status_code == 400
+    app.extensions['escritor'].detener()
+
+def test_cache_de_agregados_evita_releer_e_invalida_al_actualizar(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "cache.db"), "CACHE_AGREGADOS": True})
+    client = app.test_client()
+    id_usuario, = crear_usuarios(client, 1)
+    rv = client.post('/vuelos/reserva', data=json.dumps(reserva_con_fecha(21)), content_type='application/json')
+    id_reserva = rv.json['id']
+
+    # Dadas una lectura de cada agregado, que los guarda en el cache
+    assert client.get(f'/cliente/usuarios/{id_usuario}').status_code == 200
+    assert client.get(f'/vuelos/reserva/{id_reserva}').status_code == 200
+
+    # Cuando se vuelven a leer, solo se consulta su versión
+    sentencias = sentencias_sql(app)
+    rv = client.get(f'/cliente/usuarios/{id_usuario}')
+    assert rv.json['email'] == 'usuario0@example.com'
+    assert client.get(f'/vuelos/reserva/{id_reserva}').status_code == 200
+    assert not [sql for sql in sentencias if 'metodos_pago' in sql or 'itinerarios' in sql]
+
+    # Y una actualización invalida el usuario guardado
+    rv = client.put(f'/cliente/usuarios/{id_usuario}', data=json.dumps({"nombre": "Otro Nombre", "email": "otro@example.com"}),
+                    content_type='application/json')
+    assert rv.status_code == 200
+    assert client.get(f'/cliente/usuarios/{id_usuario}').json['nombre'] == 'Otro Nombre'
+    assert client.get('/cliente/usuarios/email/otro@example.com').json['id'] == id_usuario
+
+    lineas = client.get('/metrics').get_data(as_text=True).splitlines()
+    aciertos = [linea for linea in lineas if linea.startswith('aeroalpes_cache_agregados_aciertos ')]
+    assert aciertos and int(aciertos[0].split()[1]) >= 2
+
+def test_filtro_de_emails_evita_consultas_e_inserciones_que_fallarian(tmp_path):
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "filtro.db"), "FILTRO_EMAILS": True})
+    client = app.test_client()
+    id_usuario, = crear_usuarios(client, 1)
+    sentencias = sentencias_sql(app)
+
+    # Un email no registrado se responde sin consultar la base de datos
+    assert client.get('/cliente/usuarios/email/nadie@example.com').status_code == 404
+    assert client.get('/cliente/usuarios/email/nadie@example.com?fields=nombre').status_code == 404
+    assert sentencias == []
+
+    # Y un email repetido se rechaza sin intentar la inserción
+    rv = client.post('/cliente/usuarios', data=json.dumps(usuario_natural(0)), content_type='application/json')
+    assert rv.status_code == 400
+    assert not [sql for sql in sentencias if sql.startswith('INSERT')]
+
+    # Al cambiar el email, el anterior deja de estar registrado y el nuevo se encuentra
+    rv = client.put(f'/cliente/usuarios/{id_usuario}', data=json.dumps({"nombre": "Usuario Filtro", "email": "nuevo@example.com"}),
+                    content_type='application/json')
+    assert rv.status_code == 200
+    assert client.get('/cliente/usuarios/email/nuevo@example.com').json['id'] == id_usuario
+    del sentencias[:]
+    assert client.get('/cliente/usuarios/email/usuario0@example.com').status_code == 404
+    assert sentencias == []
+
+    # Tres consultas descartadas y la verificación previa a la primera inserción
+    assert app.extensions['filtro_emails'].estadisticas()['descartes'] == 4
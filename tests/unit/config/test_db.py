@@ -0,0 +1,140 @@
+"""Pruebas para archivo de base de datos de la configuración
+
+En este archivo usted encontrará las diferentes pruebas de validación para los perfiles de SQLite, el enrutamiento de consultas al engine de lectura, la verificación de la versión del esquema y los índices administrados
+
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from aeroalpes.api import MODULOS_MODELOS
+from aeroalpes.config.db import (
+    TABLA_VERSION_ESQUEMA, db, engines, huella_esquema, init_db, leer_del_primario, preparar_esquema,
+    sesion_consultas, sesion_lectura, uri_solo_lectura, version_esquema
+)
+from aeroalpes.config.indices import INDICES
+
+
+def crear_app(ruta: str, **configuracion) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + ruta
+    app.config.update(configuracion)
+    init_db(app)
+    return app
+
+def sentencias_ddl(app) -> list[str]:
+    sentencias = list()
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda conn, cursor, sql, *args: sentencias.append(sql))
+    return [sentencia for sentencia in sentencias if sentencia.lstrip().upper().startswith('CREATE')]
+
+def test_esquema_se_crea_una_sola_vez_por_version(tmp_path):
+    ruta = str(tmp_path / 'esquema.db')
+
+    # El primer arranque crea las tablas y guarda la huella
+    app = crear_app(ruta)
+    assert preparar_esquema(app, MODULOS_MODELOS)
+    with app.app_context():
+        assert version_esquema() == huella_esquema(MODULOS_MODELOS)
+        assert 'usuarios' in inspect(db.engine).get_table_names()
+
+    # Un arranque posterior con los mismos modelos no ejecuta DDL
+    app = crear_app(ruta)
+    ddl = sentencias_ddl(app)
+    assert not preparar_esquema(app, MODULOS_MODELOS)
+    assert ddl == []
+
+def test_esquema_se_recrea_si_cambia_la_huella_o_sin_verificacion(tmp_path):
+    ruta = str(tmp_path / 'esquema.db')
+    preparar_esquema(crear_app(ruta), MODULOS_MODELOS[:1])
+
+    # Otros modelos cambian la huella
+    assert preparar_esquema(crear_app(ruta), MODULOS_MODELOS)
+    assert huella_esquema(MODULOS_MODELOS[:1]) != huella_esquema(MODULOS_MODELOS)
+
+    # Sin verificación se ejecuta create_all siempre
+    assert preparar_esquema(crear_app(ruta, ESQUEMA_VERIFICAR_VERSION=False), MODULOS_MODELOS)
+
+def pragma(app, nombre: str):
+    with app.app_context():
+        with db.engine.connect() as conexion:
+            return conexion.execute(text(f'PRAGMA {nombre}')).scalar()
+
+def test_perfiles_de_sqlite_se_aplican_a_cada_conexion(tmp_path):
+    app = crear_app(str(tmp_path / 'rapida.db'), SQLITE_PERFIL='throughput', SQLITE_PRAGMAS=dict(cache_size=-1000))
+
+    assert pragma(app, 'journal_mode') == 'wal'
+    assert pragma(app, 'synchronous') == 0
+    assert pragma(app, 'temp_store') == 2
+    assert pragma(app, 'busy_timeout') == 10000
+    # Los PRAGMAs explícitos reemplazan los del perfil
+    assert pragma(app, 'cache_size') == -1000
+
+    # Por defecto se usa el perfil balanced
+    app = crear_app(str(tmp_path / 'balanceada.db'))
+    assert pragma(app, 'journal_mode') == 'wal'
+    assert pragma(app, 'synchronous') == 1
+
+    # Sin perfil, SQLite conserva sus valores por defecto
+    app = crear_app(str(tmp_path / 'sin_perfil.db'), SQLITE_PERFIL=None)
+    assert pragma(app, 'journal_mode') == 'delete'
+
+def test_perfil_de_sqlite_desconocido(tmp_path):
+    with pytest.raises(ValueError, match='Perfil de SQLite desconocido'):
+        crear_app(str(tmp_path / 'x.db'), SQLITE_PERFIL='turbo')
+
+def test_consultas_usan_el_engine_de_lectura_hasta_una_escritura(tmp_path):
+    app = crear_app(str(tmp_path / 'lectura.db'))
+    preparar_esquema(app, MODULOS_MODELOS)
+
+    with app.app_context():
+        # Las consultas van al archivo abierto en solo lectura
+        assert sesion_consultas() is sesion_lectura
+        assert 'mode=ro' in str(engines()[-1].url)
+        with pytest.raises(OperationalError, match='readonly'):
+            sesion_lectura.execute(text("INSERT INTO version_esquema (huella) VALUES ('x')"))
+        sesion_lectura.rollback()
+
+        # Se puede fijar un bloque al primario
+        with leer_del_primario():
+            assert sesion_consultas() is db.session
+        assert sesion_consultas() is sesion_lectura
+
+        # Y después de confirmar una escritura, el resto del contexto lee del primario
+        db.session.execute(text("INSERT INTO version_esquema (huella) VALUES ('x')"))
+        db.session.commit()
+        assert sesion_consultas() is db.session
+
+    with app.app_context():
+        assert sesion_consultas() is sesion_lectura
+
+def test_sin_engine_de_lectura_las_consultas_usan_el_primario(tmp_path):
+    app = crear_app(str(tmp_path / 'primario.db'), BD_LECTURA_URI=None)
+
+    with app.app_context():
+        assert sesion_consultas() is db.session
+        assert engines() == list(db.engines.values())
+
+    assert uri_solo_lectura('sqlite://') is None
+    assert uri_solo_lectura('postgresql://localhost/aeroalpes') is None
+
+def test_indices_administrados_se_agregan_a_una_base_de_datos_existente(tmp_path):
+    ruta = str(tmp_path / 'indices.db')
+    app = crear_app(ruta)
+    assert preparar_esquema(app, MODULOS_MODELOS)
+    with app.app_context():
+        indices = {tabla: {indice['name'] for indice in inspect(db.engine).get_indexes(tabla)} for tabla in INDICES}
+        with db.engine.begin() as conexion:
+            conexion.execute(text('DROP INDEX ix_reservas_itinerarios_reserva_id'))
+            conexion.execute(text(f'DELETE FROM {TABLA_VERSION_ESQUEMA}'))
+
+    for tabla, definidos in INDICES.items():
+        assert {nombre for nombre, _ in definidos} <= indices[tabla]
+
+    # Con la huella cambiada, create_all no toca la tabla existente pero el índice faltante se crea
+    app = crear_app(ruta)
+    assert preparar_esquema(app, MODULOS_MODELOS)
+    with app.app_context():
+        assert 'ix_reservas_itinerarios_reserva_id' in {i['name'] for i in inspect(db.engine).get_indexes('reservas_itinerarios')}
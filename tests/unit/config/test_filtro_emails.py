@@ -0,0 +1,58 @@
+"""Pruebas para archivo de filtro de emails de la configuración
+
+En este archivo usted encontrará las diferentes pruebas de validación para construir el filtro de emails al arrancar y mantenerlo con los cambios confirmados de los usuarios
+
+"""
+
+from datetime import datetime
+
+import pytest
+
+from aeroalpes.api import create_app
+from aeroalpes.config.uow import UnidadDeTrabajoSQLAlchemy
+from aeroalpes.modulos.cliente.dominio.entidades import ClienteNatural
+from aeroalpes.modulos.cliente.dominio.objetos_valor import Cedula, Email, Nombre
+from aeroalpes.modulos.cliente.infraestructura.repositorios import RepositorioUsuariosSQLite
+
+
+def usuario(i: int) -> ClienteNatural:
+    return ClienteNatural(
+        nombre=Nombre.desde_texto(f"Usuario Filtro{i}"), email=Email.desde_texto(f"filtro{i}@example.com"),
+        cedula=Cedula(numero=str(1000 + i)), fecha_nacimiento=datetime(1990, 5, 15)
+    )
+
+@pytest.fixture
+def configuracion(tmp_path):
+    return {"TESTING": True, "DATABASE": str(tmp_path / "filtro.db"), "FILTRO_EMAILS": True}
+
+def test_filtro_se_construye_al_arrancar_con_los_emails_registrados(configuracion):
+    app = create_app(configuracion)
+    with app.app_context():
+        RepositorioUsuariosSQLite().agregar_lote([usuario(i) for i in range(3)])
+
+    filtro = create_app(configuracion).extensions['filtro_emails']
+    assert all(filtro.puede_contener(f"filtro{i}@example.com") for i in range(3))
+    assert filtro.puede_contener(' FILTRO0@Example.com')
+    assert not filtro.puede_contener('nadie@example.com')
+    assert filtro.estadisticas()['elementos'] == 3
+
+def test_filtro_solo_quita_emails_de_cambios_confirmados(configuracion):
+    app = create_app(configuracion)
+    filtro = app.extensions['filtro_emails']
+    repositorio = RepositorioUsuariosSQLite()
+    nuevo = usuario(1)
+    with app.app_context():
+        repositorio.agregar(nuevo)
+
+        # Una eliminación descartada no quita el email
+        with pytest.raises(RuntimeError):
+            with UnidadDeTrabajoSQLAlchemy():
+                repositorio.eliminar(nuevo.id)
+                raise RuntimeError()
+        assert filtro.puede_contener('filtro1@example.com')
+
+        # Una confirmada lo quita al hacer commit
+        with UnidadDeTrabajoSQLAlchemy():
+            repositorio.eliminar(nuevo.id)
+            assert filtro.puede_contener('filtro1@example.com')
+        assert not filtro.puede_contener('filtro1@example.com')
@@ -0,0 +1,110 @@
+"""Pruebas para archivo de unidad de trabajo de la configuración
+
+En este archivo usted encontrará las diferentes pruebas de validación para confirmar una sola vez los cambios de varios repositorios, agrupar sus INSERT y descartar cambios con savepoints
+
+"""
+
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from aeroalpes.api import create_app
+from aeroalpes.config.db import db
+from aeroalpes.config.uow import UnidadDeTrabajoSQLAlchemy
+from aeroalpes.modulos.cliente.aplicacion.dto import ActualizarUsuarioDTO
+from aeroalpes.modulos.cliente.aplicacion.servicios import ServicioUsuario
+from aeroalpes.modulos.cliente.dominio.entidades import ClienteNatural
+from aeroalpes.modulos.cliente.dominio.objetos_valor import Cedula, Email, Nombre
+from aeroalpes.modulos.cliente.infraestructura.repositorios import RepositorioUsuariosSQLite
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_app({"TESTING": True, "DATABASE": str(tmp_path / "uow.db")})
+
+def usuario(i: int) -> ClienteNatural:
+    return ClienteNatural(
+        nombre=Nombre.desde_texto(f"Usuario Unidad{i}"), email=Email.desde_texto(f"unidad{i}@example.com"),
+        cedula=Cedula(numero=str(1000 + i)), fecha_nacimiento=datetime(1990, 5, 15)
+    )
+
+def registrar_sentencias(app) -> list[tuple[str, bool]]:
+    sentencias = list()
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, sql, parametros, contexto, executemany: sentencias.append((sql, executemany)))
+    return sentencias
+
+def contar_usuarios(app) -> int:
+    with app.app_context():
+        return db.session.execute(db.text('SELECT count(*) FROM usuarios')).scalar()
+
+def test_unidad_confirma_una_vez_y_agrupa_los_insert(app):
+    sentencias = registrar_sentencias(app)
+    commits = list()
+    registrar_commit = lambda sesion: commits.append(sesion)
+    repositorio = RepositorioUsuariosSQLite()
+
+    with app.app_context():
+        event.listen(db.session, 'after_commit', registrar_commit)
+        with UnidadDeTrabajoSQLAlchemy() as unidad:
+            for i in range(5):
+                unidad.registrar(repositorio.agregar, usuario(i))
+            # Los cambios pendientes no se escriben antes de confirmar
+            assert not [sql for sql, _ in sentencias if sql.startswith('INSERT')]
+        event.remove(db.session, 'after_commit', registrar_commit)
+
+    assert len(commits) == 1
+    insert_usuarios = [executemany for sql, executemany in sentencias if sql.startswith('INSERT INTO usuarios ')]
+    assert insert_usuarios == [True]
+    assert contar_usuarios(app) == 5
+
+def test_unidad_descarta_todo_ante_un_error_y_savepoint_solo_su_bloque(app):
+    repositorio = RepositorioUsuariosSQLite()
+
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            with UnidadDeTrabajoSQLAlchemy() as unidad:
+                unidad.registrar(repositorio.agregar, usuario(0))
+                raise RuntimeError("falla el caso de uso")
+    assert contar_usuarios(app) == 0
+
+    with app.app_context():
+        with UnidadDeTrabajoSQLAlchemy() as unidad:
+            unidad.registrar(repositorio.agregar, usuario(1))
+            with pytest.raises(Exception):
+                with unidad.savepoint():
+                    # Email repetido: viola la unicidad al liberar el savepoint
+                    unidad.registrar(repositorio.agregar, ClienteNatural(
+                        nombre=Nombre.desde_texto("Otro"), email=Email.desde_texto("unidad1@example.com"),
+                        cedula=Cedula(numero="9"), fecha_nacimiento=datetime(1990, 5, 15)
+                    ))
+            unidad.registrar(repositorio.agregar, usuario(2))
+    assert contar_usuarios(app) == 2
+
+def test_actualizar_usuarios_es_todo_o_nada(app):
+    cliente = app.test_client()
+    ids = list()
+    for i in range(2):
+        rv = cliente.post('/cliente/usuarios', data=json.dumps({
+            "tipo_usuario": "natural", "nombre": f"Usuario Lote{i}", "email": f"lote{i}@example.com",
+            "cedula": str(i), "fecha_nacimiento": "1990-05-15T00:00:00Z", "metodos_pago": []
+        }), content_type='application/json')
+        ids.append(rv.json['id'])
+
+    servicio = ServicioUsuario()
+    with app.app_context():
+        # Un id inexistente hace fallar el caso de uso: el primer usuario no se actualiza
+        with pytest.raises(Exception):
+            servicio.actualizar_usuarios([
+                ActualizarUsuarioDTO(id=ids[0], nombre="Nombre Nuevo"), ActualizarUsuarioDTO(id=str(uuid.uuid4()), nombre="Nadie")
+            ])
+        assert servicio.obtener_usuario_por_id(ids[0]).nombre == "Usuario Lote0"
+
+        actualizados = servicio.actualizar_usuarios([ActualizarUsuarioDTO(id=id, nombre=f"Nombre Nuevo{i}") for i, id in enumerate(ids)])
+    assert [u.nombre for u in actualizados] == ["Nombre Nuevo0", "Nombre Nuevo1"]
+    with app.app_context():
+        assert [servicio.obtener_usuario_por_id(id).nombre for id in ids] == ["Nombre Nuevo0", "Nombre Nuevo1"]
@@ -0,0 +1,36 @@
+"""Pruebas para archivo de mapeadores de la capa de aplicación de cliente
+
+En este archivo usted encontrará las pruebas que validan que el JSON compilado de cada DTO equivale a su formato externo
+
+"""
+
+import json
+
+import pytest
+from aeroalpes.seedwork.aplicacion.dto import Mapeador
+from aeroalpes.modulos.cliente.aplicacion.dto import UsuarioDTO, ClienteNaturalDTO, ClienteEmpresaDTO, MetodoPagoDTO
+from aeroalpes.modulos.cliente.aplicacion.mapeadores import MapeadorUsuarioDTOJson
+
+
+METODO = MetodoPagoDTO(id="1", tipo="CREDITO", nombre="Tarjeta", token_seguridad="tok", datos_ofuscados="VISA ****1234",
+                       fecha_creacion="2024-01-01T00:00:00Z", fecha_actualizacion="2024-01-02T00:00:00Z")
+
+DTOS = [
+    ClienteNaturalDTO(id="2", tipo_usuario="natural", nombre="José \"Pepe\" Pérez", email="jose@example.com",
+                      cedula="123", fecha_nacimiento="1990-05-15T00:00:00Z", metodos_pago=[METODO]),
+    ClienteEmpresaDTO(id="3", tipo_usuario="empresa", nombre="Aerolínea S.A.", email="info@aerolinea.com",
+                      rut="900123", fecha_constitucion="2000-01-01T00:00:00Z"),
+    UsuarioDTO(id="4", tipo_usuario="natural", nombre="Ana Gómez", email="ana@example.com", metodos_pago=[METODO, METODO]),
+]
+
+@pytest.mark.parametrize('dto', DTOS, ids=lambda dto: type(dto).__name__)
+def test_dto_a_json_equivale_a_dto_a_externo(dto):
+    mapeador = MapeadorUsuarioDTOJson()
+
+    assert json.loads(mapeador.dto_a_json(dto)) == mapeador.dto_a_externo(dto)
+    assert json.loads(mapeador.dto_a_json(dto)) == json.loads(Mapeador.dto_a_json(mapeador, dto))
+
+def test_dto_a_json_de_una_lista_equivale_a_dto_a_externo():
+    mapeador = MapeadorUsuarioDTOJson()
+
+    assert json.loads(mapeador.dto_a_json(DTOS)) == [mapeador.dto_a_externo(dto) for dto in DTOS]
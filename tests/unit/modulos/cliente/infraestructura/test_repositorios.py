@@ -0,0 +1,78 @@
+"""Pruebas para archivo de repositorios de la capa de infraestructura de cliente
+
+En este archivo usted encontrará las pruebas que validan la cantidad de consultas de cada plan de carga de los métodos de pago
+
+"""
+
+import json
+
+import pytest
+from sqlalchemy import event
+
+from aeroalpes.api import create_app
+from aeroalpes.config.db import engines
+from aeroalpes.modulos.cliente.infraestructura.repositorios import RepositorioUsuariosSQLite
+
+
+def usuario(i: int) -> dict:
+    return {
+        "tipo_usuario": "natural",
+        "nombre": f"Usuario Carga{i}",
+        "email": f"carga{i}@example.com",
+        "cedula": str(i),
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": f"tok_{i}", "datos_ofuscados": "****1234"}]
+    }
+
+@pytest.fixture
+def app(tmp_path):
+    # joined ordena la página unida con un B-tree temporal: la guardia de planes no aplica a esta comparación
+    app = create_app({"TESTING": True, "DATABASE": str(tmp_path / "repositorios.db"), "PLANES_VERIFICAR": None})
+    rv = app.test_client().post('/cliente/usuarios/bulk', data=json.dumps([usuario(i) for i in range(10)]), content_type='application/json')
+    assert rv.status_code == 201, rv.data
+    return app
+
+def consultas(app, operacion) -> tuple[int, object]:
+    """Ejecuta `operacion` en un contexto nuevo y cuenta los SELECT emitidos"""
+    sentencias = list()
+    registrar = lambda conn, cursor, sql, *args: sentencias.append(sql)
+    with app.app_context():
+        for engine in engines():
+            event.listen(engine, 'before_cursor_execute', registrar)
+        try:
+            resultado = operacion()
+        finally:
+            for engine in engines():
+                event.remove(engine, 'before_cursor_execute', registrar)
+    return sum(1 for sentencia in sentencias if sentencia.lstrip().upper().startswith('SELECT')), resultado
+
+@pytest.mark.parametrize('estrategia, esperadas', [('selectin', 2), ('joined', 1), ('noload', 1)])
+def test_listar_usuarios_con_cada_plan_no_depende_de_la_cantidad(app, estrategia, esperadas):
+    repositorio = RepositorioUsuariosSQLite(planes_carga=dict(obtener_pagina=dict(metodos_pago=estrategia)))
+
+    # Las consultas son las mismas para 2 y para 10 usuarios
+    for limite in (2, 10):
+        cantidad, (usuarios, _) = consultas(app, lambda: repositorio.obtener_pagina(limite))
+        assert len(usuarios) == limite
+        assert cantidad == esperadas
+        assert all(len(u.metodos_pago) == (0 if estrategia == 'noload' else 1) for u in usuarios)
+
+def test_planes_por_defecto_cargan_agregados_completos_en_consultas_constantes(app):
+    repositorio = RepositorioUsuariosSQLite()
+
+    # Recorrer todos los usuarios: una consulta y, por cada lote, una para sus métodos de pago
+    cantidad, usuarios = consultas(app, lambda: list(repositorio.iterar_todos(tamano_lote=4)))
+    assert len(usuarios) == 10 and all(u.metodos_pago for u in usuarios)
+    assert cantidad == 1 + 3
+
+    cantidad, _ = consultas(app, lambda: repositorio.obtener_por_email('carga3@example.com').metodos_pago)
+    assert cantidad == 2
+
+def test_planes_de_carga_invalidos():
+    with pytest.raises(ValueError, match='Estrategia de carga desconocida'):
+        RepositorioUsuariosSQLite(planes_carga=dict(obtener_pagina=dict(metodos_pago='lazy')))
+    with pytest.raises(ValueError, match='no declara un plan'):
+        RepositorioUsuariosSQLite(planes_carga=dict(agregar=dict(metodos_pago='selectin')))
+    # yield_per no admite colecciones con joined
+    with pytest.raises(ValueError, match='por lotes'):
+        RepositorioUsuariosSQLite(planes_carga=dict(iterar_todos=dict(metodos_pago='joined')))
@@ -0,0 +1,32 @@
+"""Pruebas para archivo de mapeadores de la capa de aplicación de vuelos
+
+En este archivo usted encontrará las pruebas que validan que el JSON compilado de cada DTO equivale a su formato externo
+
+"""
+
+import json
+
+from aeroalpes.seedwork.aplicacion.dto import Mapeador
+from aeroalpes.modulos.vuelos.aplicacion.dto import ReservaDTO, ItinerarioDTO, OdoDTO, SegmentoDTO, LegDTO
+from aeroalpes.modulos.vuelos.aplicacion.mapeadores import MapeadorReservaDTOJson
+
+
+def reserva_dto() -> ReservaDTO:
+    leg = LegDTO("2022-11-22T13:10:00Z", "2022-11-22T15:10:00Z",
+                 {"codigo": "BOG", "nombre": "El Dorado"}, {"codigo": "JFK", "nombre": "John F. Kennedy"})
+    itinerario = ItinerarioDTO([OdoDTO([SegmentoDTO([leg, leg])])])
+    return ReservaDTO("2022-11-01T00:00:00Z", "2022-11-02T00:00:00Z", "abc", [itinerario])
+
+def test_dto_a_json_equivale_a_dto_a_externo():
+    mapeador = MapeadorReservaDTOJson()
+    dto = reserva_dto()
+
+    externo = json.loads(mapeador.dto_a_json(dto))
+    assert externo == json.loads(Mapeador.dto_a_json(mapeador, dto))
+    assert externo['itinerarios'][0]['odos'][0]['segmentos'][0]['legs'][1]['destino']['codigo'] == "JFK"
+
+def test_dto_a_json_de_una_lista_equivale_a_dto_a_externo():
+    mapeador = MapeadorReservaDTOJson()
+    dtos = [reserva_dto(), ReservaDTO()]
+
+    assert json.loads(mapeador.dto_a_json(dtos)) == json.loads(Mapeador.dto_a_json(mapeador, dtos))
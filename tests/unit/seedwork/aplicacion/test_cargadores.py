@@ -0,0 +1,58 @@
+"""Pruebas para archivo de cargadores de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para la carga de agregados por lotes
+
+"""
+
+from uuid import uuid4
+
+from aeroalpes.seedwork.aplicacion.cargadores import CargadorAgregados
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class Repositorio:
+    def __init__(self, ids):
+        self.agregados = {str(id): f'agregado-{id}' for id in ids}
+        self.lotes = list()
+
+    def obtener_por_ids(self, ids):
+        self.lotes.append(list(ids))
+        return {id: self.agregados[id] for id in ids if id in self.agregados}
+
+"""
+    Pruebas
+"""
+
+def test_ids_solicitados_se_cargan_en_un_solo_lote():
+    a, b, c = uuid4(), uuid4(), uuid4()
+    repositorio = Repositorio([a, b, c])
+    cargador = CargadorAgregados(repositorio.obtener_por_ids)
+
+    cargador.solicitar([a, b])
+    assert cargador.obtener(c) == f'agregado-{c}'
+    assert cargador.obtener(a) == f'agregado-{a}'
+    assert cargador.obtener_muchos([b, c]) == [f'agregado-{b}', f'agregado-{c}']
+
+    assert repositorio.lotes == [[str(a), str(b), str(c)]]
+
+def test_resultados_en_orden_y_ausentes_como_none():
+    a, b = uuid4(), uuid4()
+    repositorio = Repositorio([a])
+    cargador = CargadorAgregados(repositorio.obtener_por_ids)
+
+    assert cargador.obtener_muchos([b, a, b]) == [None, f'agregado-{a}', None]
+
+    # Un id inexistente también queda en caché
+    assert cargador.obtener(b) is None
+    assert cargador.lotes == 1
+
+def test_lotes_acotados_por_tamano_maximo():
+    ids = [uuid4() for _ in range(5)]
+    repositorio = Repositorio(ids)
+    cargador = CargadorAgregados(repositorio.obtener_por_ids, tamano_maximo=2)
+
+    assert len(cargador.obtener_muchos(ids)) == 5
+    assert [len(lote) for lote in repositorio.lotes] == [2, 2, 1]
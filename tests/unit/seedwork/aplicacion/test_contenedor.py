@@ -0,0 +1,94 @@
+"""Pruebas para archivo de contenedor de dependencias de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para los alcances del contenedor de dependencias
+
+"""
+
+import threading
+
+import pytest
+from flask import Flask
+from aeroalpes.seedwork.aplicacion.contenedor import Contenedor, DependenciaNoRegistradaExcepcion, resolver
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class Mapeador:
+    ...
+
+class Servicio:
+    def __init__(self, mapeador: Mapeador):
+        self.mapeador = mapeador
+
+class Recurso:
+    def __init__(self):
+        self.liberado = False
+
+    def liberar(self):
+        self.liberado = True
+
+@pytest.fixture
+def contenedor():
+    contenedor = Contenedor()
+    contenedor.registrar_singleton(Mapeador, lambda c: Mapeador())
+    contenedor.registrar_singleton(Servicio, lambda c: Servicio(c.resolver(Mapeador)))
+    contenedor.registrar_por_peticion(Recurso, lambda c: Recurso(), liberar=Recurso.liberar)
+    return contenedor
+
+@pytest.fixture
+def app(contenedor):
+    app = Flask(__name__)
+    contenedor.init_app(app)
+    return app
+
+"""
+    Pruebas
+"""
+
+def test_singleton_se_crea_una_sola_vez(contenedor):
+    servicio = contenedor.resolver(Servicio)
+
+    assert contenedor.resolver(Servicio) is servicio
+    assert servicio.mapeador is contenedor.resolver(Mapeador)
+
+def test_singleton_es_unico_entre_hilos(contenedor):
+    instancias = list()
+    hilos = [threading.Thread(target=lambda: instancias.append(contenedor.resolver(Servicio))) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len({id(instancia) for instancia in instancias}) == 1
+
+def test_recurso_por_peticion_se_comparte_dentro_de_la_peticion(app):
+    with app.test_request_context():
+        recurso = resolver(Recurso)
+        assert resolver(Recurso) is recurso
+
+    with app.test_request_context():
+        assert resolver(Recurso) is not recurso
+
+def test_recurso_por_peticion_se_libera_al_cerrar_el_contexto(app):
+    with app.test_request_context():
+        recurso = resolver(Recurso)
+        assert not recurso.liberado
+
+    assert recurso.liberado
+
+def test_recurso_por_peticion_fuera_de_contexto_no_se_comparte(contenedor):
+    assert contenedor.resolver(Recurso) is not contenedor.resolver(Recurso)
+
+def test_registrar_de_nuevo_reemplaza_el_singleton(contenedor):
+    anterior = contenedor.resolver(Mapeador)
+    contenedor.registrar_singleton(Mapeador, lambda c: Mapeador())
+
+    assert contenedor.resolver(Mapeador) is not anterior
+
+def test_dependencia_no_registrada_lanza_excepcion(contenedor):
+    with pytest.raises(DependenciaNoRegistradaExcepcion) as excepcion:
+        contenedor.resolver(Contenedor)
+
+    assert 'Contenedor' in str(excepcion.value)
@@ -0,0 +1,62 @@
+"""Pruebas para archivo de serialización de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para los codificadores JSON compilados por DTO
+
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+
+import pytest
+from aeroalpes.seedwork.aplicacion.dto import DTO
+from aeroalpes.seedwork.aplicacion.serializacion import codificar, codificador_para
+from aeroalpes.modulos.cliente.aplicacion.dto import ClienteNaturalDTO, MetodoPagoDTO
+from aeroalpes.modulos.cliente.aplicacion.mapeadores import MapeadorUsuarioDTOJson
+from aeroalpes.modulos.vuelos.aplicacion.dto import ReservaDTO, ItinerarioDTO, OdoDTO, SegmentoDTO, LegDTO
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+@dataclass(frozen=True)
+class DTOPrueba(DTO):
+    texto: str = field(default_factory=str)
+    numero: int = field(default=0)
+    opcional: str = field(default=None)
+    etiquetas: list[str] = field(default_factory=list)
+
+class NoSerializable:
+    ...
+
+"""
+    Pruebas
+"""
+
+def test_codifica_dto_igual_que_el_mapeador():
+    # Dado un DTO de cliente con métodos de pago
+    metodo = MetodoPagoDTO(id="1", tipo="CREDITO", nombre="Tarjeta", token_seguridad="tok")
+    dto = ClienteNaturalDTO(id="2", tipo_usuario="natural", nombre="José \"Pepe\" Pérez", email="jose@example.com",
+                            cedula="123", metodos_pago=[metodo])
+
+    # Entonces el JSON compilado equivale al del mapeador existente
+    mapeador = MapeadorUsuarioDTOJson()
+    assert json.loads(mapeador.dto_a_json(dto)) == mapeador.dto_a_externo(dto)
+
+def test_codifica_dtos_anidados():
+    leg = LegDTO("2022-11-22T13:10:00Z", "2022-11-22T15:10:00Z", {"codigo": "BOG"}, {"codigo": "JFK"})
+    reserva = ReservaDTO(id="1", itinerarios=[ItinerarioDTO([OdoDTO([SegmentoDTO([leg, leg])])])])
+
+    assert json.loads(codificar(reserva)) == asdict(reserva)
+    assert json.loads(codificar([reserva, reserva])) == [asdict(reserva)] * 2
+
+def test_codifica_valores_que_no_coinciden_con_la_anotacion():
+    dto = DTOPrueba(texto="á", numero=3, opcional=None, etiquetas=["a", "b"])
+    assert json.loads(codificar(dto)) == {"texto": "á", "numero": 3, "opcional": None, "etiquetas": ["a", "b"]}
+
+def test_codificador_se_compila_una_sola_vez():
+    assert codificador_para(DTOPrueba) is codificador_para(DTOPrueba)
+
+def test_valor_no_serializable_lanza_excepcion():
+    with pytest.raises(TypeError):
+        codificar(DTOPrueba(etiquetas=[NoSerializable()]))
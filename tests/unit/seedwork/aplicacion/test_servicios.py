@@ -0,0 +1,57 @@
+"""Pruebas para archivo de Servicios de aplicación de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para la persistencia por lotes de los servicios de aplicación
+
+"""
+
+import pytest
+from aeroalpes.seedwork.aplicacion.servicios import Servicio
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class Repositorio:
+    """Repositorio en memoria cuya transacción falla si el lote contiene un elemento inválido"""
+
+    def __init__(self, invalidos: set):
+        self.invalidos = invalidos
+        self.persistidos = list()
+        self.transacciones = 0
+
+    def agregar_lote(self, elementos: list):
+        self.transacciones += 1
+        invalidos = [elemento for elemento in elementos if elemento in self.invalidos]
+        if invalidos:
+            raise ValueError(f"elemento inválido {invalidos[0]}")
+        self.persistidos.extend(elementos)
+
+"""
+    Pruebas
+"""
+
+def test_lote_sin_errores_usa_una_sola_transaccion():
+    repositorio = Repositorio(invalidos=set())
+
+    errores = Servicio()._persistir_lote(list(range(10)), repositorio.agregar_lote)
+
+    assert errores == []
+    assert repositorio.persistidos == list(range(10))
+    assert repositorio.transacciones == 1
+
+@pytest.mark.parametrize('invalidos', [{0}, {9}, {3, 4}, {0, 5, 9}])
+def test_lote_con_errores_aisla_los_elementos_que_fallan(invalidos):
+    repositorio = Repositorio(invalidos=invalidos)
+
+    errores = Servicio()._persistir_lote(list(range(10)), repositorio.agregar_lote)
+
+    assert [elemento for elemento, _ in errores] == sorted(invalidos)
+    assert all("elemento inválido" in error for _, error in errores)
+    assert repositorio.persistidos == [elemento for elemento in range(10) if elemento not in invalidos]
+
+def test_lote_vacio_no_persiste():
+    repositorio = Repositorio(invalidos=set())
+
+    assert Servicio()._persistir_lote([], repositorio.agregar_lote) == []
+    assert repositorio.transacciones == 0
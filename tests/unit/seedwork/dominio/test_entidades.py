@@ -7,7 +7,7 @@ En este archivo usted encontrará las diferentes pruebas de validación para los
 from dataclasses import dataclass, field
 import pytest
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
 from aeroalpes.seedwork.dominio.entidades import Entidad
 from aeroalpes.seedwork.dominio.excepciones import IdDebeSerInmutableExcepcion
 
@@ -73,3 +73,13 @@ def test_entidad_id_es_inmutable():
 
         
 
+
+def test_entidad_reconstituida_conserva_su_id():
+    # Dado el identificador de una entidad ya persistida
+    id = uuid4()
+
+    # Cuando se reconstituye la entidad con ese identificador
+    entidadPrueba = EntidadPrueba(id=id)
+
+    # Entonces conserva el identificador original
+    assert entidadPrueba.id == id
@@ -0,0 +1,82 @@
+"""Pruebas para archivo de filtro de Bloom de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para el filtro de Bloom con contadores y su reconstrucción en línea
+
+"""
+
+import pytest
+
+from aeroalpes.seedwork.infraestructura.bloom import FiltroBloomContador, FiltroReconstruible
+
+
+def test_filtro_sin_falsos_negativos_y_con_la_tasa_configurada():
+    filtro = FiltroBloomContador(capacidad=2000, falsos_positivos=0.01)
+    for i in range(2000):
+        filtro.agregar(f"usuario{i}@example.com")
+
+    assert all(f"usuario{i}@example.com" in filtro for i in range(2000))
+    falsos_positivos = sum(f"ausente{i}@example.com" in filtro for i in range(20000)) / 20000
+    assert falsos_positivos < 0.02
+    assert filtro.tasa_estimada() == pytest.approx(0.01, rel=0.2)
+
+def test_quitar_un_valor():
+    filtro = FiltroBloomContador(capacidad=100)
+    filtro.agregar('a@example.com')
+    filtro.agregar('b@example.com')
+    filtro.quitar('a@example.com')
+
+    assert 'a@example.com' not in filtro
+    assert 'b@example.com' in filtro
+    assert filtro.elementos == 1
+
+def test_parametros_invalidos():
+    with pytest.raises(ValueError):
+        FiltroBloomContador(capacidad=0)
+    with pytest.raises(ValueError):
+        FiltroBloomContador(capacidad=10, falsos_positivos=1)
+
+def test_filtro_reconstruible_se_construye_recorriendo_el_conjunto():
+    conjunto = {'A@example.com ', 'b@example.com'}
+    filtro = FiltroReconstruible(lambda: len(conjunto), lambda: iter(conjunto), capacidad_minima=10,
+                                 normalizar=lambda valor: valor.strip().casefold())
+    # Antes de construirse no descarta nada
+    assert filtro.puede_contener('c@example.com')
+
+    assert filtro.reconstruir()
+    assert filtro.puede_contener('a@example.com') and filtro.puede_contener('B@example.com')
+    assert not filtro.puede_contener('c@example.com')
+    assert filtro.estadisticas()['descartes'] == 1
+    assert filtro.estadisticas()['capacidad'] == 10
+
+def test_agregados_durante_la_reconstruccion_llegan_al_filtro_nuevo():
+    filtro = FiltroReconstruible(lambda: 1, lambda: iter(()), capacidad_minima=10)
+    filtro.reconstruir()
+
+    def leer():
+        # El conjunto cambia mientras se recorre
+        filtro.agregar('nuevo@example.com')
+        assert not filtro.reconstruir()
+        yield 'existente@example.com'
+
+    filtro.leer = leer
+    assert filtro.reconstruir()
+    assert filtro.puede_contener('nuevo@example.com') and filtro.puede_contener('existente@example.com')
+    assert filtro.estadisticas()['reconstrucciones'] == 2
+
+def test_superar_la_capacidad_reconstruye_con_mas_capacidad(monkeypatch):
+    conjunto = list()
+    filtro = FiltroReconstruible(lambda: len(conjunto), lambda: iter(conjunto), capacidad_minima=4)
+    filtro.reconstruir()
+    hilos = list()
+    reconstruir_en_segundo_plano = filtro.reconstruir_en_segundo_plano
+    monkeypatch.setattr(filtro, 'reconstruir_en_segundo_plano', lambda: hilos.append(reconstruir_en_segundo_plano()))
+
+    for i in range(5):
+        conjunto.append(f"usuario{i}@example.com")
+        filtro.agregar(f"usuario{i}@example.com")
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(hilos) == 1
+    assert filtro.estadisticas()['capacidad'] == 10
+    assert all(filtro.puede_contener(valor) for valor in conjunto)
@@ -0,0 +1,193 @@
+"""Pruebas para archivo de cache de agregados de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para el cache LRU con TTL, el mapa de identidad y el repositorio cacheado
+
+"""
+
+import contextlib
+from dataclasses import dataclass
+
+import pytest
+
+from aeroalpes.seedwork.infraestructura import cache as modulo_cache
+from aeroalpes.seedwork.infraestructura.cache import CacheLRU, MapaIdentidad, RepositorioCacheado
+from aeroalpes.seedwork.infraestructura.uow import UnidadDeTrabajo
+
+
+@dataclass
+class Agregado:
+    id: str
+    email: str
+
+class RepositorioEnMemoria:
+    def __init__(self, *agregados):
+        self.agregados = {agregado.id: agregado for agregado in agregados}
+        self.lecturas = 0
+
+    def obtener_por_id(self, id):
+        self.lecturas += 1
+        return Agregado(**vars(self.agregados[str(id)]))
+
+    def obtener_por_ids(self, ids):
+        self.lecturas += 1
+        return {str(id): Agregado(**vars(self.agregados[str(id)])) for id in ids if str(id) in self.agregados}
+
+    def obtener_por_email(self, email):
+        self.lecturas += 1
+        agregado, = [agregado for agregado in self.agregados.values() if agregado.email == email]
+        return Agregado(**vars(agregado))
+
+    def obtener_todos(self):
+        return list(self.agregados.values())
+
+    def actualizar(self, agregado):
+        self.agregados[agregado.id] = Agregado(**vars(agregado))
+
+    def eliminar(self, id):
+        del self.agregados[str(id)]
+
+class UnidadEnMemoria(UnidadDeTrabajo):
+    def commit(self):
+        ...
+
+    def rollback(self):
+        ...
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        yield
+
+def test_cache_desaloja_el_menos_usado_al_superar_las_entradas():
+    cache = CacheLRU(max_entradas=2)
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    assert cache.obtener('a') == 1
+    cache.guardar('c', 3)
+
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') == 1 and cache.obtener('c') == 3
+    assert cache.estadisticas() == dict(entradas=2, bytes=cache.bytes, aciertos=3, fallos=1,
+                                        desalojos=1, vencidos=0, invalidaciones=0)
+
+def test_cache_acotado_por_bytes():
+    cache = CacheLRU(max_bytes=10, medir=len)
+    cache.guardar('a', b'12345')
+    cache.guardar('b', b'123456')
+    assert cache.obtener('a') is None
+    assert cache.bytes == 6
+
+    # Un valor más grande que el cache no se guarda ni desaloja a los demás
+    cache.guardar('c', b'12345678901')
+    assert cache.obtener('c') is None
+    assert cache.obtener('b') == b'123456'
+
+def test_cache_vence_las_entradas_por_ttl(monkeypatch):
+    ahora = [100.0]
+    monkeypatch.setattr(modulo_cache.time, 'monotonic', lambda: ahora[0])
+    cache = CacheLRU(ttl=5)
+    cache.guardar('a', 1)
+    ahora[0] += 4
+    assert cache.obtener('a') == 1
+    ahora[0] += 2
+    assert cache.obtener('a') is None
+    assert cache.estadisticas()['vencidos'] == 1
+
+def test_repositorio_cacheado_lee_una_vez_y_entrega_copias():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'))
+    cacheado = RepositorioCacheado(repositorio, CacheLRU(), 'agregados')
+
+    primero, segundo = cacheado.obtener_por_id('1'), cacheado.obtener_por_id('1')
+    assert primero == segundo and primero is not segundo
+    assert repositorio.lecturas == 1
+
+    # Los métodos sin cache se delegan al repositorio
+    assert cacheado.obtener_todos() == [Agregado('1', 'a@example.com')]
+
+def test_mapa_de_identidad_entrega_la_misma_instancia():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'))
+    mapa = MapaIdentidad()
+    cacheado = RepositorioCacheado(repositorio, CacheLRU(), 'agregados', lambda: mapa)
+
+    assert cacheado.obtener_por_id('1') is cacheado.obtener_por_id('1')
+    assert mapa[('agregados', '1')].email == 'a@example.com'
+
+def test_llave_secundaria_se_verifica_contra_el_agregado():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'))
+    cacheado = RepositorioCacheado(repositorio, CacheLRU(), 'agregados',
+                                   llaves=dict(obtener_por_email=lambda agregado: agregado.email))
+
+    assert cacheado.obtener_por_email('a@example.com').id == '1'
+    assert cacheado.obtener_por_id('1').email == 'a@example.com'
+    assert repositorio.lecturas == 1
+
+    # Un email cambiado no se sigue resolviendo desde el cache
+    cacheado.actualizar(Agregado('1', 'b@example.com'))
+    assert cacheado.obtener_por_email('b@example.com').id == '1'
+    with pytest.raises(ValueError):
+        cacheado.obtener_por_email('a@example.com')
+
+def test_actualizar_y_eliminar_invalidan():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'))
+    cache, mapa = CacheLRU(), MapaIdentidad()
+    cacheado = RepositorioCacheado(repositorio, cache, 'agregados', lambda: mapa)
+
+    agregado = cacheado.obtener_por_id('1')
+    agregado.email = 'b@example.com'
+    cacheado.actualizar(agregado)
+    assert cacheado.obtener_por_id('1').email == 'b@example.com'
+    assert repositorio.lecturas == 2
+
+    cacheado.eliminar('1')
+    with pytest.raises(KeyError):
+        cacheado.obtener_por_id('1')
+    assert cache.estadisticas()['invalidaciones'] == 2
+
+def test_invalidacion_se_repite_tras_el_commit_de_la_unidad():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'))
+    cache = CacheLRU()
+    cacheado = RepositorioCacheado(repositorio, cache, 'agregados')
+
+    with UnidadEnMemoria():
+        cacheado.actualizar(Agregado('1', 'b@example.com'))
+        # Otra petición vuelve a guardar el valor anterior antes del commit
+        cache.guardar(('agregados', '1'), b'anterior')
+    assert cache.obtener(('agregados', '1')) is None
+
+def test_agregado_con_otra_version_se_vuelve_a_leer():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'))
+    repositorio.obtener_version = lambda id: repositorio.agregados[str(id)].email
+    peticiones = [MapaIdentidad()]
+    cacheado = RepositorioCacheado(repositorio, CacheLRU(), 'agregados', lambda: peticiones[-1],
+                                   version=lambda agregado: agregado.email)
+    cacheado.obtener_por_id('1')
+
+    # Una nueva petición sin cambios usa el cache tras consultar la versión
+    peticiones.append(MapaIdentidad())
+    assert cacheado.obtener_por_id('1').email == 'a@example.com'
+    assert repositorio.lecturas == 1
+
+    # Otro proceso actualiza el agregado sin invalidar este cache; luego llega otra petición
+    repositorio.agregados['1'] = Agregado('1', 'b@example.com')
+    peticiones.append(MapaIdentidad())
+    assert cacheado.obtener_por_id('1').email == 'b@example.com'
+    assert repositorio.lecturas == 2
+
+def test_lectura_por_lote_usa_el_cache_solo_con_version_conocida():
+    repositorio = RepositorioEnMemoria(Agregado('1', 'a@example.com'), Agregado('2', 'b@example.com'))
+    repositorio.obtener_version = lambda id: repositorio.agregados[str(id)].email
+    peticiones = [MapaIdentidad()]
+    cacheado = RepositorioCacheado(repositorio, CacheLRU(), 'agregados', lambda: peticiones[-1],
+                                   version=lambda agregado: agregado.email)
+
+    # Los faltantes se leen en un solo lote y quedan en el mapa de la petición
+    assert sorted(cacheado.obtener_por_ids(['1', '2', '3'])) == ['1', '2']
+    assert cacheado.obtener_por_ids(['1'])['1'] is cacheado.obtener_por_id('1')
+    assert repositorio.lecturas == 1
+
+    # En otra petición, solo el agregado con versión ya consultada sale del cache
+    peticiones.append(MapaIdentidad())
+    cacheado.obtener_version('1')
+    repositorio.agregados['2'] = Agregado('2', 'c@example.com')
+    leidos = cacheado.obtener_por_ids(['1', '2'])
+    assert leidos['1'].email == 'a@example.com' and leidos['2'].email == 'c@example.com'
+    assert repositorio.lecturas == 2
@@ -0,0 +1,103 @@
+"""Pruebas para archivo de escritor agrupado de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para agrupar en una transacción las escrituras de varios hilos
+
+"""
+
+import contextlib
+import threading
+
+import pytest
+
+from aeroalpes.seedwork.infraestructura.escritor import EscritorAgrupado
+from aeroalpes.seedwork.infraestructura.uow import UnidadDeTrabajo
+
+
+class UnidadEnMemoria(UnidadDeTrabajo):
+    """Aplica los cambios de sus savepoints exitosos a `datos` al confirmar"""
+
+    def __init__(self, datos: list, commits: list, fallar_commit: bool = False):
+        super().__init__()
+        self.datos = datos
+        self.commits = commits
+        self.fallar_commit = fallar_commit
+        self.pendientes = list()
+
+    def commit(self):
+        if self.fallar_commit:
+            raise IOError("disco lleno")
+        self.datos.extend(self.pendientes)
+        self.commits.append(len(self.pendientes))
+
+    def rollback(self):
+        self.pendientes = list()
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        inicio = len(self.pendientes)
+        try:
+            yield
+        except BaseException:
+            del self.pendientes[inicio:]
+            raise
+
+def test_escrituras_concurrentes_comparten_transaccion():
+    datos, commits = list(), list()
+    unidades = list()
+    def abrir():
+        unidades.append(UnidadEnMemoria(datos, commits))
+        return unidades[-1]
+    escritor = EscritorAgrupado(abrir, max_operaciones=8, espera=0.05)
+    barrera = threading.Barrier(20)
+
+    def escribir(i):
+        barrera.wait()
+        assert escritor.ejecutar(lambda: unidades[-1].pendientes.append(i) or i * 2) == i * 2
+
+    hilos = [threading.Thread(target=escribir, args=(i,)) for i in range(20)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    escritor.detener()
+
+    # Todas las escrituras se confirman en menos transacciones que operaciones, sin superar max_operaciones
+    assert sorted(datos) == list(range(20))
+    assert sum(commits) == 20 and len(commits) < 20
+    assert escritor.estadisticas()['max_lote'] <= 8
+    assert escritor.estadisticas()['lotes'] == len(commits)
+
+def test_una_operacion_fallida_no_afecta_a_las_demas_del_grupo():
+    datos, commits = list(), list()
+    unidades = list()
+    def abrir():
+        unidades.append(UnidadEnMemoria(datos, commits))
+        return unidades[-1]
+    escritor = EscritorAgrupado(abrir, espera=0.05)
+
+    def fallar():
+        unidades[-1].pendientes.append('descartado')
+        raise ValueError("email repetido")
+
+    futuros = [
+        escritor.enviar(lambda: unidades[-1].pendientes.append('a')),
+        escritor.enviar(fallar),
+        escritor.enviar(lambda: unidades[-1].pendientes.append('b')),
+    ]
+    with pytest.raises(ValueError, match="email repetido"):
+        futuros[1].result()
+    assert futuros[0].result() is None and futuros[2].result() is None
+    escritor.detener()
+
+    assert datos == ['a', 'b']
+    assert escritor.estadisticas()['fallidas'] == 1
+
+def test_si_falla_el_commit_todas_las_operaciones_del_grupo_fallan():
+    escritor = EscritorAgrupado(lambda: UnidadEnMemoria(list(), list(), fallar_commit=True), espera=0.05)
+
+    futuros = [escritor.enviar(lambda: None) for _ in range(3)]
+
+    for futuro in futuros:
+        with pytest.raises(IOError, match="disco lleno"):
+            futuro.result(timeout=5)
+    escritor.detener()
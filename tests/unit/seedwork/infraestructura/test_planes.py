@@ -0,0 +1,74 @@
+"""Pruebas para archivo de planes de consulta de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para señalar las consultas que no usan índices
+
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from aeroalpes.seedwork.infraestructura.planes import GuardiaPlanes, PlanConsultaExcepcion, revisar_plan
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conexion:
+        conexion.execute(text('CREATE TABLE usuarios (id TEXT PRIMARY KEY, email TEXT, nombre TEXT)'))
+        conexion.execute(text('CREATE INDEX ix_usuarios_email ON usuarios (email)'))
+    return engine
+
+def test_revisar_plan_senala_recorridos_ordenamientos_e_indices_automaticos():
+    detalles = [
+        'SCAN usuarios', 'SCAN TABLE reservas AS r', 'USE TEMP B-TREE FOR ORDER BY',
+        'SEARCH t USING AUTOMATIC COVERING INDEX (a=?)',
+        'SEARCH usuarios USING INDEX ix_usuarios_email (email=?)',
+        'SCAN usuarios USING INDEX ix_usuarios_fecha_creacion_id', 'SCAN CONSTANT ROW',
+    ]
+
+    problemas = [problema for _, problema in revisar_plan(detalles)]
+
+    assert problemas == ['recorrido completo de la tabla', 'recorrido completo de la tabla', 'B-tree temporal', 'índice automático']
+
+def test_guardia_registra_una_vez_cada_sentencia_sin_indice(engine):
+    encontrados = list()
+    guardia = GuardiaPlanes(al_encontrar=encontrados.append)
+    guardia.instalar(engine)
+
+    with engine.connect() as conexion:
+        conexion.execute(text('SELECT * FROM usuarios WHERE email = :email'), dict(email='a@example.com'))
+        for _ in range(2):
+            conexion.execute(text('SELECT * FROM usuarios WHERE nombre = :nombre'), dict(nombre='Ana'))
+        conexion.execute(text('SELECT * FROM usuarios ORDER BY nombre'))
+
+    # Cada sentencia se explica una sola vez; la búsqueda por email usa su índice
+    assert len(guardia.revisadas) == 3
+    assert [(h.problema, h.detalle) for h in guardia.hallazgos] == [
+        ('recorrido completo de la tabla', 'SCAN usuarios'),
+        ('recorrido completo de la tabla', 'SCAN usuarios'),
+        ('B-tree temporal', 'USE TEMP B-TREE FOR ORDER BY'),
+    ]
+    assert encontrados == guardia.hallazgos
+    assert 'WHERE nombre = ?' in guardia.reporte()
+
+    # Las sentencias permitidas y las inserciones no se revisan
+    guardia = GuardiaPlanes(permitidos=(r'FROM usuarios$',))
+    guardia.instalar(engine)
+    with engine.begin() as conexion:
+        conexion.execute(text("INSERT INTO usuarios (id, email, nombre) VALUES ('1', 'a@example.com', 'Ana')"))
+        conexion.execute(text('SELECT * FROM usuarios'))
+    assert guardia.hallazgos == []
+
+def test_guardia_en_modo_fallar_no_ejecuta_la_sentencia(engine):
+    guardia = GuardiaPlanes(fallar=True)
+    guardia.instalar(engine)
+
+    with engine.begin() as conexion:
+        conexion.execute(text("INSERT INTO usuarios (id, email, nombre) VALUES ('1', 'a@example.com', 'Ana')"))
+        with pytest.raises(PlanConsultaExcepcion, match='recorrido completo de la tabla'):
+            conexion.execute(text("DELETE FROM usuarios WHERE nombre = 'Ana'"))
+        assert conexion.execute(text('SELECT count(*) FROM usuarios WHERE id = :id'), dict(id='1')).scalar() == 1
+
+    guardia.retirar(engine)
+    with engine.begin() as conexion:
+        conexion.execute(text("DELETE FROM usuarios WHERE nombre = 'Ana'"))
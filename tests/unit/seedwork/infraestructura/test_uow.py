@@ -0,0 +1,76 @@
+"""Pruebas para archivo de unidad de trabajo de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para abrir, confirmar, descartar y anidar unidades de trabajo
+
+"""
+
+import contextlib
+
+import pytest
+
+from aeroalpes.seedwork.infraestructura.uow import UnidadDeTrabajo, unidad_de_trabajo_actual
+
+
+class UnidadEnMemoria(UnidadDeTrabajo):
+    def __init__(self):
+        super().__init__()
+        self.eventos = list()
+
+    def _abrir(self):
+        self.eventos.append('abrir')
+
+    def _cerrar(self):
+        self.eventos.append('cerrar')
+
+    def commit(self):
+        self.eventos.append('commit')
+
+    def rollback(self):
+        self.eventos.append('rollback')
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        yield
+
+def test_unidad_confirma_al_salir_y_descarta_ante_una_excepcion():
+    unidad = UnidadEnMemoria()
+    with unidad:
+        assert unidad_de_trabajo_actual() is unidad
+        assert unidad.registrar(lambda a, b: a + b, 1, b=2) == 3
+    assert unidad.eventos == ['abrir', 'commit', 'cerrar']
+    assert unidad.operaciones == 1
+    assert unidad_de_trabajo_actual() is None
+
+    unidad = UnidadEnMemoria()
+    with pytest.raises(ValueError):
+        with unidad:
+            unidad.registrar(int, 'no-es-numero')
+    assert unidad.eventos == ['abrir', 'rollback', 'cerrar']
+    assert unidad_de_trabajo_actual() is None
+
+def test_unidad_interior_se_une_a_la_exterior():
+    exterior, interior = UnidadEnMemoria(), UnidadEnMemoria()
+    with exterior:
+        with interior:
+            assert unidad_de_trabajo_actual() is exterior
+        assert interior.eventos == []
+    assert exterior.eventos == ['abrir', 'commit', 'cerrar']
+
+def test_registrar_requiere_una_unidad_abierta():
+    with pytest.raises(RuntimeError):
+        UnidadEnMemoria().registrar(print)
+
+def test_al_confirmar_se_ejecuta_solo_tras_el_commit_de_la_unidad_exterior():
+    ejecutadas = list()
+    exterior = UnidadEnMemoria()
+    with exterior:
+        with UnidadEnMemoria() as interior:
+            interior.al_confirmar(lambda: ejecutadas.append('interior'))
+        assert ejecutadas == []
+    assert ejecutadas == ['interior']
+
+    with pytest.raises(ValueError):
+        with UnidadEnMemoria() as unidad:
+            unidad.al_confirmar(lambda: ejecutadas.append('descartada'))
+            raise ValueError()
+    assert ejecutadas == ['interior']
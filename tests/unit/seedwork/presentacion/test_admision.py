@@ -0,0 +1,157 @@
+"""Pruebas para archivo de control de admisión de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para el límite adaptativo de peticiones en curso
+
+"""
+
+import threading
+
+import pytest
+from flask import Flask
+from aeroalpes.seedwork.presentacion.admision import ControlAdmision, LimitadorAdaptativo
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['ADMISION_LIMITE_INICIAL'] = 2
+    app.config['ADMISION_LIMITE_MINIMO'] = 2
+    app.config['ADMISION_RESERVA_LECTURAS'] = 0.5
+    ControlAdmision(app)
+    app.config['EN_CURSO'] = threading.Event()
+    app.config['CONTINUAR'] = threading.Event()
+
+    @app.route('/lento', methods=['GET', 'POST'])
+    def lento():
+        app.config['EN_CURSO'].set()
+        app.config['CONTINUAR'].wait(timeout=5)
+        return {"status": "ok"}
+
+    @app.route('/rapido', methods=['GET', 'POST'])
+    def rapido():
+        return {"status": "ok"}
+
+    @app.route('/health')
+    def health():
+        return {"status": "up"}
+
+    return app
+
+def con_peticion_lenta(app, metodo: str, funcion):
+    """Ejecuta `funcion` mientras una petición a /lento está en curso"""
+    hilo = threading.Thread(target=lambda: app.test_client().open('/lento', method=metodo))
+    hilo.start()
+    try:
+        assert app.config['EN_CURSO'].wait(timeout=5)
+        return funcion()
+    finally:
+        app.config['CONTINUAR'].set()
+        hilo.join()
+
+"""
+    Pruebas
+"""
+
+def test_admite_hasta_el_limite_y_rechaza_el_exceso():
+    limitador = LimitadorAdaptativo(limite_inicial=4, reserva_lecturas=0)
+
+    assert [limitador.intentar_admitir(es_escritura=False) for _ in range(5)] == [True] * 4 + [False]
+    limitador.liberar(latencia=0.01)
+    assert limitador.intentar_admitir(es_escritura=False)
+    assert limitador.estadisticas()['rechazadas_lecturas'] == 1
+
+def test_las_escrituras_no_ocupan_la_reserva_de_lecturas():
+    limitador = LimitadorAdaptativo(limite_inicial=10, reserva_lecturas=0.2)
+
+    assert sum(limitador.intentar_admitir(es_escritura=True) for _ in range(10)) == 8
+    assert limitador.intentar_admitir(es_escritura=False)
+    assert limitador.intentar_admitir(es_escritura=False)
+    assert not limitador.intentar_admitir(es_escritura=False)
+    assert limitador.estadisticas()['rechazadas_escrituras'] == 2
+
+def test_latencia_alta_disminuye_el_limite_una_vez_por_ventana():
+    reloj = Reloj()
+    limitador = LimitadorAdaptativo(limite_inicial=20, latencia_objetivo=0.1, factor_disminucion=0.5, reloj=reloj)
+
+    for _ in range(3):
+        limitador.intentar_admitir(es_escritura=False)
+        limitador.liberar(latencia=1.0)
+    assert limitador.limite == 10
+
+    reloj.ahora = 0.2
+    limitador.intentar_admitir(es_escritura=False)
+    limitador.liberar(latencia=1.0)
+    assert limitador.limite == 5
+
+def test_latencia_baja_aumenta_el_limite_solo_si_se_usa():
+    limitador = LimitadorAdaptativo(limite_inicial=4, limite_maximo=5, latencia_objetivo=0.1)
+
+    # Con una sola petición en curso el límite no se está usando
+    limitador.intentar_admitir(es_escritura=False)
+    limitador.liberar(latencia=0.01)
+    assert limitador.limite == 4
+
+    for _ in range(20):
+        for _ in range(4):
+            limitador.intentar_admitir(es_escritura=False)
+        for _ in range(4):
+            limitador.liberar(latencia=0.01)
+    assert limitador.limite == 5
+
+def test_el_limite_no_baja_del_minimo():
+    reloj = Reloj()
+    limitador = LimitadorAdaptativo(limite_inicial=3, limite_minimo=2, latencia_objetivo=0.1, reloj=reloj)
+
+    for _ in range(5):
+        reloj.ahora += 1
+        limitador.intentar_admitir(es_escritura=False)
+        limitador.liberar(latencia=1.0)
+    assert limitador.limite == 2
+
+def test_escritura_rechazada_con_503_y_retry_after(app):
+    # Con límite 2 y la mitad reservada a lecturas, una escritura en curso agota el cupo de escrituras
+    respuesta = con_peticion_lenta(app, 'POST', lambda: app.test_client().post('/rapido'))
+
+    assert respuesta.status_code == 503
+    assert respuesta.headers['Retry-After'] == '1'
+    assert 'sobrecargado' in respuesta.get_json()['error']
+
+def test_lectura_usa_la_reserva_mientras_hay_escrituras(app):
+    respuesta = con_peticion_lenta(app, 'POST', lambda: app.test_client().get('/rapido'))
+
+    assert respuesta.status_code == 200
+
+def test_rutas_exentas_nunca_se_rechazan(app):
+    control = app.extensions['admision']
+    control.limitador.limite = 1
+
+    respuesta = con_peticion_lenta(app, 'GET', lambda: app.test_client().get('/health'))
+
+    assert respuesta.status_code == 200
+    assert control.estadisticas()['rechazadas_lecturas'] == 0
+
+def test_libera_el_cupo_al_terminar_la_peticion(app):
+    client = app.test_client()
+    for _ in range(5):
+        assert client.post('/rapido').status_code == 200
+
+    estadisticas = app.extensions['admision'].estadisticas()
+    assert estadisticas['en_curso'] == 0
+    assert estadisticas['admitidas'] == 5
+
+def test_deshabilitado_no_limita(app):
+    app.config['ADMISION_HABILITADA'] = False
+    respuesta = con_peticion_lenta(app, 'POST', lambda: app.test_client().post('/rapido'))
+
+    assert respuesta.status_code == 200
@@ -0,0 +1,178 @@
+"""Pruebas para archivo de adaptador ASGI de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para el adaptador ASGI sobre aplicaciones WSGI
+
+"""
+
+import asyncio
+import json
+import threading
+
+from flask import Flask, Response, request, stream_with_context
+from aeroalpes.seedwork.presentacion.asgi import AdaptadorASGI
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+def crear_app_prueba():
+    app = Flask(__name__)
+
+    @app.route('/health')
+    def health():
+        return {"status": "up"}
+
+    @app.route('/eco', methods=['POST'])
+    def eco():
+        return {"cuerpo": request.get_json(), "consulta": request.args.get('q'), "x": request.headers.get('X-Prueba')}
+
+    @app.route('/lineas', methods=['POST'])
+    def lineas():
+        procesadas = list()
+        for linea in request.stream:
+            app.config['EVENTOS'].append(f'procesada {linea.strip().decode()}')
+            procesadas.append(linea.strip().decode())
+        return {"lineas": procesadas}
+
+    @app.route('/flujo')
+    def flujo():
+        def generar():
+            for i in range(3):
+                yield f'{i}\n'
+        return Response(stream_with_context(generar()), mimetype='text/plain')
+
+    return app
+
+def scope_http(metodo, ruta, consulta=b'', encabezados=None):
+    return {
+        'type': 'http', 'method': metodo, 'path': ruta, 'query_string': consulta,
+        'headers': encabezados or [], 'http_version': '1.1', 'scheme': 'http',
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+    }
+
+def llamar(adaptador, scope, mensajes_entrada=None):
+    mensajes_entrada = list(mensajes_entrada or [{'type': 'http.request', 'body': b'', 'more_body': False}])
+    enviados = list()
+
+    async def receive():
+        return mensajes_entrada.pop(0)
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    asyncio.run(adaptador(scope, receive, send))
+    return enviados
+
+def cuerpo(enviados) -> bytes:
+    return b''.join(m.get('body', b'') for m in enviados if m['type'] == 'http.response.body')
+
+"""
+    Pruebas
+"""
+
+def test_get_retorna_respuesta_de_la_app_wsgi():
+    adaptador = AdaptadorASGI(crear_app_prueba(), max_hilos=2)
+    enviados = llamar(adaptador, scope_http('GET', '/health'))
+
+    assert enviados[0]['type'] == 'http.response.start'
+    assert enviados[0]['status'] == 200
+    assert (b'content-type', b'application/json') in enviados[0]['headers']
+    assert json.loads(cuerpo(enviados)) == {"status": "up"}
+    assert enviados[-1]['more_body'] is False
+    adaptador.cerrar()
+
+def test_post_con_cuerpo_fragmentado_y_encabezados():
+    adaptador = AdaptadorASGI(crear_app_prueba(), max_hilos=2)
+    scope = scope_http('POST', '/eco', consulta=b'q=1',
+                       encabezados=[(b'content-type', b'application/json'), (b'x-prueba', b'si')])
+    enviados = llamar(adaptador, scope, [
+        {'type': 'http.request', 'body': b'{"a": ', 'more_body': True},
+        {'type': 'http.request', 'body': b'1}', 'more_body': False},
+    ])
+
+    assert enviados[0]['status'] == 200
+    assert json.loads(cuerpo(enviados)) == {"cuerpo": {"a": 1}, "consulta": "1", "x": "si"}
+    adaptador.cerrar()
+
+def test_respuesta_en_streaming_se_envia_por_fragmentos():
+    adaptador = AdaptadorASGI(crear_app_prueba(), max_hilos=2, max_fragmentos_pendientes=1)
+    enviados = llamar(adaptador, scope_http('GET', '/flujo'))
+
+    fragmentos = [m['body'] for m in enviados if m['type'] == 'http.response.body' and m['body']]
+    assert fragmentos == [b'0\n', b'1\n', b'2\n']
+    adaptador.cerrar()
+
+def test_excepcion_en_la_app_retorna_500():
+    # Una app WSGI que falla antes de llamar start_response
+    def app_con_falla(environ, start_response):
+        raise RuntimeError("falla")
+
+    adaptador = AdaptadorASGI(app_con_falla, max_hilos=1)
+    enviados = llamar(adaptador, scope_http('GET', '/falla'))
+
+    assert enviados[0]['status'] == 500
+    assert enviados[-1]['more_body'] is False
+    adaptador.cerrar()
+
+def test_ciclo_de_vida_crea_y_libera_el_pool():
+    adaptador = AdaptadorASGI(crear_app_prueba(), max_hilos=2)
+    mensajes = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    enviados = llamar(adaptador, {'type': 'lifespan'}, mensajes)
+
+    assert [m['type'] for m in enviados] == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert adaptador._ejecutor is None
+
+def test_cuerpo_se_lee_a_medida_que_llega():
+    app = crear_app_prueba()
+    eventos = app.config['EVENTOS'] = list()
+    adaptador = AdaptadorASGI(app, max_hilos=2)
+    mensajes = [
+        {'type': 'http.request', 'body': b'a\n', 'more_body': True},
+        {'type': 'http.request', 'body': b'b\n', 'more_body': True},
+        {'type': 'http.request', 'body': b'c\n', 'more_body': False},
+    ]
+    enviados = list()
+
+    async def receive():
+        eventos.append(f'recibido {len(mensajes)}')
+        return mensajes.pop(0)
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    scope = scope_http('POST', '/lineas', encabezados=[(b'content-type', b'application/x-ndjson')])
+    asyncio.run(adaptador(scope, receive, send))
+
+    # Cada línea se procesa antes de pedir el siguiente fragmento del cuerpo
+    assert json.loads(cuerpo(enviados)) == {"lineas": ["a", "b", "c"]}
+    assert eventos == ['recibido 3', 'procesada a', 'recibido 2', 'procesada b', 'recibido 1', 'procesada c']
+    adaptador.cerrar()
+
+def test_peticiones_concurrentes_no_se_bloquean_entre_si():
+    # Cada petición espera a que las demás estén en curso; con un solo hilo la barrera vencería
+    barrera = threading.Barrier(4, timeout=5)
+
+    def app_concurrente(environ, start_response):
+        barrera.wait()
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'ok']
+
+    adaptador = AdaptadorASGI(app_concurrente, max_hilos=4)
+
+    async def una():
+        enviados = list()
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        async def send(mensaje):
+            enviados.append(mensaje)
+        await adaptador(scope_http('GET', '/'), receive, send)
+        return enviados
+
+    async def varias():
+        return await asyncio.gather(*[una() for _ in range(4)])
+
+    resultados = asyncio.run(varias())
+    assert all(r[0]['status'] == 200 for r in resultados)
+    assert not barrera.broken
+    adaptador.cerrar()
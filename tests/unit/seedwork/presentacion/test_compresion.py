@@ -0,0 +1,119 @@
+"""Pruebas para archivo de compresión de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para la compresión de respuestas HTTP
+
+"""
+
+import gzip
+import json
+import zlib
+
+import pytest
+from flask import Flask, Response, stream_with_context
+from aeroalpes.seedwork.presentacion.compresion import Compresion
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+GRANDE = {"legs": [{"origen": "BOG", "destino": "JFK", "indice": i} for i in range(100)]}
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    Compresion(app)
+
+    @app.route('/grande')
+    def grande():
+        return GRANDE
+
+    @app.route('/pequeno')
+    def pequeno():
+        return {"status": "up"}
+
+    @app.route('/imagen')
+    def imagen():
+        return Response(b'\x89PNG' * 500, mimetype='image/png')
+
+    @app.route('/versionado')
+    def versionado():
+        respuesta = Response(json.dumps(GRANDE), mimetype='application/json')
+        respuesta.set_etag('abc')
+        return respuesta
+
+    @app.route('/flujo')
+    def flujo():
+        def generar():
+            for i in range(50):
+                yield json.dumps({"indice": i, "origen": "BOG"}) + '\n'
+        return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+"""
+    Pruebas
+"""
+
+def test_comprime_con_gzip_cuando_el_cliente_lo_acepta(client, app):
+    respuesta = client.get('/grande', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in respuesta.headers['Vary']
+    assert int(respuesta.headers['Content-Length']) == len(respuesta.data)
+    assert json.loads(gzip.decompress(respuesta.data)) == GRANDE
+
+    estadisticas = app.extensions['compresion'].estadisticas()
+    assert estadisticas['respuestas_comprimidas'] == 1
+    assert estadisticas['bytes_ahorrados'] > 0
+
+def test_negocia_deflate_segun_la_calidad(client):
+    respuesta = client.get('/grande', headers={'Accept-Encoding': 'gzip;q=0.5, deflate'})
+
+    assert respuesta.headers['Content-Encoding'] == 'deflate'
+    assert json.loads(zlib.decompress(respuesta.data)) == GRANDE
+
+def test_no_comprime_sin_accept_encoding(client):
+    respuesta = client.get('/grande')
+
+    assert 'Content-Encoding' not in respuesta.headers
+    assert 'Accept-Encoding' in respuesta.headers['Vary']
+    assert respuesta.get_json() == GRANDE
+
+def test_no_comprime_respuestas_pequenas_ni_tipos_binarios(client):
+    assert 'Content-Encoding' not in client.get('/pequeno', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/imagen', headers={'Accept-Encoding': 'gzip'}).headers
+
+def test_tamano_minimo_configurable(app, client):
+    app.config['COMPRESION_TAMANO_MINIMO'] = 1_000_000
+    respuesta = client.get('/grande', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in respuesta.headers
+    assert respuesta.get_json() == GRANDE
+
+def test_etag_fuerte_identifica_la_codificacion(client):
+    assert client.get('/versionado', headers={'Accept-Encoding': 'gzip'}).headers['ETag'] == '"abc-gzip"'
+    assert client.get('/versionado', headers={'Accept-Encoding': 'deflate'}).headers['ETag'] == '"abc-deflate"'
+    assert client.get('/versionado').headers['ETag'] == '"abc"'
+
+def test_etag_debil_se_conserva_al_comprimir(app, client):
+    @app.route('/debil')
+    def debil():
+        respuesta = Response(json.dumps(GRANDE), mimetype='application/json')
+        respuesta.set_etag('abc', weak=True)
+        return respuesta
+
+    assert client.get('/debil', headers={'Accept-Encoding': 'gzip'}).headers['ETag'] == 'W/"abc"'
+
+def test_comprime_respuestas_en_streaming(client, app):
+    respuesta = client.get('/flujo', headers={'Accept-Encoding': 'gzip'})
+
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in respuesta.headers
+    lineas = gzip.decompress(respuesta.data).decode('utf-8').splitlines()
+    assert [json.loads(linea)['indice'] for linea in lineas] == list(range(50))
+    assert app.extensions['compresion'].estadisticas()['respuestas_comprimidas'] == 1
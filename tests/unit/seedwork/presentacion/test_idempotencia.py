@@ -0,0 +1,185 @@
+"""Pruebas para archivo de idempotencia de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para repetir respuestas con Idempotency-Key
+
+"""
+
+import threading
+
+import pytest
+from flask import Flask, request
+from aeroalpes.seedwork.presentacion.idempotencia import (
+    AlmacenMemoria, AlmacenSQLite, Idempotencia, RespuestaGuardada, idempotente
+)
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+def crear_app(**configuracion) -> Flask:
+    app = Flask(__name__)
+    app.config.update(configuracion)
+    Idempotencia(app)
+    app.config['EJECUCIONES'] = list()
+    app.config['EN_CURSO'] = threading.Event()
+    app.config['CONTINUAR'] = threading.Event()
+    app.config['CONTINUAR'].set()
+
+    @app.route('/reservas', methods=['POST'])
+    @idempotente
+    def reservar():
+        app.config['EJECUCIONES'].append(request.json)
+        app.config['EN_CURSO'].set()
+        app.config['CONTINUAR'].wait(timeout=5)
+        return {"id": len(app.config['EJECUCIONES'])}, 201
+
+    @app.route('/falla', methods=['POST'])
+    @idempotente
+    def falla():
+        app.config['EJECUCIONES'].append(request.json)
+        return {"error": "falla"}, 500
+
+    return app
+
+@pytest.fixture
+def app():
+    return crear_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def reservar(client, llave: str = 'llave-1', cuerpo: dict = None):
+    headers = {'Idempotency-Key': llave} if llave is not None else {}
+    return client.post('/reservas', json=cuerpo or {"vuelo": "AV1"}, headers=headers)
+
+"""
+    Pruebas
+"""
+
+def test_reintento_repite_la_respuesta_sin_ejecutar_la_vista(app, client):
+    primera = reservar(client)
+    segunda = reservar(client)
+
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.get_json() == primera.get_json() == {"id": 1}
+    assert segunda.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in primera.headers
+    assert len(app.config['EJECUCIONES']) == 1
+
+def test_sin_llave_se_ejecuta_siempre(app, client):
+    reservar(client, llave=None)
+    reservar(client, llave=None)
+
+    assert len(app.config['EJECUCIONES']) == 2
+
+def test_llave_es_propia_de_cada_ruta_y_valor(app, client):
+    reservar(client, llave='a')
+    reservar(client, llave='b')
+    client.post('/falla', json={}, headers={'Idempotency-Key': 'a'})
+
+    assert len(app.config['EJECUCIONES']) == 3
+
+def test_llave_reutilizada_con_otro_cuerpo(client):
+    reservar(client)
+    respuesta = reservar(client, cuerpo={"vuelo": "AV2"})
+
+    assert respuesta.status_code == 422
+    assert 'diferente' in respuesta.get_json()['error']
+
+def test_llave_invalida(client):
+    assert reservar(client, llave='x' * 256).status_code == 400
+
+def test_errores_del_servidor_no_se_guardan(app, client):
+    for _ in range(2):
+        assert client.post('/falla', json={}, headers={'Idempotency-Key': 'k'}).status_code == 500
+
+    assert len(app.config['EJECUCIONES']) == 2
+
+def test_duplicado_concurrente_espera_a_la_peticion_en_curso(app):
+    app.config['CONTINUAR'].clear()
+    respuestas = list()
+    original = threading.Thread(target=lambda: respuestas.append(reservar(app.test_client())))
+    original.start()
+    assert app.config['EN_CURSO'].wait(timeout=5)
+
+    duplicado = threading.Thread(target=lambda: respuestas.append(reservar(app.test_client())))
+    duplicado.start()
+    extension = app.extensions['idempotencia']
+    for _ in range(500):
+        if extension.esperas:
+            break
+        threading.Event().wait(0.01)
+
+    app.config['CONTINUAR'].set()
+    original.join()
+    duplicado.join()
+
+    assert extension.esperas == 1
+    assert len(app.config['EJECUCIONES']) == 1
+    assert [respuesta.get_json() for respuesta in respuestas] == [{"id": 1}, {"id": 1}]
+
+def test_duplicado_que_espera_demasiado_recibe_409():
+    app = crear_app(IDEMPOTENCIA_ESPERA=0.05)
+    app.config['CONTINUAR'].clear()
+    original = threading.Thread(target=lambda: reservar(app.test_client()))
+    original.start()
+    assert app.config['EN_CURSO'].wait(timeout=5)
+    try:
+        respuesta = reservar(app.test_client())
+    finally:
+        app.config['CONTINUAR'].set()
+        original.join()
+
+    assert respuesta.status_code == 409
+
+def test_almacen_en_memoria_expira_y_descarta_las_menos_usadas():
+    reloj = Reloj()
+    almacen = AlmacenMemoria(capacidad=2, ttl=10, reloj=reloj)
+    respuesta = RespuestaGuardada('h', 201, (), b'{}')
+    almacen.guardar('a', respuesta)
+    almacen.guardar('b', respuesta)
+    almacen.obtener('a')
+    almacen.guardar('c', respuesta)
+
+    assert almacen.obtener('b') is None
+    assert almacen.obtener('a') is respuesta
+
+    reloj.ahora = 11
+    assert almacen.obtener('a') is None
+
+def test_almacen_sqlite_comparte_respuestas_entre_procesos(tmp_path):
+    ruta = str(tmp_path / 'idempotencia.db')
+    primera = crear_app(IDEMPOTENCIA_ARCHIVO=ruta)
+    segunda = crear_app(IDEMPOTENCIA_ARCHIVO=ruta)
+
+    reservar(primera.test_client())
+    respuesta = reservar(segunda.test_client())
+
+    assert respuesta.headers['Idempotent-Replayed'] == 'true'
+    assert respuesta.get_json() == {"id": 1}
+    assert segunda.config['EJECUCIONES'] == []
+
+def test_almacen_sqlite_marca_en_curso_y_libera(tmp_path):
+    reloj = Reloj()
+    almacen = AlmacenSQLite(str(tmp_path / 'idempotencia.db'), ttl=10, reloj=reloj)
+
+    assert almacen.reclamar('k', 'h', ttl_en_curso=5)
+    assert not almacen.reclamar('k', 'h', ttl_en_curso=5)
+    assert almacen.obtener('k') == (True, None)
+
+    almacen.liberar('k')
+    assert almacen.obtener('k') == (False, None)
+
+    # Una marca de un proceso que murió expira sola
+    assert almacen.reclamar('k', 'h', ttl_en_curso=5)
+    reloj.ahora = 6
+    assert almacen.reclamar('k', 'h', ttl_en_curso=5)
@@ -0,0 +1,154 @@
+"""Pruebas para archivo de métricas de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para las métricas HTTP y el tiempo por capa
+
+"""
+
+import pytest
+from flask import Flask
+from aeroalpes.seedwork.presentacion.metricas import Cronometro, Metricas, instrumentar
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class Mapeador:
+    def dto_a_entidad(self, dto):
+        return dict(dto=dto)
+
+class Repositorio:
+    def __init__(self):
+        self.mapeador = Mapeador()
+
+    def obtener_por_id(self, id):
+        return self.mapeador.dto_a_entidad(id)
+
+    def iterar_todos(self):
+        for i in range(3):
+            yield self.mapeador.dto_a_entidad(i)
+
+    def _privado(self):
+        ...
+
+instrumentar(Mapeador, 'mapeador')
+instrumentar(Repositorio, 'repositorio')
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['METRICAS_BUCKETS'] = (0.1, 1.0)
+    Metricas(app)
+    repositorio = Repositorio()
+
+    @app.route('/reservas/<id>')
+    def reserva(id):
+        return repositorio.obtener_por_id(id)
+
+    @app.route('/reservas')
+    def reservas():
+        return {"reservas": list(repositorio.iterar_todos())}
+
+    @app.route('/falla')
+    def falla():
+        return {"error": "falla"}, 500
+
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def lineas_metricas(client) -> list[str]:
+    respuesta = client.get('/metrics')
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'text/plain'
+    return respuesta.get_data(as_text=True).splitlines()
+
+"""
+    Pruebas
+"""
+
+def test_cuenta_peticiones_por_regla_y_estado(client):
+    client.get('/reservas/1')
+    client.get('/reservas/2')
+    client.get('/falla')
+    client.get('/no-existe')
+
+    lineas = lineas_metricas(client)
+
+    assert 'aeroalpes_peticiones_total{endpoint="/reservas/<id>",metodo="GET",estado="200"} 2' in lineas
+    assert 'aeroalpes_peticiones_total{endpoint="/falla",metodo="GET",estado="500"} 1' in lineas
+    assert 'aeroalpes_peticiones_total{endpoint="sin_ruta",metodo="GET",estado="404"} 1' in lineas
+    assert 'aeroalpes_errores_total{endpoint="/falla",metodo="GET"} 1' in lineas
+    assert 'aeroalpes_errores_total{endpoint="/reservas/<id>",metodo="GET"} 0' in lineas
+
+def test_histograma_de_latencia_acumulado(client):
+    client.get('/reservas/1')
+    client.get('/reservas/2')
+
+    lineas = lineas_metricas(client)
+    etiquetas = 'endpoint="/reservas/<id>",metodo="GET"'
+
+    assert f'aeroalpes_peticion_duracion_segundos_bucket{{{etiquetas},le="0.1"}} 2' in lineas
+    assert f'aeroalpes_peticion_duracion_segundos_bucket{{{etiquetas},le="1.0"}} 2' in lineas
+    assert f'aeroalpes_peticion_duracion_segundos_bucket{{{etiquetas},le="+Inf"}} 2' in lineas
+    assert f'aeroalpes_peticion_duracion_segundos_count{{{etiquetas}}} 2' in lineas
+
+def test_tiempo_por_capa_incluye_capas_anidadas_y_generadores(client):
+    client.get('/reservas/1')
+    client.get('/reservas')
+
+    lineas = lineas_metricas(client)
+
+    for endpoint in ('/reservas/<id>', '/reservas'):
+        for capa in ('mapeador', 'repositorio'):
+            assert f'aeroalpes_capa_duracion_segundos_count{{endpoint="{endpoint}",metodo="GET",capa="{capa}"}} 1' in lineas
+
+def test_expone_estadisticas_de_otras_extensiones(app, client):
+    class Extension:
+        def estadisticas(self):
+            return dict(aciertos=3, nombre="no numérico")
+
+    app.extensions['cache'] = Extension()
+
+    lineas = lineas_metricas(client)
+
+    assert 'aeroalpes_cache_aciertos 3' in lineas
+    assert not any('aeroalpes_cache_nombre' in linea for linea in lineas)
+
+def test_estadisticas_resumidas(app, client):
+    client.get('/reservas/1')
+    client.get('/falla')
+
+    assert app.extensions['metricas'].estadisticas() == dict(peticiones=2, errores=1)
+
+def test_cronometro_mide_tiempo_exclusivo():
+    cronometro = Cronometro()
+    cronometro.entrar('repositorio')
+    cronometro.entrar('commit')
+    cronometro.salir('commit')
+    cronometro.salir('repositorio')
+
+    assert set(cronometro.tiempos) == {'repositorio', 'commit'}
+    assert cronometro.capa_actual() is None
+
+def test_cronometro_cierra_capas_internas_abiertas():
+    cronometro = Cronometro()
+    cronometro.entrar('repositorio')
+    cronometro.entrar('commit')
+    cronometro.salir('repositorio')
+
+    assert cronometro.capa_actual() is None
+    assert set(cronometro.tiempos) == {'repositorio', 'commit'}
+
+def test_instrumentar_conserva_el_comportamiento_y_es_idempotente():
+    metodo = Repositorio.obtener_por_id
+    instrumentar(Repositorio, 'repositorio')
+
+    assert Repositorio.obtener_por_id is metodo
+    assert Repositorio.obtener_por_id.__name__ == 'obtener_por_id'
+    assert not hasattr(Repositorio._privado, '__capa__')
+    # Fuera de una petición no se mide nada
+    assert Repositorio().obtener_por_id(7) == dict(dto=7)
+    assert list(Repositorio().iterar_todos()) == [dict(dto=0), dict(dto=1), dict(dto=2)]
@@ -0,0 +1,182 @@
+"""Pruebas para archivo de servidor pre-fork de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para servir una aplicación precargada con varios procesos
+
+"""
+
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Los workers se identifican con /proc/<pid>/task/<pid>/children
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Requiere os.fork y /proc")
+
+SERVIDOR = """
+import gc, os, sys
+from flask import Flask
+from aeroalpes.seedwork.presentacion.prefork import ServidorPrefork
+
+app = Flask(__name__)
+estado = dict(padre=os.getpid(), reiniciado=False)
+
+def al_iniciar_worker():
+    estado['reiniciado'] = True
+
+@app.route('/pid')
+def pid():
+    return dict(pid=os.getpid(), padre=estado['padre'], reiniciado=estado['reiniciado'], congelados=gc.get_freeze_count())
+
+ServidorPrefork(app, puerto=int(sys.argv[1]), workers=2, al_iniciar_worker=al_iniciar_worker).servir()
+"""
+
+SERVIDOR_API = """
+import sys
+from aeroalpes.api import create_app
+from aeroalpes.api.servidor import servir
+
+app = create_app({"TESTING": True, "DATABASE": sys.argv[2], "ADMISION_HABILITADA": False})
+servir(app, puerto=int(sys.argv[1]), workers=2)
+"""
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def consultar(puerto: int) -> dict:
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=5)
+    try:
+        conexion.request('GET', '/pid')
+        return json.loads(conexion.getresponse().read())
+    finally:
+        conexion.close()
+
+def esperar(condicion, limite: float = 10.0):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            resultado = condicion()
+            if resultado:
+                return resultado
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise AssertionError("La condición no se cumplió a tiempo")
+
+def hijos(pid: int) -> set[int]:
+    with open(f'/proc/{pid}/task/{pid}/children') as archivo:
+        return {int(hijo) for hijo in archivo.read().split()}
+
+def iniciar(codigo: str, *argumentos: str) -> tuple[subprocess.Popen, int]:
+    puerto = puerto_libre()
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proceso = subprocess.Popen([sys.executable, '-c', codigo, str(puerto), *argumentos], env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proceso, puerto
+
+def detener(proceso: subprocess.Popen):
+    if proceso.poll() is None:
+        proceso.kill()
+        proceso.wait()
+
+@pytest.fixture
+def servidor():
+    proceso, puerto = iniciar(SERVIDOR)
+    try:
+        esperar(lambda: consultar(puerto))
+        yield proceso, puerto
+    finally:
+        detener(proceso)
+
+"""
+    Pruebas
+"""
+
+def test_workers_atienden_con_la_aplicacion_precargada(servidor):
+    proceso, puerto = servidor
+
+    respuesta = consultar(puerto)
+
+    # La aplicación se cargó en el padre, pero la petición la atiende un worker ya reiniciado
+    assert respuesta['padre'] == proceso.pid
+    assert respuesta['pid'] in hijos(proceso.pid)
+    assert respuesta['reiniciado']
+    assert respuesta['congelados'] > 0
+    assert len(esperar(lambda: len(hijos(proceso.pid)) == 2 and hijos(proceso.pid))) == 2
+
+def test_worker_que_termina_se_reemplaza(servidor):
+    proceso, puerto = servidor
+    workers = esperar(lambda: len(hijos(proceso.pid)) == 2 and hijos(proceso.pid))
+
+    terminado = workers.pop()
+    os.kill(terminado, signal.SIGKILL)
+
+    nuevos = esperar(lambda: len(hijos(proceso.pid)) == 2 and terminado not in hijos(proceso.pid) and hijos(proceso.pid))
+    assert workers < nuevos
+    assert consultar(puerto)['reiniciado']
+
+def test_sigterm_detiene_a_los_workers(servidor):
+    proceso, puerto = servidor
+    workers = esperar(lambda: len(hijos(proceso.pid)) == 2 and hijos(proceso.pid))
+
+    proceso.send_signal(signal.SIGTERM)
+
+    assert proceso.wait(timeout=10) == 0
+    assert not any(os.path.exists(f'/proc/{pid}') for pid in workers)
+
+def test_workers_comparten_las_respuestas_idempotentes(tmp_path):
+    base = tmp_path / 'prefork.db'
+    proceso, puerto = iniciar(SERVIDOR_API, str(base))
+    usuario = json.dumps({
+        "tipo_usuario": "natural", "nombre": "Usuario Prefork", "email": "prefork@example.com", "cedula": "1000",
+        "fecha_nacimiento": "1990-05-15T00:00:00Z",
+        "metodos_pago": [{"tipo": "CREDITO", "nombre": "Tarjeta", "token_seguridad": "tok", "datos_ofuscados": "****1234"}]
+    })
+
+    def crear() -> tuple[int, bytes]:
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=5)
+        try:
+            conexion.request('POST', '/cliente/usuarios', body=usuario,
+                             headers={'Content-Type': 'application/json', 'Idempotency-Key': 'reintento-1'})
+            respuesta = conexion.getresponse()
+            return respuesta.status, respuesta.read()
+        finally:
+            conexion.close()
+
+    try:
+        esperar(lambda: len(hijos(proceso.pid)) == 2)
+        primera = esperar(crear)
+        # Cada reintento abre una conexión nueva, que puede atender cualquiera de los workers
+        reintentos = [crear() for _ in range(10)]
+    finally:
+        detener(proceso)
+
+    assert primera[0] == 201
+    assert set(reintentos) == {primera}
+    assert (tmp_path / 'prefork-idempotencia.db').exists()
+
+def test_varios_workers_sin_archivo_sqlite_no_arrancan():
+    import click
+    from flask import Flask
+    from aeroalpes.api.servidor import compartir_estado
+    from aeroalpes.seedwork.presentacion.idempotencia import Idempotencia
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    Idempotencia(app)
+
+    compartir_estado(app, 1)
+    with pytest.raises(click.ClickException):
+        compartir_estado(app, 2)
@@ -0,0 +1,122 @@
+"""Pruebas para archivo de trazas por petición de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para el muestreo, la cabecera traceparent y la consulta de trazas
+
+"""
+
+import json
+
+import pytest
+from flask import Flask
+from aeroalpes.seedwork.aplicacion.servicios import Servicio
+from aeroalpes.seedwork.presentacion.trazas import Trazas, leer_traceparent
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class ServicioPrueba(Servicio):
+    def obtener(self, id):
+        return dict(id=id)
+
+TRACEPARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(TESTING=True, TRAZAS_MUESTREO=1.0)
+    Trazas(app)
+    servicio = ServicioPrueba()
+
+    @app.route('/reservas/<id>')
+    def reserva(id):
+        return servicio.obtener(id)
+
+    @app.route('/usuarios/email/<email>')
+    def usuario(email):
+        raise ValueError(f"El email {email} no está registrado")
+
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+"""
+    Pruebas
+"""
+
+def test_traza_la_peticion_y_la_consulta(client):
+    respuesta = client.get('/reservas/1')
+    trazas = client.get('/debug/trazas').get_json()['trazas']
+
+    assert len(trazas) == 1
+    traza = trazas[0]
+    assert traza['nombre'] == 'GET /reservas/<id>'
+    assert [span['nombre'] for span in traza['spans']] == ['GET /reservas/<id>', 'ServicioPrueba.obtener']
+    assert traza['spans'][0]['atributos'] == dict(ruta='/reservas/<id>', estado=200)
+    assert respuesta.headers['traceparent'] == f"00-{traza['id']}-{traza['spans'][0]['id']}-01"
+
+def test_continua_la_traza_del_traceparent(app, client):
+    app.config.update(TRAZAS_MUESTREO=0.0, TRAZAS_CONFIAR_TRACEPARENT=True)
+    client.get('/reservas/1', headers={'traceparent': TRACEPARENT})
+
+    traza = client.get('/debug/trazas?id=4bf92f3577b34da6a3ce929d0e0e4736').get_json()['trazas'][0]
+    assert traza['spans'][0]['padre'] == '00f067aa0ba902b7'
+
+def test_traceparent_no_confiable_no_fuerza_la_traza(app, client):
+    app.config['TRAZAS_MUESTREO'] = 0.0
+    respuesta = client.get('/reservas/1', headers={'traceparent': TRACEPARENT})
+
+    assert 'traceparent' not in respuesta.headers
+    assert app.extensions['trazas'].estadisticas()['muestreadas'] == 0
+
+def test_traza_no_guarda_datos_de_la_ruta_ni_del_error(app):
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+    client = app.test_client()
+    assert client.get('/usuarios/email/secreto@example.com').status_code == 500
+
+    contenido = client.get('/debug/trazas').get_data(as_text=True)
+    assert 'secreto' not in contenido
+    assert json.loads(contenido)['trazas'][0]['spans'][0]['error'] == 'ValueError'
+
+def test_ruta_de_consulta_desactivada_por_defecto_en_produccion():
+    app = Flask(__name__)
+    Trazas(app)
+
+    assert app.config['TRAZAS_RUTA'] is None
+    assert app.test_client().get('/debug/trazas').status_code == 404
+
+def test_respeta_la_decision_de_no_muestrear(client):
+    respuesta = client.get('/reservas/1', headers={'traceparent': TRACEPARENT[:-2] + '00'})
+
+    assert 'traceparent' not in respuesta.headers
+    assert client.get('/debug/trazas').get_json()['trazas'] == []
+
+def test_muestreo_cero_no_traza(app, client):
+    app.config['TRAZAS_MUESTREO'] = 0.0
+    client.get('/reservas/1')
+
+    assert app.extensions['trazas'].estadisticas() == dict(muestreadas=0, en_memoria=0)
+
+def test_filtros_invalidos(client):
+    respuesta = client.get('/debug/trazas?min_ms=lento')
+
+    assert respuesta.status_code == 400
+
+def test_exporta_a_archivo(tmp_path):
+    ruta = tmp_path / 'trazas.jsonl'
+    app = Flask(__name__)
+    app.config.update(TRAZAS_MUESTREO=1.0, TRAZAS_ARCHIVO=str(ruta), TRAZAS_RUTA=None)
+    Trazas(app)
+    app.add_url_rule('/health', 'health', lambda: {"status": "up"})
+
+    app.test_client().get('/health')
+
+    assert json.loads(ruta.read_text(encoding='utf-8'))['nombre'] == 'GET /health'
+    assert app.test_client().get('/debug/trazas').status_code == 404
+
+@pytest.mark.parametrize('valor', [None, '', 'basura', '00-' + '0' * 32 + '-00f067aa0ba902b7-01'])
+def test_traceparent_invalido(valor):
+    assert leer_traceparent(valor) is None
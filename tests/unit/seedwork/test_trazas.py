@@ -0,0 +1,143 @@
+"""Pruebas para archivo de trazas de Seedwork
+
+En este archivo usted encontrará las diferentes pruebas de validación para los spans que abren las clases base del seedwork
+
+"""
+
+import json
+
+import pytest
+from aeroalpes.seedwork.aplicacion.servicios import Servicio
+from aeroalpes.seedwork.dominio.fabricas import Fabrica
+from aeroalpes.seedwork.dominio.repositorios import Mapeador
+from aeroalpes.seedwork.trazas import ArchivoJSONL, BufferCircular, abrir_span, cerrar_span, iniciar_traza, span_actual, terminar_traza
+
+
+"""
+    Clases de Soporte para validar el seedwork
+"""
+
+class MapeadorPrueba(Mapeador):
+    def obtener_tipo(self) -> type:
+        return dict
+
+    def entidad_a_dto(self, entidad):
+        return entidad
+
+    def dto_a_entidad(self, dto):
+        return dict(dto=dto)
+
+    def dto_a_entidades(self, dtos):
+        for dto in dtos:
+            yield self.dto_a_entidad(dto)
+
+class FabricaPrueba(Fabrica):
+    def crear_objeto(self, obj, mapeador=None):
+        if obj is None:
+            raise ValueError("Objeto vacío")
+        return mapeador.dto_a_entidad(obj)
+
+class ServicioPrueba(Servicio):
+    def __init__(self):
+        self.fabrica = FabricaPrueba()
+        self.mapeador = MapeadorPrueba()
+
+    def crear(self, obj):
+        return self.fabrica.crear_objeto(obj, self.mapeador)
+
+    def _privado(self):
+        ...
+
+def trazar(funcion) -> dict:
+    span, token = iniciar_traza('prueba', 'api')
+    buffer = BufferCircular()
+    try:
+        funcion()
+    finally:
+        terminar_traza(span, token, buffer)
+    return buffer.consultar()[0]
+
+"""
+    Pruebas
+"""
+
+def test_spans_anidados_por_capa():
+    traza = trazar(lambda: ServicioPrueba().crear(1))
+
+    spans = {span['nombre']: span for span in traza['spans']}
+    assert [span['nombre'] for span in traza['spans']] == [
+        'prueba', 'ServicioPrueba.crear', 'FabricaPrueba.crear_objeto', 'MapeadorPrueba.dto_a_entidad'
+    ]
+    assert spans['ServicioPrueba.crear']['capa'] == 'servicio'
+    assert spans['FabricaPrueba.crear_objeto']['padre'] == spans['ServicioPrueba.crear']['id']
+    assert spans['MapeadorPrueba.dto_a_entidad']['padre'] == spans['FabricaPrueba.crear_objeto']['id']
+    assert span_actual() is None
+
+def test_span_registra_la_excepcion():
+    def crear_vacio():
+        with pytest.raises(ValueError):
+            ServicioPrueba().crear(None)
+
+    traza = trazar(crear_vacio)
+
+    spans = {span['nombre']: span for span in traza['spans']}
+    assert spans['FabricaPrueba.crear_objeto']['error'] == 'ValueError'
+    assert spans['ServicioPrueba.crear']['error'] == 'ValueError'
+
+def test_generador_no_filtra_su_span_al_consumidor():
+    mapeador = MapeadorPrueba()
+    padres = list()
+
+    def consumir():
+        for _ in mapeador.dto_a_entidades([1, 2]):
+            padres.append(span_actual().nombre)
+
+    traza = trazar(consumir)
+
+    assert padres == ['prueba', 'prueba']
+    generador = next(span for span in traza['spans'] if span['nombre'] == 'MapeadorPrueba.dto_a_entidades')
+    hijos = [span for span in traza['spans'] if span['padre'] == generador['id']]
+    assert len(hijos) == 2
+
+def test_sin_traza_no_se_abren_spans():
+    assert ServicioPrueba().crear(1) == dict(dto=1)
+    assert abrir_span('huerfano', 'servicio') is None
+    assert span_actual() is None
+
+def test_metodos_privados_y_abstractos_no_se_trazan():
+    assert not hasattr(ServicioPrueba._privado, '__traza__')
+    assert not hasattr(Servicio._persistir_lote, '__traza__')
+    assert ServicioPrueba.crear.__traza__ == 'servicio'
+    assert ServicioPrueba.crear.__name__ == 'crear'
+
+def test_spans_de_traza_terminada_se_ignoran():
+    span, token = iniciar_traza('prueba', 'api')
+    terminar_traza(span, token)
+
+    abierto = abrir_span('tarde', 'servicio')
+    cerrar_span(abierto)
+
+    assert abierto is None
+    assert len(span.traza.spans) == 1
+
+def test_buffer_circular_conserva_las_ultimas_y_filtra():
+    buffer = BufferCircular(capacidad=2)
+    for nombre in ('GET /a', 'GET /b', 'POST /c'):
+        span, token = iniciar_traza(nombre, 'api')
+        terminar_traza(span, token, buffer)
+
+    assert [traza['nombre'] for traza in buffer.consultar()] == ['POST /c', 'GET /b']
+    assert [traza['nombre'] for traza in buffer.consultar(nombre='GET')] == ['GET /b']
+    assert buffer.consultar(duracion_minima_ms=60_000) == []
+    assert buffer.consultar(limite=1)[0]['nombre'] == 'POST /c'
+
+def test_archivo_jsonl_agrega_una_linea_por_traza(tmp_path):
+    ruta = tmp_path / 'trazas.jsonl'
+    archivo = ArchivoJSONL(str(ruta))
+    for _ in range(2):
+        span, token = iniciar_traza('GET /a', 'api', id_traza='a' * 32)
+        terminar_traza(span, token, archivo)
+
+    lineas = ruta.read_text(encoding='utf-8').splitlines()
+    assert len(lineas) == 2
+    assert json.loads(lineas[0])['id'] == 'a' * 32